@@ -446,6 +446,7 @@ export type MemoryTableGroups = {
 export type MemoryTableGroup = {
   entries: MemoryTableEntry[];
   summary: MemoryTableSummary;
+  numEntries: number;
 };
 
 export type MemoryTableResponse = {
@@ -49,6 +49,9 @@ class DataSource:
 
 
 class DataOrganizer:
+    # The memory table of the cluster, updated as node stats arrive.
+    memory_index = memory_utils.MemoryIndex()
+
     @staticmethod
     @async_loop_forever(dashboard_consts.PURGE_DATA_INTERVAL_SECONDS)
     async def purge():
@@ -286,16 +289,23 @@ class DataOrganizer:
         }
         return results
 
+    @classmethod
+    async def update_memory_index(cls, change):
+        if change.new:
+            node_id, node_stats = change.new
+            cls.memory_index.update_node(
+                node_id, node_stats.get("coreWorkersStats", []))
+        elif change.old:
+            node_id, _ = change.old
+            cls.memory_index.remove_node(node_id)
+
     @classmethod
     async def get_memory_table(cls,
                                sort_by=memory_utils.SortingType.OBJECT_SIZE,
-                               group_by=memory_utils.GroupByType.STACK_TRACE):
-        all_worker_stats = []
-        for node_stats in DataSource.node_stats.values():
-            all_worker_stats.extend(node_stats.get("coreWorkersStats", []))
-        memory_information = memory_utils.construct_memory_table(
-            all_worker_stats, group_by=group_by, sort_by=sort_by)
-        return memory_information
+                               group_by=memory_utils.GroupByType.STACK_TRACE,
+                               **kwargs):
+        return cls.memory_index.query(
+            group_by=group_by, sort_by=sort_by, **kwargs)
 
     @staticmethod
     def _extract_view_data(views, data_keys):
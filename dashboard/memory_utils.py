@@ -1,8 +1,9 @@
 import base64
+import bisect
 
 from collections import defaultdict
 from enum import Enum
-from typing import List
+from typing import Dict, List, Optional
 
 import ray
 
@@ -46,6 +47,7 @@ class SortingType(Enum):
 class GroupByType(Enum):
     NODE_ADDRESS = "node"
     STACK_TRACE = "stack_trace"
+    REFERENCE_TYPE = "reference_type"
 
 
 class ReferenceType:
@@ -100,6 +102,8 @@ class MemoryTableEntry:
             return self.node_address
         elif group_by_type == GroupByType.STACK_TRACE:
             return self.call_site
+        elif group_by_type == GroupByType.REFERENCE_TYPE:
+            return self.reference_type
         else:
             raise ValueError(f"group by type {group_by_type} is invalid.")
 
@@ -158,6 +162,43 @@ class MemoryTableEntry:
         return str(self.as_dict())
 
 
+# The summary counter of each reference type.
+_REFERENCE_TYPE_SUMMARY_KEYS = {
+    ReferenceType.LOCAL_REFERENCE: "total_local_ref_count",
+    ReferenceType.PINNED_IN_MEMORY: "total_pinned_in_memory",
+    ReferenceType.USED_BY_PENDING_TASK: "total_used_by_pending_task",
+    ReferenceType.CAPTURED_IN_OBJECT: "total_captured_in_objects",
+    ReferenceType.ACTOR_HANDLE: "total_actor_handles",
+}
+
+
+def _empty_summary() -> dict:
+    summary = {"total_object_size": 0}
+    for key in _REFERENCE_TYPE_SUMMARY_KEYS.values():
+        summary[key] = 0
+    return summary
+
+
+def _update_summary(summary: dict, entry: MemoryTableEntry, sign: int = 1):
+    """Adds an entry to a summary, or removes it if sign is -1."""
+    if entry.object_size > 0:
+        summary["total_object_size"] += sign * entry.object_size
+    key = _REFERENCE_TYPE_SUMMARY_KEYS.get(entry.reference_type)
+    if key:
+        summary[key] += sign
+
+
+def _sort_key(sorting_type: SortingType):
+    if sorting_type == SortingType.PID:
+        return lambda entry: entry.pid
+    elif sorting_type == SortingType.OBJECT_SIZE:
+        return lambda entry: entry.object_size
+    elif sorting_type == SortingType.REFERENCE_TYPE:
+        return lambda entry: entry.reference_type
+    else:
+        raise ValueError(f"Give sorting type: {sorting_type} is invalid.")
+
+
 class MemoryTable:
     def __init__(self,
                  entries: List[MemoryTableEntry],
@@ -193,46 +234,13 @@ class MemoryTable:
 
     def summarize(self):
         # Reset summary.
-        total_object_size = 0
-        total_local_ref_count = 0
-        total_pinned_in_memory = 0
-        total_used_by_pending_task = 0
-        total_captured_in_objects = 0
-        total_actor_handles = 0
-
+        self.summary = _empty_summary()
         for entry in self.table:
-            if entry.object_size > 0:
-                total_object_size += entry.object_size
-            if entry.reference_type == ReferenceType.LOCAL_REFERENCE:
-                total_local_ref_count += 1
-            elif entry.reference_type == ReferenceType.PINNED_IN_MEMORY:
-                total_pinned_in_memory += 1
-            elif entry.reference_type == ReferenceType.USED_BY_PENDING_TASK:
-                total_used_by_pending_task += 1
-            elif entry.reference_type == ReferenceType.CAPTURED_IN_OBJECT:
-                total_captured_in_objects += 1
-            elif entry.reference_type == ReferenceType.ACTOR_HANDLE:
-                total_actor_handles += 1
-
-        self.summary = {
-            "total_object_size": total_object_size,
-            "total_local_ref_count": total_local_ref_count,
-            "total_pinned_in_memory": total_pinned_in_memory,
-            "total_used_by_pending_task": total_used_by_pending_task,
-            "total_captured_in_objects": total_captured_in_objects,
-            "total_actor_handles": total_actor_handles
-        }
+            _update_summary(self.summary, entry)
         return self
 
     def _sort_by(self, sorting_type: SortingType):
-        if sorting_type == SortingType.PID:
-            self.table.sort(key=lambda entry: entry.pid)
-        elif sorting_type == SortingType.OBJECT_SIZE:
-            self.table.sort(key=lambda entry: entry.object_size)
-        elif sorting_type == SortingType.REFERENCE_TYPE:
-            self.table.sort(key=lambda entry: entry.reference_type)
-        else:
-            raise ValueError(f"Give sorting type: {sorting_type} is invalid.")
+        self.table.sort(key=_sort_key(sorting_type))
         return self
 
     def _group_by(self, group_by_type: GroupByType):
@@ -278,24 +286,219 @@ class MemoryTable:
         return self.__repr__()
 
 
+def build_memory_table_entries(
+        core_worker_stats: dict) -> List[MemoryTableEntry]:
+    """Returns the valid memory table entries of a core worker."""
+    pid = core_worker_stats["pid"]
+    is_driver = core_worker_stats.get("workerType") == "DRIVER"
+    node_address = core_worker_stats["ipAddress"]
+    entries = []
+    for object_ref in core_worker_stats.get("objectRefs", []):
+        memory_table_entry = MemoryTableEntry(
+            object_ref=object_ref,
+            node_address=node_address,
+            is_driver=is_driver,
+            pid=pid)
+        if memory_table_entry.is_valid():
+            entries.append(memory_table_entry)
+    return entries
+
+
 def construct_memory_table(workers_stats: List,
                            group_by: GroupByType = GroupByType.NODE_ADDRESS,
                            sort_by=SortingType.OBJECT_SIZE) -> MemoryTable:
     memory_table_entries = []
     for core_worker_stats in workers_stats:
-        pid = core_worker_stats["pid"]
-        is_driver = core_worker_stats.get("workerType") == "DRIVER"
-        node_address = core_worker_stats["ipAddress"]
-        object_refs = core_worker_stats.get("objectRefs", [])
-
-        for object_ref in object_refs:
-            memory_table_entry = MemoryTableEntry(
-                object_ref=object_ref,
-                node_address=node_address,
-                is_driver=is_driver,
-                pid=pid)
-            if memory_table_entry.is_valid():
-                memory_table_entries.append(memory_table_entry)
+        memory_table_entries.extend(
+            build_memory_table_entries(core_worker_stats))
     memory_table = MemoryTable(
         memory_table_entries, group_by_type=group_by, sort_by_type=sort_by)
     return memory_table
+
+
+def _insert_sorted(grouped, group_key, sort_key, entry):
+    keys, entries = grouped.setdefault(group_key, ([], []))
+    index = bisect.bisect_right(keys, sort_key)
+    keys.insert(index, sort_key)
+    entries.insert(index, entry)
+
+
+def _remove_sorted(grouped, group_key, sort_key, entry):
+    keys, entries = grouped[group_key]
+    index = bisect.bisect_left(keys, sort_key)
+    while entries[index] is not entry:
+        index += 1
+    del keys[index]
+    del entries[index]
+    if not entries:
+        del grouped[group_key]
+
+
+class MemoryIndex:
+    """The memory table of the cluster, updated as node stats arrive.
+
+    Entries are only built for the workers whose object refs changed since
+    the last update of their node. The summaries of the whole table and of
+    each group, for every GroupByType, are updated with the entries added and
+    removed, so they are never computed from the whole table. Queries return
+    a page of the table, optionally filtered.
+    """
+
+    # Filter name -> MemoryTableEntry attribute.
+    FILTERS = {
+        "node_ip_address": "node_address",
+        "pid": "pid",
+        "reference_type": "reference_type",
+        "call_site": "call_site",
+    }
+
+    def __init__(self):
+        # {node id: {pid: (object refs, entries)}}
+        self._workers = defaultdict(dict)
+        self.summary = _empty_summary()
+        # {group by type: {group key: [number of entries, summary]}}
+        self.groups = {group_by_type: {} for group_by_type in GroupByType}
+        # {(group by type, sorting type): {group key: (sort keys, entries)}},
+        # built on the first query and kept sorted as entries change.
+        self._sorted = {}
+
+    def _update(self, entries: List[MemoryTableEntry], sign: int):
+        if not entries:
+            return
+        for (group_by, sort_by), grouped in self._sorted.items():
+            key = _sort_key(sort_by)
+            for entry in entries:
+                if sign > 0:
+                    _insert_sorted(grouped, entry.group_key(group_by),
+                                   key(entry), entry)
+                else:
+                    _remove_sorted(grouped, entry.group_key(group_by),
+                                   key(entry), entry)
+        for entry in entries:
+            _update_summary(self.summary, entry, sign)
+            for group_by_type, groups in self.groups.items():
+                group_key = entry.group_key(group_by_type)
+                group = groups.get(group_key)
+                if group is None:
+                    group = groups[group_key] = [0, _empty_summary()]
+                group[0] += sign
+                _update_summary(group[1], entry, sign)
+                if group[0] == 0:
+                    del groups[group_key]
+
+    def update_node(self, node_id: str, workers_stats: List[dict]):
+        """Updates the entries of a node from its core workers stats."""
+        workers = self._workers[node_id]
+        pids = set()
+        for core_worker_stats in workers_stats:
+            pid = core_worker_stats["pid"]
+            pids.add(pid)
+            object_refs = core_worker_stats.get("objectRefs", [])
+            old = workers.get(pid)
+            if old is not None and old[0] == object_refs:
+                continue
+            entries = build_memory_table_entries(core_worker_stats)
+            if old is not None:
+                self._update(old[1], -1)
+            self._update(entries, 1)
+            workers[pid] = (object_refs, entries)
+        for pid in workers.keys() - pids:
+            self._update(workers.pop(pid)[1], -1)
+        if not workers:
+            del self._workers[node_id]
+
+    def remove_node(self, node_id: str):
+        for _, entries in self._workers.pop(node_id, {}).values():
+            self._update(entries, -1)
+
+    def _grouped_entries(self, group_by: GroupByType, sort_by: SortingType
+                         ) -> Dict[str, List[MemoryTableEntry]]:
+        grouped = self._sorted.get((group_by, sort_by))
+        if grouped is None:
+            entries_by_group = defaultdict(list)
+            for workers in self._workers.values():
+                for _, entries in workers.values():
+                    for entry in entries:
+                        entries_by_group[entry.group_key(group_by)].append(
+                            entry)
+            key = _sort_key(sort_by)
+            grouped = {}
+            for group_key, entries in entries_by_group.items():
+                entries.sort(key=key)
+                grouped[group_key] = ([key(entry) for entry in entries],
+                                      entries)
+            self._sorted[(group_by, sort_by)] = grouped
+        return {
+            group_key: entries
+            for group_key, (_, entries) in grouped.items()
+        }
+
+    def query(self,
+              group_by: GroupByType = GroupByType.STACK_TRACE,
+              sort_by: SortingType = SortingType.OBJECT_SIZE,
+              filters: Optional[Dict[str, str]] = None,
+              group_key: Optional[str] = None,
+              offset: int = 0,
+              limit: Optional[int] = None) -> dict:
+        """Returns a page of the memory table.
+
+        Args:
+            group_by: How to group the entries.
+            sort_by: How to sort the entries of each group.
+            filters: {filter name: value}, the entries must match all the
+                filters. See `FILTERS` for the filter names.
+            group_key: Only return this group.
+            offset: The number of entries to skip in each group.
+            limit: The maximum number of entries to return per group, all
+                of them if None.
+
+        Returns:
+            A dict in the format of MemoryTable.as_dict, where each group
+            holds a page of its entries and its number of entries as
+            "num_entries". With filters, the groups and summaries only count
+            the matching entries.
+        """
+        filters = {
+            self.FILTERS[name]: str(value)
+            for name, value in (filters or {}).items()
+        }
+        end = None if limit is None else offset + limit
+        grouped = self._grouped_entries(group_by, sort_by)
+        if group_key is not None:
+            grouped = {
+                key: entries
+                for key, entries in grouped.items() if key == group_key
+            }
+
+        groups = {}
+        if not filters:
+            for key, entries in grouped.items():
+                num_entries, summary = self.groups[group_by][key]
+                groups[key] = {
+                    "entries": [
+                        entry.as_dict() for entry in entries[offset:end]
+                    ],
+                    "summary": dict(summary),
+                    "num_entries": num_entries
+                }
+            return {"summary": dict(self.summary), "group": groups}
+
+        summary = _empty_summary()
+        for key, entries in grouped.items():
+            matching = [
+                entry for entry in entries if all(
+                    str(getattr(entry, attribute)) == value
+                    for attribute, value in filters.items())
+            ]
+            if not matching:
+                continue
+            group_summary = _empty_summary()
+            for entry in matching:
+                _update_summary(group_summary, entry)
+                _update_summary(summary, entry)
+            groups[key] = {
+                "entries": [entry.as_dict() for entry in matching[offset:end]],
+                "summary": group_summary,
+                "num_entries": len(matching)
+            }
+        return {"summary": summary, "group": groups}
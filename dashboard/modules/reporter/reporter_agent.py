@@ -19,6 +19,7 @@ import ray.utils
 from ray.core.generated import reporter_pb2
 from ray.core.generated import reporter_pb2_grpc
 from ray.metrics_agent import MetricsAgent
+from ray.profiling import ProfilingSampleWindow
 import psutil
 
 logger = logging.getLogger(__name__)
@@ -72,6 +73,12 @@ class ReporterAgent(dashboard_utils.DashboardAgentModule,
         self._metrics_agent = MetricsAgent(dashboard_agent.metrics_export_port)
         self._key = f"{reporter_consts.REPORTER_PREFIX}" \
                     f"{self._dashboard_agent.node_id}"
+        # The recent stack samples of all workers.
+        self._profiling_samples = ProfilingSampleWindow(
+            reporter_consts.PROFILING_WINDOW_S,
+            reporter_consts.PROFILING_BUCKET_S,
+            reporter_consts.PROFILING_MAX_STACKS_PER_FUNCTION,
+            reporter_consts.PROFILING_DROPPED_STACK)
 
     async def GetProfilingStats(self, request, context):
         pid = request.pid
@@ -104,6 +111,26 @@ class ReporterAgent(dashboard_utils.DashboardAgentModule,
             logger.error(traceback.format_exc())
         return reporter_pb2.ReportOCMetricsReply()
 
+    async def ReportProfilingSamples(self, request, context):
+        for sample in request.samples:
+            self._profiling_samples.add(sample.function_name, sample.stack,
+                                        sample.count)
+        return reporter_pb2.ReportProfilingSamplesReply()
+
+    async def GetProfilingSamples(self, request, context):
+        if request.function_name:
+            function_names = [request.function_name]
+        else:
+            function_names = self._profiling_samples.function_names()
+        samples = []
+        for function_name in function_names:
+            counts = self._profiling_samples.get(function_name)
+            samples.extend(
+                reporter_pb2.ProfilingSample(
+                    function_name=function_name, stack=stack, count=count)
+                for stack, count in counts.items())
+        return reporter_pb2.GetProfilingSamplesReply(samples=samples)
+
     @staticmethod
     def _get_cpu_percent():
         return psutil.cpu_percent()
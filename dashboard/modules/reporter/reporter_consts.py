@@ -4,3 +4,14 @@ REPORTER_PREFIX = "RAY_REPORTER:"
 # The reporter will report its statistics this often (milliseconds).
 REPORTER_UPDATE_INTERVAL_MS = ray_constants.env_integer(
     "REPORTER_UPDATE_INTERVAL_MS", 2500)
+# The maximum number of distinct stacks the agent keeps per function and
+# bucket. Samples of other stacks are counted in PROFILING_DROPPED_STACK.
+PROFILING_MAX_STACKS_PER_FUNCTION = ray_constants.env_integer(
+    "PROFILING_MAX_STACKS_PER_FUNCTION", 10000)
+PROFILING_DROPPED_STACK = "[dropped]"
+# The agent serves the profiling samples of this many recent seconds, kept in
+# buckets of PROFILING_BUCKET_S seconds.
+PROFILING_WINDOW_S = ray_constants.env_integer("PROFILING_WINDOW_S", 600)
+PROFILING_BUCKET_S = 60
+# Timeout of the requests for the profiling samples of each node.
+PROFILING_RPC_TIMEOUT_S = 10
@@ -1,3 +1,5 @@
+import asyncio
+import collections
 import json
 import logging
 import yaml
@@ -22,6 +24,38 @@ logger = logging.getLogger(__name__)
 routes = dashboard_utils.ClassMethodRouteTable
 
 
+def folded_stacks_to_flame_graph(name, stacks):
+    """Build a flame graph tree from folded stack counts.
+
+    Args:
+        name (str): The name of the root node.
+        stacks (dict): Folded stack, frames separated by ";", to count.
+
+    Returns:
+        The root node. Each node is a dict of its "name", the number of
+        samples including it as "value", and its callees as "children".
+    """
+    root = {"name": name, "value": 0, "children": {}}
+    for stack, count in stacks.items():
+        root["value"] += count
+        node = root
+        for frame in stack.split(";"):
+            child = node["children"].get(frame)
+            if child is None:
+                child = {"name": frame, "value": 0, "children": {}}
+                node["children"][frame] = child
+            child["value"] += count
+            node = child
+
+    def to_lists(node):
+        children = sorted(
+            node["children"].values(), key=lambda c: c["value"], reverse=True)
+        node["children"] = [to_lists(child) for child in children]
+        return node
+
+    return to_lists(root)
+
+
 class ReportHead(dashboard_utils.DashboardHeadModule):
     def __init__(self, dashboard_head):
         super().__init__(dashboard_head)
@@ -56,6 +90,41 @@ class ReportHead(dashboard_utils.DashboardHeadModule):
             message="Profiling success.",
             profiling_info=profiling_info)
 
+    @routes.get("/api/flame_graph")
+    async def get_flame_graph(self, req) -> aiohttp.web.Response:
+        """Merges the stack samples of all nodes into flame graphs.
+
+        Returns a flame graph per task or actor method function, or only for
+        the "function_name" query parameter if given.
+        """
+        function_name = req.query.get("function_name", "")
+        stubs = list(self._stubs.items())
+        replies = await asyncio.gather(
+            *[
+                stub.GetProfilingSamples(
+                    reporter_pb2.GetProfilingSamplesRequest(
+                        function_name=function_name),
+                    timeout=reporter_consts.PROFILING_RPC_TIMEOUT_S)
+                for _, stub in stubs
+            ],
+            return_exceptions=True)
+        samples = collections.defaultdict(collections.Counter)
+        for (ip, _), reply in zip(stubs, replies):
+            if isinstance(reply, Exception):
+                logger.warning(
+                    f"Failed to get the profiling samples of {ip}: {reply}")
+                continue
+            for sample in reply.samples:
+                samples[sample.function_name][sample.stack] += sample.count
+        flame_graphs = [{
+            "function_name": name,
+            "flame_graph": folded_stacks_to_flame_graph(name, stacks)
+        } for name, stacks in sorted(samples.items())]
+        return dashboard_utils.rest_response(
+            success=True,
+            message="Fetched flame graphs.",
+            flame_graphs=flame_graphs)
+
     @routes.get("/api/ray_config")
     async def get_ray_config(self, req) -> aiohttp.web.Response:
         if self._ray_config is None:
@@ -2,11 +2,16 @@ import os
 import sys
 import logging
 import requests
+import threading
 import time
 
 import pytest
 import ray
+from ray.new_dashboard.modules.reporter.reporter_head import \
+    folded_stacks_to_flame_graph
 from ray.new_dashboard.tests.conftest import *  # noqa
+from ray.profiling import (ProfilingSampleWindow, SamplingProfiler,
+                           sampled_task)
 from ray.test_utils import (
     format_web_url,
     RayTestTimeoutException,
@@ -96,5 +101,117 @@ def test_node_physical_stats(enable_test_module, shutdown_only):
     wait_for_condition(_check_workers, timeout=10)
 
 
+def test_sampling_profiler():
+    profiler = SamplingProfiler()
+    running = threading.Event()
+    stop = threading.Event()
+
+    def busy_loop():
+        running.set()
+        while not stop.is_set():
+            pass
+
+    def run_task():
+        with sampled_task("Actor.busy"):
+            busy_loop()
+
+    thread = threading.Thread(target=run_task)
+    thread.start()
+    running.wait()
+    for _ in range(3):
+        profiler.sample()
+    stop.set()
+    thread.join()
+    # Threads that don't run a task are not sampled.
+    profiler.sample()
+
+    samples = profiler.take_samples()
+    assert list(samples) == ["Actor.busy"]
+    assert sum(samples["Actor.busy"].values()) == 3
+    for stack in samples["Actor.busy"]:
+        names = [frame.split(" (")[0] for frame in stack.split(";")]
+        assert names.index("run_task") < names.index("busy_loop")
+    assert not profiler.take_samples()
+
+
+def test_profiling_sample_window():
+    window = ProfilingSampleWindow(
+        window_s=10, bucket_s=5, max_stacks_per_function=2, dropped_stack="?")
+    window.add("f", "a;b", 1, now=0)
+    window.add("f", "a;c", 2, now=1)
+    # Stacks beyond the limit of a bucket are counted as dropped.
+    window.add("f", "a;d", 3, now=2)
+    window.add("g", "e", 1, now=6)
+    window.add("f", "a;d", 4, now=7)
+    assert sorted(window.function_names(now=8)) == ["f", "g"]
+    assert window.get("f", now=8) == {"a;b": 1, "a;c": 2, "?": 3, "a;d": 4}
+    # Samples older than the window are dropped.
+    assert window.get("f", now=10) == {"a;d": 4}
+    assert window.function_names(now=17) == []
+    assert window.get("f", now=17) == {}
+
+
+def test_folded_stacks_to_flame_graph():
+    flame_graph = folded_stacks_to_flame_graph("f", {
+        "a;b": 2,
+        "a;c": 3,
+        "d": 1
+    })
+    assert flame_graph == {
+        "name": "f",
+        "value": 6,
+        "children": [{
+            "name": "a",
+            "value": 5,
+            "children": [{
+                "name": "c",
+                "value": 3,
+                "children": []
+            }, {
+                "name": "b",
+                "value": 2,
+                "children": []
+            }]
+        }, {
+            "name": "d",
+            "value": 1,
+            "children": []
+        }]
+    }
+
+
+def test_flame_graph(monkeypatch, shutdown_only):
+    monkeypatch.setenv("RAY_SAMPLING_PROFILER_REPORT_INTERVAL_S", "1")
+    addresses = ray.init(include_dashboard=True, num_cpus=1)
+
+    @ray.remote
+    def busy_task():
+        start = time.time()
+        while time.time() - start < 3:
+            pass
+
+    ray.get(busy_task.remote())
+
+    webui_url = addresses["webui_url"]
+    assert (wait_until_server_available(webui_url) is True)
+    webui_url = format_web_url(webui_url)
+
+    def _check_flame_graph():
+        try:
+            resp = requests.get(webui_url + "/api/flame_graph")
+            resp.raise_for_status()
+            result = resp.json()
+            assert result["result"] is True
+            flame_graphs = result["data"]["flameGraphs"]
+            names = [f["functionName"] for f in flame_graphs]
+            assert any(name.endswith("busy_task") for name in names), names
+            return True
+        except Exception as ex:
+            logger.info(ex)
+            return False
+
+    wait_for_condition(_check_flame_graph, timeout=20)
+
+
 if __name__ == "__main__":
     sys.exit(pytest.main(["-v", __file__]))
@@ -1,7 +1,6 @@
 import asyncio
 import re
 import logging
-import json
 import aiohttp.web
 from aioredis.pubsub import Receiver
 from grpc.experimental import aio as aiogrpc
@@ -12,12 +11,14 @@ import ray.new_dashboard.modules.stats_collector.stats_collector_consts \
 import ray.new_dashboard.utils as dashboard_utils
 from ray.new_dashboard.actor_utils import actor_classname_from_task_spec
 from ray.new_dashboard.utils import async_loop_forever
-from ray.new_dashboard.memory_utils import GroupByType, SortingType
+from ray.new_dashboard.memory_utils import (GroupByType, MemoryIndex,
+                                            SortingType)
 from ray.core.generated import node_manager_pb2
 from ray.core.generated import node_manager_pb2_grpc
 from ray.core.generated import gcs_service_pb2
 from ray.core.generated import gcs_service_pb2_grpc
 from ray.new_dashboard.datacenter import DataSource, DataOrganizer
+from ray.ray_logging import decode_log_batch
 
 logger = logging.getLogger(__name__)
 routes = dashboard_utils.ClassMethodRouteTable
@@ -62,6 +63,7 @@ class StatsCollector(dashboard_utils.DashboardHeadModule):
         self._gcs_actor_info_stub = None
         self._collect_memory_info = False
         DataSource.nodes.signal.append(self._update_stubs)
+        DataSource.node_stats.signal.append(DataOrganizer.update_memory_index)
 
     async def _update_stubs(self, change):
         if change.old:
@@ -117,17 +119,31 @@ class StatsCollector(dashboard_utils.DashboardHeadModule):
     async def get_memory_table(self, req) -> aiohttp.web.Response:
         group_by = req.query.get("group_by")
         sort_by = req.query.get("sort_by")
-        kwargs = {}
-        if group_by:
-            kwargs["group_by"] = GroupByType(group_by)
-        if sort_by:
-            kwargs["sort_by"] = SortingType(sort_by)
+        kwargs = {
+            "filters": {
+                name: req.query[name]
+                for name in MemoryIndex.FILTERS if name in req.query
+            },
+            "group_key": req.query.get("group_key"),
+        }
+        try:
+            kwargs["offset"] = int(req.query.get("offset", 0))
+            if "limit" in req.query:
+                kwargs["limit"] = int(req.query["limit"])
+            if kwargs["offset"] < 0 or kwargs.get("limit", 0) < 0:
+                raise ValueError("offset and limit must not be negative")
+            if group_by:
+                kwargs["group_by"] = GroupByType(group_by)
+            if sort_by:
+                kwargs["sort_by"] = SortingType(sort_by)
+        except ValueError as e:
+            raise aiohttp.web.HTTPBadRequest(reason=str(e))
 
         memory_table = await DataOrganizer.get_memory_table(**kwargs)
         return dashboard_utils.rest_response(
             success=True,
             message="Fetched memory table",
-            memory_table=memory_table.as_dict())
+            memory_table=memory_table)
 
     @routes.get("/memory/set_fetch")
     async def set_fetch_memory_info(self, req) -> aiohttp.web.Response:
@@ -268,15 +284,16 @@ class StatsCollector(dashboard_utils.DashboardHeadModule):
 
         async for sender, msg in receiver.iter():
             try:
-                data = json.loads(ray.utils.decode(msg))
-                ip = data["ip"]
-                pid = str(data["pid"])
-                logs_for_ip = dict(DataSource.ip_and_pid_to_logs.get(ip, {}))
-                logs_for_pid = list(logs_for_ip.get(pid, []))
-                logs_for_pid.extend(data["lines"])
-                logs_for_ip[pid] = logs_for_pid
-                DataSource.ip_and_pid_to_logs[ip] = logs_for_ip
-                logger.info(f"Received a log for {ip} and {pid}")
+                for data in decode_log_batch(msg):
+                    ip = data["ip"]
+                    pid = str(data["pid"])
+                    logs_for_ip = dict(
+                        DataSource.ip_and_pid_to_logs.get(ip, {}))
+                    logs_for_pid = list(logs_for_ip.get(pid, []))
+                    logs_for_pid.extend(data["lines"])
+                    logs_for_ip[pid] = logs_for_pid
+                    DataSource.ip_and_pid_to_logs[ip] = logs_for_ip
+                    logger.info(f"Received a log for {ip} and {pid}")
             except Exception:
                 logger.exception("Error receiving log info.")
 
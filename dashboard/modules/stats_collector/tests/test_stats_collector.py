@@ -126,6 +126,11 @@ def test_memory_table(disable_aiohttp_cache, ray_start_with_dashboard):
 
     wait_for_condition(check_mem_table, 10)
 
+    # Invalid paging parameters are rejected.
+    for params in [{"offset": "x"}, {"limit": "-1"}, {"group_by": "x"}]:
+        resp = requests.get(f"{webui_url}/memory/memory_table", params=params)
+        assert resp.status_code == 400
+
 
 def test_get_all_node_details(disable_aiohttp_cache, ray_start_with_dashboard):
     assert (wait_until_server_available(ray_start_with_dashboard["webui_url"]))
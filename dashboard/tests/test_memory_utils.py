@@ -1,7 +1,7 @@
 import ray
 from ray.new_dashboard.memory_utils import (
     ReferenceType, decode_object_ref_if_needed, MemoryTableEntry, MemoryTable,
-    SortingType)
+    SortingType, GroupByType, MemoryIndex, construct_memory_table)
 """Memory Table Unit Test"""
 
 NODE_ADDRESS = "127.0.0.1"
@@ -246,6 +246,90 @@ def test_group_by():
             pid += 1
 
 
+def build_worker_stats(pid, node_address, object_sizes, call_site="a.py:1"):
+    return {
+        "pid": pid,
+        "ipAddress": node_address,
+        "workerType": "WORKER",
+        "objectRefs": [{
+            "objectId": OBJECT_ID,
+            "callSite": call_site,
+            "objectSize": object_size,
+            "localRefCount": 1,
+        } for object_size in object_sizes]
+    }
+
+
+def test_memory_index():
+    memory_index = MemoryIndex()
+    node_1 = [
+        build_worker_stats(1, "127.0.0.1", [300, 100]),
+        build_worker_stats(2, "127.0.0.1", [200], call_site="b.py:1")
+    ]
+    node_2 = [build_worker_stats(3, "127.0.0.2", [400])]
+    memory_index.update_node("node_1", node_1)
+    memory_index.update_node("node_2", node_2)
+
+    # Same summaries as the memory table built from all workers.
+    memory_table = construct_memory_table(
+        node_1 + node_2, group_by=GroupByType.STACK_TRACE)
+    result = memory_index.query(group_by=GroupByType.STACK_TRACE)
+    assert result["summary"] == memory_table.summary
+    assert result["group"].keys() == memory_table.group.keys()
+    for group_key, group in result["group"].items():
+        assert group["summary"] == memory_table.group[group_key].summary
+        assert group["entries"] == memory_table.group[group_key].get_entries()
+
+    # Pagination.
+    result = memory_index.query(
+        group_by=GroupByType.NODE_ADDRESS,
+        sort_by=SortingType.OBJECT_SIZE,
+        offset=1,
+        limit=1)
+    group = result["group"]["127.0.0.1"]
+    assert group["num_entries"] == 3
+    assert [entry["object_size"] for entry in group["entries"]] == [200]
+
+    # Filters.
+    result = memory_index.query(
+        group_by=GroupByType.NODE_ADDRESS, filters={"pid": "1"})
+    assert list(result["group"]) == ["127.0.0.1"]
+    assert result["group"]["127.0.0.1"]["num_entries"] == 2
+    assert result["summary"]["total_object_size"] == 400
+    result = memory_index.query(
+        group_by=GroupByType.REFERENCE_TYPE,
+        group_key=ReferenceType.LOCAL_REFERENCE)
+    assert result["group"][ReferenceType.LOCAL_REFERENCE]["num_entries"] == 4
+
+    # The sorted groups are kept up to date as entries change.
+    sorted_groups = memory_index._sorted[(GroupByType.NODE_ADDRESS,
+                                          SortingType.OBJECT_SIZE)]
+    memory_index.update_node("node_1", [
+        build_worker_stats(1, "127.0.0.1", [300, 100]),
+        build_worker_stats(2, "127.0.0.1", [150, 250], call_site="b.py:1")
+    ])
+    assert memory_index._sorted[(GroupByType.NODE_ADDRESS,
+                                 SortingType.OBJECT_SIZE)] is sorted_groups
+    result = memory_index.query(
+        group_by=GroupByType.NODE_ADDRESS, sort_by=SortingType.OBJECT_SIZE)
+    group = result["group"]["127.0.0.1"]
+    assert [entry["object_size"]
+            for entry in group["entries"]] == [100, 150, 250, 300]
+
+    # Updates of a node only replace the entries of the changed workers.
+    node_1 = [build_worker_stats(1, "127.0.0.1", [300, 100])]
+    memory_index.update_node("node_1", node_1)
+    memory_index.remove_node("node_2")
+    result = memory_index.query(group_by=GroupByType.NODE_ADDRESS)
+    assert result["summary"]["total_object_size"] == 400
+    assert result["summary"]["total_local_ref_count"] == 2
+    assert list(result["group"]) == ["127.0.0.1"]
+    memory_index.remove_node("node_1")
+    result = memory_index.query()
+    assert result["group"] == {}
+    assert result["summary"]["total_object_size"] == 0
+
+
 if __name__ == "__main__":
     import sys
     import pytest
@@ -0,0 +1,85 @@
+# Measures how many metric points per second the per-node MetricsAgent
+# ingests, for reports that add new series, repeat the same values, and
+# change every value.
+#
+# Usage: python metrics_agent.py [--num-metrics 100] [--num-series 100]
+
+import argparse
+import socket
+import time
+
+from ray.core.generated.metrics_pb2 import Metric
+from ray.metrics_agent import MetricsAgent
+
+
+def make_report(num_metrics, num_series, value):
+    metrics = []
+    for i in range(num_metrics):
+        metric = Metric()
+        descriptor = metric.metric_descriptor
+        descriptor.name = "benchmark_metric_{}".format(i)
+        descriptor.description = "benchmark"
+        descriptor.label_keys.add().key = "WorkerId"
+        for j in range(num_series):
+            series = metric.timeseries.add()
+            series.start_timestamp.seconds = 1
+            series.label_values.add().value = "worker_{}".format(j)
+            point = series.points.add()
+            if i % 3 == 0:
+                point.int64_value = value
+            elif i % 3 == 1:
+                point.double_value = value
+            else:
+                dist = point.distribution_value
+                dist.count = value + 1
+                dist.sum = value * 1.5
+                dist.bucket_options.explicit.bounds.extend([0.1, 1, 10])
+                for count in [0, value, 1, 0]:
+                    dist.buckets.add().count = count
+        metrics.append(metric)
+    return metrics
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-metrics", type=int, default=100)
+    parser.add_argument("--num-series", type=int, default=100)
+    parser.add_argument("--num-reports", type=int, default=20)
+    args = parser.parse_args()
+
+    agent = MetricsAgent(free_port())
+    num_points = args.num_metrics * args.num_series
+    first = make_report(args.num_metrics, args.num_series, 1)
+    reports = [
+        make_report(args.num_metrics, args.num_series, value)
+        for value in range(2, args.num_reports + 2)
+    ]
+
+    def timeit(name, reports):
+        start = time.time()
+        for report in reports:
+            agent.record_metric_points_from_protobuf(report)
+        elapsed = time.time() - start
+        print("\t{}: {:.0f} points/s".format(
+            name,
+            num_points * len(reports) / elapsed))
+
+    print("Recording {} metrics with {} series each".format(
+        args.num_metrics, args.num_series))
+    timeit("new series", [first])
+    timeit("unchanged values", [first] * args.num_reports)
+    timeit("changed values", reports)
+    start = time.time()
+    agent.flush()
+    print("\texport: {:.3f}s".format(time.time() - start))
+    agent.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,12 @@ from ray.autoscaler.tags import (TAG_RAY_LAUNCH_CONFIG, TAG_RAY_RUNTIME_CONFIG,
                                  TAG_RAY_USER_NODE_TYPE, STATUS_UP_TO_DATE,
                                  NODE_KIND_WORKER, NODE_KIND_UNMANAGED)
 from ray.autoscaler._private.providers import _get_node_provider
+from ray.autoscaler._private.cached_provider import CachedNodeProvider
 from ray.autoscaler._private.updater import NodeUpdaterThread
 from ray.autoscaler._private.node_launcher import NodeLauncher
+from ray.autoscaler._private.demand_forecaster import DemandForecaster
+from ray.autoscaler._private.file_mount_broadcast import FileMountBroadcast
+from ray.autoscaler._private.prom_metrics import AutoscalerPrometheusMetrics
 from ray.autoscaler._private.resource_demand_scheduler import \
     ResourceDemandScheduler, NodeType, NodeID
 from ray.autoscaler._private.util import ConcurrentCounter, validate_config, \
@@ -66,12 +70,14 @@ class StandardAutoscaler:
                  max_concurrent_launches=AUTOSCALER_MAX_CONCURRENT_LAUNCHES,
                  max_failures=AUTOSCALER_MAX_NUM_FAILURES,
                  process_runner=subprocess,
-                 update_interval_s=AUTOSCALER_UPDATE_INTERVAL_S):
+                 update_interval_s=AUTOSCALER_UPDATE_INTERVAL_S,
+                 prom_metrics=None):
         self.config_path = config_path
         # Keep this before self.reset (self.provider needs to be created
         # exactly once).
         self.provider = None
         self.resource_demand_scheduler = None
+        self.file_mount_broadcast = None
         self.reset(errors_fatal=True)
         self.head_node_ip = load_metrics.local_ip
         self.load_metrics = load_metrics
@@ -88,6 +94,10 @@ class StandardAutoscaler:
         self.num_failures = 0
         self.last_update_time = 0.0
         self.update_interval_s = update_interval_s
+        # Duration and provider calls of the last update.
+        self.update_latency_s = 0.0
+        self.update_provider_calls = collections.Counter()
+        self.prom_metrics = prom_metrics or AutoscalerPrometheusMetrics()
 
         # Node launchers
         self.launch_queue = queue.Queue()
@@ -124,7 +134,23 @@ class StandardAutoscaler:
     def update(self):
         try:
             self.reset(errors_fatal=False)
-            self._update()
+            last_update_time = self.last_update_time
+            start = time.time()
+            cached = isinstance(self.provider, CachedNodeProvider)
+            if cached:
+                num_calls = self.provider.num_calls.copy()
+                # Serve the provider reads of this update from a snapshot.
+                self.provider.snapshot()
+            try:
+                self._update()
+            finally:
+                if cached:
+                    self.provider.clear()
+                if self.last_update_time != last_update_time:
+                    self._record_update(
+                        time.time() - start,
+                        self.provider.num_calls - num_calls
+                        if cached else collections.Counter())
         except Exception as e:
             logger.exception("StandardAutoscaler: "
                              "Error during autoscaling.")
@@ -143,6 +169,13 @@ class StandardAutoscaler:
                                 "Too many errors, abort.")
                 raise e
 
+    def _record_update(self, latency_s, provider_calls):
+        self.update_latency_s = latency_s
+        self.update_provider_calls = provider_calls
+        self.prom_metrics.update_time.observe(latency_s)
+        for method, count in provider_calls.items():
+            self.prom_metrics.provider_calls.labels(method=method).inc(count)
+
     def _update(self):
         now = time.time()
 
@@ -158,6 +191,8 @@ class StandardAutoscaler:
             self.provider.internal_ip(node_id)
             for node_id in self.all_workers()
         ])
+        if self.file_mount_broadcast:
+            self.file_mount_broadcast.prune(nodes)
         self.log_info_string(nodes)
 
         # Terminate any idle or out of date nodes
@@ -214,7 +249,8 @@ class StandardAutoscaler:
             self.load_metrics.get_resource_utilization(),
             self.load_metrics.get_pending_placement_groups(),
             self.load_metrics.get_static_node_resources_by_ip(),
-            ensure_min_cluster_size=self.resource_demand_vector)
+            ensure_min_cluster_size=self.resource_demand_vector,
+            demand_history=self.load_metrics.get_demand_history())
         for node_type, count in to_launch.items():
             self.launch_new_node(count, node_type=node_type)
 
@@ -350,8 +386,9 @@ class StandardAutoscaler:
             self.runtime_hash = new_runtime_hash
             self.file_mounts_contents_hash = new_file_mounts_contents_hash
             if not self.provider:
-                self.provider = _get_node_provider(self.config["provider"],
-                                                   self.config["cluster_name"])
+                self.provider = CachedNodeProvider(
+                    _get_node_provider(self.config["provider"],
+                                       self.config["cluster_name"]))
 
             self.available_node_types = self.config["available_node_types"]
             upscaling_speed = self.config.get("upscaling_speed")
@@ -377,17 +414,28 @@ class StandardAutoscaler:
                     "1 / target_utilization_fraction - 1.")
             else:
                 upscaling_speed = 1.0
+            fanout = self.config.get("file_mounts_broadcast_fanout", 0)
+            relay = self.config.get("file_mounts_broadcast_relay", False)
+            if not fanout:
+                self.file_mount_broadcast = None
+            elif self.file_mount_broadcast:
+                self.file_mount_broadcast.fanout = fanout
+                self.file_mount_broadcast.relay = relay
+            else:
+                self.file_mount_broadcast = FileMountBroadcast(fanout, relay)
+            forecaster = DemandForecaster.from_config(
+                self.config.get("predictive_scaling"))
             if self.resource_demand_scheduler:
                 # The node types are autofilled internally for legacy yamls,
                 # overwriting the class will remove the inferred node resources
                 # for legacy yamls.
                 self.resource_demand_scheduler.reset_config(
                     self.provider, self.available_node_types,
-                    self.config["max_workers"], upscaling_speed)
+                    self.config["max_workers"], upscaling_speed, forecaster)
             else:
                 self.resource_demand_scheduler = ResourceDemandScheduler(
                     self.provider, self.available_node_types,
-                    self.config["max_workers"], upscaling_speed)
+                    self.config["max_workers"], upscaling_speed, forecaster)
 
         except Exception as e:
             if errors_fatal:
@@ -541,7 +589,8 @@ class StandardAutoscaler:
             process_runner=self.process_runner,
             use_internal_ip=True,
             docker_config=docker_config,
-            node_resources=node_resources)
+            node_resources=node_resources,
+            file_mount_broadcast=self.file_mount_broadcast)
         updater.start()
         self.updaters[node_id] = updater
 
@@ -587,6 +636,9 @@ class StandardAutoscaler:
         tmp += self.resource_demand_scheduler.debug_string(
             nodes, self.pending_launches.breakdown(),
             self.load_metrics.get_resource_utilization())
+        tmp += "\nPrevious update: {:.3f}s, {} provider calls {}".format(
+            self.update_latency_s, sum(self.update_provider_calls.values()),
+            dict(self.update_provider_calls))
         if _internal_kv_initialized():
             _internal_kv_put(DEBUG_AUTOSCALING_STATUS, tmp, overwrite=True)
         logger.debug(tmp)
@@ -0,0 +1,122 @@
+# Times the autoscaler bin packing on a large cluster with a large backlog of
+# resource demands, e.g. 10k nodes and 100k pending tasks and actors.
+#
+# Usage: python bin_packing.py [--num-nodes 10000] [--num-demands 100000]
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ray.autoscaler._private.resource_demand_scheduler import (
+    get_bin_pack_residual, get_nodes_for)
+
+NODE_TYPES = {
+    "m4.large": {
+        "resources": {
+            "CPU": 2
+        },
+        "max_workers": 20000,
+    },
+    "m4.4xlarge": {
+        "resources": {
+            "CPU": 16
+        },
+        "max_workers": 20000,
+    },
+    "m4.16xlarge": {
+        "resources": {
+            "CPU": 64,
+            "memory": 1000,
+        },
+        "max_workers": 20000,
+    },
+    "p2.8xlarge": {
+        "resources": {
+            "CPU": 32,
+            "GPU": 8
+        },
+        "max_workers": 20000,
+    },
+}
+
+DEMAND_SHAPES = [
+    {
+        "CPU": 1
+    },
+    {
+        "CPU": 2
+    },
+    {
+        "CPU": 0.5
+    },
+    {
+        "CPU": 4,
+        "memory": 50
+    },
+    {
+        "GPU": 1
+    },
+    {
+        "CPU": 8,
+        "GPU": 1
+    },
+]
+
+
+def make_nodes(num_nodes):
+    """Returns the available resources of a partially used cluster."""
+    nodes = []
+    for _ in range(num_nodes):
+        node = dict(random.choice(list(NODE_TYPES.values()))["resources"])
+        for k in node:
+            node[k] = random.randint(0, node[k])
+        nodes.append(node)
+    return nodes
+
+
+def make_demands(num_demands):
+    """Returns demands grouped by shape, as reported by the raylets."""
+    counts = np.random.multinomial(
+        num_demands, [1 / len(DEMAND_SHAPES)] * len(DEMAND_SHAPES))
+    demands = []
+    for shape, count in zip(DEMAND_SHAPES, counts):
+        demands += [shape] * count
+    return demands
+
+
+def timeit(name, fn, repeat=3):
+    stats = []
+    for _ in range(repeat):
+        start = time.time()
+        result = fn()
+        stats.append(time.time() - start)
+    print("\t{} {} +- {} s".format(name, round(np.mean(stats), 3),
+                                   round(np.std(stats), 3)))
+    return result
+
+
+def main(num_nodes, num_demands):
+    random.seed(0)
+    np.random.seed(0)
+    nodes = make_nodes(num_nodes)
+    demands = make_demands(num_demands)
+    print("Bin packing {} demands onto {} nodes".format(
+        num_demands, num_nodes))
+    unfulfilled, _ = timeit("get_bin_pack_residual",
+                            lambda: get_bin_pack_residual(nodes, demands))
+    timeit("get_bin_pack_residual (strict spread)",
+           lambda: get_bin_pack_residual(nodes, demands, strict_spread=True))
+    to_add = timeit(
+        "get_nodes_for {} unfulfilled".format(len(unfulfilled)),
+        lambda: get_nodes_for(NODE_TYPES, {}, num_nodes, unfulfilled))
+    print("\tNodes to add: {}".format(dict(to_add)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-nodes", type=int, default=10000)
+    parser.add_argument("--num-demands", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.num_nodes, args.num_demands)
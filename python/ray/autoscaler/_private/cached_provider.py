@@ -0,0 +1,162 @@
+import collections
+import threading
+from typing import Any, Dict, List, Optional
+
+from ray.autoscaler.node_provider import NodeProvider
+
+
+class CachedNodeProvider(NodeProvider):
+    """Serves the autoscaler's reads of a NodeProvider from a snapshot.
+
+    The autoscaler calls `snapshot()` at the start of each update and
+    `clear()` at the end. In between, the non-terminated nodes are listed
+    once and the tags and internal IP of each node are fetched at most once.
+    Writes keep the snapshot coherent: tag updates are applied to it,
+    terminated nodes are removed from it, and creating nodes makes the next
+    read list the nodes again. Outside of an update every call goes to the
+    wrapped provider.
+
+    Calls made to the wrapped provider are counted in `num_calls`.
+    """
+
+    def __init__(self, provider: NodeProvider) -> None:
+        super().__init__(provider.provider_config, provider.cluster_name)
+        self.provider = provider
+        self.num_calls = collections.Counter()
+        self._lock = threading.RLock()
+        self._active = False
+        # Node ids in the order returned by the provider, or None if the
+        # nodes need to be listed again.
+        self._node_ids = None
+        self._tags = {}
+        self._internal_ips = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # Provider specific attributes and methods.
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def _call(self, method: str, *args) -> Any:
+        with self._lock:
+            self.num_calls[method] += 1
+        return getattr(self.provider, method)(*args)
+
+    def snapshot(self) -> None:
+        """Starts serving reads from a snapshot taken on first use."""
+        with self._lock:
+            self._active = True
+            self._node_ids = None
+            self._tags = {}
+            self._internal_ips = {}
+
+    def clear(self) -> None:
+        """Drops the snapshot, all calls go to the provider again."""
+        with self._lock:
+            self._active = False
+            self._node_ids = None
+            self._tags = {}
+            self._internal_ips = {}
+
+    def _cached_node_ids(self) -> Optional[List[str]]:
+        with self._lock:
+            if not self._active:
+                return None
+            if self._node_ids is not None:
+                return self._node_ids
+        node_ids = self._call("non_terminated_nodes", {})
+        with self._lock:
+            if self._active:
+                self._node_ids = list(node_ids)
+                live = set(node_ids)
+                self._tags = {
+                    node_id: tags
+                    for node_id, tags in self._tags.items() if node_id in live
+                }
+            return node_ids
+
+    def _is_cached(self, node_id: str) -> bool:
+        node_ids = self._cached_node_ids()
+        return node_ids is not None and node_id in node_ids
+
+    def non_terminated_nodes(self, tag_filters: Dict[str, str]) -> List[str]:
+        node_ids = self._cached_node_ids()
+        if node_ids is None:
+            return self._call("non_terminated_nodes", tag_filters)
+        if not tag_filters:
+            return list(node_ids)
+        matching = []
+        for node_id in node_ids:
+            tags = self.node_tags(node_id)
+            if all(tags.get(k) == v for k, v in tag_filters.items()):
+                matching.append(node_id)
+        return matching
+
+    def is_running(self, node_id: str) -> bool:
+        return self._call("is_running", node_id)
+
+    def is_terminated(self, node_id: str) -> bool:
+        return self._call("is_terminated", node_id)
+
+    def node_tags(self, node_id: str) -> Dict[str, str]:
+        with self._lock:
+            if node_id in self._tags:
+                return self._tags[node_id]
+        tags = self._call("node_tags", node_id)
+        if self._is_cached(node_id):
+            with self._lock:
+                self._tags[node_id] = tags
+        return tags
+
+    def external_ip(self, node_id: str) -> str:
+        return self._call("external_ip", node_id)
+
+    def internal_ip(self, node_id: str) -> str:
+        with self._lock:
+            if node_id in self._internal_ips:
+                return self._internal_ips[node_id]
+        ip = self._call("internal_ip", node_id)
+        # The IP of a node never changes, but it may not be assigned yet.
+        if ip is not None and self._is_cached(node_id):
+            with self._lock:
+                self._internal_ips[node_id] = ip
+        return ip
+
+    def get_node_id(self, ip_address: str,
+                    use_internal_ip: bool = False) -> str:
+        return self._call("get_node_id", ip_address, use_internal_ip)
+
+    def create_node(self, node_config: Dict[str, Any], tags: Dict[str, str],
+                    count: int) -> None:
+        self._call("create_node", node_config, tags, count)
+        with self._lock:
+            self._node_ids = None
+
+    def set_node_tags(self, node_id: str, tags: Dict[str, str]) -> None:
+        self._call("set_node_tags", node_id, tags)
+        with self._lock:
+            if node_id in self._tags:
+                self._tags[node_id] = dict(self._tags[node_id], **tags)
+
+    def terminate_node(self, node_id: str) -> None:
+        self.terminate_nodes([node_id])
+
+    def terminate_nodes(self, node_ids: List[str]) -> None:
+        self._call("terminate_nodes", node_ids)
+        terminated = set(node_ids)
+        with self._lock:
+            if self._node_ids is not None:
+                self._node_ids = [
+                    node_id for node_id in self._node_ids
+                    if node_id not in terminated
+                ]
+            for node_id in terminated:
+                self._tags.pop(node_id, None)
+                self._internal_ips.pop(node_id, None)
+
+    def get_command_runner(self, *args, **kwargs):
+        return self.provider.get_command_runner(*args, **kwargs)
+
+    def prepare_for_head_node(
+            self, cluster_config: Dict[str, Any]) -> Dict[str, Any]:
+        return self.provider.prepare_for_head_node(cluster_config)
@@ -41,6 +41,11 @@ AUTOSCALER_HEARTBEAT_TIMEOUT_S = env_integer("AUTOSCALER_HEARTBEAT_TIMEOUT_S",
 # to run.
 AUTOSCALER_MAX_RESOURCE_DEMAND_VECTOR_SIZE = 1000
 
+# Number of resource demand samples kept by LoadMetrics for forecasting, one
+# per AUTOSCALER_UPDATE_INTERVAL_S (one hour by default).
+AUTOSCALER_DEMAND_HISTORY_SIZE = env_integer("AUTOSCALER_DEMAND_HISTORY_SIZE",
+                                             720)
+
 # Max number of retries to AWS (default is 5, time increases exponentially)
 BOTO_MAX_RETRIES = env_integer("BOTO_MAX_RETRIES", 12)
 # Max number of retries to create an EC2 node (retry different subnet)
@@ -48,3 +53,6 @@ BOTO_CREATE_MAX_RETRIES = env_integer("BOTO_CREATE_MAX_RETRIES", 5)
 
 # ray home path in the container image
 RAY_HOME = "/home/ray"
+
+# Port on which the monitor exports the autoscaler's prometheus metrics.
+AUTOSCALER_METRIC_PORT = env_integer("AUTOSCALER_METRIC_PORT", 44217)
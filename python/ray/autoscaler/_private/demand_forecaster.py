@@ -0,0 +1,124 @@
+"""Forecasts resource demands from the demand history in LoadMetrics.
+
+The forecast is used by the resource demand scheduler to launch nodes ahead
+of demand, so that node startup time does not add to the queueing time of
+tasks and actors. Nodes launched for forecasted demand are capped by
+`max_speculative_nodes` per autoscaler update.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from ray.autoscaler._private.constants import \
+    AUTOSCALER_MAX_RESOURCE_DEMAND_VECTOR_SIZE
+
+# e.g., (("CPU", 1), ("GPU", 1)).
+ResourceShape = Tuple[Tuple[str, float], ...]
+
+# e.g., (1612345678.0, {(("CPU", 1),): 16}).
+DemandSample = Tuple[float, Dict[ResourceShape, int]]
+
+# Exponentially weighted moving average of the demand per shape.
+POLICY_EWMA = "ewma"
+# Holt's linear trend: EWMA of the demand and of its rate of change.
+POLICY_TREND = "trend"
+
+DEFAULT_POLICY = POLICY_TREND
+DEFAULT_HORIZON_S = 120
+DEFAULT_MAX_SPECULATIVE_NODES = 1
+DEFAULT_ALPHA = 0.5
+DEFAULT_BETA = 0.3
+
+
+def shape_key(demand: Dict[str, float]) -> ResourceShape:
+    """Returns a hashable key for a resource demand shape."""
+    return tuple(sorted(demand.items()))
+
+
+class DemandForecaster:
+    """Predicts the resource demands `horizon_s` seconds from now.
+
+    Each resource shape is forecasted independently from its demand count in
+    the history samples. Only the demand exceeding the current demand is
+    returned, since the current demand is already scheduled.
+    """
+
+    def __init__(self,
+                 policy: str = DEFAULT_POLICY,
+                 horizon_s: float = DEFAULT_HORIZON_S,
+                 max_speculative_nodes: int = DEFAULT_MAX_SPECULATIVE_NODES,
+                 alpha: float = DEFAULT_ALPHA,
+                 beta: float = DEFAULT_BETA) -> None:
+        if policy not in (POLICY_EWMA, POLICY_TREND):
+            raise ValueError(f"Unknown demand forecasting policy {policy}, "
+                             f"expected one of {POLICY_EWMA}, {POLICY_TREND}")
+        self.policy = policy
+        self.horizon_s = horizon_s
+        self.max_speculative_nodes = max_speculative_nodes
+        self.alpha = alpha
+        self.beta = beta
+
+    @staticmethod
+    def from_config(
+            config: Optional[Dict[str, Any]]) -> Optional["DemandForecaster"]:
+        """Creates a forecaster from the `predictive_scaling` config section.
+
+        Returns None if predictive scaling is not configured.
+        """
+        if not config:
+            return None
+        return DemandForecaster(
+            policy=config.get("policy", DEFAULT_POLICY),
+            horizon_s=config.get("horizon_s", DEFAULT_HORIZON_S),
+            max_speculative_nodes=config.get("max_speculative_nodes",
+                                             DEFAULT_MAX_SPECULATIVE_NODES),
+            alpha=config.get("alpha", DEFAULT_ALPHA),
+            beta=config.get("beta", DEFAULT_BETA))
+
+    def forecast(self, history: List[DemandSample]) -> List[Dict[str, float]]:
+        """Returns the predicted demands in excess of the latest sample.
+
+        Args:
+            history: Demand samples, oldest first.
+        """
+        if not history:
+            return []
+        shapes = set()
+        for _, counts in history:
+            shapes.update(counts)
+        latest = history[-1][1]
+        predicted = []
+        for shape in sorted(shapes):
+            series = [(t, counts.get(shape, 0)) for t, counts in history]
+            if self.policy == POLICY_EWMA:
+                expected = self._ewma(series)
+            else:
+                expected = self._trend(series)
+            extra = int(math.ceil(expected - 1e-9)) - latest.get(shape, 0)
+            if extra > 0:
+                predicted.extend([dict(shape)] * extra)
+            if len(predicted) >= AUTOSCALER_MAX_RESOURCE_DEMAND_VECTOR_SIZE:
+                break
+        return predicted[:AUTOSCALER_MAX_RESOURCE_DEMAND_VECTOR_SIZE]
+
+    def _ewma(self, series: List[Tuple[float, int]]) -> float:
+        level = series[0][1]
+        for _, count in series[1:]:
+            level = self.alpha * count + (1 - self.alpha) * level
+        return level
+
+    def _trend(self, series: List[Tuple[float, int]]) -> float:
+        level = series[0][1]
+        # Rate of change of the demand, per second.
+        rate = 0.0
+        prev_time = series[0][0]
+        for t, count in series[1:]:
+            dt = t - prev_time
+            if dt <= 0:
+                continue
+            prev_level = level
+            level = self.alpha * count + (1 - self.alpha) * (level + rate * dt)
+            rate = (
+                self.beta * (level - prev_level) / dt + (1 - self.beta) * rate)
+            prev_time = t
+        return max(0.0, level + rate * self.horizon_s)
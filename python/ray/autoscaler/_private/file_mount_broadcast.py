@@ -0,0 +1,121 @@
+import collections
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ray.autoscaler._private.util import hash_file_mount_contents
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting updater checks for a free source, in seconds.
+SOURCE_WAIT_INTERVAL_S = 5
+
+# Returned by _free_source when every source is busy.
+_NO_SOURCE = object()
+
+
+class FileMountBroadcast:
+    """Distributes the file mounts to new nodes in a fan-out tree.
+
+    The head node sends the file mounts to at most `fanout` nodes at a time.
+    Each node that finished syncing becomes a seed and sends the same
+    contents to at most `fanout` other nodes at a time. Seeds are preferred
+    over the head node, so the number of nodes holding the file mounts grows
+    geometrically while the head node uploads only a few copies.
+
+    The file mounts contents are identified by a key, the runtime and file
+    mounts contents hash of the updater. Only seeds with the same key serve a
+    node.
+
+    Relaying needs the cluster SSH key on the seeds, so it is only done if
+    `relay` is set. Otherwise the head node sends the file mounts to every
+    node, still at most `fanout` at a time.
+    """
+
+    def __init__(self, fanout: int, relay: bool = False) -> None:
+        self.fanout = fanout
+        self.relay = relay
+        self._cv = threading.Condition()
+        # Node id -> contents key of the file mounts it holds.
+        self._seeds = {}
+        # Source node id (None for the head node) -> transfers in flight.
+        self._transfers = collections.Counter()
+        # Contents key -> {remote path: contents hash}.
+        self._mount_hashes = {}
+
+    def _free_source(self, key: str, node_id: str):
+        candidates = [
+            seed for seed, seed_key in self._seeds.items() if seed != node_id
+            and seed_key == key and self._transfers[seed] < self.fanout
+        ]
+        if candidates:
+            return min(candidates, key=lambda n: self._transfers[n])
+        if self._transfers[None] < self.fanout:
+            return None
+        return _NO_SOURCE
+
+    @contextmanager
+    def source(self, key: str, node_id: str) -> Iterator[Optional[str]]:
+        """Waits for a free source and reserves it for node `node_id`.
+
+        Yields:
+            The node id of the seed to sync from, or None for the head node.
+        """
+        with self._cv:
+            source = self._free_source(key, node_id)
+            while source is _NO_SOURCE:
+                self._cv.wait(SOURCE_WAIT_INTERVAL_S)
+                source = self._free_source(key, node_id)
+            self._transfers[source] += 1
+        try:
+            yield source
+        finally:
+            with self._cv:
+                self._transfers[source] -= 1
+                self._cv.notify_all()
+
+    def add_seed(self, node_id: str, key: str) -> None:
+        if not self.relay:
+            return
+        with self._cv:
+            self._seeds[node_id] = key
+            self._cv.notify_all()
+
+    def remove_seed(self, node_id: str) -> None:
+        with self._cv:
+            self._seeds.pop(node_id, None)
+
+    def prune(self, node_ids: Iterable[str]) -> None:
+        """Removes the seeds that are not in `node_ids`."""
+        node_ids = set(node_ids)
+        with self._cv:
+            for node_id in list(self._seeds):
+                if node_id not in node_ids:
+                    del self._seeds[node_id]
+
+    def seeds(self) -> List[str]:
+        with self._cv:
+            return list(self._seeds)
+
+    def mount_hashes(self, key: str, file_mounts: Dict[str, str],
+                     cluster_synced_files: List[str]) -> Dict[str, str]:
+        """Returns the contents hash of each mount, by remote path.
+
+        The hashes are computed once per contents key. Missing cluster synced
+        files have no hash.
+        """
+        with self._cv:
+            if key in self._mount_hashes:
+                return self._mount_hashes[key]
+        mounts = dict(file_mounts)
+        mounts.update({path: path for path in cluster_synced_files})
+        hashes = {}
+        for remote_path, local_path in mounts.items():
+            contents_hash = hash_file_mount_contents(local_path)
+            if contents_hash is not None:
+                hashes[remote_path.rstrip("/")] = contents_hash
+        with self._cv:
+            # Only keep the hashes of the current contents.
+            self._mount_hashes = {key: hashes}
+        return hashes
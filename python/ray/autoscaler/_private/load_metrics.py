@@ -1,10 +1,14 @@
+import collections
 import logging
 import time
 from typing import Dict, List
 
 import numpy as np
 import ray._private.services as services
-from ray.autoscaler._private.constants import MEMORY_RESOURCE_UNIT_BYTES
+from ray.autoscaler._private.constants import (AUTOSCALER_DEMAND_HISTORY_SIZE,
+                                               AUTOSCALER_UPDATE_INTERVAL_S,
+                                               MEMORY_RESOURCE_UNIT_BYTES)
+from ray.autoscaler._private.demand_forecaster import DemandSample, shape_key
 from ray.gcs_utils import PlacementGroupTableData
 from ray.autoscaler._private.resource_demand_scheduler import \
     NodeIP, ResourceDict
@@ -31,6 +35,12 @@ class LoadMetrics:
         self.waiting_bundles = []
         self.infeasible_bundles = []
         self.pending_placement_groups = []
+        # Ring buffer of (time, {resource shape: count}) demand samples, at
+        # most one per history interval.
+        self.demand_history = collections.deque(
+            maxlen=AUTOSCALER_DEMAND_HISTORY_SIZE)
+        self.demand_history_interval_s = AUTOSCALER_UPDATE_INTERVAL_S
+        self.demand_interval_start = 0.0
 
     def update(self,
                ip: str,
@@ -69,6 +79,30 @@ class LoadMetrics:
         self.waiting_bundles = waiting_bundles
         self.infeasible_bundles = infeasible_bundles
         self.pending_placement_groups = pending_placement_groups
+        self._record_demand(now)
+
+    def _record_demand(self, now: float) -> None:
+        counts = collections.Counter(
+            shape_key(demand) for demand in self.get_resource_demand_vector())
+        sample = (now, dict(counts))
+        # The demand vector is reported with every heartbeat, keep only the
+        # latest one in each interval.
+        if self.demand_history and (now - self.demand_interval_start <
+                                    self.demand_history_interval_s):
+            self.demand_history[-1] = sample
+        else:
+            self.demand_interval_start = now
+            self.demand_history.append(sample)
+
+    def get_demand_history(self) -> List[DemandSample]:
+        """Return the resource demand samples, oldest first.
+
+        Example:
+            >>> lm.get_demand_history()
+            [(1612345670.0, {(("CPU", 1),): 8}),
+             (1612345675.0, {(("CPU", 1),): 16, (("GPU", 1),): 1})]
+        """
+        return list(self.demand_history)
 
     def mark_active(self, ip):
         assert ip is not None, "IP should be known at this time"
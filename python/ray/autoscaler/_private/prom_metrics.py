@@ -0,0 +1,25 @@
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+
+class AutoscalerPrometheusMetrics:
+    """Prometheus metrics of the StandardAutoscaler.
+
+    The metrics are kept in their own registry, which the monitor exports
+    on `AUTOSCALER_METRIC_PORT`.
+    """
+
+    def __init__(self, registry: CollectorRegistry = None):
+        self.registry = registry or CollectorRegistry(auto_describe=True)
+        self.update_time = Histogram(
+            "update_time",
+            "Time in seconds an autoscaler update took.",
+            unit="seconds",
+            namespace="autoscaler",
+            registry=self.registry,
+            buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60, 120])
+        self.provider_calls = Counter(
+            "provider_calls",
+            "Number of calls the autoscaler made to the node provider.",
+            labelnames=("method", ),
+            namespace="autoscaler",
+            registry=self.registry)
@@ -10,11 +10,14 @@ return a list of node types that can satisfy the demands given constraints
 import copy
 import numpy as np
 import logging
+import math
 import collections
 from numbers import Number
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from ray.autoscaler.node_provider import NodeProvider
+from ray.autoscaler._private.demand_forecaster import (DemandForecaster,
+                                                       DemandSample)
 from ray.gcs_utils import PlacementGroupTableData
 from ray.core.generated.common_pb2 import PlacementStrategy
 from ray.autoscaler.tags import (
@@ -41,23 +44,33 @@ NodeID = str
 # e.g., "127.0.0.1".
 NodeIP = str
 
+# e.g., ({"GPU": 1}, 16) for 16 identical consecutive demands.
+DemandRun = Tuple[ResourceDict, int]
+
+# Slack when dividing node resources by demands, so that e.g. ten 0.1 CPU
+# demands fit on a 1 CPU node despite floating point rounding.
+_FIT_TOLERANCE = 1e-9
+
 
 class ResourceDemandScheduler:
     def __init__(self,
                  provider: NodeProvider,
                  node_types: Dict[NodeType, NodeTypeConfigDict],
                  max_workers: int,
-                 upscaling_speed: float = 1) -> None:
+                 upscaling_speed: float = 1,
+                 forecaster: Optional[DemandForecaster] = None) -> None:
         self.provider = provider
         self.node_types = copy.deepcopy(node_types)
         self.max_workers = max_workers
         self.upscaling_speed = upscaling_speed
+        self.forecaster = forecaster
 
     def reset_config(self,
                      provider: NodeProvider,
                      node_types: Dict[NodeType, NodeTypeConfigDict],
                      max_workers: int,
-                     upscaling_speed: float = 1) -> None:
+                     upscaling_speed: float = 1,
+                     forecaster: Optional[DemandForecaster] = None) -> None:
         """Updates the class state variables.
 
         For legacy yamls, it merges previous state and new state to make sure
@@ -90,6 +103,7 @@ class ResourceDemandScheduler:
         self.node_types = copy.deepcopy(final_node_types)
         self.max_workers = max_workers
         self.upscaling_speed = upscaling_speed
+        self.forecaster = forecaster
 
     def is_legacy_yaml(self,
                        node_types: Dict[NodeType, NodeTypeConfigDict] = None
@@ -111,6 +125,7 @@ class ResourceDemandScheduler:
             pending_placement_groups: List[PlacementGroupTableData],
             max_resources_by_ip: Dict[NodeIP, ResourceDict],
             ensure_min_cluster_size: List[ResourceDict] = None,
+            demand_history: List[DemandSample] = None,
     ) -> Dict[NodeType, int]:
         """Given resource demands, return node types to add to the cluster.
 
@@ -123,6 +138,8 @@ class ResourceDemandScheduler:
             (4) calculates the unfulfilled resource bundles.
             (5) calculates which nodes need to be launched to fulfill all
                 the bundle requests, subject to max_worker constraints.
+            (6) if a forecaster is set, calculates which nodes to launch
+                ahead of the forecasted demand, up to the speculative cap.
 
         Args:
             nodes: List of existing nodes in the cluster.
@@ -134,6 +151,8 @@ class ResourceDemandScheduler:
             ensure_min_cluster_size: Try to ensure the cluster can fit at least
                 this set of resources. This differs from resources_demands in
                 that we don't take into account existing usage.
+            demand_history: Resource demand samples from LoadMetrics, used
+                to forecast demand if a forecaster is set.
         """
 
         # If the user is using request_resources() API, calculate the remaining
@@ -188,8 +207,8 @@ class ResourceDemandScheduler:
 
         # Step 4/5: add nodes for pending tasks, actors, and non-strict spread
         # groups
-        unfulfilled, _ = get_bin_pack_residual(node_resources,
-                                               resource_demands)
+        unfulfilled, remaining_resources = get_bin_pack_residual(
+            node_resources, resource_demands)
         logger.info("Resource demands: {}".format(resource_demands))
         logger.info("Unfulfilled demands: {}".format(unfulfilled))
         # Add 1 to account for the head node.
@@ -202,6 +221,13 @@ class ResourceDemandScheduler:
             nodes_to_add_based_on_requests = {}
         nodes_to_add_based_on_demand = get_nodes_for(
             self.node_types, node_type_counts, max_to_add, unfulfilled)
+        # Step 6: add nodes for forecasted demand
+        if self.forecaster and demand_history:
+            speculative_nodes_to_add = self._get_speculative_nodes_to_add(
+                remaining_resources, node_type_counts, max_to_add, unfulfilled,
+                nodes_to_add_based_on_demand, demand_history)
+            for node_type, count in speculative_nodes_to_add.items():
+                nodes_to_add_based_on_demand[node_type] += count
         # Merge nodes to add based on demand and nodes to add based on
         # min_workers constraint. We add them because nodes to add based on
         # demand was calculated after the min_workers constraint was respected.
@@ -221,6 +247,45 @@ class ResourceDemandScheduler:
         logger.info("Node requests: {}".format(total_nodes_to_add))
         return total_nodes_to_add
 
+    def _get_speculative_nodes_to_add(
+            self, remaining_resources: List[ResourceDict],
+            node_type_counts: Dict[NodeType, int], max_to_add: int,
+            unfulfilled: List[ResourceDict],
+            nodes_to_add_based_on_demand: Dict[NodeType, int],
+            demand_history: List[DemandSample]) -> Dict[NodeType, int]:
+        """Get nodes to launch ahead of the forecasted demand.
+
+        The forecasted demand is first packed onto the resources left over
+        by the current demand, including the nodes about to be launched for
+        it. At most `max_speculative_nodes` nodes are added for the rest.
+        """
+        predicted_demands = self.forecaster.forecast(demand_history)
+        if not predicted_demands:
+            return {}
+        new_node_resources = []
+        new_node_type_counts = copy.deepcopy(node_type_counts)
+        for node_type, count in nodes_to_add_based_on_demand.items():
+            new_node_resources.extend([
+                copy.deepcopy(self.node_types[node_type]["resources"])
+                for _ in range(count)
+            ])
+            new_node_type_counts[node_type] = new_node_type_counts.get(
+                node_type, 0) + count
+        _, new_node_resources = get_bin_pack_residual(new_node_resources,
+                                                      unfulfilled)
+        unfulfilled_predicted, _ = get_bin_pack_residual(
+            remaining_resources + new_node_resources, predicted_demands)
+        max_speculative = min(
+            self.forecaster.max_speculative_nodes,
+            max_to_add - sum(nodes_to_add_based_on_demand.values()))
+        speculative_nodes_to_add = get_nodes_for(
+            self.node_types, new_node_type_counts, max_speculative,
+            unfulfilled_predicted)
+        logger.info("Predicted demands: {}".format(predicted_demands))
+        logger.info(
+            "Speculative node requests: {}".format(speculative_nodes_to_add))
+        return speculative_nodes_to_add
+
     def _legacy_worker_node_to_launch(
             self, nodes: List[NodeID], launching_nodes: Dict[NodeType, int],
             node_resources: List[ResourceDict],
@@ -556,8 +621,11 @@ def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
 
     """
     nodes_to_add = collections.defaultdict(int)
+    # Identical consecutive demands are packed together, which keeps the cost
+    # of each iteration proportional to the number of distinct shapes.
+    runs = _demand_runs(resources)
 
-    while resources and sum(nodes_to_add.values()) < max_to_add:
+    while runs and sum(nodes_to_add.values()) < max_to_add:
         utilization_scores = []
         for node_type in node_types:
             if (existing_nodes.get(node_type, 0) + nodes_to_add.get(
@@ -568,9 +636,10 @@ def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
             if strict_spread:
                 # If handling strict spread, only one bundle can be placed on
                 # the node.
-                score = _utilization_score(node_resources, [resources[0]])
+                score = _runs_utilization_score(node_resources,
+                                                [(runs[0][0], 1)])
             else:
-                score = _utilization_score(node_resources, resources)
+                score = _runs_utilization_score(node_resources, runs)
             if score is not None:
                 utilization_scores.append((score, node_type))
 
@@ -580,35 +649,35 @@ def get_nodes_for(node_types: Dict[NodeType, NodeTypeConfigDict],
             # starts up because placement groups are scheduled via custom
             # resources. This will behave properly with the current utilization
             # score heuristic, but it's a little dangerous and misleading.
-            logger.info(
-                "No feasible node type to add for {}".format(resources))
+            logger.info("No feasible node type to add for {}".format(
+                _runs_to_demands(runs)))
             break
 
         utilization_scores = sorted(utilization_scores, reverse=True)
         best_node_type = utilization_scores[0][1]
         nodes_to_add[best_node_type] += 1
         if strict_spread:
-            resources = resources[1:]
+            shape, count = runs[0]
+            runs = [(shape, count - 1)] + runs[1:] if count > 1 else runs[1:]
         else:
             allocated_resource = node_types[best_node_type]["resources"]
-            residual, _ = get_bin_pack_residual([allocated_resource],
-                                                resources)
-            assert len(residual) < len(resources), (resources, residual)
-            resources = residual
+            _, residual = _pack_runs_on_node(allocated_resource, runs)
+            assert sum(count for _, count in residual) < sum(
+                count for _, count in runs), (runs, residual)
+            runs = residual
 
     return nodes_to_add
 
 
 def _utilization_score(node_resources: ResourceDict,
-                       resources: ResourceDict) -> float:
-    remaining = copy.deepcopy(node_resources)
+                       resources: List[ResourceDict]) -> float:
+    return _runs_utilization_score(node_resources, _demand_runs(resources))
 
-    fittable = []
-    for r in resources:
-        if _fits(remaining, r):
-            fittable.append(r)
-            _inplace_subtract(remaining, r)
-    if not fittable:
+
+def _runs_utilization_score(node_resources: ResourceDict,
+                            runs: List[DemandRun]) -> float:
+    remaining, residual = _pack_runs_on_node(node_resources, runs)
+    if residual == runs:
         return None
 
     util_by_resources = []
@@ -621,11 +690,47 @@ def _utilization_score(node_resources: ResourceDict,
     return (min(util_by_resources), np.mean(util_by_resources))
 
 
+def _pack_runs_on_node(node_resources: ResourceDict, runs: List[DemandRun]
+                       ) -> (ResourceDict, List[DemandRun]):
+    """First-fit packs demand runs, in order, onto a single node.
+
+    Returns:
+        ResourceDict: The resources left on the node.
+        List[DemandRun]: The runs, or parts of runs, that do not fit.
+    """
+    remaining = copy.deepcopy(node_resources)
+    residual = []
+    for shape, count in runs:
+        num_fit = min(count, _num_fits(remaining, shape))
+        if num_fit:
+            for k, v in shape.items():
+                if v > 0:
+                    remaining[k] -= num_fit * v
+        if num_fit < count:
+            residual.append((shape, count - num_fit))
+    return remaining, residual
+
+
+def _num_fits(node: ResourceDict, shape: ResourceDict) -> float:
+    """Returns how many copies of `shape` fit on `node`."""
+    num_fit = float("inf")
+    for k, v in shape.items():
+        if v > 0:
+            num_fit = min(num_fit,
+                          math.floor(node.get(k, 0.0) / v + _FIT_TOLERANCE))
+    return max(num_fit, 0)
+
+
 def get_bin_pack_residual(node_resources: List[ResourceDict],
                           resource_demands: List[ResourceDict],
                           strict_spread: bool = False) -> List[ResourceDict]:
     """Return a subset of resource_demands that cannot fit in the cluster.
 
+    Demands are placed, in order, on the first node they fit on. Identical
+    consecutive demands are packed at once on a matrix of the node resources,
+    so the cost grows with the number of distinct demand shapes rather than
+    the number of demands.
+
     TODO(ekl): this currently does not guarantee the resources will be packed
     correctly by the Ray scheduler. This is only possible once the Ray backend
     supports a placement groups API.
@@ -643,29 +748,83 @@ def get_bin_pack_residual(node_resources: List[ResourceDict],
     """
 
     unfulfilled = []
-
-    # A most naive bin packing algorithm.
-    nodes = copy.deepcopy(node_resources)
-    # List of nodes that cannot be used again due to strict spread.
+    labels = sorted({k
+                     for node in node_resources for k in node}
+                    | {k
+                       for demand in resource_demands for k in demand})
+    columns = {label: i for i, label in enumerate(labels)}
+    nodes = np.zeros((len(node_resources), len(labels)))
+    for i, node in enumerate(node_resources):
+        for k, v in node.items():
+            nodes[i, columns[k]] = v
+    # Nodes that can still be used, and the nodes that cannot be used again
+    # due to strict spread, in the order they were used.
+    unused = np.ones(len(node_resources), dtype=bool)
     used = []
+    updated = np.zeros(len(node_resources), dtype=bool)
+
+    end = 0
+    for shape, count in _demand_runs(resource_demands):
+        start, end = end, end + count
+        demand = np.zeros(len(labels))
+        for k, v in shape.items():
+            demand[columns[k]] = v
+        required = demand > 0
+        if required.any():
+            num_fits = np.floor(nodes[:, required] / demand[required] +
+                                _FIT_TOLERANCE).min(axis=1)
+            num_fits = np.maximum(num_fits, 0)
+        else:
+            num_fits = np.full(len(node_resources), count)
+        if strict_spread:
+            # In the strict_spread case, we can't reuse nodes.
+            chosen = np.flatnonzero(unused & (num_fits > 0))[:count]
+            placed = np.zeros(len(node_resources))
+            placed[chosen] = 1
+            unused[chosen] = False
+            used.extend(chosen)
+        else:
+            # Fill the first node that fits, then the next one, and so on.
+            num_before = np.cumsum(num_fits) - num_fits
+            placed = np.clip(count - num_before, 0, num_fits)
+        rows = np.flatnonzero(placed)
+        nodes[rows] -= placed[rows, np.newaxis] * demand
+        updated[rows] = True
+        unfulfilled.extend(resource_demands[start + int(placed.sum()):end])
+
+    result = []
+    for i, node in enumerate(node_resources):
+        if updated[i]:
+            node = {k: _like(v, nodes[i, columns[k]]) for k, v in node.items()}
+        else:
+            node = copy.deepcopy(node)
+        result.append(node)
+    return unfulfilled, (
+        [result[i]
+         for i in np.flatnonzero(unused)] + [result[i] for i in used])
+
+
+def _demand_runs(resource_demands: List[ResourceDict]) -> List[DemandRun]:
+    """Aggregates identical consecutive demands into (shape, count) runs."""
+    runs = []
     for demand in resource_demands:
-        found = False
-        node = None
-        for i in range(len(nodes)):
-            node = nodes[i]
-            if _fits(node, demand):
-                found = True
-                # In the strict_spread case, we can't reuse nodes.
-                if strict_spread:
-                    used.append(node)
-                    del nodes[i]
-                break
-        if found and node:
-            _inplace_subtract(node, demand)
+        if runs and runs[-1][0] == demand:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
         else:
-            unfulfilled.append(demand)
+            runs.append((demand, 1))
+    return runs
+
+
+def _runs_to_demands(runs: List[DemandRun]) -> List[ResourceDict]:
+    return [shape for shape, count in runs for _ in range(count)]
+
 
-    return unfulfilled, nodes + used
+def _like(original: Number, value: float) -> Number:
+    """Converts a packed resource quantity back to the type of the input."""
+    value = float(value)
+    if isinstance(original, int) and value.is_integer():
+        return int(value)
+    return value
 
 
 def _fits(node: ResourceDict, resources: ResourceDict) -> bool:
@@ -1,8 +1,10 @@
 import click
+import json
 import logging
 import os
 import subprocess
 import time
+from shlex import quote
 
 from threading import Thread
 
@@ -11,7 +13,7 @@ from ray.autoscaler.tags import TAG_RAY_NODE_STATUS, TAG_RAY_RUNTIME_CONFIG, \
     STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED, STATUS_WAITING_FOR_SSH, \
     STATUS_SETTING_UP, STATUS_SYNCING_FILES
 from ray.autoscaler._private.command_runner import NODE_START_WAIT_S, \
-    ProcessRunnerError
+    ProcessRunnerError, SSHCommandRunner, DockerCommandRunner, SSHOptions
 from ray.autoscaler._private.log_timer import LogTimer
 from ray.autoscaler._private.cli_logger import cli_logger, cf
 import ray.autoscaler._private.subprocess_output_util as cmd_output_util
@@ -25,6 +27,9 @@ logger = logging.getLogger(__name__)
 NUM_SETUP_STEPS = 7
 READY_CHECK_INTERVAL = 5
 
+# Contents hashes of the file mounts synced to a node, kept on the node.
+SYNCED_MOUNT_HASHES_PATH = "~/.ray_file_mounts_contents.json"
+
 
 class NodeUpdater:
     """A process for syncing files and running init commands on a node.
@@ -48,6 +53,8 @@ class NodeUpdater:
         use_internal_ip: Wwhether the node_id belongs to an internal ip
             or external ip.
         docker_config: Docker section of autoscaler yaml
+        file_mount_broadcast: If set, sync the file mounts from nodes that
+            are already up to date instead of the head node when possible.
     """
 
     def __init__(self,
@@ -68,7 +75,8 @@ class NodeUpdater:
                  rsync_options=None,
                  process_runner=subprocess,
                  use_internal_ip=False,
-                 docker_config=None):
+                 docker_config=None,
+                 file_mount_broadcast=None):
 
         self.log_prefix = "NodeUpdater: {}: ".format(node_id)
         use_internal_ip = (use_internal_ip
@@ -106,6 +114,10 @@ class NodeUpdater:
         self.auth_config = auth_config
         self.is_head_node = is_head_node
         self.docker_config = docker_config
+        self.cluster_name = cluster_name
+        self.process_runner = process_runner
+        self.use_internal_ip = use_internal_ip
+        self.file_mount_broadcast = file_mount_broadcast
 
     def run(self):
         if cmd_output_util.does_allow_interactive(
@@ -224,6 +236,133 @@ class NodeUpdater:
                 "No worker file mounts to sync",
                 _numbered=("[]", previous_steps + 1, total_steps))
 
+    def broadcast_file_mounts(self, step_numbers=(0, 2)):
+        """Syncs the file mounts from a seed node or the head node.
+
+        Mounts whose contents hash matches the one recorded on the node are
+        skipped. Once synced, this node becomes a seed for other nodes if
+        relaying is enabled.
+        """
+        broadcast = self.file_mount_broadcast
+        key = "{}:{}".format(self.runtime_hash, self.file_mounts_contents_hash)
+        mount_hashes = broadcast.mount_hashes(key, self.file_mounts,
+                                              self.cluster_synced_files)
+        synced_hashes = self._get_synced_mount_hashes()
+
+        while True:
+            with broadcast.source(key, self.node_id) as source_node_id:
+                sync_cmd = self._broadcast_sync_cmd(
+                    source_node_id, mount_hashes, synced_hashes)
+                try:
+                    self.sync_file_mounts(sync_cmd, step_numbers=step_numbers)
+                    break
+                except Exception as e:
+                    if source_node_id is None:
+                        raise
+                    cli_logger.warning(
+                        "Failed to sync file mounts from node {} ({}), "
+                        "retrying from another node.", source_node_id, str(e))
+                    broadcast.remove_seed(source_node_id)
+
+        if broadcast.relay:
+            # Other nodes relay through this node with the cluster SSH key,
+            # which the user opted into with file_mounts_broadcast_relay.
+            ssh_key = self.auth_config["ssh_private_key"]
+            host_runner = self._host_cmd_runner()
+            host_runner.run_rsync_up(os.path.expanduser(ssh_key), ssh_key)
+            host_runner.run("chmod 600 {}".format(_quote_path(ssh_key)))
+        self.cmd_runner.run(
+            "echo {} > {}".format(
+                quote(json.dumps(mount_hashes)), SYNCED_MOUNT_HASHES_PATH),
+            run_env="host")
+        broadcast.add_seed(self.node_id, key)
+
+    def _broadcast_sync_cmd(self, source_node_id, mount_hashes, synced_hashes):
+        if source_node_id is not None:
+            source_runner = self.provider.get_command_runner(
+                self.log_prefix, source_node_id, self.auth_config,
+                self.cluster_name, self.process_runner, True, None)
+
+        def sync_cmd(source, target, docker_mount_if_possible=False):
+            contents_hash = mount_hashes.get(target.rstrip("/"))
+            if contents_hash is not None and synced_hashes.get(
+                    target.rstrip("/")) == contents_hash:
+                cli_logger.verbose("{} is unchanged, skipping.",
+                                   cf.bold(target))
+            elif source_node_id is None:
+                self.rsync_up(
+                    source,
+                    target,
+                    docker_mount_if_possible=docker_mount_if_possible)
+            else:
+                self._relay_rsync_up(source_runner, source_node_id, target)
+
+        return sync_cmd
+
+    def _relay_rsync_up(self, source_runner, source_node_id, target):
+        """Copies `target` from a seed node to this node."""
+        host_target = self._host_path(target)
+        self.cmd_runner.run(
+            "mkdir -p {}".format(
+                _quote_path(os.path.dirname(host_target.rstrip("/")))),
+            run_env="host")
+        ssh_options = SSHOptions(self.auth_config["ssh_private_key"])
+        command = [
+            "rsync", "--rsh",
+            quote(
+                subprocess.list2cmdline(
+                    ["ssh"] + ssh_options.to_ssh_options_list(timeout=120))),
+            "-az"
+        ]
+        for exclude in self.rsync_options.get("rsync_exclude") or []:
+            command += ["--exclude", quote(exclude)]
+        for rsync_filter in self.rsync_options.get("rsync_filter") or []:
+            command += [
+                "--filter",
+                quote("dir-merge,- {}".format(rsync_filter))
+            ]
+        command += [
+            _quote_path(host_target), "{}@{}:{}".format(
+                self.auth_config["ssh_user"],
+                self.provider.internal_ip(self.node_id),
+                _quote_path(host_target))
+        ]
+        with LogTimer(self.log_prefix +
+                      "Relayed {} from {}".format(target, source_node_id)):
+            source_runner.run(" ".join(command), run_env="host")
+
+    def _can_relay_file_mounts(self):
+        return bool(self.auth_config.get("ssh_private_key")) and isinstance(
+            self.cmd_runner, (SSHCommandRunner, DockerCommandRunner))
+
+    def _is_docker(self):
+        return bool(self.docker_config
+                    and self.docker_config["container_name"] != "")
+
+    def _host_cmd_runner(self):
+        return getattr(self.cmd_runner, "ssh_command_runner", self.cmd_runner)
+
+    def _host_path(self, remote_path):
+        """Returns where a file mount is stored on the host of the node."""
+        if not self._is_docker():
+            return remote_path
+        # Imported here due to circular dependency in imports.
+        from ray.autoscaler.sdk import get_docker_host_mount_location
+        return os.path.join(
+            get_docker_host_mount_location(self.cluster_name),
+            remote_path.lstrip("/"))
+
+    def _get_synced_mount_hashes(self):
+        try:
+            output = self.cmd_runner.run(
+                "cat {} 2>/dev/null || true".format(SYNCED_MOUNT_HASHES_PATH),
+                with_output=True,
+                run_env="host")
+            hashes = json.loads(output.decode("utf-8") or "{}")
+        except Exception:
+            return {}
+        return hashes if isinstance(hashes, dict) else {}
+
     def wait_ready(self, deadline):
         with cli_logger.group(
                 "Waiting for SSH to become available",
@@ -308,8 +447,11 @@ class NodeUpdater:
             self.provider.set_node_tags(
                 self.node_id, {TAG_RAY_NODE_STATUS: STATUS_SYNCING_FILES})
             cli_logger.labeled_value("New status", STATUS_SYNCING_FILES)
-            self.sync_file_mounts(
-                self.rsync_up, step_numbers=(1, NUM_SETUP_STEPS))
+            if self.file_mount_broadcast and self._can_relay_file_mounts():
+                self.broadcast_file_mounts(step_numbers=(1, NUM_SETUP_STEPS))
+            else:
+                self.sync_file_mounts(
+                    self.rsync_up, step_numbers=(1, NUM_SETUP_STEPS))
 
             # Only run setup commands if runtime_hash has changed because
             # we don't want to run setup_commands every time the head node
@@ -457,6 +599,13 @@ class NodeUpdater:
                            cf.bold(source), cf.bold(target))
 
 
+def _quote_path(path):
+    # Keep a leading ~ unquoted so that the remote shell expands it.
+    if path.startswith("~/"):
+        return "~/" + quote(path[2:])
+    return quote(path)
+
+
 class NodeUpdaterThread(NodeUpdater, Thread):
     def __init__(self, *args, **kwargs):
         Thread.__init__(self)
@@ -5,7 +5,7 @@ import json
 import jsonschema
 import os
 import threading
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import ray
 import ray._private.services as services
@@ -172,6 +172,43 @@ def hash_launch_conf(node_conf, auth):
 _hash_cache = {}
 
 
+def _add_content_hashes(hasher,
+                        path: str,
+                        allow_non_existing_paths: bool = False) -> None:
+    def add_hash_of_file(fpath):
+        with open(fpath, "rb") as f:
+            for chunk in iter(lambda: f.read(2**20), b""):
+                hasher.update(chunk)
+
+    path = os.path.expanduser(path)
+    if allow_non_existing_paths and not os.path.exists(path):
+        return
+    if os.path.isdir(path):
+        dirs = []
+        for dirpath, _, filenames in os.walk(path):
+            dirs.append((dirpath, sorted(filenames)))
+        for dirpath, filenames in sorted(dirs):
+            hasher.update(dirpath.encode("utf-8"))
+            for name in filenames:
+                hasher.update(name.encode("utf-8"))
+                fpath = os.path.join(dirpath, name)
+                add_hash_of_file(fpath)
+    else:
+        add_hash_of_file(path)
+
+
+def hash_file_mount_contents(path: str) -> Optional[str]:
+    """Returns the hash of the contents of a file or directory.
+
+    Returns None if the path does not exist.
+    """
+    if not os.path.exists(os.path.expanduser(path)):
+        return None
+    hasher = hashlib.sha1()
+    _add_content_hashes(hasher, path)
+    return hasher.hexdigest()
+
+
 def hash_runtime_conf(file_mounts,
                       cluster_synced_files,
                       extra_objs,
@@ -189,28 +226,6 @@ def hash_runtime_conf(file_mounts,
     runtime_hasher = hashlib.sha1()
     contents_hasher = hashlib.sha1()
 
-    def add_content_hashes(path, allow_non_existing_paths: bool = False):
-        def add_hash_of_file(fpath):
-            with open(fpath, "rb") as f:
-                for chunk in iter(lambda: f.read(2**20), b""):
-                    contents_hasher.update(chunk)
-
-        path = os.path.expanduser(path)
-        if allow_non_existing_paths and not os.path.exists(path):
-            return
-        if os.path.isdir(path):
-            dirs = []
-            for dirpath, _, filenames in os.walk(path):
-                dirs.append((dirpath, sorted(filenames)))
-            for dirpath, filenames in sorted(dirs):
-                contents_hasher.update(dirpath.encode("utf-8"))
-                for name in filenames:
-                    contents_hasher.update(name.encode("utf-8"))
-                    fpath = os.path.join(dirpath, name)
-                    add_hash_of_file(fpath)
-        else:
-            add_hash_of_file(path)
-
     conf_str = (json.dumps(file_mounts, sort_keys=True).encode("utf-8") +
                 json.dumps(extra_objs, sort_keys=True).encode("utf-8"))
 
@@ -218,7 +233,7 @@ def hash_runtime_conf(file_mounts,
     # if we need to generate the runtime_hash
     if conf_str not in _hash_cache or generate_file_mounts_contents_hash:
         for local_path in sorted(file_mounts.values()):
-            add_content_hashes(local_path)
+            _add_content_hashes(contents_hasher, local_path)
         head_node_contents_hash = contents_hasher.hexdigest()
 
         # Generate a new runtime_hash if its not cached
@@ -236,7 +251,8 @@ def hash_runtime_conf(file_mounts,
                 # For cluster_synced_files, we let the path be non-existant
                 # because its possible that the source directory gets set up
                 # anytime over the life of the head node.
-                add_content_hashes(local_path, allow_non_existing_paths=True)
+                _add_content_hashes(
+                    contents_hasher, local_path, allow_non_existing_paths=True)
 
         file_mounts_contents_hash = contents_hasher.hexdigest()
 
@@ -34,6 +34,10 @@ class APIImpl(ABC):
     def call_remote(self, f, kind, *args, **kwargs):
         pass
 
+    @abstractmethod
+    def call_remote_batch(self, calls):
+        pass
+
     @abstractmethod
     def close(self, *args, **kwargs):
         pass
@@ -58,9 +62,15 @@ class ClientAPI(APIImpl):
     def call_remote(self, f, kind, *args, **kwargs):
         return self.worker.call_remote(f, kind, *args, **kwargs)
 
+    def call_remote_batch(self, calls):
+        return self.worker.call_remote_batch(calls)
+
     def close(self, *args, **kwargs):
         return self.worker.close()
 
+    def session_stats(self):
+        return self.worker.session_stats()
+
     def __getattr__(self, key: str):
         if not key.startswith("_"):
             raise NotImplementedError(
@@ -1,8 +1,15 @@
+import asyncio
 import ray.core.generated.ray_client_pb2 as ray_client_pb2
 from ray.experimental.client import ray
 from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
 from ray import cloudpickle
 
+# Objects are transferred in chunks of at most this many bytes.
+OBJECT_CHUNK_BYTES = 1024 * 1024
+
 
 class ClientBaseRef:
     def __init__(self, id):
@@ -19,7 +26,17 @@ class ClientBaseRef:
 
 
 class ClientObjectRef(ClientBaseRef):
-    pass
+    def as_future(self) -> asyncio.Future:
+        """Returns a future of the value of this object.
+
+        The value is fetched in the default executor of the event loop, so
+        the gets of several futures are in flight at the same time.
+        """
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(None, ray.get, self)
+
+    def __await__(self):
+        return self.as_future().__await__()
 
 
 class ClientActorRef(ClientBaseRef):
@@ -114,3 +131,40 @@ def convert_to_arg(val):
         out.local = ray_client_pb2.Arg.Locality.INTERNED
         out.data = cloudpickle.dumps(val)
     return out
+
+
+def object_chunks(index: int, val) -> Iterator[ray_client_pb2.ObjectChunk]:
+    """Pickles a value and splits it into chunks.
+
+    Out-of-band buffers, e.g. of numpy arrays, are sent as raw chunks instead
+    of being copied into the pickled data.
+    """
+    buffers = []
+    data = cloudpickle.dumps(val, protocol=5, buffer_callback=buffers.append)
+    parts = [memoryview(data)] + [buf.raw() for buf in buffers]
+    for part, part_data in enumerate(parts):
+        # Empty parts are sent as one empty chunk.
+        starts = range(0, len(part_data), OBJECT_CHUNK_BYTES) or [0]
+        for start in starts:
+            yield ray_client_pb2.ObjectChunk(
+                valid=True,
+                index=index,
+                part=part,
+                data=bytes(part_data[start:start + OBJECT_CHUNK_BYTES]),
+                last=(part == len(parts) - 1
+                      and start + OBJECT_CHUNK_BYTES >= len(part_data)))
+
+
+def objects_from_chunks(chunks: Iterable[ray_client_pb2.ObjectChunk]
+                        ) -> Iterator[Tuple[int, Any]]:
+    """Reassembles the (index, value) of objects sent by `object_chunks`."""
+    parts = []
+    for chunk in chunks:
+        if not chunk.valid:
+            raise Exception("Invalid object data: id invalid?")
+        if chunk.part == len(parts):
+            parts.append(bytearray())
+        parts[chunk.part] += chunk.data
+        if chunk.last:
+            yield chunk.index, cloudpickle.loads(parts[0], buffers=parts[1:])
+            parts = []
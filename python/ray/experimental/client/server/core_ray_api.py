@@ -31,6 +31,12 @@ class CoreRayAPI(APIImpl):
             f._raylet_remote_func = ray.remote(f._func)
         return f._raylet_remote_func.remote(*args, **kwargs)
 
+    def call_remote_batch(self, calls):
+        return [
+            self.call_remote(f, kind, *args, **kwargs)
+            for f, kind, args, kwargs in calls
+        ]
+
     def close(self, *args, **kwargs):
         return None
 
@@ -1,4 +1,6 @@
+import collections
 import logging
+import threading
 from concurrent import futures
 import grpc
 from ray import cloudpickle
@@ -9,45 +11,159 @@ import time
 import inspect
 from ray.experimental.client import stash_api_for_tests
 from ray.experimental.client.common import convert_from_arg
+from ray.experimental.client.common import object_chunks
+from ray.experimental.client.common import objects_from_chunks
 from ray.experimental.client.common import ClientObjectRef
 from ray.experimental.client.common import ClientRemoteFunc
 
 logger = logging.getLogger(__name__)
 
 
+class ClientSession:
+    """The objects and actors held for a client, until it releases them.
+
+    The server holds a ref to every object and actor handle it returned to
+    the client, so Ray doesn't free them while the client may use them.
+    """
+
+    def __init__(self):
+        self.object_refs = {}
+        self.actor_refs = {}
+        # Object id -> size in bytes, of the objects put or fetched.
+        self.object_sizes = {}
+
+    def release(self, ids):
+        for id in ids:
+            self.object_refs.pop(id, None)
+            self.object_sizes.pop(id, None)
+            self.actor_refs.pop(id, None)
+
+    def stats(self) -> ray_client_pb2.SessionStats:
+        return ray_client_pb2.SessionStats(
+            num_objects=len(self.object_refs),
+            num_actors=len(self.actor_refs),
+            object_bytes=sum(self.object_sizes.values()))
+
+
+def _get_client_id(context) -> str:
+    if context is None:
+        return ""
+    return dict(context.invocation_metadata()).get("client_id", "")
+
+
 class RayletServicer(ray_client_pb2_grpc.RayletDriverServicer):
     def __init__(self, test_mode=False):
-        self.object_refs = {}
+        # Client id -> ClientSession.
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        # Payload id -> registered function or actor class, see
+        # RegisterPayload.
+        self.payloads = {}
         self.function_refs = {}
-        self.actor_refs = {}
         self.registered_actor_classes = {}
         self._test_mode = test_mode
 
+    def _session(self, context) -> ClientSession:
+        client_id = _get_client_id(context)
+        with self._sessions_lock:
+            if client_id not in self.sessions:
+                self.sessions[client_id] = ClientSession()
+            return self.sessions[client_id]
+
     def GetObject(self, request, context=None):
-        if request.id not in self.object_refs:
+        session = self._session(context)
+        if request.id not in session.object_refs:
             return ray_client_pb2.GetResponse(valid=False)
-        objectref = self.object_refs[request.id]
+        objectref = session.object_refs[request.id]
         logger.info("get: %s" % objectref)
         item = ray.get(objectref)
         item_ser = cloudpickle.dumps(item)
         return ray_client_pb2.GetResponse(valid=True, data=item_ser)
 
     def PutObject(self, request, context=None):
+        session = self._session(context)
         obj = cloudpickle.loads(request.data)
         objectref = ray.put(obj)
-        self.object_refs[objectref.binary()] = objectref
+        session.object_refs[objectref.binary()] = objectref
+        session.object_sizes[objectref.binary()] = len(request.data)
         logger.info("put: %s" % objectref)
         return ray_client_pb2.PutResponse(id=objectref.binary())
 
+    def GetObjects(self, request, context=None):
+        session = self._session(context)
+        for index, id in enumerate(request.ids):
+            if id not in session.object_refs:
+                yield ray_client_pb2.ObjectChunk(valid=False, index=index)
+                return
+        objectrefs = [session.object_refs[id] for id in request.ids]
+        logger.info("get: %s" % objectrefs)
+        items = ray.get(objectrefs)
+        for index, item in enumerate(items):
+            size = 0
+            for chunk in object_chunks(index, item):
+                size += len(chunk.data)
+                yield chunk
+            session.object_sizes[request.ids[index]] = size
+
+    def PutObjects(self, request_iterator,
+                   context=None) -> ray_client_pb2.PutObjectsResponse:
+        session = self._session(context)
+        sizes = collections.Counter()
+
+        def count_sizes(chunks):
+            for chunk in chunks:
+                sizes[chunk.index] += len(chunk.data)
+                yield chunk
+
+        ids = []
+        for index, obj in objects_from_chunks(count_sizes(request_iterator)):
+            objectref = ray.put(obj)
+            session.object_refs[objectref.binary()] = objectref
+            session.object_sizes[objectref.binary()] = sizes[index]
+            logger.info("put: %s" % objectref)
+            ids.append(objectref.binary())
+        return ray_client_pb2.PutObjectsResponse(ids=ids)
+
+    def ReleaseObjects(self, request,
+                       context=None) -> ray_client_pb2.ReleaseResponse:
+        if request.release_all:
+            with self._sessions_lock:
+                self.sessions.pop(_get_client_id(context), None)
+        else:
+            self._session(context).release(request.ids)
+        return ray_client_pb2.ReleaseResponse()
+
+    def GetSessionStats(self, request,
+                        context=None) -> ray_client_pb2.SessionStats:
+        return self._session(context).stats()
+
+    def RegisterPayload(self, request, context=None
+                        ) -> ray_client_pb2.RegisterPayloadResponse:
+        # The id is the hash of the contents, so a known payload is the same.
+        if request.id not in self.payloads:
+            self.payloads[request.id] = cloudpickle.loads(request.data)
+            logger.info("register payload: %s" % request.id.hex())
+        return ray_client_pb2.RegisterPayloadResponse()
+
+    def _get_payload(self, payload_id: bytes):
+        if payload_id not in self.payloads:
+            raise Exception("Attempting to schedule a function or actor "
+                            "class that isn't registered.")
+        return self.payloads[payload_id]
+
     def WaitObject(self, request, context=None) -> ray_client_pb2.WaitResponse:
+        session = self._session(context)
         object_refs = [cloudpickle.loads(o) for o in request.object_refs]
         num_returns = request.num_returns
         timeout = request.timeout
         object_refs_ids = []
+        # Ray ObjectRef -> the id the client refers to it by.
+        client_ids = {}
         for object_ref in object_refs:
-            if object_ref.id not in self.object_refs:
+            if object_ref.id not in session.object_refs:
                 return ray_client_pb2.WaitResponse(valid=False)
-            object_refs_ids.append(self.object_refs[object_ref.id])
+            object_refs_ids.append(session.object_refs[object_ref.id])
+            client_ids[object_refs_ids[-1]] = object_ref.id
         try:
             ready_object_refs, remaining_object_refs = ray.wait(
                 object_refs_ids,
@@ -59,10 +175,11 @@ class RayletServicer(ray_client_pb2_grpc.RayletDriverServicer):
         logger.info("wait: %s %s" % (str(ready_object_refs),
                                      str(remaining_object_refs)))
         ready_object_ids = [
-            ready_object_ref.binary() for ready_object_ref in ready_object_refs
+            client_ids[ready_object_ref]
+            for ready_object_ref in ready_object_refs
         ]
         remaining_object_ids = [
-            remaining_object_ref.binary()
+            client_ids[remaining_object_ref]
             for remaining_object_ref in remaining_object_refs
         ]
         return ray_client_pb2.WaitResponse(
@@ -85,60 +202,86 @@ class RayletServicer(ray_client_pb2_grpc.RayletDriverServicer):
                 "Unimplemented Schedule task type: %s" %
                 ray_client_pb2.ClientTask.RemoteExecType.Name(task.type))
 
+    def ScheduleBatch(self, request,
+                      context=None) -> ray_client_pb2.ClientTaskTicketBatch:
+        return ray_client_pb2.ClientTaskTicketBatch(
+            tickets=[self.Schedule(task, context) for task in request.tasks])
+
+    def ScheduleStream(self, request_iterator, context=None):
+        for request in request_iterator:
+            tickets = []
+            for task in request.tasks:
+                try:
+                    tickets.append(self.Schedule(task, context))
+                except Exception as e:
+                    logger.exception("Failed to schedule %s" % task.name)
+                    tickets.append(
+                        ray_client_pb2.ClientTaskTicket(
+                            return_id=task.return_id,
+                            valid=False,
+                            error=str(e)))
+            yield ray_client_pb2.ClientTaskTicketBatch(tickets=tickets)
+
     def _schedule_method(self, task: ray_client_pb2.ClientTask,
                          context=None) -> ray_client_pb2.ClientTaskTicket:
-        actor_handle = self.actor_refs.get(task.payload_id)
+        session = self._session(context)
+        actor_handle = session.actor_refs.get(task.payload_id)
         if actor_handle is None:
             raise Exception(
                 "Can't run an actor the server doesn't have a handle for")
-        arglist = _convert_args(task.args)
+        arglist = _convert_args(task.args, session)
         with stash_api_for_tests(self._test_mode):
             output = getattr(actor_handle, task.name).remote(*arglist)
-            self.object_refs[output.binary()] = output
-        return ray_client_pb2.ClientTaskTicket(return_id=output.binary())
+            return_id = task.return_id or output.binary()
+            session.object_refs[return_id] = output
+        return ray_client_pb2.ClientTaskTicket(return_id=return_id, valid=True)
 
     def _schedule_actor(self, task: ray_client_pb2.ClientTask,
                         context=None) -> ray_client_pb2.ClientTaskTicket:
+        session = self._session(context)
         with stash_api_for_tests(self._test_mode):
             if task.payload_id not in self.registered_actor_classes:
-                actor_class_ref = self.object_refs[task.payload_id]
-                actor_class = ray.get(actor_class_ref)
+                actor_class = self._get_payload(task.payload_id)
                 if not inspect.isclass(actor_class):
                     raise Exception("Attempting to schedule actor that "
                                     "isn't a ClientActorClass.")
                 reg_class = ray.remote(actor_class)
                 self.registered_actor_classes[task.payload_id] = reg_class
             remote_class = self.registered_actor_classes[task.payload_id]
-            arglist = _convert_args(task.args)
+            arglist = _convert_args(task.args, session)
             actor = remote_class.remote(*arglist)
-            actor_ref = actor._actor_id
-            self.actor_refs[actor_ref.binary()] = actor
-        return ray_client_pb2.ClientTaskTicket(return_id=actor_ref.binary())
+            return_id = task.return_id or actor._actor_id.binary()
+            session.actor_refs[return_id] = actor
+        return ray_client_pb2.ClientTaskTicket(return_id=return_id, valid=True)
 
     def _schedule_function(self, task: ray_client_pb2.ClientTask,
                            context=None) -> ray_client_pb2.ClientTaskTicket:
+        session = self._session(context)
         if task.payload_id not in self.function_refs:
-            funcref = self.object_refs[task.payload_id]
-            func = ray.get(funcref)
+            func = self._get_payload(task.payload_id)
             if not isinstance(func, ClientRemoteFunc):
                 raise Exception("Attempting to schedule function that "
                                 "isn't a ClientRemoteFunc.")
             self.function_refs[task.payload_id] = func
         remote_func = self.function_refs[task.payload_id]
-        arglist = _convert_args(task.args)
+        arglist = _convert_args(task.args, session)
         # Prepare call if we're in a test
         with stash_api_for_tests(self._test_mode):
             output = remote_func.remote(*arglist)
-            self.object_refs[output.binary()] = output
-        return ray_client_pb2.ClientTaskTicket(return_id=output.binary())
+            return_id = task.return_id or output.binary()
+            session.object_refs[return_id] = output
+        return ray_client_pb2.ClientTaskTicket(return_id=return_id, valid=True)
 
 
-def _convert_args(arg_list):
+def _convert_args(arg_list, session: ClientSession):
     out = []
     for arg in arg_list:
         t = convert_from_arg(arg)
         if isinstance(t, ClientObjectRef):
-            out.append(ray.ObjectRef(t.id))
+            if t.id not in session.object_refs:
+                raise Exception("Can't pass an object the server doesn't "
+                                "have a ref for")
+            out.append(session.object_refs[t.id])
         else:
             out.append(t)
     return out
@@ -2,7 +2,14 @@
 It implements the Ray API functions that are forwarded through grpc calls
 to the server.
 """
+import collections
+import hashlib
 import inspect
+import queue
+import threading
+import time
+import uuid
+import weakref
 from typing import List
 from typing import Tuple
 
@@ -13,12 +20,25 @@ import grpc
 import ray.core.generated.ray_client_pb2 as ray_client_pb2
 import ray.core.generated.ray_client_pb2_grpc as ray_client_pb2_grpc
 from ray.experimental.client.common import convert_to_arg
+from ray.experimental.client.common import object_chunks
+from ray.experimental.client.common import objects_from_chunks
 from ray.experimental.client.common import ClientObjectRef
 from ray.experimental.client.common import ClientActorRef
 from ray.experimental.client.common import ClientActorClass
 from ray.experimental.client.common import ClientRemoteMethod
 from ray.experimental.client.common import ClientRemoteFunc
 
+# The ids of garbage collected refs are released on the server in batches of
+# this many ids, or after this many seconds.
+RELEASE_BATCH_SIZE = 100
+RELEASE_INTERVAL_S = 1
+
+# The maximum number of queued tasks sent in one message of the task stream.
+TASK_BATCH_MAX_SIZE = 1000
+# The task stream is closed after this many idle seconds, as it holds one
+# thread of the server, and reopened by the next task.
+TASK_STREAM_IDLE_S = 1
+
 
 class Worker:
     def __init__(self,
@@ -33,7 +53,9 @@ class Worker:
             secure: whether to use SSL secure channel or not.
             metadata: additional metadata passed in the grpc request headers.
         """
-        self.metadata = metadata
+        # Identifies the session of this client on the server.
+        self.client_id = uuid.uuid4().hex
+        self.metadata = (metadata or []) + [("client_id", self.client_id)]
         if stub is None:
             if secure:
                 credentials = grpc.ssl_channel_credentials()
@@ -43,8 +65,112 @@ class Worker:
             self.server = ray_client_pb2_grpc.RayletDriverStub(self.channel)
         else:
             self.server = stub
+        # Remote function or actor class stub -> id of its payload.
+        self._payload_ids = weakref.WeakKeyDictionary()
+        # Ids of the payloads registered with the server in this session.
+        self._registered_payloads = set()
+        # Object or actor id -> number of live refs to it.
+        self._ref_counts = collections.Counter()
+        # Ids of the refs that were garbage collected. Appended to by
+        # finalizers, which may run in any thread.
+        self._collected_ids = collections.deque()
+        # (Task count, id) of the ids without live refs that are not
+        # released on the server yet. An id may be released once the server
+        # scheduled the first `task count` tasks, which include every task
+        # that may take it as an argument.
+        self._pending_releases = []
+        self._last_release_time = time.monotonic()
+        self._ref_lock = threading.Lock()
+        # Tasks are submitted without waiting for the server. They are queued
+        # and sent in batches on a single stream, see `_run_task_stream`.
+        self._task_queue = None
+        self._task_stream_thread = None
+        # Return ids of the sent tasks that the server didn't schedule yet.
+        self._unacked_ids = set()
+        # Number of tasks submitted, and acked by the server in order.
+        self._num_submitted = 0
+        self._num_acked = 0
+        # Return id -> error of the tasks the server failed to schedule.
+        self._schedule_errors = {}
+        self._task_cv = threading.Condition()
+
+    def _make_ref(self, ref_type, id: bytes):
+        """Creates a ref that releases its id on the server when collected."""
+        ref = ref_type(id)
+        with self._ref_lock:
+            self._ref_counts[id] += 1
+        weakref.finalize(ref, self._collected_ids.append, id)
+        return ref
+
+    def _release_collected(self, force: bool = False):
+        """Releases the ids without live refs on the server, in batches.
+
+        Releases are not sent on the task stream, so an id is only released
+        once the server scheduled every task submitted before its last ref
+        was collected. Those include the task returning it and the tasks
+        taking it as an argument. Unless `force` is set, ids whose tasks are
+        still in flight stay pending rather than blocking the caller.
+        """
+        with self._ref_lock:
+            collected = []
+            while self._collected_ids:
+                collected.append(self._collected_ids.popleft())
+            # The tasks using the collected ids were submitted before they
+            # were collected, so before this.
+            num_submitted = self._num_submitted
+            for id in collected:
+                self._ref_counts[id] -= 1
+                if self._ref_counts[id] <= 0:
+                    del self._ref_counts[id]
+                    self._pending_releases.append((num_submitted, id))
+            if not self._pending_releases:
+                return
+            if not (force or len(self._pending_releases) >= RELEASE_BATCH_SIZE
+                    or time.monotonic() - self._last_release_time >=
+                    RELEASE_INTERVAL_S):
+                return
+            pending = self._pending_releases
+            self._pending_releases = []
+            self._last_release_time = time.monotonic()
+        with self._task_cv:
+            if force:
+                self._task_cv.wait_for(
+                    lambda: self._num_acked >= pending[-1][0])
+            ids = []
+            for num_tasks, id in pending:
+                if num_tasks > self._num_acked:
+                    break
+                ids.append(id)
+                self._schedule_errors.pop(id, None)
+            # The pending ids are ordered by their task count.
+            not_ready = pending[len(ids):]
+        if not_ready:
+            with self._ref_lock:
+                self._pending_releases[:0] = not_ready
+        if not ids:
+            return
+        req = ray_client_pb2.ReleaseRequest(ids=ids)
+        self.server.ReleaseObjects(req, metadata=self.metadata)
+
+    def session_stats(self) -> dict:
+        """Returns what the server holds for this client.
+
+        Returns:
+            A dict with the number of objects and actors the server holds
+            for this client, and the total size in bytes of the held objects
+            that were put or fetched.
+        """
+        self._release_collected(force=True)
+        resp = self.server.GetSessionStats(
+            ray_client_pb2.SessionStatsRequest(), metadata=self.metadata)
+        return {
+            "num_objects": resp.num_objects,
+            "num_actors": resp.num_actors,
+            "object_bytes": resp.object_bytes,
+        }
 
     def get(self, ids):
+        self._release_collected()
         to_get = []
         single = False
         if isinstance(ids, list):
@@ -55,20 +181,22 @@ class Worker:
         else:
             raise Exception("Can't get something that's not a "
                             "list of IDs or just an ID: %s" % type(ids))
-        out = [self._get(x) for x in to_get]
+        self._wait_for_tasks(to_get)
+        out = self._get(to_get)
         if single:
             out = out[0]
         return out
 
-    def _get(self, id: bytes):
-        req = ray_client_pb2.GetRequest(id=id)
-        data = self.server.GetObject(req, metadata=self.metadata)
-        if not data.valid:
-            raise Exception(
-                "Client GetObject returned invalid data: id invalid?")
-        return cloudpickle.loads(data.data)
+    def _get(self, ids: List[bytes]) -> list:
+        req = ray_client_pb2.GetObjectsRequest(ids=ids)
+        chunks = self.server.GetObjects(req, metadata=self.metadata)
+        out = [None] * len(ids)
+        for index, val in objects_from_chunks(chunks):
+            out[index] = val
+        return out
 
     def put(self, vals):
+        self._release_collected()
         to_put = []
         single = False
         if isinstance(vals, list):
@@ -77,16 +205,16 @@ class Worker:
             single = True
             to_put.append(vals)
 
-        out = [self._put(x) for x in to_put]
+        out = self._put(to_put)
         if single:
             out = out[0]
         return out
 
-    def _put(self, val):
-        data = cloudpickle.dumps(val)
-        req = ray_client_pb2.PutRequest(data=data)
-        resp = self.server.PutObject(req, metadata=self.metadata)
-        return ClientObjectRef(resp.id)
+    def _put(self, vals: list) -> List[ClientObjectRef]:
+        chunks = (chunk for index, val in enumerate(vals)
+                  for chunk in object_chunks(index, val))
+        resp = self.server.PutObjects(chunks, metadata=self.metadata)
+        return [self._make_ref(ClientObjectRef, id) for id in resp.ids]
 
     def wait(self,
              object_refs: List[ClientObjectRef],
@@ -97,6 +225,8 @@ class Worker:
         assert isinstance(object_refs, list)
         for ref in object_refs:
             assert isinstance(ref, ClientObjectRef)
+        self._release_collected()
+        self._wait_for_tasks([ref.id for ref in object_refs])
         data = {
             "object_refs": [
                 cloudpickle.dumps(object_ref) for object_ref in object_refs
@@ -110,10 +240,11 @@ class Worker:
             # TODO(ameer): improve error/exceptions messages.
             raise Exception("Client Wait request failed. Reference invalid?")
         client_ready_object_ids = [
-            ClientObjectRef(id) for id in resp.ready_object_ids
+            self._make_ref(ClientObjectRef, id) for id in resp.ready_object_ids
         ]
         client_remaining_object_ids = [
-            ClientObjectRef(id) for id in resp.remaining_object_ids
+            self._make_ref(ClientObjectRef, id)
+            for id in resp.remaining_object_ids
         ]
 
         return (client_ready_object_ids, client_remaining_object_ids)
@@ -131,49 +262,198 @@ class Worker:
                             "either a function or to a class.")
 
     def call_remote(self, instance, kind, *args, **kwargs):
-        ticket = None
-        if kind == ray_client_pb2.ClientTask.FUNCTION:
-            ticket = self._put_and_schedule(instance, kind, *args, **kwargs)
-        elif kind == ray_client_pb2.ClientTask.ACTOR:
-            ticket = self._put_and_schedule(instance, kind, *args, **kwargs)
-            return ClientActorRef(ticket.return_id)
-        elif kind == ray_client_pb2.ClientTask.METHOD:
-            ticket = self._call_method(instance, *args, **kwargs)
-
-        if ticket is None:
+        """Submits a remote call without waiting for the server.
+
+        The return id is generated by the client, so the call returns as
+        soon as the task is queued. Errors scheduling the task are raised
+        when the result is fetched.
+        """
+        if kind not in (ray_client_pb2.ClientTask.FUNCTION,
+                        ray_client_pb2.ClientTask.ACTOR,
+                        ray_client_pb2.ClientTask.METHOD):
             raise Exception(
                 "Couldn't call_remote on %s for type %s" % (instance, kind))
-        return ClientObjectRef(ticket.return_id)
+        self._release_collected()
+        task = self._make_task(instance, kind, *args, **kwargs)
+        task.return_id = uuid.uuid4().bytes
+        self._submit(task)
+        if kind == ray_client_pb2.ClientTask.ACTOR:
+            return self._make_ref(ClientActorRef, task.return_id)
+        return self._make_ref(ClientObjectRef, task.return_id)
 
-    def _call_method(self, instance: ClientRemoteMethod, *args, **kwargs):
-        if not isinstance(instance, ClientRemoteMethod):
-            raise TypeError("Client not passing a ClientRemoteMethod stub")
+    def _submit(self, *tasks: ray_client_pb2.ClientTask):
+        with self._task_cv:
+            if self._task_stream_thread is None:
+                # Each stream has its own queue, so a failed stream doesn't
+                # take the tasks of the next one.
+                self._task_queue = queue.Queue()
+                self._task_stream_thread = threading.Thread(
+                    target=self._run_task_stream,
+                    args=(self._task_queue, ),
+                    name="ray_client_task_stream",
+                    daemon=True)
+                self._task_stream_thread.start()
+            for task in tasks:
+                self._unacked_ids.add(task.return_id)
+                self._task_queue.put(task)
+            self._num_submitted += len(tasks)
+
+    def _task_batches(self, task_queue: queue.Queue):
+        """Coalesces the queued tasks into batches, until closed or idle."""
+        while True:
+            try:
+                task = task_queue.get(timeout=TASK_STREAM_IDLE_S)
+            except queue.Empty:
+                with self._task_cv:
+                    if self._task_queue is not task_queue:
+                        # The stream failed.
+                        return
+                    # Only closes once the server scheduled every task, so
+                    # the tasks of the next stream can't overtake them.
+                    if task_queue.empty() and \
+                            self._num_acked == self._num_submitted:
+                        self._task_queue = None
+                        self._task_stream_thread = None
+                        return
+                continue
+            if task is None:
+                return
+            batch = ray_client_pb2.ClientTaskBatch(tasks=[task])
+            while len(batch.tasks) < TASK_BATCH_MAX_SIZE:
+                try:
+                    task = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    yield batch
+                    return
+                batch.tasks.append(task)
+            yield batch
+
+    def _run_task_stream(self, task_queue: queue.Queue):
+        """Sends the queued tasks and receives their tickets.
+
+        The server schedules the tasks of the stream in order, so a task may
+        depend on the results of the tasks sent before it.
+        """
+        error = "The task stream was closed."
+        try:
+            tickets = self.server.ScheduleStream(
+                self._task_batches(task_queue), metadata=self.metadata)
+            for resp in tickets:
+                with self._task_cv:
+                    self._num_acked += len(resp.tickets)
+                    for ticket in resp.tickets:
+                        self._unacked_ids.discard(ticket.return_id)
+                        if not ticket.valid:
+                            self._schedule_errors[ticket.return_id] = \
+                                ticket.error
+                    self._task_cv.notify_all()
+        except grpc.RpcError as e:
+            error = "The task stream failed: %s" % e
+        finally:
+            with self._task_cv:
+                # An idle stream was detached with all its tasks scheduled,
+                # the unacked tasks belong to the next stream.
+                if self._task_queue is task_queue:
+                    for id in self._unacked_ids:
+                        self._schedule_errors[id] = error
+                    self._unacked_ids.clear()
+                    self._num_acked = self._num_submitted
+                    self._task_queue = None
+                    self._task_stream_thread = None
+                    self._task_cv.notify_all()
+
+    def _wait_for_tasks(self, ids: List[bytes]):
+        """Waits until the server scheduled the tasks returning these ids."""
+        with self._task_cv:
+            self._task_cv.wait_for(lambda: self._unacked_ids.isdisjoint(ids))
+            for id in ids:
+                if id in self._schedule_errors:
+                    raise Exception("Client failed to schedule the task: %s" %
+                                    self._schedule_errors[id])
+
+    def call_remote_batch(self, calls):
+        """Submits several remote calls at once.
+
+        The tasks are queued together on the task stream, so they are
+        scheduled after the tasks submitted before them, whose results they
+        may take as arguments.
+
+        Args:
+            calls: A list of (instance, kind, args, kwargs) tuples, with the
+                arguments of `call_remote`.
+
+        Returns:
+            The result of `call_remote` for each call.
+        """
+        self._release_collected()
+        tasks = []
+        for instance, kind, args, kwargs in calls:
+            task = self._make_task(instance, kind, *args, **kwargs)
+            task.return_id = uuid.uuid4().bytes
+            tasks.append(task)
+        self._submit(*tasks)
+        out = []
+        for task in tasks:
+            if task.type == ray_client_pb2.ClientTask.ACTOR:
+                out.append(self._make_ref(ClientActorRef, task.return_id))
+            else:
+                out.append(self._make_ref(ClientObjectRef, task.return_id))
+        return out
+
+    def _make_task(self, instance, kind, *args, **kwargs):
         task = ray_client_pb2.ClientTask()
-        task.type = ray_client_pb2.ClientTask.METHOD
-        task.name = instance.method_name
-        task.payload_id = instance.actor_handle.actor_id.id
+        task.type = kind
+        if kind == ray_client_pb2.ClientTask.METHOD:
+            if not isinstance(instance, ClientRemoteMethod):
+                raise TypeError("Client not passing a ClientRemoteMethod stub")
+            task.name = instance.method_name
+            task.payload_id = instance.actor_handle.actor_id.id
+        else:
+            task.name = instance._name
+            task.payload_id = self._register_payload(instance)
         for arg in args:
             pb_arg = convert_to_arg(arg)
             task.args.append(pb_arg)
-        ticket = self.server.Schedule(task, metadata=self.metadata)
-        return ticket
+        return task
 
-    def _put_and_schedule(self, item, task_type, *args, **kwargs):
+    def _register_payload(self, item) -> bytes:
+        """Uploads the function or actor class of a stub once per session.
+
+        Payloads are identified by the hash of their pickled contents, so
+        stubs of the same function share one payload on the server.
+        """
+        payload_id = self._payload_ids.get(item)
+        if payload_id is not None:
+            return payload_id
         if isinstance(item, ClientRemoteFunc):
-            ref = self._put(item)
+            data = cloudpickle.dumps(item)
         elif isinstance(item, ClientActorClass):
-            ref = self._put(item.actor_cls)
+            data = cloudpickle.dumps(item.actor_cls)
         else:
             raise TypeError("Client not passing a ClientRemoteFunc stub")
-        task = ray_client_pb2.ClientTask()
-        task.type = task_type
-        task.name = item._name
-        task.payload_id = ref.id
-        for arg in args:
-            pb_arg = convert_to_arg(arg)
-            task.args.append(pb_arg)
-        ticket = self.server.Schedule(task, metadata=self.metadata)
-        return ticket
+        payload_id = hashlib.sha1(data).digest()
+        if payload_id not in self._registered_payloads:
+            req = ray_client_pb2.RegisterPayloadRequest(
+                id=payload_id, data=data)
+            self.server.RegisterPayload(req, metadata=self.metadata)
+            self._registered_payloads.add(payload_id)
+        self._payload_ids[item] = payload_id
+        return payload_id
 
     def close(self):
+        with self._task_cv:
+            task_stream_thread = self._task_stream_thread
+            if task_stream_thread is not None:
+                # Sends the queued tasks before closing the stream.
+                self._task_queue.put(None)
+        if task_stream_thread is not None:
+            task_stream_thread.join()
+        # Release everything the server holds for this session.
+        req = ray_client_pb2.ReleaseRequest(release_all=True)
+        try:
+            self.server.ReleaseObjects(req, metadata=self.metadata)
+        except grpc.RpcError:
+            pass
         self.channel.close()
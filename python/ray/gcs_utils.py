@@ -18,6 +18,7 @@ from ray.core.generated.gcs_pb2 import (
     ResourceLoad,
     ResourceMap,
     ResourceTableData,
+    NodeResourceChange,
     ObjectLocationInfo,
     PubSubMessage,
     WorkerTableData,
@@ -44,6 +45,7 @@ __all__ = [
     "ResourceLoad",
     "ResourceMap",
     "ResourceTableData",
+    "NodeResourceChange",
     "construct_error_message",
     "ObjectLocationInfo",
     "PubSubMessage",
@@ -69,6 +71,10 @@ RAY_REPORTER_PUBSUB_PATTERN = "RAY_REPORTER.*".encode("ascii")
 
 RAY_ERROR_PUBSUB_PATTERN = "ERROR_INFO:*".encode("ascii")
 
+# Node membership and node resource pub/sub updates
+NODE_PUBSUB_PATTERN = "NODE:*".encode("ascii")
+NODE_RESOURCE_PUBSUB_PATTERN = "NODE_RESOURCE:*".encode("ascii")
+
 # These prefixes must be kept up-to-date with the TablePrefix enum in
 # gcs.proto.
 # TODO(rkn): We should use scoped enums, in which case we should be able to
@@ -1,20 +1,24 @@
 import argparse
+import ctypes
+import ctypes.util
 import errno
 import glob
-import json
 import logging
 import logging.handlers
 import os
 import platform
 import re
+import select
 import shutil
+import struct
+import sys
 import time
 import traceback
 
 import ray.ray_constants as ray_constants
 import ray._private.services as services
 import ray.utils
-from ray.ray_logging import setup_component_logger
+from ray.ray_logging import encode_log_batch, setup_component_logger
 
 # Logger for this module. It should be configured at the entry point
 # into the program using Ray. Ray provides a default configuration at
@@ -24,6 +28,14 @@ logger = logging.getLogger(__name__)
 # The groups are worker id, job id, and pid.
 JOB_LOG_PATTERN = re.compile(".*worker-([0-9a-f]{40})-(\d+)-(\d+)")
 
+# How long to sleep between polls of the log files when nothing was published.
+POLL_INTERVAL_S = 0.05
+# How often to look for new log files when inotify is used. Creating a file
+# also triggers a scan.
+RESCAN_INTERVAL_S = 1
+# Batches smaller than this are not worth compressing.
+COMPRESS_MIN_BYTES = 1024
+
 
 class LogFileInfo:
     def __init__(self,
@@ -45,6 +57,82 @@ class LogFileInfo:
         self.worker_pid = worker_pid
 
 
+class InotifyWatcher:
+    """Watches a directory for written and created files with inotify.
+
+    This is only available on Linux. Use `InotifyWatcher.create`, which
+    returns None if inotify can't be used.
+    """
+
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+
+    # struct inotify_event without the name: wd, mask, cookie, len.
+    _EVENT = struct.Struct("iIII")
+    _READ_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        mask = (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+                | self.IN_CREATE)
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err))
+
+    @staticmethod
+    def create(path):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return InotifyWatcher(path)
+        except (AttributeError, OSError) as e:
+            logger.info(f"Polling the log files, inotify failed: {e}")
+            return None
+
+    def wait(self, timeout):
+        """Wait up to `timeout` seconds for changes in the directory.
+
+        Returns:
+            A tuple of the names of the changed files, the names of the created
+            files, and whether events were lost.
+        """
+        changed, created, overflow = set(), set(), False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, created, overflow
+        while True:
+            try:
+                buf = os.read(self.fd, self._READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = self._EVENT.unpack_from(buf, offset)
+                offset += self._EVENT.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                if not name:
+                    continue
+                name = os.fsdecode(name)
+                changed.add(name)
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    created.add(name)
+        return changed, created, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
 class LogMonitor:
     """A monitor process for monitoring Ray log files.
 
@@ -53,15 +141,20 @@ class LogMonitor:
     descriptors.
 
     The "run" method of this class will cycle between doing several things:
-    1. First, it will check if any new files have appeared in the log
-       directory. If so, they will be added to the list of closed files.
+    1. First, it will wait for log files to change. On Linux, it is notified
+       of the changed files by inotify; otherwise, all files are considered
+       changed after a short sleep. If any new files have appeared in the log
+       directory, they will be added to the list of closed files.
     2. Then, if we are unable to open any new files, we will close all of the
        files.
     3. Then, we will open as many closed files as we can that may have new
-       lines (judged by an increase in file size since the last time the file
-       was opened).
-    4. Then we will loop through the open files and see if there are any new
-       lines in the file. If so, we will publish them to Redis.
+       lines (judged by an increase in file size since the last position we
+       read).
+    4. Then we will read the new lines of the open files, in chunks, and
+       publish the lines of many files in a batch to Redis.
+
+    The bytes read per second can be limited. Lines over the limit stay in
+    the files until the next pass.
 
     Attributes:
         host (str): The hostname of this machine. Used to improve the log
@@ -75,9 +168,20 @@ class LogMonitor:
             files.
         can_open_more_files (bool): True if we can still open more files and
             false otherwise.
+        pending_filenames (set): The filenames that may have new lines, or
+            None if every file is checked in each pass.
+        max_bytes_per_s (int): The maximum number of bytes to publish per
+            second, 0 for no limit.
+        compress (bool): True if the published messages are compressed.
     """
 
-    def __init__(self, logs_dir, redis_address, redis_password=None):
+    def __init__(self,
+                 logs_dir,
+                 redis_address,
+                 redis_password=None,
+                 max_bytes_per_s=ray_constants.LOG_MONITOR_MAX_BYTES_PER_S,
+                 compress=ray_constants.LOG_MONITOR_COMPRESS,
+                 use_inotify=ray_constants.LOG_MONITOR_USE_INOTIFY):
         """Initialize the log monitor object."""
         self.ip = services.get_node_ip_address()
         self.logs_dir = logs_dir
@@ -87,6 +191,21 @@ class LogMonitor:
         self.open_file_infos = []
         self.closed_file_infos = []
         self.can_open_more_files = True
+        self.max_bytes_per_s = max_bytes_per_s
+        self.compress = compress
+        self.watcher = InotifyWatcher.create(logs_dir) if use_inotify else None
+        self.pending_filenames = set() if self.watcher else None
+        self.last_scan_time = 0
+        self.byte_budget = max_bytes_per_s
+        self.byte_budget_time = time.monotonic()
+
+    def _is_pending(self, file_info):
+        return (self.pending_filenames is None
+                or file_info.filename in self.pending_filenames)
+
+    def _mark_drained(self, file_info):
+        if self.pending_filenames is not None:
+            self.pending_filenames.discard(file_info.filename)
 
     def close_all_files(self):
         """Close all open files (so that we can open more)."""
@@ -104,6 +223,7 @@ class LogMonitor:
                 # The process is not alive any more, so move the log file
                 # out of the log directory so glob.glob will not be slowed
                 # by it.
+                self._mark_drained(file_info)
                 target = os.path.join(self.logs_dir, "old",
                                       os.path.basename(file_info.filename))
                 try:
@@ -121,6 +241,7 @@ class LogMonitor:
 
     def update_log_filenames(self):
         """Update the list of log files to monitor."""
+        self.last_scan_time = time.monotonic()
         # output of user code is written here
         log_file_paths = glob.glob(f"{self.logs_dir}/worker*[.out|.err]")
         # segfaults and other serious errors are logged here
@@ -141,6 +262,8 @@ class LogMonitor:
                 is_err_file = file_path.endswith("err")
 
                 self.log_filenames.add(file_path)
+                if self.pending_filenames is not None:
+                    self.pending_filenames.add(file_path)
                 self.closed_file_infos.append(
                     LogFileInfo(
                         filename=file_path,
@@ -172,8 +295,11 @@ class LogMonitor:
 
             file_info = self.closed_file_infos.pop(0)
             assert file_info.file_handle is None
+            if not self._is_pending(file_info):
+                files_with_no_updates.append(file_info)
+                continue
             # Get the file size to see if it has gotten bigger since we last
-            # opened it.
+            # read it.
             try:
                 file_size = os.path.getsize(file_info.filename)
             except (IOError, OSError) as e:
@@ -182,12 +308,13 @@ class LogMonitor:
                     logger.warning(f"Warning: The file {file_info.filename} "
                                    "was not found.")
                     self.log_filenames.remove(file_info.filename)
+                    self._mark_drained(file_info)
                     continue
                 raise e
 
             # If some new lines have been added to this file, try to reopen the
             # file.
-            if file_size > file_info.size_when_last_opened:
+            if file_size > file_info.file_position:
                 try:
                     f = open(file_info.filename, "rb")
                 except (IOError, OSError) as e:
@@ -196,50 +323,89 @@ class LogMonitor:
                             f"Warning: The file {file_info.filename} "
                             "was not found.")
                         self.log_filenames.remove(file_info.filename)
+                        self._mark_drained(file_info)
                         continue
                     else:
                         raise e
 
                 f.seek(file_info.file_position)
-                file_info.filesize_when_last_opened = file_size
+                file_info.size_when_last_opened = file_size
                 file_info.file_handle = f
                 self.open_file_infos.append(file_info)
             else:
+                self._mark_drained(file_info)
                 files_with_no_updates.append(file_info)
 
         # Add the files with no changes back to the list of closed files.
         self.closed_file_infos += files_with_no_updates
 
+    def _take_byte_budget(self):
+        """Returns how many bytes may be read now, None if unlimited."""
+        if not self.max_bytes_per_s:
+            return None
+        now = time.monotonic()
+        # Allow bursts of up to one second worth of bytes.
+        self.byte_budget = min(
+            self.max_bytes_per_s, self.byte_budget +
+            (now - self.byte_budget_time) * self.max_bytes_per_s)
+        self.byte_budget_time = now
+        return int(self.byte_budget)
+
+    def _read_lines(self, file_info, max_bytes):
+        """Reads up to `max_bytes` of new lines from an open file.
+
+        Returns:
+            A tuple of the lines and whether the end of the file was reached.
+        """
+        f = file_info.file_handle
+        try:
+            data = f.read(max_bytes)
+        except Exception:
+            logger.error(f"Error: Reading file: {file_info.filename}, "
+                         f"position: {file_info.file_position} failed.")
+            raise
+        at_eof = len(data) < max_bytes
+        if not at_eof:
+            # Stop at the last full line, the rest is read with the next
+            # chunk. A line longer than the chunk is split.
+            end = data.rfind(b"\n") + 1
+            if end > 0:
+                f.seek(end - len(data), os.SEEK_CUR)
+                data = data[:end]
+        if not data:
+            return [], at_eof
+        # Replace any characters not in UTF-8 with a replacement character,
+        # see https://stackoverflow.com/a/38565489/10891801
+        text = data.decode("utf-8", "replace")
+        if text[-1] == "\n":
+            text = text[:-1]
+        return text.split("\n"), at_eof
+
     def check_log_files_and_publish_updates(self):
         """Get any changes to the log files and push updates to Redis.
 
+        The lines of many files are published together, in messages of about
+        LOG_MONITOR_BATCH_MAX_BYTES.
+
         Returns:
             True if anything was published and false otherwise.
         """
         anything_published = False
+        batch = []
+        batch_bytes = 0
+        budget = self._take_byte_budget()
         for file_info in self.open_file_infos:
             assert not file_info.file_handle.closed
+            if not self._is_pending(file_info):
+                continue
+            max_bytes = ray_constants.LOG_MONITOR_READ_CHUNK_BYTES
+            if budget is not None:
+                if budget <= 0:
+                    break
+                max_bytes = min(max_bytes, budget)
 
-            lines_to_publish = []
-            max_num_lines_to_read = 100
-            for _ in range(max_num_lines_to_read):
-                try:
-                    next_line = file_info.file_handle.readline()
-                    # Replace any characters not in UTF-8 with
-                    # a replacement character, see
-                    # https://stackoverflow.com/a/38565489/10891801
-                    next_line = next_line.decode("utf-8", "replace")
-                    if next_line == "":
-                        break
-                    if next_line[-1] == "\n":
-                        next_line = next_line[:-1]
-                    lines_to_publish.append(next_line)
-                except Exception:
-                    logger.error(
-                        f"Error: Reading file: {file_info.full_path}, "
-                        f"position: {file_info.file_info.file_handle.tell()} "
-                        "failed.")
-                    raise
+            start_position = file_info.file_handle.tell()
+            lines_to_publish, at_eof = self._read_lines(file_info, max_bytes)
 
             if file_info.file_position == 0:
                 if "/raylet" in file_info.filename:
@@ -249,35 +415,84 @@ class LogMonitor:
 
             # Record the current position in the file.
             file_info.file_position = file_info.file_handle.tell()
+            num_bytes = file_info.file_position - start_position
+            if budget is not None:
+                budget -= num_bytes
+                self.byte_budget -= num_bytes
+            if at_eof:
+                self._mark_drained(file_info)
 
             if len(lines_to_publish) > 0:
-                self.redis_client.publish(
-                    ray.gcs_utils.LOG_FILE_CHANNEL,
-                    json.dumps({
-                        "ip": self.ip,
-                        "pid": file_info.worker_pid,
-                        "job": file_info.job_id,
-                        "is_err": file_info.is_err_file,
-                        "lines": lines_to_publish
-                    }))
-                anything_published = True
-
+                batch.append({
+                    "ip": self.ip,
+                    "pid": file_info.worker_pid,
+                    "job": file_info.job_id,
+                    "is_err": file_info.is_err_file,
+                    "lines": lines_to_publish
+                })
+                batch_bytes += num_bytes
+                if batch_bytes >= ray_constants.LOG_MONITOR_BATCH_MAX_BYTES:
+                    self.publish_batch(batch, batch_bytes)
+                    anything_published = True
+                    batch = []
+                    batch_bytes = 0
+
+        if batch:
+            self.publish_batch(batch, batch_bytes)
+            anything_published = True
         return anything_published
 
+    def publish_batch(self, batch, batch_bytes):
+        """Publish the log records of a batch in one message."""
+        compress = self.compress and batch_bytes >= COMPRESS_MIN_BYTES
+        self.redis_client.publish(ray.gcs_utils.LOG_FILE_CHANNEL,
+                                  encode_log_batch(batch, compress=compress))
+
+    def wait_for_changes(self, anything_published):
+        """Wait until the log files may have new lines.
+
+        Args:
+            anything_published (bool): Whether the last pass published
+                anything. If so, files may have more lines to read.
+        """
+        if self.watcher is None:
+            # If nothing was published, then wait a little bit before
+            # checking for logs to avoid using too much CPU.
+            if not anything_published:
+                time.sleep(POLL_INTERVAL_S)
+            self.update_log_filenames()
+            return
+
+        if anything_published:
+            timeout = 0
+        elif self.pending_filenames:
+            # The files have lines over the rate limit or over the number of
+            # files that can be open.
+            timeout = POLL_INTERVAL_S
+        else:
+            timeout = RESCAN_INTERVAL_S
+        changed, created, overflow = self.watcher.wait(timeout)
+        if overflow:
+            self.pending_filenames.update(self.log_filenames)
+        for name in changed:
+            filename = os.path.join(self.logs_dir, name)
+            if filename in self.log_filenames:
+                self.pending_filenames.add(filename)
+        if (created or overflow or
+                time.monotonic() - self.last_scan_time >= RESCAN_INTERVAL_S):
+            self.update_log_filenames()
+
     def run(self):
         """Run the log monitor.
 
-        This will query Redis once every second to check if there are new log
-        files to monitor. It will also store those log files in Redis.
+        This waits for changes of the log files in the log directory and
+        publishes their new lines to Redis.
         """
+        self.update_log_filenames()
         while True:
-            self.update_log_filenames()
             self.open_closed_files()
             anything_published = self.check_log_files_and_publish_updates()
-            # If nothing was published, then wait a little bit before checking
-            # for logs to avoid using too much CPU.
-            if not anything_published:
-                time.sleep(0.05)
+            self.wait_for_changes(anything_published)
 
 
 if __name__ == "__main__":
@@ -338,6 +553,19 @@ if __name__ == "__main__":
         default=ray_constants.LOGGING_ROTATE_BACKUP_COUNT,
         help="Specify the backup count of rotated log file, default is "
         f"{ray_constants.LOGGING_ROTATE_BACKUP_COUNT}.")
+    parser.add_argument(
+        "--max-bytes-per-s",
+        required=False,
+        type=int,
+        default=ray_constants.LOG_MONITOR_MAX_BYTES_PER_S,
+        help="The maximum number of log bytes to publish per second, 0 for "
+        "no limit.")
+    parser.add_argument(
+        "--compress",
+        required=False,
+        action="store_true",
+        default=ray_constants.LOG_MONITOR_COMPRESS,
+        help="Compress the published log messages.")
     args = parser.parse_args()
     setup_component_logger(
         logging_level=args.logging_level,
@@ -348,7 +576,11 @@ if __name__ == "__main__":
         backup_count=args.logging_rotate_backup_count)
 
     log_monitor = LogMonitor(
-        args.logs_dir, args.redis_address, redis_password=args.redis_password)
+        args.logs_dir,
+        args.redis_address,
+        redis_password=args.redis_password,
+        max_bytes_per_s=args.max_bytes_per_s,
+        compress=args.compress)
 
     try:
         log_monitor.run()
@@ -23,35 +23,125 @@ from ray.core.generated.metrics_pb2 import Metric
 
 logger = logging.getLogger(__name__)
 
+# How often new views and series are handed to the exporter.
+METRICS_EXPORT_INTERVAL_S = 1
+# A series that wasn't reported for this long, and at most twice as long, is
+# forgotten and no longer exported.
+SERIES_EXPIRY_S = 600
+
 
 class MetricsAgent:
-    def __init__(self, metrics_export_port):
+    """Records the metrics reported by Ray processes for Prometheus.
+
+    The view and view data of each metric are created once, and each series
+    (metric, tag values) keeps its aggregation data until its value changes,
+    so unchanged points cost a tuple comparison. The exporter reads the view
+    data when Prometheus scrapes it, so views are only handed to it when they
+    get new series, by a thread that runs once per export interval.
+
+    The last values are kept in two generations, which are rotated every
+    `series_expiry_s`. Series that are no longer reported, e.g. of dead
+    workers, are removed from the view data when they expire, so they are
+    no longer exported and don't pile up.
+    """
+
+    def __init__(self,
+                 metrics_export_port,
+                 export_interval_s=METRICS_EXPORT_INTERVAL_S,
+                 series_expiry_s=SERIES_EXPIRY_S):
         assert metrics_export_port is not None
         # OpenCensus classes.
         self.view_manager = stats_module.stats.view_manager
         # Port where we will expose metrics.
         self.metrics_export_port = metrics_export_port
+        self.export_interval_s = export_interval_s
+        self.series_expiry_s = series_expiry_s
         # Lock required because gRPC server uses
         # multiple threads to process requests.
         self._lock = threading.Lock()
+        # Metric name -> ViewData.
+        self._view_data = {}
+        # (Metric name, tag values) -> value of the last recorded point,
+        # for series reported since the last rotation and before it.
+        self._last_values = {}
+        self._previous_values = {}
+        self._last_rotation = time.monotonic()
+        # Metric name -> ViewData with series not handed to the exporter yet.
+        self._views_to_export = {}
 
         # Configure exporter. (We currently only support prometheus).
         self.view_manager.register_exporter(
             prometheus_exporter.new_stats_exporter(
                 prometheus_exporter.Options(
                     namespace="ray", port=metrics_export_port)))
+        self._stop_event = threading.Event()
+        self._export_thread = threading.Thread(
+            target=self._run_export_loop, daemon=True)
+        self._export_thread.start()
+
+    def stop(self):
+        """Stops the export thread."""
+        self._stop_event.set()
+        self._export_thread.join()
 
     def record_metric_points_from_protobuf(self, metrics: List[Metric]):
         """Record metrics from Opencensus Protobuf"""
         with self._lock:
             self._record_metrics(metrics)
 
-    def _record_metrics(self, metrics):
-        # The list of view data is what we are going to use for the
-        # final export to exporter.
-        view_data_changed: List[ViewData] = []
+    def flush(self):
+        """Hands the views with new series to the exporter."""
+        with self._lock:
+            views_to_export = list(self._views_to_export.values())
+            self._views_to_export = {}
+            if views_to_export:
+                self.view_manager.measure_to_view_map.export(views_to_export)
+
+    def expire_series(self):
+        """Forgets the series not reported since the previous call, and
+        stops exporting them."""
+        with self._lock:
+            for name, tag_vals in self._previous_values:
+                self._view_data[name].tag_value_aggregation_data_map.pop(
+                    tag_vals, None)
+            self._previous_values = self._last_values
+            self._last_values = {}
+            self._last_rotation = time.monotonic()
+
+    def _run_export_loop(self):
+        while not self._stop_event.wait(self.export_interval_s):
+            # This thread won't be broken by exceptions.
+            try:
+                self.flush()
+                if (time.monotonic() - self._last_rotation >=
+                        self.series_expiry_s):
+                    self.expire_series()
+            except Exception:
+                logger.warning(traceback.format_exc())
 
-        # Walk the protobufs and convert them to ViewData
+    def _get_view_data(self, descriptor, start_time) -> ViewData:
+        view_data = self._view_data.get(descriptor.name)
+        if view_data is not None:
+            return view_data
+        measure_to_view_map = self.view_manager.measure_to_view_map
+        if not measure_to_view_map.get_view(descriptor.name, None):
+            columns = [label_key.key for label_key in descriptor.label_keys]
+            measure = measure_module.BaseMeasure(
+                descriptor.name, descriptor.description, descriptor.unit)
+            view = View(
+                descriptor.name,
+                descriptor.description,
+                columns,
+                measure,
+                aggregation=None)
+            measure_to_view_map.register_view(view, start_time)
+        view_data = (measure_to_view_map._measure_to_view_data_list_map[
+            descriptor.name][-1])
+        self._view_data[descriptor.name] = view_data
+        return view_data
+
+    def _record_metrics(self, metrics):
+        # Walk the protobufs and update the ViewData of changed series.
         for metric in metrics:
             descriptor = metric.metric_descriptor
             timeseries = metric.timeseries
@@ -59,55 +149,63 @@ class MetricsAgent:
             if len(timeseries) == 0:
                 continue
 
-            columns = [label_key.key for label_key in descriptor.label_keys]
-            start_time = timeseries[0].start_timestamp.seconds
+            view_data = self._get_view_data(
+                descriptor, timeseries[0].start_timestamp.seconds)
+            aggregation_data_map = view_data.tag_value_aggregation_data_map
 
-            # Create the view and view_data
-            measure = measure_module.BaseMeasure(
-                descriptor.name, descriptor.description, descriptor.unit)
-            view = self.view_manager.measure_to_view_map.get_view(
-                descriptor.name, None)
-            if not view:
-                view = View(
-                    descriptor.name,
-                    descriptor.description,
-                    columns,
-                    measure,
-                    aggregation=None)
-                self.view_manager.measure_to_view_map.register_view(
-                    view, start_time)
-            view_data = (self.view_manager.measure_to_view_map.
-                         _measure_to_view_data_list_map[measure.name][-1])
-            view_data_changed.append(view_data)
-
-            # Create the aggregation and fill it in the our stats
             for series in timeseries:
+                if len(series.points) == 0:
+                    continue
+                # Only the latest point of a series is exported.
+                point = series.points[-1]
+                value = _point_value(point)
                 tag_vals = tuple(val.value for val in series.label_values)
-                for point in series.points:
-                    if point.HasField("int64_value"):
-                        data = CountAggregationData(point.int64_value)
-                    elif point.HasField("double_value"):
-                        data = LastValueAggregationData(
-                            ValueDouble, point.double_value)
-                    elif point.HasField("distribution_value"):
-                        dist_value = point.distribution_value
-                        counts_per_bucket = [
-                            bucket.count for bucket in dist_value.buckets
-                        ]
-                        bucket_bounds = (
-                            dist_value.bucket_options.explicit.bounds)
-                        data = DistributionAggregationData(
-                            dist_value.sum / dist_value.count,
-                            dist_value.count,
-                            dist_value.sum_of_squared_deviation,
-                            counts_per_bucket, bucket_bounds)
-                    else:
-                        raise ValueError("Summary is not supported")
-
-                    view_data.tag_value_aggregation_data_map[tag_vals] = data
-
-        # Finally, export all the values
-        self.view_manager.measure_to_view_map.export(view_data_changed)
+                key = (descriptor.name, tag_vals)
+                last_value = self._last_values.get(key)
+                if last_value is None:
+                    # Reported before the last rotation.
+                    last_value = self._previous_values.pop(key, None)
+                    if last_value is not None:
+                        self._last_values[key] = last_value
+                if last_value == value:
+                    continue
+                self._last_values[key] = value
+                if tag_vals not in aggregation_data_map:
+                    self._views_to_export[descriptor.name] = view_data
+                aggregation_data_map[tag_vals] = _to_aggregation_data(point)
+
+
+def _point_value(point):
+    """Returns a hashable value of a point, to detect unchanged points."""
+    if point.HasField("int64_value"):
+        return point.int64_value
+    elif point.HasField("double_value"):
+        return point.double_value
+    elif point.HasField("distribution_value"):
+        dist_value = point.distribution_value
+        return (dist_value.count, dist_value.sum,
+                dist_value.sum_of_squared_deviation,
+                tuple(bucket.count for bucket in dist_value.buckets),
+                tuple(dist_value.bucket_options.explicit.bounds))
+    else:
+        raise ValueError("Summary is not supported")
+
+
+def _to_aggregation_data(point):
+    if point.HasField("int64_value"):
+        return CountAggregationData(point.int64_value)
+    elif point.HasField("double_value"):
+        return LastValueAggregationData(ValueDouble, point.double_value)
+    elif point.HasField("distribution_value"):
+        dist_value = point.distribution_value
+        counts_per_bucket = [bucket.count for bucket in dist_value.buckets]
+        bucket_bounds = dist_value.bucket_options.explicit.bounds
+        return DistributionAggregationData(dist_value.sum / dist_value.count,
+                                           dist_value.count,
+                                           dist_value.sum_of_squared_deviation,
+                                           counts_per_bucket, bucket_bounds)
+    else:
+        raise ValueError("Summary is not supported")
 
 
 class PrometheusServiceDiscoveryWriter(threading.Thread):
@@ -8,10 +8,14 @@ import time
 import traceback
 import json
 
+from prometheus_client import start_http_server
+
 import ray
 from ray.autoscaler._private.autoscaler import StandardAutoscaler
 from ray.autoscaler._private.commands import teardown_cluster
-from ray.autoscaler._private.constants import AUTOSCALER_UPDATE_INTERVAL_S
+from ray.autoscaler._private.constants import AUTOSCALER_UPDATE_INTERVAL_S, \
+    AUTOSCALER_METRIC_PORT
+from ray.autoscaler._private.prom_metrics import AutoscalerPrometheusMetrics
 from ray.autoscaler._private.load_metrics import LoadMetrics
 from ray.autoscaler._private.constants import \
     AUTOSCALER_MAX_RESOURCE_DEMAND_VECTOR_SIZE
@@ -85,7 +89,11 @@ class Monitor:
             This is used to receive notifications about failed components.
     """
 
-    def __init__(self, redis_address, autoscaling_config, redis_password=None):
+    def __init__(self,
+                 redis_address,
+                 autoscaling_config,
+                 redis_password=None,
+                 metrics_export_port=AUTOSCALER_METRIC_PORT):
         # Initialize the Redis clients.
         ray.state.state._initialize_global_state(
             redis_address, redis_password=redis_password)
@@ -106,9 +114,21 @@ class Monitor:
         self.raylet_id_to_ip_map = {}
         head_node_ip = redis_address.split(":")[0]
         self.load_metrics = LoadMetrics(local_ip=head_node_ip)
+        self.prom_metrics = AutoscalerPrometheusMetrics()
+        if metrics_export_port:
+            try:
+                start_http_server(
+                    port=metrics_export_port,
+                    registry=self.prom_metrics.registry)
+            except Exception:
+                logger.exception(
+                    "Monitor: Failed to export autoscaler metrics on port "
+                    "{}.".format(metrics_export_port))
         if autoscaling_config:
-            self.autoscaler = StandardAutoscaler(autoscaling_config,
-                                                 self.load_metrics)
+            self.autoscaler = StandardAutoscaler(
+                autoscaling_config,
+                self.load_metrics,
+                prom_metrics=self.prom_metrics)
             self.autoscaling_config = autoscaling_config
         else:
             self.autoscaler = None
@@ -328,6 +348,13 @@ if __name__ == "__main__":
         type=str,
         default=None,
         help="the password to use for Redis")
+    parser.add_argument(
+        "--autoscaler-metrics-export-port",
+        required=False,
+        type=int,
+        default=AUTOSCALER_METRIC_PORT,
+        help="the port to export the autoscaler's prometheus metrics on, "
+        "0 disables them")
     parser.add_argument(
         "--logging-level",
         required=False,
@@ -387,7 +414,8 @@ if __name__ == "__main__":
     monitor = Monitor(
         args.redis_address,
         autoscaling_config,
-        redis_password=args.redis_password)
+        redis_password=args.redis_password,
+        metrics_export_port=args.autoscaler_metrics_export_port)
 
     try:
         monitor.run()
@@ -1,4 +1,15 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
 import ray
+import ray.ray_constants as ray_constants
+
+logger = logging.getLogger(__name__)
 
 
 class _NullLogSpan:
@@ -49,3 +60,190 @@ def profile(event_type, extra_data=None):
         return NULL_LOG_SPAN
     return worker.core_worker.profile_event(
         event_type.encode("ascii"), extra_data)
+
+
+# Thread id -> name of the task function the thread runs.
+_thread_task_names = {}
+
+
+@contextmanager
+def sampled_task(function_name):
+    """Attribute the stack samples of this thread to a task function.
+
+    The worker executes each task in this context, so that the sampling
+    profiler can tag the stacks with the task or actor method name.
+    """
+    thread_id = threading.get_ident()
+    previous = _thread_task_names.get(thread_id)
+    _thread_task_names[thread_id] = function_name
+    try:
+        yield
+    finally:
+        if previous is None:
+            _thread_task_names.pop(thread_id, None)
+        else:
+            _thread_task_names[thread_id] = previous
+
+
+class SamplingProfiler:
+    """A low overhead stack sampler for the threads running tasks.
+
+    Each call to `sample` takes the Python stack of every thread running a
+    task, see `sampled_task`, and counts it as a folded stack: the frames from
+    the outermost to the innermost, separated by ";". The counts are kept per
+    task function name. Threads that don't run a task are not sampled.
+
+    Attributes:
+        max_depth (int): The number of innermost frames kept per stack.
+    """
+
+    # Frame names are cached by code object, up to this many.
+    _MAX_FRAME_NAMES = 10000
+
+    def __init__(self, max_depth=ray_constants.SAMPLING_PROFILER_MAX_DEPTH):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._samples = collections.defaultdict(collections.Counter)
+        self._frame_names = {}
+
+    def _frame_name(self, code):
+        name = self._frame_names.get(code)
+        if name is None:
+            if len(self._frame_names) >= self._MAX_FRAME_NAMES:
+                self._frame_names.clear()
+            name = (f"{code.co_name} "
+                    f"({code.co_filename}:{code.co_firstlineno})")
+            self._frame_names[code] = name
+        return name
+
+    def sample(self):
+        """Sample the stacks of the threads running tasks."""
+        frames = sys._current_frames()
+        stacks = []
+        for thread_id, function_name in list(_thread_task_names.items()):
+            frame = frames.get(thread_id)
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                stacks.append((function_name, ";".join(reversed(names))))
+        with self._lock:
+            for function_name, stack in stacks:
+                self._samples[function_name][stack] += 1
+
+    def take_samples(self):
+        """Return the stack counts by function name since the last call."""
+        with self._lock:
+            samples = self._samples
+            self._samples = collections.defaultdict(collections.Counter)
+        return samples
+
+    def run(self,
+            report,
+            threads_stopped,
+            hz=ray_constants.SAMPLING_PROFILER_HZ,
+            report_interval_s=ray_constants.SAMPLING_PROFILER_REPORT_INTERVAL_S
+            ):
+        """Sample `hz` times per second until `threads_stopped` is set.
+
+        Args:
+            report: Called with the result of `take_samples` every
+                `report_interval_s` seconds, if anything was sampled.
+            threads_stopped (threading.Event): A threading event used to
+                signal to the thread that it should exit.
+        """
+        next_report_time = time.monotonic() + report_interval_s
+        while not threads_stopped.wait(1 / hz):
+            self.sample()
+            if time.monotonic() < next_report_time:
+                continue
+            next_report_time = time.monotonic() + report_interval_s
+            samples = self.take_samples()
+            if not samples:
+                continue
+            try:
+                report(samples)
+            except Exception:
+                # The agent may not be up yet, or may have died with the node.
+                logger.debug(
+                    "Failed to report the stack samples.", exc_info=True)
+
+
+class ProfilingSampleWindow:
+    """The stack counts by function name of the last `window_s` seconds.
+
+    Samples are added to buckets of `bucket_s` seconds, and buckets older
+    than the window are dropped, so memory doesn't grow with uptime. Each
+    bucket keeps at most `max_stacks_per_function` distinct stacks per
+    function; samples of other stacks are counted as `dropped_stack`.
+    """
+
+    def __init__(self, window_s, bucket_s, max_stacks_per_function,
+                 dropped_stack):
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.max_stacks_per_function = max_stacks_per_function
+        self.dropped_stack = dropped_stack
+        # (Start time, function name -> Counter of stacks), oldest first.
+        self._buckets = collections.deque()
+
+    def _expire(self, now):
+        while self._buckets and self._buckets[0][0] <= now - self.window_s:
+            self._buckets.popleft()
+
+    def add(self, function_name, stack, count, now=None):
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        if not self._buckets or now - self._buckets[-1][0] >= self.bucket_s:
+            self._buckets.append(
+                (now, collections.defaultdict(collections.Counter)))
+        counts = self._buckets[-1][1][function_name]
+        if (stack not in counts
+                and len(counts) >= self.max_stacks_per_function):
+            stack = self.dropped_stack
+        counts[stack] += count
+
+    def function_names(self, now=None):
+        self._expire(time.monotonic() if now is None else now)
+        return list({
+            function_name
+            for _, samples in self._buckets for function_name in samples
+        })
+
+    def get(self, function_name, now=None):
+        """Return the stack counts of a function within the window."""
+        self._expire(time.monotonic() if now is None else now)
+        counts = collections.Counter()
+        for _, samples in self._buckets:
+            counts.update(samples.get(function_name, {}))
+        return counts
+
+
+def agent_reporter(agent_address):
+    """Return a function reporting stack samples to the dashboard agent.
+
+    Args:
+        agent_address (str): The gRPC address of the dashboard agent.
+    """
+    import grpc
+    from ray.core.generated import reporter_pb2
+    from ray.core.generated import reporter_pb2_grpc
+
+    channel = grpc.insecure_channel(agent_address)
+    stub = reporter_pb2_grpc.ReporterServiceStub(channel)
+    pid = os.getpid()
+
+    def report(samples):
+        stub.ReportProfilingSamples(
+            reporter_pb2.ReportProfilingSamplesRequest(
+                pid=pid,
+                samples=[
+                    reporter_pb2.ProfilingSample(
+                        function_name=function_name, stack=stack, count=count)
+                    for function_name, counts in samples.items()
+                    for stack, count in counts.items()
+                ]),
+            timeout=ray_constants.SAMPLING_PROFILER_REPORT_INTERVAL_S)
+
+    return report
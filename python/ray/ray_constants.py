@@ -192,7 +192,32 @@ WORKER_PROCESS_TYPE_SPILL_WORKER_DELETE = (
 WORKER_PROCESS_TYPE_RESTORE_WORKER_DELETE = (
     f"ray::DELETE_{WORKER_PROCESS_TYPE_RESTORE_WORKER_NAME}")
 
+# The number of times per second workers sample the stacks of running tasks,
+# 0 to disable the sampling profiler.
+SAMPLING_PROFILER_HZ = env_integer("RAY_SAMPLING_PROFILER_HZ", 10)
+# How often workers report their stack samples to the dashboard agent.
+SAMPLING_PROFILER_REPORT_INTERVAL_S = env_integer(
+    "RAY_SAMPLING_PROFILER_REPORT_INTERVAL_S", 10)
+# The maximum number of innermost frames kept per stack sample.
+SAMPLING_PROFILER_MAX_DEPTH = env_integer("RAY_SAMPLING_PROFILER_MAX_DEPTH",
+                                          64)
+
 LOG_MONITOR_MAX_OPEN_FILES = 200
+# The maximum number of bytes the log monitor reads from a file at once.
+LOG_MONITOR_READ_CHUNK_BYTES = env_integer("RAY_LOG_MONITOR_READ_CHUNK_BYTES",
+                                           256 * 1024)
+# The log monitor publishes the lines of many files in one message of up to
+# about this many bytes.
+LOG_MONITOR_BATCH_MAX_BYTES = env_integer("RAY_LOG_MONITOR_BATCH_MAX_BYTES",
+                                          1024 * 1024)
+# The maximum number of log bytes per second the log monitor publishes, 0 for
+# no limit. The lines over the limit are published later.
+LOG_MONITOR_MAX_BYTES_PER_S = env_integer("RAY_LOG_MONITOR_MAX_BYTES_PER_S", 0)
+# Whether the log monitor compresses the messages it publishes.
+LOG_MONITOR_COMPRESS = env_bool("RAY_LOG_MONITOR_COMPRESS", False)
+# Whether the log monitor waits for file changes with inotify, if available,
+# instead of polling the log files.
+LOG_MONITOR_USE_INOTIFY = env_bool("RAY_LOG_MONITOR_USE_INOTIFY", True)
 
 # The object metadata field uses the following format: It is a comma
 # separated list of fields. The first field is mandatory and is the
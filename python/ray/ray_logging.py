@@ -1,6 +1,8 @@
+import json
 import logging
 import os
 import sys
+import zlib
 from logging.handlers import RotatingFileHandler
 
 import ray
@@ -55,6 +57,35 @@ def setup_component_logger(*, logging_level, logging_format, log_dir, filename,
     logger.addHandler(handler)
 
 
+def encode_log_batch(records, compress=False):
+    """Encode the log records the log monitor publishes in one message.
+
+    Each record holds the "ip", "pid", "job", "is_err" and "lines" of one log
+    file. The message is a JSON list of records, zlib compressed if
+    `compress` is True.
+    """
+    data = json.dumps(records).encode("utf-8")
+    if compress:
+        data = zlib.compress(data, 1)
+    return data
+
+
+def decode_log_batch(data):
+    """Decode a message published by the log monitor into log records.
+
+    Messages holding a single JSON record are also accepted.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    # JSON messages start with "[" or "{", zlib streams never do.
+    if data[:1] not in (b"[", b"{"):
+        data = zlib.decompress(data)
+    records = json.loads(data.decode("utf-8"))
+    if isinstance(records, dict):
+        return [records]
+    return records
+
+
 """
 All components underneath here is used specifically for the default_worker.py.
 """
@@ -1,18 +1,30 @@
 """This is the script for `ray microbenchmark`."""
 
 import asyncio
+import json
 import logging
 import os
+import platform
+import sys
 import time
 import numpy as np
 import multiprocessing
 import ray
+from ray.experimental.internal_kv import _internal_kv_get, _internal_kv_put
+from ray.util.placement_group import (placement_group, remove_placement_group)
 
 logger = logging.getLogger(__name__)
 
 # Only run tests matching this filter pattern.
 filter_pattern = os.environ.get("TESTS_TO_RUN", "")
 
+# The result of each benchmark that ran, see `timeit`.
+results = []
+
+# A benchmark regresses if its rate dropped by more than this fraction of the
+# baseline, and by more than the noise of both runs.
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
 
 @ray.remote(num_cpus=0)
 class Actor:
@@ -37,6 +49,10 @@ class AsyncActor:
     async def small_value_batch(self, n):
         await asyncio.wait([small_value.remote() for _ in range(n)])
 
+    async def sleep(self):
+        await asyncio.sleep(0.01)
+        return b"ok"
+
 
 @ray.remote(num_cpus=0)
 class Client:
@@ -71,6 +87,22 @@ def small_value_batch(n):
     return 0
 
 
+@ray.remote
+def many_args(*args):
+    return b"ok"
+
+
+@ray.remote
+def nested_refs(refs):
+    return b"ok"
+
+
+class SerializableObject:
+    def __init__(self):
+        self.ints = list(range(100))
+        self.name = "object"
+
+
 def timeit(name, fn, multiplier=1):
     if filter_pattern not in name:
         return
@@ -90,6 +122,76 @@ def timeit(name, fn, multiplier=1):
         stats.append(multiplier * count / (end - start))
     print(name, "per second", round(np.mean(stats), 2), "+-",
           round(np.std(stats), 2))
+    results.append({
+        "name": name,
+        "per_second": float(np.mean(stats)),
+        "std": float(np.std(stats)),
+    })
+
+
+def save_results(path):
+    """Save the benchmark results and the machine they ran on as JSON."""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "metadata": {
+                    "ray_version": ray.__version__,
+                    "ray_commit": ray.__commit__,
+                    "python_version": platform.python_version(),
+                    "platform": platform.platform(),
+                    "num_cpus": multiprocessing.cpu_count(),
+                    "time": time.time(),
+                },
+                "results": results,
+            },
+            f,
+            indent=2)
+
+
+def compare_results(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Compare benchmark results to a baseline.
+
+    Args:
+        baseline (list): Results of the baseline run, see `timeit`.
+        current (list): Results to compare to the baseline.
+        threshold (float): A benchmark regresses if its rate dropped by more
+            than this fraction of the baseline rate, and by more than twice
+            the combined standard deviation of both runs.
+
+    Returns:
+        A list of (name, baseline rate, current rate, change, regressed) of
+        the benchmarks in both results, where change is the relative change
+        of the rate.
+    """
+    baseline = {result["name"]: result for result in baseline}
+    comparison = []
+    for result in current:
+        base = baseline.get(result["name"])
+        if base is None or base["per_second"] <= 0:
+            continue
+        drop = base["per_second"] - result["per_second"]
+        noise = 2 * (base["std"]**2 + result["std"]**2)**0.5
+        regressed = (drop > threshold * base["per_second"] and drop > noise)
+        comparison.append(
+            (result["name"], base["per_second"], result["per_second"],
+             -drop / base["per_second"], regressed))
+    return comparison
+
+
+def print_comparison(comparison):
+    """Print a comparison and return the number of regressions."""
+    for name, base, current, change, regressed in comparison:
+        print(f"{'REGRESSION' if regressed else 'ok':<10} {name}: "
+              f"{round(base, 2)} -> {round(current, 2)} per second "
+              f"({change:+.1%})")
+    num_regressions = sum(1 for *_, regressed in comparison if regressed)
+    print(f"{num_regressions} regressions in {len(comparison)} benchmarks.")
+    return num_regressions
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)["results"]
 
 
 def check_optimized_build():
@@ -104,8 +206,152 @@ def check_optimized_build():
         logger.warning(msg)
 
 
-def main():
+def large_object_benchmarks(arr):
+    arr_ref = ray.put(arr)
+
+    def get_large():
+        ray.get(arr_ref)
+
+    timeit("single client get calls of numpy (zero-copy)", get_large)
+
+    def read_large():
+        ray.get(arr_ref).sum()
+
+    timeit("single client zero-copy numpy read gigabytes", read_large, 8 * 0.1)
+
+
+def task_arg_benchmarks():
+    refs = [ray.put(i) for i in range(100)]
+
+    def many_args_task():
+        ray.get(many_args.remote(*refs))
+
+    timeit("single client tasks with 100 args", many_args_task)
+
+    def nested_refs_task():
+        ray.get(nested_refs.remote(refs))
+
+    timeit("single client tasks with 100 nested refs", nested_refs_task)
+
+    refs = [small_value.remote() for _ in range(10000)]
+    ray.get(refs)
+
+    def wait_many():
+        ray.wait(refs, num_returns=len(refs))
+
+    timeit("single client wait calls on 10k refs", wait_many)
+
+
+def actor_creation_benchmarks():
+    def create_actors():
+        actors = [Actor.remote() for _ in range(10)]
+        ray.get([a.small_value.remote() for a in actors])
+        for a in actors:
+            ray.kill(a)
+
+    timeit("actor creations", create_actors, 10)
+
+    a = AsyncActor.options(max_concurrency=1000).remote()
+
+    def async_actor_concurrent():
+        ray.get([a.sleep.remote() for _ in range(1000)])
+
+    timeit("1:1 async-actor calls with 1000 concurrent sleeps",
+           async_actor_concurrent, 1000)
+
+
+def placement_group_benchmarks():
+    def create_remove_placement_group():
+        pg = placement_group([{"CPU": 1}])
+        ray.get(pg.ready())
+        remove_placement_group(pg)
+
+    timeit("placement group creations and removals",
+           create_remove_placement_group)
+
+
+def internal_kv_benchmarks():
+    value = b"x" * 100
+
+    def kv_put():
+        _internal_kv_put(b"ray_perf", value, overwrite=True)
+
+    timeit("single client internal kv put calls", kv_put)
+
+    def kv_get():
+        _internal_kv_get(b"ray_perf")
+
+    timeit("single client internal kv get calls", kv_get)
+
+
+def serialization_benchmarks():
+    context = ray.worker.global_worker.get_serialization_context()
+    values = {
+        "int list": list(range(1000)),
+        "str dict": {str(i): str(i)
+                     for i in range(1000)},
+        "small numpy array": np.zeros(1000),
+        "bytes": b"x" * 10000,
+        "object": SerializableObject(),
+    }
+    for name, value in values.items():
+
+        def serialize():
+            context.serialize(value).total_bytes
+
+        timeit(f"serialize {name}", serialize)
+
+        def put_get():
+            ray.get(ray.put(value))
+
+        timeit(f"single client put/get {name}", put_get)
+
+
+def client_benchmarks():
+    import ray.experimental.client.server.server as ray_client_server
+    from ray.experimental.client import ray as client
+
+    server = ray_client_server.serve("localhost:50051", test_mode=True)
+    client.connect("localhost:50051")
+
+    @client.remote
+    def client_value():
+        return b"ok"
+
+    def client_task():
+        client.get(client_value.remote())
+
+    timeit("client: tasks and get calls", client_task)
+
+    def client_task_async():
+        client.get([client_value.remote() for _ in range(1000)])
+
+    timeit("client: tasks async", client_task_async, 1000)
+
+    def client_put():
+        client.put(0)
+
+    timeit("client: put calls", client_put)
+
+    client.disconnect()
+    server.stop(0)
+
+
+def main(output=None,
+         baseline=None,
+         regression_threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Run the benchmarks.
+
+    Args:
+        output (str): Save the results as JSON to this path.
+        baseline (str): Compare the results to the JSON results at this path.
+        regression_threshold (float): See `compare_results`.
+
+    Returns:
+        The number of regressions compared to the baseline.
+    """
     check_optimized_build()
+    results.clear()
 
     print("Tip: set TESTS_TO_RUN='pattern' to run a subset of benchmarks")
 
@@ -150,6 +396,8 @@ def main():
 
     timeit("single client put gigabytes", put_large, 8 * 0.1)
 
+    large_object_benchmarks(arr)
+
     @ray.remote
     def do_put():
         for _ in range(10):
@@ -278,6 +526,29 @@ def main():
 
     timeit("n:n async-actor calls async", async_actor_multi, m * n)
 
+    task_arg_benchmarks()
+    actor_creation_benchmarks()
+    placement_group_benchmarks()
+    internal_kv_benchmarks()
+    serialization_benchmarks()
+    client_benchmarks()
+
+    ray.shutdown()
+
+    if output:
+        save_results(output)
+    if baseline:
+        return print_comparison(
+            compare_results(
+                load_results(baseline), results, regression_threshold))
+    return 0
+
 
 if __name__ == "__main__":
+    # Usage: ray_perf.py [compare BASELINE RESULTS]
+    if len(sys.argv) == 4 and sys.argv[1] == "compare":
+        sys.exit(
+            print_comparison(
+                compare_results(
+                    load_results(sys.argv[2]), load_results(sys.argv[3]))))
     main()
@@ -1328,10 +1328,33 @@ done
 
 
 @cli.command()
-def microbenchmark():
+@click.option(
+    "--output",
+    required=False,
+    type=str,
+    help="Save the benchmark results as JSON to this file.")
+@click.option(
+    "--baseline",
+    required=False,
+    type=str,
+    help="Compare the benchmark results to the JSON results in this file, "
+    "and exit with an error if any benchmark regressed.")
+@click.option(
+    "--regression-threshold",
+    required=False,
+    type=float,
+    default=0.1,
+    help="The fraction of the baseline rate that a benchmark must drop by "
+    "to count as a regression.")
+def microbenchmark(output, baseline, regression_threshold):
     """Run a local Ray microbenchmark on the current machine."""
     from ray.ray_perf import main
-    main()
+    num_regressions = main(
+        output=output,
+        baseline=baseline,
+        regression_threshold=regression_threshold)
+    if num_regressions:
+        sys.exit(1)
 
 
 @cli.command()
@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 from subprocess import CalledProcessError
@@ -13,11 +14,15 @@ from jsonschema.exceptions import ValidationError
 
 import ray
 import ray._private.services as services
-from ray.autoscaler._private.util import prepare_config, validate_config
+from ray.autoscaler._private.util import prepare_config, validate_config, \
+    hash_file_mount_contents
 from ray.autoscaler._private import commands
 from ray.autoscaler.sdk import get_docker_host_mount_location
 from ray.autoscaler._private.load_metrics import LoadMetrics
 from ray.autoscaler._private.autoscaler import StandardAutoscaler
+from ray.autoscaler._private.cached_provider import CachedNodeProvider
+from ray.autoscaler._private.prom_metrics import AutoscalerPrometheusMetrics
+from ray.autoscaler._private.file_mount_broadcast import FileMountBroadcast
 from ray.autoscaler._private.providers import (
     _NODE_PROVIDERS, _clear_provider_cache, _DEFAULT_CONFIGS)
 from ray.autoscaler.tags import TAG_RAY_NODE_KIND, TAG_RAY_NODE_STATUS, \
@@ -554,6 +559,75 @@ class AutoscalingTest(unittest.TestCase):
         # Eventually reaches steady state
         self.waitForNodes(5)
 
+    def testCachedProvider(self):
+        provider = MockProvider()
+        provider.create_node({}, {TAG_RAY_NODE_KIND: NODE_KIND_WORKER}, 3)
+        provider.create_node({}, {TAG_RAY_NODE_KIND: NODE_KIND_HEAD}, 1)
+        cached = CachedNodeProvider(provider)
+        cached.snapshot()
+        for _ in range(3):
+            nodes = cached.non_terminated_nodes({
+                TAG_RAY_NODE_KIND: NODE_KIND_WORKER
+            })
+            for node_id in nodes:
+                cached.internal_ip(node_id)
+        assert len(nodes) == 3
+        assert cached.num_calls == {
+            "non_terminated_nodes": 1,
+            "node_tags": 4,
+            "internal_ip": 3
+        }
+
+        # Writes are applied to the snapshot.
+        cached.set_node_tags(nodes[0], {TAG_RAY_NODE_STATUS: "foo"})
+        assert cached.node_tags(nodes[0])[TAG_RAY_NODE_STATUS] == "foo"
+        cached.terminate_nodes(nodes[:2])
+        assert cached.num_calls["terminate_nodes"] == 1
+        assert cached.non_terminated_nodes({
+            TAG_RAY_NODE_KIND: NODE_KIND_WORKER
+        }) == nodes[2:]
+        assert cached.num_calls["non_terminated_nodes"] == 1
+        # Creating nodes invalidates the snapshot.
+        cached.create_node({}, {TAG_RAY_NODE_KIND: NODE_KIND_WORKER}, 1)
+        assert len(
+            cached.non_terminated_nodes({
+                TAG_RAY_NODE_KIND: NODE_KIND_WORKER
+            })) == 2
+        assert cached.num_calls["non_terminated_nodes"] == 2
+
+        cached.clear()
+        cached.non_terminated_nodes({})
+        cached.non_terminated_nodes({})
+        assert cached.num_calls["non_terminated_nodes"] == 4
+
+    def testProviderCallMetrics(self):
+        config_path = self.write_config(SMALL_CLUSTER)
+        self.provider = MockProvider()
+        prom_metrics = AutoscalerPrometheusMetrics()
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_failures=0,
+            process_runner=MockProcessRunner(),
+            update_interval_s=0,
+            prom_metrics=prom_metrics)
+        autoscaler.update()
+        self.waitForNodes(2)
+        registry = prom_metrics.registry
+        assert registry.get_sample_value(
+            "autoscaler_update_time_seconds_count") == 1
+        assert registry.get_sample_value(
+            "autoscaler_provider_calls_total",
+            {"method": "non_terminated_nodes"}) == \
+            autoscaler.update_provider_calls["non_terminated_nodes"] > 0
+
+        # Updates also work with a provider that doesn't count its calls.
+        autoscaler.provider = self.provider
+        autoscaler.update()
+        assert registry.get_sample_value(
+            "autoscaler_update_time_seconds_count") == 2
+        assert not autoscaler.update_provider_calls
+
     def testDynamicScaling(self):
         config_path = self.write_config(SMALL_CLUSTER)
         self.provider = MockProvider()
@@ -1512,6 +1586,166 @@ class AutoscalingTest(unittest.TestCase):
                 f"{file_mount_dir}/ ubuntu@172.0.0.{i}:"
                 f"{docker_mount_prefix}/home/test-folder/")
 
+    def testFileMountBroadcastSources(self):
+        broadcast = FileMountBroadcast(fanout=1, relay=True)
+        with broadcast.source("a", "node-0") as source:
+            # The head node serves the first node.
+            assert source is None
+        broadcast.add_seed("node-0", "a")
+        with broadcast.source("a", "node-1") as first:
+            # Seeds are preferred over the head node.
+            assert first == "node-0"
+            with broadcast.source("a", "node-2") as second:
+                assert second is None
+        # A node is never its own source.
+        with broadcast.source("a", "node-0") as source:
+            assert source is None
+        # Seeds only serve the contents they hold.
+        with broadcast.source("b", "node-1") as source:
+            assert source is None
+        broadcast.prune(["node-1"])
+        assert broadcast.seeds() == []
+
+        # A node waits while every source is busy.
+        sources = []
+
+        def wait_for_source():
+            with broadcast.source("a", "node-2") as source:
+                sources.append(source)
+
+        with broadcast.source("a", "node-3"):
+            waiter = threading.Thread(target=wait_for_source)
+            waiter.start()
+            time.sleep(0.1)
+            assert sources == []
+            broadcast.add_seed("node-1", "a")
+            waiter.join(timeout=10)
+        assert sources == ["node-1"]
+
+        # Without relaying, nodes don't become seeds.
+        broadcast = FileMountBroadcast(fanout=1)
+        broadcast.add_seed("node-0", "a")
+        assert broadcast.seeds() == []
+        with broadcast.source("a", "node-1") as source:
+            assert source is None
+
+    def testFileMountsBroadcast(self):
+        file_mount_dir = tempfile.mkdtemp()
+        with open(os.path.join(file_mount_dir, "test.txt"), "wb") as temp_file:
+            temp_file.write("hello".encode())
+
+        self.provider = MockProvider()
+        config = SMALL_CLUSTER.copy()
+        config["file_mounts"] = {"/home/test-folder": file_mount_dir}
+        config["file_mounts_broadcast_fanout"] = 1
+        config["file_mounts_broadcast_relay"] = True
+        config["min_workers"] = 3
+        config["max_workers"] = 3
+        config_path = self.write_config(config)
+        runner = MockProcessRunner()
+        runner.respond_to_call("json .Config.Env", ["[]" for i in range(3)])
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_failures=0,
+            process_runner=runner,
+            update_interval_s=0)
+
+        autoscaler.update()
+        self.waitForNodes(3)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            3, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        docker_mount_prefix = get_docker_host_mount_location(
+            config["cluster_name"])
+        target = f"{docker_mount_prefix}/home/test-folder/"
+
+        from_head = [
+            i for i in range(3)
+            if any(f"{file_mount_dir}/ ubuntu@172.0.0.{i}:{target}" in cmd
+                   for cmd in runner.command_history())
+        ]
+        relayed = [
+            i for i in range(3)
+            if any(f"-az {target} ubuntu@172.0.0.{i}:{target}" in cmd
+                   for cmd in runner.command_history())
+        ]
+        # The head node serves one node at a time, the other nodes are
+        # served by the nodes that are already up to date.
+        assert relayed
+        assert sorted(from_head + relayed) == [0, 1, 2]
+        assert sorted(autoscaler.file_mount_broadcast.seeds()) == [0, 1, 2]
+        for i in range(3):
+            runner.assert_has_call(f"172.0.0.{i}",
+                                   ".ray_file_mounts_contents.json")
+            # Relaying nodes got the cluster SSH key.
+            runner.assert_has_call(f"172.0.0.{i}", "chmod 600")
+
+        # Mounts with unchanged contents are skipped.
+        self.provider = MockProvider()
+        _clear_provider_cache()
+        runner = MockProcessRunner()
+        runner.respond_to_call("json .Config.Env", ["[]" for i in range(3)])
+        runner.respond_to_call("cat ~/.ray_file_mounts_contents.json", [
+            json.dumps({
+                "/home/test-folder": hash_file_mount_contents(file_mount_dir)
+            }) for i in range(3)
+        ])
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_failures=0,
+            process_runner=runner,
+            update_interval_s=0)
+        autoscaler.update()
+        self.waitForNodes(3)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            3, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        for i in range(3):
+            runner.assert_has_call(f"172.0.0.{i}", "setup_cmd")
+            runner.assert_not_has_call(f"172.0.0.{i}", target)
+
+    def testFileMountsBroadcastWithoutRelay(self):
+        file_mount_dir = tempfile.mkdtemp()
+        with open(os.path.join(file_mount_dir, "test.txt"), "wb") as temp_file:
+            temp_file.write("hello".encode())
+
+        self.provider = MockProvider()
+        config = SMALL_CLUSTER.copy()
+        config["file_mounts"] = {"/home/test-folder": file_mount_dir}
+        config["file_mounts_broadcast_fanout"] = 1
+        config["min_workers"] = 3
+        config["max_workers"] = 3
+        config_path = self.write_config(config)
+        runner = MockProcessRunner()
+        runner.respond_to_call("json .Config.Env", ["[]" for i in range(3)])
+        autoscaler = StandardAutoscaler(
+            config_path,
+            LoadMetrics(),
+            max_failures=0,
+            process_runner=runner,
+            update_interval_s=0)
+        autoscaler.update()
+        self.waitForNodes(3)
+        self.provider.finish_starting_nodes()
+        autoscaler.update()
+        self.waitForNodes(
+            3, tag_filters={TAG_RAY_NODE_STATUS: STATUS_UP_TO_DATE})
+        docker_mount_prefix = get_docker_host_mount_location(
+            config["cluster_name"])
+        target = f"{docker_mount_prefix}/home/test-folder/"
+        # The head node sends the file mounts to every node and the SSH key
+        # stays on the head node.
+        for i in range(3):
+            runner.assert_has_call(
+                f"172.0.0.{i}",
+                f"{file_mount_dir}/ ubuntu@172.0.0.{i}:{target}")
+            runner.assert_not_has_call(f"172.0.0.{i}", "chmod 600")
+        assert autoscaler.file_mount_broadcast.seeds() == []
+
     def testAutodetectResources(self):
         self.provider = MockProvider()
         config = SMALL_CLUSTER.copy()
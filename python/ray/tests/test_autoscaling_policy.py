@@ -1,12 +1,15 @@
 import collections
+import contextlib
 import copy
 import logging
 import yaml
 import tempfile
-from typing import Dict, Callable, List
+import threading
+from typing import Dict, Callable, List, Union
 import shutil
 from queue import PriorityQueue
 import unittest
+from unittest import mock
 import pytest
 
 import ray
@@ -16,6 +19,8 @@ from ray.autoscaler._private.providers import (
     _NODE_PROVIDERS,
     _clear_provider_cache,
 )
+from ray.autoscaler._private import autoscaler as autoscaler_module
+from ray.autoscaler._private import load_metrics as load_metrics_module
 from ray.autoscaler._private.autoscaler import StandardAutoscaler
 from ray.autoscaler._private.load_metrics import LoadMetrics
 from ray.autoscaler._private.node_launcher import NodeLauncher
@@ -39,6 +44,7 @@ class Task:
         self.resources = resources
         self.start_callback = start_callback
         self.done_callback = done_callback
+        self.submit_time = None
         self.start_time = None
         self.end_time = None
         self.node = None
@@ -62,6 +68,7 @@ class PlacementGroup:
         self.strategy = strategy
         self.start_callback = start_callback
         self.done_callback = done_callback
+        self.submit_time = None
         self.start_time = None
         self.end_time = None
         self.node = None
@@ -101,6 +108,55 @@ class Node:
             self.available_resources[resource] += quantity
         assert self.feasible(self.available_resources)
 
+    def idle(self):
+        return self.in_cluster and \
+            self.available_resources == self.total_resources
+
+
+# NodeProvider methods whose calls are counted by SimulatedProvider.
+PROVIDER_API_METHODS = [
+    "non_terminated_nodes", "non_terminated_node_ips", "is_running",
+    "is_terminated", "node_tags", "internal_ip", "external_ip", "create_node",
+    "set_node_tags", "terminate_node", "terminate_nodes"
+]
+
+
+class SimulatedProvider(MockProvider):
+    """In-memory node provider that counts calls to the NodeProvider API.
+
+    Nodes are created instantly; the simulator decides when they join the
+    cluster. The counts in `api_calls` stand in for cloud API requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.api_calls = collections.Counter()
+        self._api_calls_lock = threading.Lock()
+
+    def count_call(self, method):
+        with self._api_calls_lock:
+            self.api_calls[method] += 1
+
+    def terminate_nodes(self, node_ids):
+        # Count a batch termination as a single call, like cloud providers
+        # that implement it with one request.
+        self.count_call("terminate_nodes")
+        for node_id in node_ids:
+            MockProvider.terminate_node(self, node_id)
+
+
+def _counted(method):
+    def wrapper(self, *args, **kwargs):
+        self.count_call(method)
+        return getattr(super(SimulatedProvider, self), method)(*args, **kwargs)
+
+    return wrapper
+
+
+for _method in PROVIDER_API_METHODS:
+    if _method != "terminate_nodes":
+        setattr(SimulatedProvider, _method, _counted(_method))
+
 
 class Event:
     def __init__(self, time, event_type, data=None):
@@ -120,6 +176,7 @@ SIMULATOR_EVENT_AUTOSCALER_UPDATE = 0
 SIMULATOR_EVENT_TASK_DONE = 1
 SIMULATOR_EVENT_NODE_JOINED = 2
 SIMULATOR_EVENT_PG_DONE = 3
+SIMULATOR_EVENT_WORK_SUBMITTED = 4
 
 
 class Simulator:
@@ -142,10 +199,16 @@ class Simulator:
           dispatches work to the appropriate event handlers.
 
     There are 3 main ways of interacting with the simulator:
-        * simulator.submit: To submit tasks
+        * simulator.submit: To submit tasks, now or at a later virtual time
+          (simulator.load_trace replays a recorded or synthetic trace).
         * simulator.step: To go to the next "event"
         * task/actor/placement group start/done callbacks
 
+    The autoscaler and load metrics read the virtual time, so idle timeouts
+    and heartbeat timeouts behave as they would in a real cluster, and runs
+    are repeatable. simulator.stats reports the time to capacity, idle
+    node-hours, autoscaler updates and provider API calls of the run.
+
     """
 
     def __init__(
@@ -153,7 +216,7 @@ class Simulator:
             config_path,
             provider,
             autoscaler_update_interval_s=AUTOSCALER_UPDATE_INTERVAL_S,
-            node_startup_delay_s=120,
+            node_startup_delay_s: Union[float, Dict[str, float]] = 120,
     ):
         self.config_path = config_path
         self.provider = provider
@@ -175,7 +238,8 @@ class Simulator:
             },
             1,
         )
-        self.head_ip = self.provider.non_terminated_node_ips({})[0]
+        self.head_ip = MockProvider.non_terminated_node_ips(self.provider,
+                                                            {})[0]
 
         self.load_metrics = LoadMetrics(local_ip=self.head_ip)
         self.autoscaler = StandardAutoscaler(
@@ -208,13 +272,39 @@ class Simulator:
         self.event_queue = PriorityQueue()
         self.event_queue.put(Event(0, SIMULATOR_EVENT_AUTOSCALER_UPDATE))
 
+        self.num_autoscaler_updates = 0
+        self.wait_times = []
+        self.node_seconds = 0
+        self.idle_node_seconds = 0
+        # Only count the calls made by the autoscaler from here on.
+        if isinstance(self.provider, SimulatedProvider):
+            self.provider.api_calls.clear()
+
+    @contextlib.contextmanager
+    def _virtual_time(self):
+        """Makes the autoscaler and load metrics read the virtual time."""
+        clock = mock.Mock()
+        clock.time.side_effect = lambda: self.virtual_time
+        with mock.patch.object(autoscaler_module, "time", clock), \
+                mock.patch.object(load_metrics_module, "time", clock):
+            yield
+
+    def _node_startup_delay(self, node_type):
+        if isinstance(self.node_startup_delay_s, dict):
+            return self.node_startup_delay_s[node_type]
+        return self.node_startup_delay_s
+
     def _update_cluster_state(self, join_immediately=False):
-        nodes = self.provider.non_terminated_nodes(tag_filters={})
+        # Read the provider state directly, so that only the calls made by
+        # the autoscaler are counted.
+        nodes = MockProvider.non_terminated_nodes(self.provider, {})
+        ips = set()
         for node_id in nodes:
-            ip = self.provider.internal_ip(node_id)
+            ip = MockProvider.internal_ip(self.provider, node_id)
+            ips.add(ip)
             if ip in self.ip_to_nodes:
                 continue
-            node_tags = self.provider.node_tags(node_id)
+            node_tags = MockProvider.node_tags(self.provider, node_id)
             if TAG_RAY_USER_NODE_TYPE in node_tags:
                 node_type = node_tags[TAG_RAY_USER_NODE_TYPE]
                 resources = self.config["available_node_types"][node_type].get(
@@ -223,15 +313,53 @@ class Simulator:
                             self.virtual_time)
                 self.ip_to_nodes[ip] = node
                 if not join_immediately:
-                    join_time = self.virtual_time + self.node_startup_delay_s
+                    join_time = (self.virtual_time +
+                                 self._node_startup_delay(node_type))
                     self.event_queue.put(
                         Event(join_time, SIMULATOR_EVENT_NODE_JOINED, node))
-
-    def submit(self, work):
-        if isinstance(work, list):
-            self.work_queue.extend(work)
-        else:
-            self.work_queue.append(work)
+        # Forget the nodes terminated by the autoscaler.
+        for ip in list(self.ip_to_nodes):
+            if ip not in ips:
+                del self.ip_to_nodes[ip]
+
+    def submit(self, work, submit_time=None):
+        """Submits work now, or at `submit_time` if it is in the future."""
+        if not isinstance(work, list):
+            work = [work]
+        if submit_time is not None and submit_time > self.virtual_time:
+            for item in work:
+                self.event_queue.put(
+                    Event(submit_time, SIMULATOR_EVENT_WORK_SUBMITTED, item))
+            return
+        for item in work:
+            item.submit_time = self.virtual_time
+        self.work_queue.extend(work)
+
+    def load_trace(self, trace):
+        """Replays a workload trace.
+
+        Args:
+            trace: List of dicts, each with the virtual submission "time",
+                the "duration" and "resources" of the work, and optionally
+                the "count" of identical items and their "type" ("task" or
+                "actor"). Actors run forever if "duration" is None.
+
+        Returns:
+            The submitted Task and Actor objects.
+        """
+        submitted = []
+        for record in trace:
+            cls = Actor if record.get("type") == "actor" else Task
+            duration = record.get("duration")
+            if duration is None:
+                duration = float("inf")
+            work = [
+                cls(duration=duration, resources=dict(record["resources"]))
+                for _ in range(record.get("count", 1))
+            ]
+            self.submit(work, submit_time=record["time"])
+            submitted.extend(work)
+        return submitted
 
     def _get_node_to_run(self, bundle, nodes):
         for ip, node in nodes.items():
@@ -269,6 +397,7 @@ class Simulator:
             node = self.ip_to_nodes[ip]
             node.allocate(bundle)
         pg.start_time = self.virtual_time
+        self.wait_times.append(self.virtual_time - pg.submit_time)
         end_time = self.virtual_time + pg.duration
         self.event_queue.put(
             Event(end_time, SIMULATOR_EVENT_PG_DONE, (pg, to_allocate)))
@@ -284,6 +413,7 @@ class Simulator:
         node.allocate(task.resources)
         task.node = node
         task.start_time = self.virtual_time
+        self.wait_times.append(self.virtual_time - task.submit_time)
         end_time = self.virtual_time + task.duration
         self.event_queue.put(Event(end_time, SIMULATOR_EVENT_TASK_DONE, task))
         if task.start_callback:
@@ -348,20 +478,28 @@ class Simulator:
                         ],
                     ))
 
-        for ip, node in self.ip_to_nodes.items():
-            if not node.in_cluster:
-                continue
-            self.load_metrics.update(
-                ip=ip,
-                static_resources=node.total_resources,
-                dynamic_resources=node.available_resources,
-                resource_load={},
-                waiting_bundles=waiting_bundles,
-                infeasible_bundles=infeasible_bundles,
-                pending_placement_groups=placement_groups,
-            )
-
-        self.autoscaler.update()
+        with self._virtual_time():
+            for ip, node in self.ip_to_nodes.items():
+                if not node.in_cluster:
+                    continue
+                self.load_metrics.update(
+                    ip=ip,
+                    static_resources=node.total_resources,
+                    dynamic_resources=node.available_resources,
+                    resource_load={},
+                    waiting_bundles=waiting_bundles,
+                    infeasible_bundles=infeasible_bundles,
+                    pending_placement_groups=placement_groups,
+                )
+
+            self.autoscaler.update()
+        self.num_autoscaler_updates += 1
+        # Wait for the node updaters, so that nodes are set up before the
+        # next update. How often an updater polls the provider while it
+        # waits for a node depends on wall clock time, so the number of
+        # their provider calls is not deterministic.
+        for updater in list(self.autoscaler.updaters.values()):
+            updater.join()
         self._launch_nodes()
         self._update_cluster_state()
 
@@ -385,11 +523,20 @@ class Simulator:
                 self.ip_to_nodes[ip].free(bundle)
             if pg.done_callback:
                 pg.done_callback()
+        elif event.event_type == SIMULATOR_EVENT_WORK_SUBMITTED:
+            self.submit(event.data)
         else:
             assert False, "Unknown event!"
 
     def step(self):
-        self.virtual_time = self.event_queue.queue[0].time
+        next_time = self.event_queue.queue[0].time
+        for ip, node in self.ip_to_nodes.items():
+            if ip == self.head_ip or not node.in_cluster:
+                continue
+            self.node_seconds += next_time - self.virtual_time
+            if node.idle():
+                self.idle_node_seconds += next_time - self.virtual_time
+        self.virtual_time = next_time
         while self.event_queue.queue[0].time == self.virtual_time:
             event = self.event_queue.get()
             self.process_event(event)
@@ -411,6 +558,26 @@ class Simulator:
             costs[node.node_type] += runtime
         return costs
 
+    def stats(self):
+        """Returns the performance of the autoscaler in this simulation.
+
+        The time to capacity is the longest time any work waited between its
+        submission and its start. Node-hours only count worker nodes that
+        joined the cluster.
+        """
+        api_calls = None
+        if isinstance(self.provider, SimulatedProvider):
+            api_calls = sum(self.provider.api_calls.values())
+        return {
+            "time_to_capacity": max(self.wait_times, default=0),
+            "mean_wait_time": (sum(self.wait_times) / len(self.wait_times)
+                               if self.wait_times else 0),
+            "node_hours": self.node_seconds / 3600,
+            "idle_node_hours": self.idle_node_seconds / 3600,
+            "autoscaler_updates": self.num_autoscaler_updates,
+            "provider_api_calls": api_calls,
+        }
+
     def info_string(self):
         num_connected_nodes = len(
             [node for node in self.ip_to_nodes.values() if node.in_cluster])
@@ -584,6 +751,68 @@ class AutoscalingPolicyTest(unittest.TestCase):
 
         assert time < 630
 
+    def testTraceReplay(self):
+        config = copy.deepcopy(SAMPLE_CLUSTER_CONFIG)
+        config["idle_timeout_minutes"] = 1
+        config_path = self.write_config(config)
+        self.provider = SimulatedProvider()
+        startup_delays = {
+            node_type: 60
+            for node_type in config["available_node_types"]
+        }
+        simulator = Simulator(
+            config_path, self.provider, node_startup_delay_s=startup_delays)
+
+        trace = [{
+            "time": 0,
+            "duration": 100,
+            "resources": {
+                "CPU": 1
+            },
+            "count": 100,
+        }, {
+            "time": 3000,
+            "duration": 100,
+            "resources": {
+                "CPU": 1
+            },
+            "count": 100,
+        }]
+        tasks = simulator.load_trace(trace)
+
+        while simulator.step() < 2900:
+            pass
+        assert all(task.start_time is not None for task in tasks[:100])
+        assert not any(task.start_time is not None for task in tasks[100:])
+        # The idle workers were terminated, only the head node is left.
+        assert list(simulator.ip_to_nodes) == [simulator.head_ip]
+
+        while simulator.step() < 3500:
+            pass
+        assert all(task.start_time is not None for task in tasks)
+
+        stats = simulator.stats()
+        # Both bursts had to wait for nodes to boot.
+        assert stats["time_to_capacity"] >= 60
+        assert 0 < stats["idle_node_hours"] < stats["node_hours"]
+        assert stats["autoscaler_updates"] >= 3500 / \
+            AUTOSCALER_UPDATE_INTERVAL_S
+        assert stats["provider_api_calls"] > 0
+
+        # Replaying the same trace gives the same results. Provider calls
+        # include the polling of node updaters, which isn't deterministic.
+        stats.pop("provider_api_calls")
+        self.provider = SimulatedProvider()
+        _clear_provider_cache()
+        simulator = Simulator(
+            config_path, self.provider, node_startup_delay_s=startup_delays)
+        simulator.load_trace(trace)
+        while simulator.step() < 3500:
+            pass
+        replayed_stats = simulator.stats()
+        replayed_stats.pop("provider_api_calls")
+        assert replayed_stats == stats
+
 
 if __name__ == "__main__":
     import sys
@@ -1,9 +1,16 @@
+import asyncio
+import time
+import numpy as np
 import pytest
 from contextlib import contextmanager
 
+import ray.core.generated.ray_client_pb2 as ray_client_pb2
 import ray.experimental.client.server.server as ray_client_server
 from ray.experimental.client import ray
+from ray.experimental.client.common import ClientActorHandle
+from ray.experimental.client.common import ClientActorRef
 from ray.experimental.client.common import ClientObjectRef
+from ray.experimental.client.worker import Worker
 
 
 @contextmanager
@@ -61,6 +68,25 @@ def test_put_get(ray_start_regular_shared):
         assert retval == "hello world"
 
 
+def test_put_get_batched_and_large(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+        refs = ray.put(["a", 1, None])
+        assert ray.get(refs) == ["a", 1, None]
+
+        # Larger than the default gRPC message size limit.
+        arr = np.arange(3 * 1024 * 1024)
+        ref = ray.put(arr)
+        assert np.array_equal(ray.get(ref), arr)
+        assert [np.array_equal(a, arr)
+                for a in ray.get([ref, ref])] == [True, True]
+
+        @ray.remote
+        def double(x):
+            return x * 2
+
+        assert np.array_equal(ray.get(double.remote(ref)), arr * 2)
+
+
 def test_wait(ray_start_regular_shared):
     with ray_start_client_server() as ray:
         objectref = ray.put("hello world")
@@ -170,6 +196,170 @@ def test_basic_actor(ray_start_regular_shared):
         assert count == 2
 
 
+def test_call_remote_batch(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+
+        @ray.remote
+        def plus2(x):
+            return x + 2
+
+        refs = ray.call_remote_batch(
+            [(plus2, ray_client_pb2.ClientTask.FUNCTION, (i, ), {})
+             for i in range(10)])
+        assert ray.get(refs) == [i + 2 for i in range(10)]
+
+
+def test_pipelined_tasks(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+
+        @ray.remote
+        def plus2(x):
+            return x + 2
+
+        @ray.remote
+        class Counter:
+            def __init__(self):
+                self.count = 0
+
+            def incr(self, x):
+                self.count += x
+                return self.count
+
+        # The tasks are scheduled in the order they were submitted, so they
+        # can depend on the results of each other.
+        refs = [plus2.remote(0)]
+        for _ in range(100):
+            refs.append(plus2.remote(refs[-1]))
+        counter = Counter.remote()
+        counts = [counter.incr.remote(ref) for ref in refs[:3]]
+        assert ray.get(refs[-1]) == 202
+        assert ray.get(counts) == [2, 6, 12]
+
+        async def get_async():
+            return await asyncio.gather(*refs[:3])
+
+        assert asyncio.get_event_loop().run_until_complete(
+            get_async()) == [2, 4, 6]
+
+        # Scheduling errors are raised when fetching the result.
+        unknown_actor = ClientActorHandle(ClientActorRef(b"unknown"), Counter)
+        ref = unknown_actor.incr.remote(1)
+        with pytest.raises(Exception, match="failed to schedule"):
+            ray.get(ref)
+
+
+def test_release_objects(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+        refs = ray.put(list(range(10)))
+        ref = ray.put(np.zeros(1024 * 1024, dtype=np.uint8))
+        stats = ray.session_stats()
+        assert stats["num_objects"] == 11
+        assert stats["object_bytes"] > 1024 * 1024
+
+        # A ref is released once all refs to its object are collected.
+        refs_copy = list(refs)
+        del refs, ref
+        assert ray.session_stats()["num_objects"] == 10
+        ready, _ = ray.wait(refs_copy[:1])
+        del refs_copy
+        assert ray.session_stats()["num_objects"] == 1
+        del ready
+        assert ray.session_stats()["num_objects"] == 0
+
+        @ray.remote
+        class Actor:
+            def ping(self):
+                return "pong"
+
+        actor = Actor.remote()
+        assert ray.get(actor.ping.remote()) == "pong"
+        assert ray.session_stats()["num_actors"] == 1
+        del actor
+        assert ray.session_stats() == {
+            "num_objects": 0,
+            "num_actors": 0,
+            "object_bytes": 0,
+        }
+
+
+def test_release_argument_of_pipelined_tasks(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+
+        @ray.remote
+        def plus2(x):
+            return x + 2
+
+        x = plus2.remote(0)
+        # Let the release interval pass, so the next call releases x.
+        time.sleep(1.1)
+        refs = [plus2.remote(x) for _ in range(1000)]
+        del x
+        # Releasing x must not overtake the queued tasks taking it.
+        refs += ray.call_remote_batch(
+            [(plus2, ray_client_pb2.ClientTask.FUNCTION, (refs[0], ), {})])
+        assert ray.get(refs) == [4] * 1000 + [6]
+        del refs
+        assert ray.session_stats()["num_objects"] == 0
+
+
+def test_more_clients_than_server_threads(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+
+        @ray.remote
+        def plus2(x):
+            return x + 2
+
+        # Each client opens a task stream, which holds a server thread while
+        # it is open. The server has 10 threads.
+        workers = [Worker("localhost:50051") for _ in range(12)]
+        try:
+            refs = [
+                worker.call_remote(plus2, ray_client_pb2.ClientTask.FUNCTION,
+                                   i) for i, worker in enumerate(workers)
+            ]
+            # Idle streams are closed, which frees the threads for the gets.
+            assert [worker.get(ref) for worker, ref in zip(workers, refs)] == [
+                i + 2 for i in range(12)
+            ]
+            # The next task reopens the stream.
+            ref = workers[0].call_remote(plus2,
+                                         ray_client_pb2.ClientTask.FUNCTION, 5)
+            assert workers[0].get(ref) == 7
+        finally:
+            for worker in workers:
+                worker.close()
+
+
+def test_payload_registered_once(ray_start_regular_shared):
+    with ray_start_client_server() as ray:
+        server = ray.worker.server
+        register_payload = server.RegisterPayload
+        registered = []
+
+        def count_register_payload(req, metadata=None):
+            registered.append(req.id)
+            return register_payload(req, metadata=metadata)
+
+        server.RegisterPayload = count_register_payload
+
+        for i in range(3):
+            # Each iteration creates a new stub of the same function.
+            @ray.remote
+            def plus2(x):
+                return x + 2
+
+            assert ray.get([plus2.remote(i) for _ in range(5)]) == [i + 2] * 5
+
+        @ray.remote
+        class Counter:
+            def get(self):
+                return 1
+
+        actors = [Counter.remote() for _ in range(3)]
+        assert ray.get([a.get.remote() for a in actors]) == [1] * 3
+        assert len(registered) == len(set(registered)) == 2
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", __file__]))
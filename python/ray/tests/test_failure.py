@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import signal
@@ -15,6 +14,7 @@ import ray
 import ray.utils
 import ray.ray_constants as ray_constants
 from ray.exceptions import RayTaskError
+from ray.ray_logging import decode_log_batch
 from ray.cluster_utils import Cluster
 from ray.test_utils import (
     wait_for_condition,
@@ -1285,8 +1285,8 @@ def test_gcs_server_failiure_report(ray_start_regular, log_pubsub):
             time.sleep(0.01)
             cnt += 1
             continue
-        data = json.loads(ray.utils.decode(msg["data"]))
-        assert data["pid"] == "gcs_server"
+        for data in decode_log_batch(msg["data"]):
+            assert data["pid"] == "gcs_server"
 
 
 @pytest.mark.parametrize(
@@ -0,0 +1,113 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+import ray.log_monitor
+from ray.log_monitor import InotifyWatcher, LogMonitor
+from ray.ray_logging import decode_log_batch, encode_log_batch
+
+
+def make_log_monitor(logs_dir, **kwargs):
+    with mock.patch("ray._private.services.create_redis_client"), \
+            mock.patch("ray._private.services.get_node_ip_address",
+                       return_value="1.2.3.4"):
+        return LogMonitor(logs_dir, "", **kwargs)
+
+
+def published_records(log_monitor):
+    records = []
+    for call in log_monitor.redis_client.publish.call_args_list:
+        _, data = call[0]
+        records.extend(decode_log_batch(data))
+    return records
+
+
+def write_log(logs_dir, name, data):
+    with open(os.path.join(logs_dir, name), "ab") as f:
+        f.write(data)
+
+
+def test_log_batch_encoding():
+    records = [{"ip": "1.2.3.4", "pid": 1, "lines": ["a", "b"]}]
+    assert decode_log_batch(encode_log_batch(records)) == records
+    assert decode_log_batch(encode_log_batch(records, compress=True)) == \
+        records
+    # Messages of a single record are still understood.
+    assert decode_log_batch('{"pid": 1}') == [{"pid": 1}]
+
+
+@pytest.mark.parametrize("use_inotify", [False, True])
+def test_log_monitor_batches_files(tmp_path, use_inotify):
+    logs_dir = str(tmp_path)
+    job_id = "01000000"
+    write_log(logs_dir, f"worker-{'a' * 40}-{job_id}-1.out", b"x\ny\n")
+    write_log(logs_dir, f"worker-{'b' * 40}-{job_id}-2.err", b"z\n")
+    log_monitor = make_log_monitor(
+        logs_dir, compress=True, use_inotify=use_inotify)
+    log_monitor.update_log_filenames()
+    log_monitor.open_closed_files()
+    assert log_monitor.check_log_files_and_publish_updates()
+    # Both files are published in one message.
+    assert log_monitor.redis_client.publish.call_count == 1
+    records = sorted(published_records(log_monitor), key=lambda r: r["pid"])
+    assert [(r["pid"], r["is_err"], r["lines"])
+            for r in records] == [("1", False, ["x", "y"]), ("2", True, ["z"])]
+    assert all(r["ip"] == "1.2.3.4" and r["job"] == job_id for r in records)
+
+    log_monitor.redis_client.publish.reset_mock()
+    log_monitor.wait_for_changes(True)
+    log_monitor.open_closed_files()
+    assert not log_monitor.check_log_files_and_publish_updates()
+
+    write_log(logs_dir, f"worker-{'a' * 40}-{job_id}-1.out", b"more\n")
+    log_monitor.wait_for_changes(False)
+    log_monitor.open_closed_files()
+    assert log_monitor.check_log_files_and_publish_updates()
+    assert [r["lines"] for r in published_records(log_monitor)] == [["more"]]
+
+
+def test_log_monitor_chunks_and_rate_limit(tmp_path, monkeypatch):
+    logs_dir = str(tmp_path)
+    monkeypatch.setattr(ray.ray_constants, "LOG_MONITOR_READ_CHUNK_BYTES", 16)
+    lines = [f"line{i}" for i in range(10)]
+    write_log(logs_dir, f"worker-{'a' * 40}-01000000-1.out",
+              "".join(f"{line}\n" for line in lines).encode())
+    log_monitor = make_log_monitor(
+        logs_dir, max_bytes_per_s=10, use_inotify=False)
+    log_monitor.update_log_filenames()
+    log_monitor.open_closed_files()
+
+    now = [0]
+    monkeypatch.setattr(ray.log_monitor.time, "monotonic", lambda: now[0])
+    log_monitor.byte_budget_time = 0
+    published = []
+    for _ in range(10):
+        log_monitor.check_log_files_and_publish_updates()
+        passed = [
+            line for r in published_records(log_monitor) for line in r["lines"]
+        ]
+        # Full lines only, and no more bytes than the rate limit allows.
+        assert sum(len(line) + 1 for line in passed) <= 10 * (now[0] + 1)
+        published = passed
+        now[0] += 1
+    assert published == lines
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux only.")
+def test_inotify_watcher(tmp_path):
+    watcher = InotifyWatcher.create(str(tmp_path))
+    assert watcher is not None
+    assert watcher.wait(0) == (set(), set(), False)
+    write_log(str(tmp_path), "worker.out", b"x\n")
+    changed, created, overflow = watcher.wait(1)
+    assert changed == {"worker.out"}
+    assert created == {"worker.out"}
+    assert not overflow
+    watcher.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-v", __file__]))
@@ -1,6 +1,7 @@
 import json
 import pathlib
 import platform
+import socket
 from pprint import pformat
 from unittest.mock import MagicMock
 
@@ -10,7 +11,8 @@ from prometheus_client.parser import text_string_to_metric_families
 
 import ray
 from ray.ray_constants import PROMETHEUS_SERVICE_DISCOVERY_FILE
-from ray.metrics_agent import PrometheusServiceDiscoveryWriter
+from ray.core.generated.metrics_pb2 import Metric
+from ray.metrics_agent import MetricsAgent, PrometheusServiceDiscoveryWriter
 from ray.util.metrics import Count, Histogram, Gauge
 from ray.test_utils import wait_for_condition, SignalActor
 
@@ -201,6 +203,84 @@ def test_metrics_export_end_to_end(_setup_cluster_for_test):
         test_cases()  # Should fail assert
 
 
+def _make_metric(name, values):
+    metric = Metric()
+    metric.metric_descriptor.name = name
+    metric.metric_descriptor.label_keys.add().key = "a"
+    for tag, value in values.items():
+        series = metric.timeseries.add()
+        series.label_values.add().value = tag
+        series.points.add().int64_value = value
+    return metric
+
+
+def test_metrics_agent_records_changed_series():
+    with socket.socket() as s:
+        s.bind(("", 0))
+        port = s.getsockname()[1]
+    agent = MetricsAgent(port, export_interval_s=3600)
+    try:
+        _check_metrics_agent_records_changed_series(agent)
+    finally:
+        agent.stop()
+    assert not agent._export_thread.is_alive()
+
+
+def _check_metrics_agent_records_changed_series(agent):
+    agent.record_metric_points_from_protobuf(
+        [_make_metric("agent_test_count", {
+            "x": 1,
+            "y": 2
+        })])
+    view_data = agent._view_data["agent_test_count"]
+    aggregation_data_map = view_data.tag_value_aggregation_data_map
+    assert aggregation_data_map[("x", )].count_data == 1
+    assert aggregation_data_map[("y", )].count_data == 2
+    assert list(agent._views_to_export) == ["agent_test_count"]
+    agent.flush()
+    assert agent._views_to_export == {}
+
+    # Unchanged series keep their aggregation data, changed ones are updated.
+    x_data = aggregation_data_map[("x", )]
+    agent.record_metric_points_from_protobuf(
+        [_make_metric("agent_test_count", {
+            "x": 1,
+            "y": 3
+        })])
+    assert aggregation_data_map[("x", )] is x_data
+    assert aggregation_data_map[("y", )].count_data == 3
+    # The exporter already holds the view data.
+    assert agent._views_to_export == {}
+
+    # A new series is handed to the exporter with its view.
+    agent.record_metric_points_from_protobuf(
+        [_make_metric("agent_test_count", {"z": 4})])
+    assert agent._views_to_export == {"agent_test_count": view_data}
+    assert agent._view_data["agent_test_count"] is view_data
+
+    # Series not reported for two rotations are forgotten, and no longer
+    # exported.
+    agent.expire_series()
+    agent.record_metric_points_from_protobuf(
+        [_make_metric("agent_test_count", {"x": 1})])
+    assert aggregation_data_map[("x", )] is x_data
+    agent.expire_series()
+    assert set(agent._last_values) | set(agent._previous_values) == {
+        ("agent_test_count", ("x", ))
+    }
+    assert list(aggregation_data_map) == [("x", )]
+    agent.expire_series()
+    assert agent._last_values == {}
+    assert agent._previous_values == {}
+    assert aggregation_data_map == {}
+
+    # An expired series is exported again when it is reported again.
+    agent.record_metric_points_from_protobuf(
+        [_make_metric("agent_test_count", {"y": 5})])
+    assert aggregation_data_map[("y", )].count_data == 5
+    assert agent._views_to_export == {"agent_test_count": view_data}
+
+
 @pytest.fixture
 def metric_mock():
     mock = MagicMock()
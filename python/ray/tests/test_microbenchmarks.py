@@ -103,6 +103,30 @@ def test_cache(ray_start_regular):
               "d = {}, b = {}".format(d, b))
 
 
+def test_compare_microbenchmark_results():
+    from ray.ray_perf import compare_results
+
+    def result(name, per_second, std):
+        return {"name": name, "per_second": per_second, "std": std}
+
+    baseline = [
+        result("fast", 1000, 10),
+        result("noisy", 1000, 300),
+        result("slow", 1000, 10),
+        result("removed", 1000, 10),
+    ]
+    current = [
+        result("fast", 1200, 10),
+        result("noisy", 700, 300),
+        result("slow", 800, 10),
+        result("added", 1000, 10),
+    ]
+    comparison = compare_results(baseline, current, threshold=0.1)
+    assert [(name, regressed) for name, _, _, _, regressed in comparison
+            ] == [("fast", False), ("noisy", False), ("slow", True)]
+    assert comparison[2][3] == pytest.approx(-0.2)
+
+
 if __name__ == "__main__":
     import pytest
     import sys
@@ -16,6 +16,7 @@ from ray.autoscaler._private.providers import (_NODE_PROVIDERS,
 from ray.autoscaler._private.autoscaler import StandardAutoscaler
 from ray.autoscaler._private.load_metrics import LoadMetrics
 from ray.autoscaler._private.commands import get_or_create_head_node
+from ray.autoscaler._private.demand_forecaster import DemandForecaster
 from ray.autoscaler._private.resource_demand_scheduler import \
     _utilization_score, _add_min_workers_nodes, \
     get_bin_pack_residual, get_nodes_for, ResourceDemandScheduler
@@ -142,6 +143,38 @@ def test_bin_pack():
         }])
 
 
+def test_bin_pack_aggregated_demands():
+    nodes = [{"CPU": 4}, {"CPU": 2, "GPU": 1}, {"CPU": 8}]
+    demands = [{"CPU": 1}] * 10 + [{"GPU": 1}] * 2 + [{"CPU": 1}] * 5
+    assert get_bin_pack_residual(nodes, demands) == ([{
+        "GPU": 1
+    }, {
+        "CPU": 1
+    }], [{
+        "CPU": 0
+    }, {
+        "CPU": 0,
+        "GPU": 0
+    }, {
+        "CPU": 0
+    }])
+    assert get_bin_pack_residual(
+        nodes, [{
+            "CPU": 2
+        }] * 4, strict_spread=True) == ([{
+            "CPU": 2
+        }], [{
+            "CPU": 2
+        }, {
+            "CPU": 0,
+            "GPU": 1
+        }, {
+            "CPU": 6
+        }])
+    assert get_bin_pack_residual([{"CPU": 1}], [{"CPU": 0.1}] * 10)[0] == []
+    assert get_bin_pack_residual([{"CPU": 2}], [{}] * 3)[0] == []
+
+
 def test_get_nodes_packing_heuristic():
     assert get_nodes_for(TYPES_A, {}, 9999, [{"GPU": 8}]) == \
         {"p2.8xlarge": 1}
@@ -819,6 +852,63 @@ def test_get_nodes_to_launch_max_launch_concurrency():
     assert to_launch == {"p2.8xlarge": 6}
 
 
+def test_demand_forecaster():
+    gpu = (("GPU", 1), )
+    history = [(0, {gpu: 2}), (10, {gpu: 4}), (20, {gpu: 6})]
+    # The demand grows by 0.2 per second, 20 more in 100 seconds.
+    trend = DemandForecaster(horizon_s=100, alpha=1, beta=1)
+    assert trend.forecast(history) == [{"GPU": 1}] * 20
+    assert trend.forecast([]) == []
+    # A steady demand is not forecasted to grow.
+    steady = [(0, {gpu: 4}), (10, {gpu: 4}), (20, {gpu: 4})]
+    assert trend.forecast(steady) == []
+
+    # The smoothed demand stays above a demand that just dropped.
+    ewma = DemandForecaster(policy="ewma", alpha=0.5)
+    assert ewma.forecast([(0, {gpu: 8}), (5, {})]) == [{"GPU": 1}] * 4
+    assert ewma.forecast(history) == []
+
+    with pytest.raises(ValueError):
+        DemandForecaster(policy="oracle")
+    assert DemandForecaster.from_config(None) is None
+    forecaster = DemandForecaster.from_config({
+        "policy": "ewma",
+        "max_speculative_nodes": 3
+    })
+    assert forecaster.policy == "ewma"
+    assert forecaster.max_speculative_nodes == 3
+
+
+def test_get_nodes_to_launch_speculative():
+    provider = MockProvider()
+    gpu = (("GPU", 1), )
+    history = [(0, {gpu: 2}), (10, {gpu: 4}), (20, {gpu: 6})]
+    demands = [{"GPU": 1}] * 6
+
+    scheduler = ResourceDemandScheduler(provider, TYPES_A, 10)
+    to_launch = scheduler.get_nodes_to_launch(
+        [], {}, demands, {}, [], {}, demand_history=history)
+    assert to_launch == {"p2.8xlarge": 1}
+
+    # 20 more GPUs are forecasted, 2 fit on the node launched for the current
+    # demand. The other 18 need 3 more nodes, capped to 2.
+    forecaster = DemandForecaster(
+        horizon_s=100, alpha=1, beta=1, max_speculative_nodes=2)
+    scheduler = ResourceDemandScheduler(
+        provider, TYPES_A, 10, forecaster=forecaster)
+    to_launch = scheduler.get_nodes_to_launch(
+        [], {}, demands, {}, [], {}, demand_history=history)
+    assert to_launch == {"p2.8xlarge": 3}
+
+    # The forecasted demand fits on the node launched for the current demand.
+    forecaster = DemandForecaster(horizon_s=10, alpha=1, beta=1)
+    scheduler = ResourceDemandScheduler(
+        provider, TYPES_A, 10, forecaster=forecaster)
+    to_launch = scheduler.get_nodes_to_launch(
+        [], {}, demands, {}, [], {}, demand_history=history)
+    assert to_launch == {"p2.8xlarge": 1}
+
+
 def test_rewrite_legacy_yaml_to_available_node_types():
     cluster_config = copy.deepcopy(SMALL_CLUSTER)  # Legacy cluster_config.
     cluster_config = rewrite_legacy_yaml_to_available_node_types(
@@ -978,6 +1068,28 @@ class LoadMetricsTest(unittest.TestCase):
             pending_placement_groups=pending_placement_groups)
         assert lm.get_pending_placement_groups() == pending_placement_groups
 
+    def testDemandHistory(self):
+        lm = LoadMetrics()
+        lm.update("1.1.1.1", {}, {}, {}, waiting_bundles=[{"CPU": 1}])
+        # Heartbeats within the same interval replace the last sample.
+        lm.update(
+            "1.1.1.2", {}, {}, {},
+            waiting_bundles=[{
+                "CPU": 1
+            }] * 2 + [{
+                "GPU": 1
+            }])
+        history = lm.get_demand_history()
+        assert len(history) == 1
+        assert history[0][1] == {(("CPU", 1), ): 2, (("GPU", 1), ): 1}
+
+        lm.demand_history_interval_s = 0
+        for _ in range(lm.demand_history.maxlen + 1):
+            lm.update("1.1.1.1", {}, {}, {})
+        history = lm.get_demand_history()
+        assert len(history) == lm.demand_history.maxlen
+        assert history[-1][1] == {}
+
 
 class AutoscalingTest(unittest.TestCase):
     def setUp(self):
@@ -1,6 +1,10 @@
+import hashlib
 import json
 import logging
 import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from numbers import Number
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -23,12 +27,29 @@ from ray.tune.utils.trainable import TrainableUtil
 
 logger = logging.getLogger(__name__)
 
+# Per-experiment cache files. They are kept outside of the experiment
+# directory, so that they are not synced along with the trial results.
+ANALYSIS_CACHE_DIR = os.environ.get("TUNE_ANALYSIS_CACHE_DIR",
+                                    "~/.cache/ray/tune_analysis")
+ANALYSIS_INDEX_FILE = "index.pkl"
+ANALYSIS_DATAFRAMES_FILE = "dataframes.pkl"
+ANALYSIS_CACHE_VERSION = 1
+
 
 class Analysis:
     """Analyze all results from a directory of experiments.
 
     To use this class, the experiment must be executed with the JsonLogger.
 
+    Trial results and configs are loaded in parallel and cached in
+    ``TUNE_ANALYSIS_CACHE_DIR`` (``~/.cache/ray/tune_analysis`` by default),
+    outside of the experiment directory. The cache is updated
+    incrementally: only trials whose result or param files changed since
+    the last load are parsed again. A small per-trial index holding configs
+    and metric extrema is loaded eagerly; ``trial_dataframes`` are loaded on
+    first access, so best-trial queries don't require loading all
+    dataframes.
+
     Args:
         experiment_dir (str): Directory of the experiment to load.
         default_metric (str): Default metric for comparing results. Can be
@@ -38,19 +59,27 @@ class Analysis:
         default_mode (str): Default mode for comparing results. Has to be one
             of [min, max]. Can be overwritten with the ``mode`` parameter
             in the respective functions.
+        max_workers (int): Number of threads used to load trial files.
+            Defaults to the ThreadPoolExecutor default.
+        use_cache (bool): Whether to read and write the cache files.
     """
 
     def __init__(self,
                  experiment_dir: str,
                  default_metric: Optional[str] = None,
-                 default_mode: Optional[str] = None):
+                 default_mode: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 use_cache: bool = True):
         experiment_dir = os.path.expanduser(experiment_dir)
         if not os.path.isdir(experiment_dir):
             raise ValueError(
                 "{} is not a valid directory.".format(experiment_dir))
         self._experiment_dir = experiment_dir
+        self._max_workers = max_workers
+        self._use_cache = use_cache
         self._configs = {}
-        self._trial_dataframes = {}
+        self._index = {}
+        self._trial_dataframes = None
 
         self.default_metric = default_metric
         if default_mode and default_mode not in ["min", "max"]:
@@ -67,7 +96,7 @@ class Analysis:
                 "pandas not installed. Run `pip install pandas` for "
                 "Analysis utilities.")
         else:
-            self.fetch_trial_dataframes()
+            self._refresh_index()
 
     def _validate_metric(self, metric: str) -> str:
         if not metric and not self.default_metric:
@@ -126,8 +155,8 @@ class Analysis:
         metric = self._validate_metric(metric)
         mode = self._validate_mode(mode)
 
-        rows = self._retrieve_rows(metric=metric, mode=mode)
-        if not rows:
+        best_path = self._get_best_path(metric, mode)
+        if best_path is None:
             # only nans encountered when retrieving rows
             logger.warning("Not able to retrieve the best config for {} "
                            "according to the specified metric "
@@ -135,8 +164,6 @@ class Analysis:
                                self._experiment_dir))
             return None
         all_configs = self.get_all_configs()
-        compare_op = max if mode == "max" else min
-        best_path = compare_op(rows, key=lambda k: rows[k][metric])
         return all_configs[best_path]
 
     def get_best_logdir(self,
@@ -153,33 +180,49 @@ class Analysis:
         mode = self._validate_mode(mode)
 
         assert mode in ["max", "min"]
-        df = self.dataframe(metric=metric, mode=mode)
-        mode_idx = pd.Series.idxmax if mode == "max" else pd.Series.idxmin
-        try:
-            return df.iloc[mode_idx(df[metric])].logdir
-        except KeyError:
+        best_path = self._get_best_path(metric, mode)
+        if best_path is None:
             # all dirs contains only nan values
             # for the specified metric
-            # -> df is an empty dataframe
             logger.warning("Not able to retrieve the best logdir for {} "
                            "according to the specified metric "
                            "(only nans encountered).".format(
                                self._experiment_dir))
-            return None
+        return best_path
 
     def fetch_trial_dataframes(self) -> Dict[str, DataFrame]:
+        stamps = {
+            path: _file_stamp(os.path.join(path, EXPR_PROGRESS_FILE))
+            for path in self._get_trial_paths()
+        }
+        cache = self._read_cache(ANALYSIS_DATAFRAMES_FILE)
+        dataframes = {}
+        stale = []
+        for path, stamp in stamps.items():
+            cached = cache.get(self._cache_key(path))
+            if cached is not None and cached[0] == stamp:
+                dataframes[path] = cached[1]
+            else:
+                stale.append(path)
+
         fail_count = 0
-        for path in self._get_trial_paths():
-            try:
-                self.trial_dataframes[path] = pd.read_csv(
-                    os.path.join(path, EXPR_PROGRESS_FILE))
-            except Exception:
+        for path, df in zip(stale, self._map(_read_progress, stale)):
+            if df is None:
                 fail_count += 1
+            else:
+                dataframes[path] = df
 
         if fail_count:
             logger.debug(
                 "Couldn't read results from {} paths".format(fail_count))
-        return self.trial_dataframes
+        self._trial_dataframes = dataframes
+        if stale or len(cache) != len(dataframes):
+            self._write_cache(
+                ANALYSIS_DATAFRAMES_FILE, {
+                    self._cache_key(path): (stamps[path], df)
+                    for path, df in dataframes.items()
+                })
+        return self._trial_dataframes
 
     def get_all_configs(self, prefix: bool = False) -> Dict[str, Dict]:
         """Returns a list of all configurations.
@@ -192,17 +235,18 @@ class Analysis:
             Dict[str, Dict]: Dict of all configurations of trials, indexed by
                 their trial dir.
         """
+        self._refresh_index()
         fail_count = 0
-        for path in self._get_trial_paths():
-            try:
-                with open(os.path.join(path, EXPR_PARAM_FILE)) as f:
-                    config = json.load(f)
-                    if prefix:
-                        for k in list(config):
-                            config[CONFIG_PREFIX + k] = config.pop(k)
-                    self._configs[path] = config
-            except Exception:
+        for path, entry in self._index.items():
+            config = entry["config"]
+            if config is None:
                 fail_count += 1
+                continue
+            if prefix:
+                config = {CONFIG_PREFIX + k: v for k, v in config.items()}
+            else:
+                config = config.copy()
+            self._configs[path] = config
 
         if fail_count:
             logger.warning(
@@ -292,6 +336,116 @@ class Analysis:
 
         return rows
 
+    def _get_best_path(self, metric: str, mode: str) -> Optional[str]:
+        """Finds the trial with the best value of metric from the index."""
+        index = 1 if mode == "max" else 0
+        best_path = None
+        best_value = None
+        for path, entry in self._index.items():
+            extrema = entry["extrema"].get(metric)
+            if extrema is None:
+                continue
+            value = extrema[index]
+            if (best_value is None or (mode == "max" and value > best_value)
+                    or (mode == "min" and value < best_value)):
+                best_path, best_value = path, value
+        return best_path
+
+    def _refresh_index(self):
+        """Updates the per-trial index from changed trial files."""
+        if self._index:
+            cache = {
+                self._cache_key(path): entry
+                for path, entry in self._index.items()
+            }
+        else:
+            cache = self._read_cache(ANALYSIS_INDEX_FILE)
+        index = {}
+        stale = []
+        for path in self._get_trial_paths():
+            stamp = (_file_stamp(os.path.join(path, EXPR_PROGRESS_FILE)),
+                     _file_stamp(os.path.join(path, EXPR_PARAM_FILE)))
+            cached = cache.get(self._cache_key(path))
+            if cached is not None and cached["stamp"] == stamp:
+                index[path] = cached
+            else:
+                stale.append((path, stamp))
+
+        paths = [path for path, _ in stale]
+        parsed = {}
+        for (path, stamp), (entry, df) in zip(stale,
+                                              self._map(_index_trial, paths)):
+            entry["stamp"] = stamp
+            index[path] = entry
+            if df is not None:
+                parsed[self._cache_key(path)] = (stamp[0], df)
+
+        self._index = index
+        if stale or len(cache) != len(index):
+            self._write_cache(ANALYSIS_INDEX_FILE, {
+                self._cache_key(path): entry
+                for path, entry in index.items()
+            })
+        if parsed and self._use_cache:
+            # The parsed results are cached for `fetch_trial_dataframes`,
+            # rather than kept in memory, so they are only parsed once.
+            cache = self._read_cache(ANALYSIS_DATAFRAMES_FILE)
+            cache.update(parsed)
+            self._write_cache(ANALYSIS_DATAFRAMES_FILE, cache)
+
+    def _map(self, fn, paths: List[str]) -> List[Any]:
+        if len(paths) <= 1:
+            return [fn(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return list(executor.map(fn, paths))
+
+    def _cache_key(self, path: str) -> str:
+        return os.path.relpath(path, self._experiment_dir)
+
+    def _cache_path(self, file_name: str) -> str:
+        experiment_id = hashlib.sha1(
+            os.path.realpath(self._experiment_dir).encode()).hexdigest()
+        return os.path.join(
+            os.path.expanduser(ANALYSIS_CACHE_DIR), experiment_id, file_name)
+
+    def _read_cache(self, file_name: str) -> Dict[str, Any]:
+        if not self._use_cache:
+            return {}
+        cache_path = self._cache_path(file_name)
+        try:
+            with open(cache_path, "rb") as f:
+                version, cache = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.debug("Ignoring unreadable cache file %s", cache_path)
+            return {}
+        return cache if version == ANALYSIS_CACHE_VERSION else {}
+
+    def _write_cache(self, file_name: str, cache: Dict[str, Any]):
+        if not self._use_cache:
+            return
+        cache_path = self._cache_path(file_name)
+        cache_dir = os.path.dirname(cache_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # A unique temporary file, so that concurrent writers don't
+            # interleave, then atomically replace the cache file.
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        except OSError:
+            logger.debug("Couldn't write cache file %s", cache_path)
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((ANALYSIS_CACHE_VERSION, cache), f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.debug("Couldn't write cache file %s", cache_path)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     def _get_trial_paths(self) -> List[str]:
         _trial_paths = []
         for trial_path, _, files in os.walk(self._experiment_dir):
@@ -306,9 +460,50 @@ class Analysis:
     @property
     def trial_dataframes(self) -> Dict[str, DataFrame]:
         """List of all dataframes of the trials."""
+        if self._trial_dataframes is None:
+            self.fetch_trial_dataframes()
         return self._trial_dataframes
 
 
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_progress(path: str) -> Optional[DataFrame]:
+    try:
+        return pd.read_csv(os.path.join(path, EXPR_PROGRESS_FILE))
+    except Exception:
+        return None
+
+
+def _index_trial(path: str) -> Tuple[Dict[str, Any], Optional[DataFrame]]:
+    """Reads the config and metric extrema of a trial.
+
+    For every numeric or boolean column of the trial's results, the
+    minimum and maximum values are kept, so the best trial for any metric
+    can be found without loading the trial dataframes. The parsed
+    dataframe is returned along with the index entry.
+    """
+    try:
+        with open(os.path.join(path, EXPR_PARAM_FILE)) as f:
+            config = json.load(f)
+    except Exception:
+        config = None
+
+    extrema = {}
+    df = _read_progress(path)
+    if df is not None:
+        for column in df.select_dtypes(["number", "bool"]).columns:
+            series = df[column]
+            if series.notna().any():
+                extrema[column] = (series.min(), series.max())
+    return {"config": config, "extrema": extrema}, df
+
+
 class ExperimentAnalysis(Analysis):
     """Analyze results from a Tune experiment.
 
@@ -326,6 +521,8 @@ class ExperimentAnalysis(Analysis):
         default_mode (str): Default mode for comparing results. Has to be one
             of [min, max]. Can be overwritten with the ``mode`` parameter
             in the respective functions.
+        max_workers (int): Number of threads used to load trial files.
+        use_cache (bool): Whether to read and write the cache files.
 
     Example:
         >>> tune.run(my_trainable, name="my_exp", local_dir="~/tune_results")
@@ -337,7 +534,9 @@ class ExperimentAnalysis(Analysis):
                  experiment_checkpoint_path: str,
                  trials: Optional[List[Trial]] = None,
                  default_metric: Optional[str] = None,
-                 default_mode: Optional[str] = None):
+                 default_mode: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 use_cache: bool = True):
         experiment_checkpoint_path = os.path.expanduser(
             experiment_checkpoint_path)
         if not os.path.isfile(experiment_checkpoint_path):
@@ -358,7 +557,7 @@ class ExperimentAnalysis(Analysis):
 
         super(ExperimentAnalysis, self).__init__(
             os.path.dirname(experiment_checkpoint_path), default_metric,
-            default_mode)
+            default_mode, max_workers, use_cache)
 
     @property
     def best_trial(self) -> Trial:
@@ -440,13 +440,20 @@ class FunctionRunner(Trainable):
         obj = TrainableUtil.checkpoint_to_object(checkpoint_path)
         return obj
 
+    def save_to_memory(self):
+        checkpoint = self._status_reporter.get_checkpoint()
+        if not isinstance(checkpoint, dict):
+            return self.save_to_object()
+        return TrainableUtil.checkpoint_to_memory(checkpoint, self.get_state())
+
     def load_checkpoint(self, checkpoint):
         # This should be removed once Trainables are refactored.
         if "tune_checkpoint_path" in checkpoint:
             del checkpoint["tune_checkpoint_path"]
         # If there does not exist a checkpoint, we will not restore
         # from it and will remove the marker.
-        if FuncCheckpointUtil.is_null_checkpoint(checkpoint):
+        if isinstance(checkpoint, str) and \
+                FuncCheckpointUtil.is_null_checkpoint(checkpoint):
             return
         # By informing that this checkpoint is not new,
         # we will not return the checkpoint path
@@ -454,6 +461,9 @@ class FunctionRunner(Trainable):
         self._status_reporter.set_checkpoint(checkpoint, is_new=False)
 
     def restore_from_object(self, obj):
+        if TrainableUtil.is_memory_checkpoint(obj):
+            self._restore_from_memory(obj)
+            return
         self.temp_checkpoint_dir = (FuncCheckpointUtil.mk_temp_checkpoint_dir(
             self.logdir))
         checkpoint_path = TrainableUtil.create_from_pickle(
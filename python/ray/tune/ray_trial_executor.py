@@ -18,6 +18,7 @@ from ray.tune.function_runner import FunctionRunner
 from ray.tune.logger import NoopLogger
 from ray.tune.result import TRIAL_INFO, STDOUT_FILE, STDERR_FILE
 from ray.tune.resources import Resources
+from ray.tune.resource_view import ClusterResourceView
 from ray.tune.utils.trainable import TrainableUtil
 from ray.tune.trial import Trial, Checkpoint, Location, TrialInfo
 from ray.tune.trial_executor import TrialExecutor
@@ -163,13 +164,28 @@ class RayTrialExecutor(TrialExecutor):
 
         self._avail_resources = Resources(cpu=0, gpu=0)
         self._committed_resources = Resources(cpu=0, gpu=0)
+        # Resource dicts of the trial actors currently holding resources,
+        # used to check whether a new trial fits on a single node.
+        self._committed_bundles = []
         self._resources_initialized = False
+        self._resource_view = ClusterResourceView()
 
         if refresh_period is None:
             refresh_period = float(
                 os.environ.get("TUNE_STATE_REFRESH_PERIOD",
                                TUNE_STATE_REFRESH_PERIOD))
         self._refresh_period = refresh_period
+
+        # Number of results fetched per `train` call. If larger than 1,
+        # trainables run several iterations per call and return the
+        # buffered results as a list.
+        self._result_buffer_length = int(
+            os.environ.get("TUNE_RESULT_BUFFER_LENGTH", 1))
+        self._result_buffer_min_time_s = float(
+            os.environ.get("TUNE_RESULT_BUFFER_MIN_TIME_S", 0.))
+        self._result_buffer_max_time_s = float(
+            os.environ.get("TUNE_RESULT_BUFFER_MAX_TIME_S", 100.))
+
         self._last_resource_refresh = float("-inf")
         self._last_ip_refresh = float("-inf")
         self._last_ip_addresses = set()
@@ -181,6 +197,9 @@ class RayTrialExecutor(TrialExecutor):
             ray.init()
 
         if ray.is_initialized():
+            if (os.environ.get("TUNE_DISABLE_RESOURCE_EVENTS") != "1"
+                    and ray.worker._mode() != ray.worker.LOCAL_MODE):
+                self._resource_view.start()
             self._update_avail_resources()
 
     def _setup_remote_runner(self, trial, reuse_allowed):
@@ -258,7 +277,18 @@ class RayTrialExecutor(TrialExecutor):
 
         assert trial.status == Trial.RUNNING, trial.status
         with self._change_working_directory(trial):
-            remote = trial.runner.train.remote()
+            if self._result_buffer_length > 1:
+                # Buffer results for longer when more trials are running
+                # to reduce the per-result overhead on the driver, 0.1s
+                # per running trial.
+                buffer_time_s = max(
+                    self._result_buffer_min_time_s,
+                    min(self._result_buffer_max_time_s,
+                        (len(self._running) + 1) / 10))
+                remote = trial.runner.train_buffered.remote(
+                    buffer_time_s, self._result_buffer_length)
+            else:
+                remote = trial.runner.train.remote()
 
         # Local Mode
         if isinstance(remote, dict):
@@ -487,7 +517,8 @@ class RayTrialExecutor(TrialExecutor):
         """Fetches one result of the running trials.
 
         Returns:
-            Result of the most recent trial training run.
+            Result of the most recent trial training run. This is a list of
+            results if result buffering is enabled.
         """
         trial_future = self._find_item(self._running, trial)
         if not trial_future:
@@ -518,6 +549,7 @@ class RayTrialExecutor(TrialExecutor):
             committed.object_store_memory +
             resources.object_store_memory_total(),
             custom_resources=custom_resources)
+        self._committed_bundles.append(_head_bundle(resources))
 
     def _return_resources(self, resources):
         committed = self._committed_resources
@@ -536,8 +568,20 @@ class RayTrialExecutor(TrialExecutor):
 
         assert self._committed_resources.is_nonnegative(), (
             "Resource invalid: {}".format(resources))
+        bundle = _head_bundle(resources)
+        if bundle in self._committed_bundles:
+            self._committed_bundles.remove(bundle)
 
     def _update_avail_resources(self, num_retries=5):
+        if self._resource_view.active:
+            changed = self._resource_view.poll()
+            # The view stops if it loses its subscription, in which case we
+            # fall back to polling the cluster resources below.
+            if self._resource_view.active:
+                if changed or not self._resources_initialized:
+                    self._set_avail_resources(
+                        self._resource_view.total_resources())
+                return
         if time.time() - self._last_resource_refresh < self._refresh_period:
             return
         logger.debug("Checking Ray cluster resources.")
@@ -567,12 +611,19 @@ class RayTrialExecutor(TrialExecutor):
                            "You can resume this experiment by passing in "
                            "`resume=True` to `run`.")
 
+        resources = resources.copy()
+        for name in ["memory", "object_store_memory"]:
+            resources[name] = ray_constants.from_memory_units(
+                resources.get(name, 0))
+        self._set_avail_resources(resources)
+
+    def _set_avail_resources(self, resources):
+        """Sets the available resources from a dict with memory in bytes."""
         resources = resources.copy()
         num_cpus = resources.pop("CPU", 0)
         num_gpus = resources.pop("GPU", 0)
-        memory = ray_constants.from_memory_units(resources.pop("memory", 0))
-        object_store_memory = ray_constants.from_memory_units(
-            resources.pop("object_store_memory", 0))
+        memory = resources.pop("memory", 0)
+        object_store_memory = resources.pop("object_store_memory", 0)
         custom_resources = resources
 
         self._avail_resources = Resources(
@@ -587,9 +638,12 @@ class RayTrialExecutor(TrialExecutor):
     def has_resources(self, resources):
         """Returns whether this runner has at least the specified resources.
 
-        This refreshes the Ray cluster resources if the time since last update
-        has exceeded self._refresh_period. This also assumes that the
-        cluster is not resizing very frequently.
+        When subscribed to GCS node updates, the cluster resources are
+        always current and the trial must also fit on a single node next to
+        the running trials. Otherwise, this refreshes the Ray cluster
+        resources if the time since last update has exceeded
+        self._refresh_period. This also assumes that the cluster is not
+        resizing very frequently.
         """
         self._update_avail_resources()
         currently_available = Resources.subtract(self._avail_resources,
@@ -603,6 +657,9 @@ class RayTrialExecutor(TrialExecutor):
             currently_available.object_store_memory and all(
                 resources.get_res_total(res) <= currently_available.get(res)
                 for res in resources.custom_resources))
+        if have_space and self._resource_view.active:
+            have_space = self._resource_view.fits(self._committed_bundles,
+                                                  _head_bundle(resources))
 
         if have_space:
             # The assumption right now is that we block all trials if one
@@ -690,7 +747,9 @@ class RayTrialExecutor(TrialExecutor):
         result = result or trial.last_result
         with self._change_working_directory(trial):
             if storage == Checkpoint.MEMORY:
-                value = trial.runner.save_to_object.remote()
+                # The checkpoint stays in the object store and is passed by
+                # reference to the actor that restores from it.
+                value = trial.runner.save_to_memory.remote()
                 checkpoint = Checkpoint(storage, value, result)
                 trial.on_checkpoint(checkpoint)
             else:
@@ -775,6 +834,7 @@ class RayTrialExecutor(TrialExecutor):
 
     def cleanup(self):
         self._trial_cleanup.cleanup(partial=False)
+        self._resource_view.stop()
 
     @contextmanager
     def _change_working_directory(self, trial):
@@ -794,5 +854,20 @@ class RayTrialExecutor(TrialExecutor):
             yield
 
 
+def _head_bundle(resources):
+    """Returns the resources of the trial actor itself.
+
+    Extra resources are requested by separate actors, which can be placed on
+    any node.
+    """
+    bundle = dict(
+        resources.custom_resources,
+        CPU=resources.cpu,
+        GPU=resources.gpu,
+        memory=resources.memory,
+        object_store_memory=resources.object_store_memory)
+    return {name: quantity for name, quantity in bundle.items() if quantity}
+
+
 def _to_gb(n_bytes):
     return round(n_bytes / (1024**3), 2)
@@ -0,0 +1,163 @@
+import logging
+
+import ray
+from ray import gcs_utils
+from ray import ray_constants
+from ray.utils import binary_to_hex
+
+logger = logging.getLogger(__name__)
+
+# Resources reported by the GCS in memory units rather than bytes.
+_MEMORY_RESOURCES = ("memory", "object_store_memory")
+
+
+class ClusterResourceView:
+    """Per-node view of the cluster resources, kept current by GCS events.
+
+    The view is seeded once from the GCS node table and then updated from
+    the node membership (``NODE:*``) and node resource (``NODE_RESOURCE:*``)
+    pub/sub channels, so that reading it never issues a cluster-wide RPC.
+
+    Memory resources are converted to bytes to match ``Resources``.
+    """
+
+    def __init__(self):
+        self._pubsub = None
+        self._nodes = {}
+
+    @property
+    def active(self):
+        """Whether the view is subscribed to GCS node updates."""
+        return self._pubsub is not None
+
+    def start(self):
+        """Subscribes to GCS node updates and loads the initial snapshot.
+
+        Returns:
+            True if the view is now kept current by GCS events, False if the
+            caller should fall back to polling the cluster resources.
+        """
+        try:
+            pubsub = ray.worker.global_worker.redis_client.pubsub(
+                ignore_subscribe_messages=True)
+            # Subscribe before reading the snapshot so that no update that
+            # lands in between is lost. Updates carry absolute capacities, so
+            # replaying one that is already in the snapshot is harmless.
+            pubsub.psubscribe(gcs_utils.NODE_PUBSUB_PATTERN,
+                              gcs_utils.NODE_RESOURCE_PUBSUB_PATTERN)
+            nodes = {
+                node["NodeID"]: _to_bytes(node["Resources"])
+                for node in ray.state.state.node_table() if node["Alive"]
+            }
+        except Exception as exc:
+            logger.debug(f"{exc}: Cannot subscribe to GCS node updates.")
+            return False
+        self._pubsub = pubsub
+        self._nodes = nodes
+        return True
+
+    def stop(self):
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+        self._pubsub = None
+
+    def poll(self):
+        """Applies all pending GCS node updates without blocking.
+
+        Returns:
+            True if the view changed.
+        """
+        if self._pubsub is None:
+            return False
+        changed = False
+        while True:
+            try:
+                msg = self._pubsub.get_message()
+            except Exception as exc:
+                logger.warning(f"{exc}: Lost GCS node updates subscription, "
+                               "falling back to polling cluster resources.")
+                self.stop()
+                return changed
+            if msg is None:
+                return changed
+            changed = self._handle_message(msg) or changed
+
+    def _handle_message(self, msg):
+        channel = msg["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("ascii")
+        pubsub_msg = gcs_utils.PubSubMessage.FromString(msg["data"])
+        if channel.startswith("NODE_RESOURCE:"):
+            change = gcs_utils.NodeResourceChange.FromString(pubsub_msg.data)
+            node_id = binary_to_hex(change.node_id)
+            if node_id not in self._nodes:
+                # The node is not (or no longer) alive.
+                return False
+            resources = self._nodes[node_id]
+            resources.update(_to_bytes(change.updated_resources))
+            for name in change.deleted_resources:
+                resources.pop(name, None)
+        else:
+            info = gcs_utils.GcsNodeInfo.FromString(pubsub_msg.data)
+            node_id = binary_to_hex(info.node_id)
+            alive = info.state == gcs_utils.GcsNodeInfo.GcsNodeState.Value(
+                "ALIVE")
+            if alive:
+                if node_id in self._nodes:
+                    return False
+                # Resources registered before this message was published do
+                # not produce a separate update.
+                self._nodes[node_id] = _to_bytes(
+                    ray.state.state.node_resource_table(node_id))
+            elif self._nodes.pop(node_id, None) is None:
+                return False
+        return True
+
+    def total_resources(self):
+        """Returns the resources summed over all alive nodes."""
+        total = {}
+        for resources in self._nodes.values():
+            for name, quantity in resources.items():
+                total[name] = total.get(name, 0) + quantity
+        return total
+
+    def fits(self, committed, demand):
+        """Returns whether ``demand`` fits on a node next to ``committed``.
+
+        The committed bundles are first packed onto the nodes (first fit,
+        largest first). Bundles that do not fit on any node are still
+        waiting for resources and are not holding any, so they are skipped.
+
+        Args:
+            committed (list): Resource dicts of bundles already running.
+            demand (dict): Resource dict of the bundle to place.
+        """
+        remaining = [dict(resources) for resources in self._nodes.values()]
+        for bundle in sorted(committed, key=_bundle_size, reverse=True):
+            for node in remaining:
+                if _fits_node(node, bundle):
+                    for name, quantity in bundle.items():
+                        node[name] = node.get(name, 0) - quantity
+                    break
+        return any(_fits_node(node, demand) for node in remaining)
+
+
+def _to_bytes(resources):
+    resources = dict(resources)
+    for name in _MEMORY_RESOURCES:
+        if name in resources:
+            resources[name] = ray_constants.from_memory_units(resources[name])
+    return resources
+
+
+def _fits_node(node, bundle):
+    return all(quantity <= 0 or node.get(name, 0) >= quantity
+               for name, quantity in bundle.items())
+
+
+def _bundle_size(bundle):
+    return (bundle.get("GPU", 0), bundle.get("CPU", 0), bundle.get(
+        "memory", 0))
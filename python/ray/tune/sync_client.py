@@ -1,9 +1,16 @@
+import collections
 import distutils
 import distutils.spawn
+import hashlib
+import json
 import logging
+import os
+import shutil
 import subprocess
 import tempfile
+import time
 import types
+from concurrent.futures import ThreadPoolExecutor
 
 from shlex import quote
 
@@ -18,6 +25,15 @@ ALLOWED_REMOTE_PREFIXES = (S3_PREFIX, GS_PREFIX, HDFS_PREFIX)
 
 noop_template = ": {target}"  # noop in bash
 
+# Size of the chunks files are split into by the ContentAddressedClient.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Unreferenced chunks are collected at most this often, when deleting.
+DEFAULT_GC_INTERVAL_S = 600
+# Chunks written or reused this recently are never collected, so that the
+# chunks of uploads in progress are not removed before their manifests are
+# written.
+DEFAULT_GC_GRACE_S = 3600
+
 
 def noop(*args):
     return
@@ -27,7 +43,8 @@ def get_sync_client(sync_function, delete_function=None):
     """Returns a sync client.
 
     Args:
-        sync_function (Optional[str|function]): Sync function.
+        sync_function (Optional[str|function|SyncClient]): Sync function.
+            If a SyncClient instance is given, it is returned as is.
         delete_function (Optional[str|function]): Delete function. Must be
             the same type as sync_function if it is provided.
 
@@ -36,6 +53,11 @@ def get_sync_client(sync_function, delete_function=None):
     """
     if sync_function is None:
         return None
+    if isinstance(sync_function, SyncClient):
+        if delete_function:
+            raise ValueError("A delete function cannot be combined with a "
+                             "SyncClient instance.")
+        return sync_function
     if delete_function and type(sync_function) != type(delete_function):
         raise ValueError("Sync and delete functions must be of same type.")
     if isinstance(sync_function, types.FunctionType):
@@ -279,3 +301,319 @@ class CommandBasedClient(SyncClient):
             raise ValueError("Sync template missing '{source}'.")
         if "{target}" not in sync_string:
             raise ValueError("Sync template missing '{target}'.")
+
+
+class ContentAddressedClient(SyncClient):
+    def __init__(self,
+                 store_dir,
+                 chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_workers=8,
+                 gc_interval_s=DEFAULT_GC_INTERVAL_S,
+                 gc_grace_s=DEFAULT_GC_GRACE_S):
+        """Syncs directories to a content-addressed chunk store.
+
+        Files are split into fixed-size chunks that are stored under their
+        SHA-256 digest, so a chunk is only uploaded once no matter how many
+        files, trials or checkpoint iterations contain it. For every synced
+        file, a small manifest listing its chunks is written to the store
+        at the file's remote path.
+
+        The store is a local directory, e.g. a mounted bucket or a shared
+        file system. Remote paths are mapped into it, with URI schemes such
+        as ``s3://`` turned into a leading directory. Several clients can
+        share a store: a chunk is only skipped if it exists in the store,
+        and reusing it refreshes its modification time.
+
+        Deleting removes the manifests right away. Chunks that no manifest
+        references are collected by a delete at most every
+        ``gc_interval_s``, and only if they were not written or reused in
+        the last ``gc_grace_s``, which must be longer than any upload.
+
+        Arguments:
+            store_dir (str): Root directory of the chunk store.
+            chunk_size (int): Size in bytes of the chunks files are split
+                into.
+            max_workers (int): Number of threads used to transfer chunks.
+            gc_interval_s (float): Minimum time between garbage
+                collections of unreferenced chunks.
+            gc_grace_s (float): Minimum age of collected chunks.
+        """
+        self.store_dir = store_dir
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.gc_interval_s = gc_interval_s
+        self.gc_grace_s = gc_grace_s
+        self.stats = {}
+        self._chunk_dir = os.path.join(store_dir, "chunks")
+        self._manifest_dir = os.path.join(store_dir, "manifests")
+        # Maps local path -> ((size, mtime_ns, chunk_size), chunk digests)
+        # so unchanged files are not re-hashed on every sync.
+        self._hash_cache = {}
+        self._last_gc_time = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+
+    def sync_up(self, source, target):
+        return self._submit(self._sync_up, source, target)
+
+    def sync_down(self, source, target):
+        return self._submit(self._sync_down, source, target)
+
+    def delete(self, target):
+        return self._submit(self._delete, target)
+
+    def wait(self):
+        if self._future:
+            future, self._future = self._future, None
+            try:
+                future.result()
+            except Exception as e:
+                raise TuneError("Sync error: {}".format(e)) from e
+
+    def reset(self):
+        if self.is_running:
+            logger.warning("Sync still running but resetting anyways.")
+        self._future = None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    @property
+    def is_running(self):
+        """Returns whether a sync or delete is running."""
+        return bool(self._future) and not self._future.done()
+
+    def _submit(self, fn, *args):
+        if self.is_running:
+            logger.warning("Last sync still in progress, skipping.")
+            return False
+        self._future = self._executor.submit(fn, *args)
+        return True
+
+    def _manifest_path(self, remote_path):
+        remote_path = remote_path.replace("://", "/", 1)
+        return os.path.join(self._manifest_dir,
+                            os.path.normpath(remote_path).lstrip(os.sep))
+
+    def _chunk_path(self, digest):
+        return os.path.join(self._chunk_dir, digest[:2], digest)
+
+    def _file_chunks(self, path, chunk_size):
+        """Returns the chunk digests of a local file."""
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns, chunk_size)
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digests = []
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digests.append(hashlib.sha256(chunk).hexdigest())
+        self._hash_cache[path] = (key, digests)
+        return digests
+
+    def _has_chunk(self, digest):
+        """Checks that a chunk is in the store, and refreshes its
+        modification time so it isn't collected before the manifest that
+        reuses it is written."""
+        try:
+            os.utime(self._chunk_path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _upload_chunk(self, digest, data):
+        _atomic_write(self._chunk_path(digest), [data])
+        return len(data)
+
+    def _upload_file(self, path, is_stored, upload):
+        """Uploads the chunks of a local file that are not stored yet.
+
+        The chunks are hashed as they are read, so each chunk is stored
+        under the digest of the bytes uploaded, even if the file is
+        written to meanwhile. Returns the size and the chunk digests of the
+        contents that were read.
+        """
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns, self.chunk_size)
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == key and all(
+                is_stored(digest) for digest in cached[1]):
+            return stat.st_size, cached[1]
+        size = 0
+        digests = []
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(self.chunk_size), b""):
+                digest = hashlib.sha256(data).hexdigest()
+                if not is_stored(digest):
+                    upload(digest, data)
+                size += len(data)
+                digests.append(digest)
+        self._hash_cache[path] = (key, digests)
+        return size, digests
+
+    def _sync_up(self, source, target):
+        stats = _new_stats()
+        uploaded = set()
+        pending = collections.deque()
+        manifests = []
+
+        def is_stored(digest):
+            return digest in uploaded or self._has_chunk(digest)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+
+            def upload(digest, data):
+                # Bounds the number of chunks held in memory.
+                if len(pending) >= 2 * self.max_workers:
+                    stats["bytes_transferred"] += pending.popleft().result()
+                uploaded.add(digest)
+                pending.append(pool.submit(self._upload_chunk, digest, data))
+
+            for path, rel_path in _walk_files(source):
+                size, digests = self._upload_file(path, is_stored, upload)
+                stats["files"] += 1
+                stats["bytes"] += size
+                manifests.append((_join(target, rel_path), {
+                    "size": size,
+                    "chunk_size": self.chunk_size,
+                    "chunks": digests
+                }))
+            while pending:
+                stats["bytes_transferred"] += pending.popleft().result()
+
+        # Manifests are written last so that they never reference chunks
+        # that are not in the store yet.
+        for remote_path, manifest in manifests:
+            manifest_path = self._manifest_path(remote_path)
+            data = json.dumps(manifest).encode("utf-8")
+            if not _file_equals(manifest_path, data):
+                _atomic_write(manifest_path, [data])
+        self._record_stats("up", source, target, stats)
+
+    def _download_file(self, manifest, path):
+        def read_chunk(digest):
+            with open(self._chunk_path(digest), "rb") as f:
+                return f.read()
+
+        chunks = manifest["chunks"]
+        chunk_size = manifest["chunk_size"]
+        if (os.path.exists(path)
+                and self._file_chunks(path, chunk_size) == chunks):
+            return 0
+        _atomic_write(path, (read_chunk(digest) for digest in chunks))
+        stat = os.stat(path)
+        self._hash_cache[path] = ((stat.st_size, stat.st_mtime_ns, chunk_size),
+                                  chunks)
+        return manifest["size"]
+
+    def _sync_down(self, source, target):
+        stats = _new_stats()
+        jobs = []
+        for manifest_path, rel_path in _walk_files(
+                self._manifest_path(source)):
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+            stats["files"] += 1
+            stats["bytes"] += manifest["size"]
+            jobs.append((manifest, _join(target, rel_path)))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(self._download_file, manifest, path)
+                for manifest, path in jobs
+            ]
+            stats["bytes_transferred"] = sum(f.result() for f in futures)
+        self._record_stats("down", source, target, stats)
+
+    def _delete(self, target):
+        manifest_path = self._manifest_path(target)
+        if os.path.isdir(manifest_path):
+            shutil.rmtree(manifest_path)
+        elif os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        now = time.time()
+        if self._last_gc_time is None or \
+                now - self._last_gc_time >= self.gc_interval_s:
+            self._last_gc_time = now
+            self._collect_garbage(now - self.gc_grace_s)
+
+    def _collect_garbage(self, cutoff):
+        """Removes chunks that are not referenced by any manifest and
+        were last modified before `cutoff`."""
+        candidates = []
+        for chunk_path, _ in _walk_files(self._chunk_dir):
+            try:
+                if os.path.getmtime(chunk_path) <= cutoff:
+                    candidates.append(chunk_path)
+            except FileNotFoundError:
+                pass
+        if not candidates:
+            return
+        referenced = set()
+        for manifest_path, _ in _walk_files(self._manifest_dir):
+            try:
+                with open(manifest_path, "r") as f:
+                    referenced.update(json.load(f)["chunks"])
+            except FileNotFoundError:
+                pass
+        for chunk_path in candidates:
+            if os.path.basename(chunk_path) in referenced:
+                continue
+            try:
+                # A chunk reused by an upload since it was listed is
+                # referenced by a manifest that may not be written yet.
+                if os.path.getmtime(chunk_path) <= cutoff:
+                    os.remove(chunk_path)
+            except FileNotFoundError:
+                pass
+
+    def _record_stats(self, direction, source, target, stats):
+        stats["bytes_saved"] = stats["bytes"] - stats["bytes_transferred"]
+        self.stats = stats
+        logger.debug(
+            "Synced %s %d files (%d bytes) from %s to %s. "
+            "Transferred %d bytes, saved %d bytes.", direction, stats["files"],
+            stats["bytes"], source, target, stats["bytes_transferred"],
+            stats["bytes_saved"])
+
+
+def _new_stats():
+    return {"files": 0, "bytes": 0, "bytes_transferred": 0, "bytes_saved": 0}
+
+
+def _walk_files(root):
+    """Yields (path, path relative to root) for all files under root."""
+    if os.path.isfile(root):
+        yield root, ""
+        return
+    for dirpath, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dirpath, file_name)
+            yield path, os.path.relpath(path, root)
+
+
+def _join(root, rel_path):
+    return os.path.join(root, rel_path) if rel_path else root
+
+
+def _file_equals(path, data):
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read() == data
+
+
+def _atomic_write(path, chunks):
+    """Writes chunks to a temporary file and moves it to path."""
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -93,9 +93,11 @@ class SyncConfig:
     Args:
         upload_dir (str): Optional URI to sync training results and checkpoints
             to (e.g. ``s3://bucket``, ``gs://bucket`` or ``hdfs://path``).
-        sync_to_cloud (func|str): Function for syncing the local_dir to and
-            from upload_dir. If string, then it must be a string template that
-            includes `{source}` and `{target}` for the syncer to run. If not
+        sync_to_cloud (func|str|SyncClient): Function for syncing the
+            local_dir to and from upload_dir. If string, then it must be a
+            string template that includes `{source}` and `{target}` for the
+            syncer to run. A SyncClient instance such as
+            ``ContentAddressedClient`` is used as is. If not
             provided, the sync command defaults to standard S3, gsutil or HDFS
             sync commands. By default local_dir is synced to remote_dir every
             300 seconds. To change this, set the TUNE_CLOUD_SYNC_S
@@ -32,6 +32,7 @@ from ray.tune.suggest._mock import _MockSuggestionAlgorithm
 from ray.tune.utils import (flatten_dict, get_pinned_object,
                             pin_in_object_store)
 from ray.tune.utils.mock import mock_storage_client, MOCK_REMOTE_DIR
+from ray.tune.utils.trainable import TrainableUtil
 
 
 class TrainableFunctionApiTest(unittest.TestCase):
@@ -855,6 +856,54 @@ class TrainableFunctionApiTest(unittest.TestCase):
             self.assertEqual(trial.status, Trial.TERMINATED)
             self.assertTrue(trial.has_checkpoint())
 
+    def testCheckpointDictToMemory(self):
+        class TestTrain(Trainable):
+            def setup(self, config):
+                self.state = {"hi": 1, "weights": np.arange(10)}
+
+            def step(self):
+                return {"timesteps_this_iter": 1, "done": True}
+
+            def save_checkpoint(self, path):
+                return self.state
+
+            def load_checkpoint(self, state):
+                self.checkpoint_path = state.pop("tune_checkpoint_path")
+                # Restored arrays can be modified in place.
+                state["weights"] += 1
+                self.state = state
+
+        test_trainable = TestTrain()
+        test_trainable.train()
+        obj = test_trainable.save_to_memory()
+        self.assertTrue(TrainableUtil.is_memory_checkpoint(obj))
+        self.assertIs(obj["checkpoint"]["weights"],
+                      test_trainable.state["weights"])
+
+        restored_obj = ray.get(ray.put(obj))
+        restored_obj["checkpoint"]["weights"].setflags(write=False)
+        test_trainable2 = TestTrain()
+        test_trainable2.restore_from_object(restored_obj)
+        self.assertEqual(test_trainable2.iteration, 1)
+        self.assertEqual(test_trainable2.state["hi"], 1)
+        np.testing.assert_array_equal(test_trainable2.state["weights"],
+                                      np.arange(1, 11))
+        self.assertTrue(test_trainable2.checkpoint_path.endswith("checkpoint"))
+        self.assertFalse(
+            os.path.exists(os.path.dirname(test_trainable2.checkpoint_path)))
+
+        # Files written next to a dict checkpoint fall back to disk.
+        class TestTrainWithFiles(TestTrain):
+            def save_checkpoint(self, path):
+                open(os.path.join(path, "extra"), "w").close()
+                return self.state
+
+        test_trainable3 = TestTrainWithFiles()
+        obj = test_trainable3.save_to_memory()
+        self.assertFalse(TrainableUtil.is_memory_checkpoint(obj))
+        test_trainable3.restore_from_object(obj)
+        self.assertEqual(test_trainable3.state["hi"], 1)
+
     def testMultipleCheckpoints(self):
         class TestTrain(Trainable):
             def setup(self, config):
@@ -11,6 +11,10 @@ import numpy as np
 import ray
 from ray.tune import (run, Trainable, sample_from, Analysis,
                       ExperimentAnalysis, grid_search)
+from ray.tune.analysis import experiment_analysis
+from ray.tune.analysis.experiment_analysis import (ANALYSIS_INDEX_FILE,
+                                                   ANALYSIS_DATAFRAMES_FILE)
+from ray.tune.result import EXPR_PROGRESS_FILE
 from ray.tune.utils.mock import MyTrainableClass
 from ray.tune.utils.serialization import TuneFunctionEncoder
 
@@ -162,6 +166,9 @@ class AnalysisSuite(unittest.TestCase):
 
     def setUp(self):
         self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self._original_cache_dir = experiment_analysis.ANALYSIS_CACHE_DIR
+        experiment_analysis.ANALYSIS_CACHE_DIR = self.cache_dir
         self.num_samples = 10
         self.metric = "episode_reward_mean"
         self.run_test_exp(test_name="analysis_exp1")
@@ -180,7 +187,9 @@ class AnalysisSuite(unittest.TestCase):
             })
 
     def tearDown(self):
+        experiment_analysis.ANALYSIS_CACHE_DIR = self._original_cache_dir
         shutil.rmtree(self.test_dir, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
 
     def testDataframe(self):
         analysis = Analysis(self.test_dir)
@@ -203,6 +212,65 @@ class AnalysisSuite(unittest.TestCase):
             best_config = analysis.get_best_config(metric, mode=mode)
             self.assertEqual(analysis.get_all_configs()[logdir], best_config)
 
+    def testCacheUpdatedIncrementally(self):
+        analysis = Analysis(self.test_dir)
+        self.assertEqual(len(analysis.trial_dataframes), self.num_samples * 2)
+        for file_name in [ANALYSIS_INDEX_FILE, ANALYSIS_DATAFRAMES_FILE]:
+            cache_path = analysis._cache_path(file_name)
+            self.assertTrue(os.path.exists(cache_path))
+            # The cache must not be synced along with the experiment.
+            self.assertFalse(cache_path.startswith(self.test_dir))
+            self.assertFalse(
+                os.path.exists(os.path.join(self.test_dir, file_name)))
+
+        # Append a new best result to a single trial.
+        logdir = analysis.get_best_logdir(self.metric, mode="min")
+        df = analysis.trial_dataframes[logdir]
+        row = df.iloc[-1:].copy()
+        row[self.metric] = df[self.metric].max() + 1e6
+        row.to_csv(
+            os.path.join(logdir, EXPR_PROGRESS_FILE),
+            mode="a",
+            header=False,
+            index=False)
+
+        analysis2 = Analysis(self.test_dir)
+        self.assertEqual(
+            analysis2.get_best_logdir(self.metric, mode="max"), logdir)
+        self.assertEqual(len(analysis2.trial_dataframes[logdir]), len(df) + 1)
+        self.assertEqual(
+            analysis2.get_best_config(self.metric, mode="max"),
+            analysis2.get_all_configs()[logdir])
+
+        analysis3 = Analysis(self.test_dir, use_cache=False)
+        self.assertEqual(
+            analysis3.dataframe(self.metric, mode="max").shape,
+            analysis2.dataframe(self.metric, mode="max").shape)
+
+    def testResultsParsedOnce(self):
+        original_read_csv = pd.read_csv
+        num_reads = []
+
+        def read_csv(*args, **kwargs):
+            num_reads.append(args[0])
+            return original_read_csv(*args, **kwargs)
+
+        experiment_analysis.pd.read_csv = read_csv
+        try:
+            analysis = Analysis(self.test_dir)
+            # Loading the index doesn't keep the parsed dataframes.
+            self.assertIsNone(analysis._trial_dataframes)
+            self.assertEqual(
+                len(analysis.trial_dataframes), self.num_samples * 2)
+        finally:
+            experiment_analysis.pd.read_csv = original_read_csv
+        self.assertEqual(len(num_reads), self.num_samples * 2)
+
+    def testBoolMetricsIndexed(self):
+        analysis = Analysis(self.test_dir)
+        for entry in analysis._index.values():
+            self.assertIn("done", entry["extrema"])
+
 
 if __name__ == "__main__":
     import sys
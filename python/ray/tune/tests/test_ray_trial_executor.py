@@ -1,4 +1,5 @@
 # coding: utf-8
+import time
 import unittest
 
 import ray
@@ -252,6 +253,53 @@ class RayExecutorQueueTest(unittest.TestCase):
             self.trial_executor.has_resources(cpu_only_trial3.resources))
 
 
+class RayExecutorResourceViewTest(unittest.TestCase):
+    def setUp(self):
+        self.cluster = Cluster(
+            initialize_head=True, connect=True, head_node_args={"num_cpus": 2})
+        # A long refresh period makes sure that resource updates can only
+        # come from GCS node updates.
+        self.trial_executor = RayTrialExecutor(
+            queue_trials=False, refresh_period=1000)
+        _register_all()
+
+    def tearDown(self):
+        ray.shutdown()
+        self.cluster.shutdown()
+        _register_all()  # re-register the evicted objects
+
+    def waitForResources(self, resources, timeout=10):
+        start = time.time()
+        while time.time() - start < timeout:
+            if self.trial_executor.has_resources(resources):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def testNodeLevelFit(self):
+        self.assertTrue(self.trial_executor._resource_view.active)
+        self.cluster.add_node(num_cpus=2)
+        self.cluster.wait_for_nodes()
+        self.assertTrue(self.waitForResources(Resources(cpu=2, gpu=0)))
+
+        # 4 CPUs are available in total, but not on any single node.
+        self.assertFalse(
+            self.trial_executor.has_resources(Resources(cpu=3, gpu=0)))
+
+        trial = Trial("__fake", resources=Resources(cpu=2, gpu=0))
+        self.trial_executor.start_trial(trial)
+        self.assertTrue(
+            self.trial_executor.has_resources(Resources(cpu=2, gpu=0)))
+        self.trial_executor.stop_trial(trial)
+
+    def testNodeAdded(self):
+        trial_resources = Resources(cpu=1, gpu=1)
+        self.assertFalse(self.trial_executor.has_resources(trial_resources))
+        self.cluster.add_node(num_cpus=1, num_gpus=1)
+        self.cluster.wait_for_nodes()
+        self.assertTrue(self.waitForResources(trial_resources))
+
+
 class LocalModeExecutorTest(RayTrialExecutorTest):
     def setUp(self):
         ray.init(local_mode=True)
@@ -1,4 +1,5 @@
 import glob
+import hashlib
 import os
 import shutil
 import sys
@@ -15,6 +16,7 @@ from ray import tune
 from ray.tune.integration.docker import DockerSyncer
 from ray.tune.integration.kubernetes import KubernetesSyncer
 from ray.tune.syncer import CommandBasedClient, detect_sync_to_driver
+from ray.tune.sync_client import ContentAddressedClient, get_sync_client
 
 
 class TestSyncFunctionality(unittest.TestCase):
@@ -291,6 +293,155 @@ class TestSyncFunctionality(unittest.TestCase):
             self.assertTrue(issubclass(syncer, DockerSyncer))
 
 
+class TestContentAddressedClient(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmpdir, "source")
+        self.store = os.path.join(self.tmpdir, "store")
+        self.client = ContentAddressedClient(self.store, chunk_size=1024)
+
+    def tearDown(self):
+        self.client.close()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, rel_path, data):
+        path = os.path.join(self.source, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _sync_up(self, target):
+        self.assertTrue(self.client.sync_up(self.source, target))
+        self.client.wait()
+        return self.client.stats
+
+    def testDedupeAcrossIterations(self):
+        data = os.urandom(10 * 1024)
+        self._write("checkpoint_1/model", data)
+        stats = self._sync_up("s3://bucket/exp")
+        self.assertEqual(stats["bytes_transferred"], len(data))
+
+        # Only the changed chunk of the new checkpoint is uploaded.
+        self._write("checkpoint_2/model", data[:-1] + b"x")
+        stats = self._sync_up("s3://bucket/exp")
+        self.assertEqual(stats["bytes"], 2 * len(data))
+        self.assertEqual(stats["bytes_transferred"], 1024)
+        self.assertEqual(stats["bytes_saved"], 2 * len(data) - 1024)
+
+        # Chunks are shared across targets.
+        stats = self._sync_up("s3://bucket/other_trial")
+        self.assertEqual(stats["bytes_transferred"], 0)
+
+    def testSyncDown(self):
+        data = os.urandom(5000)
+        self._write("checkpoint_1/model", data)
+        self._sync_up("s3://bucket/exp")
+
+        target = os.path.join(self.tmpdir, "target")
+        client = get_sync_client(ContentAddressedClient(self.store))
+        client.sync_down("s3://bucket/exp", target)
+        client.wait()
+        with open(os.path.join(target, "checkpoint_1/model"), "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(client.stats["bytes_transferred"], len(data))
+
+        client.sync_down("s3://bucket/exp", target)
+        client.wait()
+        self.assertEqual(client.stats["bytes_transferred"], 0)
+        client.close()
+
+    def testDeleteCollectsGarbage(self):
+        self.client.close()
+        self.client = ContentAddressedClient(
+            self.store, chunk_size=1024, gc_interval_s=0, gc_grace_s=0)
+        shared = os.urandom(1024)
+        self._write("checkpoint_1/model", shared + os.urandom(1024))
+        self._write("checkpoint_2/model", shared + os.urandom(1024))
+        self._sync_up("s3://bucket/exp")
+        chunk_dir = os.path.join(self.store, "chunks")
+        self.assertEqual(len(list(glob.glob(chunk_dir + "/*/*"))), 3)
+
+        self.client.delete("s3://bucket/exp/checkpoint_1")
+        self.client.wait()
+        self.assertEqual(len(list(glob.glob(chunk_dir + "/*/*"))), 2)
+
+        target = os.path.join(self.tmpdir, "target")
+        self.client.sync_down("s3://bucket/exp", target)
+        self.client.wait()
+        self.assertEqual(os.listdir(target), ["checkpoint_2"])
+
+    def testGarbageCollectionGracePeriod(self):
+        self._write("checkpoint_1/model", os.urandom(2048))
+        self._sync_up("s3://bucket/exp")
+        chunk_dir = os.path.join(self.store, "chunks")
+        self.client.delete("s3://bucket/exp")
+        self.client.wait()
+        # Recent chunks may belong to an upload in progress.
+        self.assertEqual(len(list(glob.glob(chunk_dir + "/*/*"))), 2)
+
+    def testReuploadsChunksCollectedByOtherClient(self):
+        data = os.urandom(2048)
+        self._write("checkpoint_1/model", data)
+        self._sync_up("s3://bucket/exp")
+
+        other = ContentAddressedClient(
+            self.store, chunk_size=1024, gc_interval_s=0, gc_grace_s=0)
+        other.delete("s3://bucket/exp")
+        other.wait()
+        other.close()
+
+        # The chunks are uploaded again, so the manifest can be restored.
+        stats = self._sync_up("s3://bucket/exp")
+        self.assertEqual(stats["bytes_transferred"], len(data))
+        target = os.path.join(self.tmpdir, "target")
+        self.client.sync_down("s3://bucket/exp", target)
+        self.client.wait()
+        with open(os.path.join(target, "checkpoint_1/model"), "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def testFileWrittenDuringSync(self):
+        data = os.urandom(1500)
+        self._write("result.json", data)
+        path = os.path.join(self.source, "result.json")
+        upload_chunk = self.client._upload_chunk
+
+        def append_then_upload(digest, chunk):
+            # The trial appends results while the sync is running.
+            with open(path, "ab") as f:
+                f.write(b"x" * 300)
+            return upload_chunk(digest, chunk)
+
+        self.client._upload_chunk = append_then_upload
+        self._sync_up("s3://bucket/exp")
+        self.client._upload_chunk = upload_chunk
+
+        # Every chunk is stored under the digest of its contents.
+        chunk_dir = os.path.join(self.store, "chunks")
+        for chunk_path in glob.glob(chunk_dir + "/*/*"):
+            with open(chunk_path, "rb") as f:
+                self.assertEqual(
+                    hashlib.sha256(f.read()).hexdigest(),
+                    os.path.basename(chunk_path))
+
+        # The synced file is a consistent prefix of the local file, and the
+        # next sync picks up the rest.
+        target = os.path.join(self.tmpdir, "target")
+        self.client.sync_down("s3://bucket/exp", target)
+        self.client.wait()
+        with open(path, "rb") as f:
+            local = f.read()
+        with open(os.path.join(target, "result.json"), "rb") as f:
+            synced = f.read()
+        self.assertTrue(local.startswith(synced))
+        self.assertGreaterEqual(len(synced), len(data))
+
+        self._sync_up("s3://bucket/exp")
+        self.client.sync_down("s3://bucket/exp", target)
+        self.client.wait()
+        with open(os.path.join(target, "result.json"), "rb") as f:
+            self.assertEqual(f.read(), local)
+
+
 if __name__ == "__main__":
     import pytest
     sys.exit(pytest.main(["-v", __file__]))
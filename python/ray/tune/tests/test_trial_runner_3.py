@@ -10,6 +10,8 @@ import ray
 from ray.rllib import _register_all
 
 from ray.tune import TuneError
+from ray.tune.callback import Callback
+from ray.tune.result import TRAINING_ITERATION
 from ray.tune.schedulers import TrialScheduler, FIFOScheduler
 from ray.tune.experiment import Experiment
 from ray.tune.trial import Trial
@@ -105,6 +107,114 @@ class TrialRunnerTest3(unittest.TestCase):
         self.assertEqual(trials[2].status, Trial.RUNNING)
         self.assertEqual(trials[-1].status, Trial.TERMINATED)
 
+    def testResultBuffering(self):
+        os.environ["TUNE_RESULT_BUFFER_LENGTH"] = "7"
+        os.environ["TUNE_RESULT_BUFFER_MIN_TIME_S"] = "1"
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_LENGTH")
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_MIN_TIME_S")
+        ray.init(num_cpus=1)
+
+        class IterationCallback(Callback):
+            def __init__(self):
+                self.iterations = []
+
+            def on_trial_result(self, iteration, trials, trial, result,
+                                **info):
+                self.iterations.append(result[TRAINING_ITERATION])
+
+        callback = IterationCallback()
+        runner = TrialRunner(callbacks=[callback])
+        trial = Trial("__fake", stopping_criterion={TRAINING_ITERATION: 10})
+        runner.add_trial(trial)
+        num_steps = 0
+        while not runner.is_finished():
+            runner.step()
+            num_steps += 1
+
+        self.assertEqual(trial.status, Trial.TERMINATED)
+        # Results beyond the stopping criterion are ignored.
+        self.assertEqual(callback.iterations, list(range(1, 11)))
+        self.assertEqual(trial.last_result[TRAINING_ITERATION], 10)
+        # The first step only starts the trial.
+        self.assertLessEqual(num_steps, 3)
+
+    def testResultBufferingWithCheckpoints(self):
+        os.environ["TUNE_RESULT_BUFFER_LENGTH"] = "7"
+        os.environ["TUNE_RESULT_BUFFER_MIN_TIME_S"] = "1"
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_LENGTH")
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_MIN_TIME_S")
+        ray.init(num_cpus=12)
+
+        class IterationCallback(Callback):
+            def __init__(self):
+                self.results = {}
+
+            def on_trial_result(self, iteration, trials, trial, result,
+                                **info):
+                self.results.setdefault(trial.trial_id,
+                                        []).append(result[TRAINING_ITERATION])
+
+        callback = IterationCallback()
+        runner = TrialRunner(callbacks=[callback])
+        # Checkpoints are due in the middle of the buffered results.
+        trials = [
+            Trial(
+                "__fake",
+                checkpoint_freq=3,
+                stopping_criterion={TRAINING_ITERATION: 10}) for _ in range(12)
+        ]
+        for trial in trials:
+            runner.add_trial(trial)
+        while not runner.is_finished():
+            runner.step()
+            # A trial never has more than one train call in flight.
+            in_flight = Counter(
+                trial.trial_id
+                for trial in runner.trial_executor.get_running_trials())
+            self.assertLessEqual(max(in_flight.values(), default=0), 1)
+
+        for trial in trials:
+            self.assertEqual(trial.status, Trial.TERMINATED)
+            # No results are dropped after a checkpoint.
+            self.assertEqual(callback.results[trial.trial_id],
+                             list(range(1, 11)))
+            self.assertTrue(trial.has_checkpoint())
+
+    def testResultBufferingStopsPausedTrial(self):
+        os.environ["TUNE_RESULT_BUFFER_LENGTH"] = "7"
+        os.environ["TUNE_RESULT_BUFFER_MIN_TIME_S"] = "1"
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_LENGTH")
+        self.addCleanup(os.environ.pop, "TUNE_RESULT_BUFFER_MIN_TIME_S")
+        ray.init(num_cpus=1)
+
+        class PauseOnceScheduler(FIFOScheduler):
+            def on_trial_result(self, trial_runner, trial, result):
+                if result[TRAINING_ITERATION] == 3:
+                    return TrialScheduler.PAUSE
+                return TrialScheduler.CONTINUE
+
+        class IterationCallback(Callback):
+            def __init__(self):
+                self.iterations = []
+
+            def on_trial_result(self, iteration, trials, trial, result,
+                                **info):
+                self.iterations.append(result[TRAINING_ITERATION])
+
+        callback = IterationCallback()
+        runner = TrialRunner(
+            scheduler=PauseOnceScheduler(), callbacks=[callback])
+        # The trial is paused at iteration 3, and the stopping criterion is
+        # met by a later result of the same batch.
+        trial = Trial("__fake", stopping_criterion={TRAINING_ITERATION: 5})
+        runner.add_trial(trial)
+        while not runner.is_finished():
+            runner.step()
+
+        self.assertEqual(trial.status, Trial.TERMINATED)
+        self.assertEqual(callback.iterations, list(range(1, 6)))
+        self.assertEqual(trial.last_result[TRAINING_ITERATION], 5)
+
     def testSearchAlgNotification(self):
         """Checks notification of trial to the Search Algorithm."""
         ray.init(num_cpus=4, num_gpus=2)
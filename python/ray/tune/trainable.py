@@ -20,7 +20,7 @@ from ray.util.debug import log_once
 from ray.tune.result import (
     DEFAULT_RESULTS_DIR, TIME_THIS_ITER_S, TIMESTEPS_THIS_ITER, DONE,
     TIMESTEPS_TOTAL, EPISODES_THIS_ITER, EPISODES_TOTAL, TRAINING_ITERATION,
-    RESULT_DUPLICATE, TRIAL_INFO, STDOUT_FILE, STDERR_FILE)
+    RESULT_DUPLICATE, SHOULD_CHECKPOINT, TRIAL_INFO, STDOUT_FILE, STDERR_FILE)
 from ray.tune.utils import UtilMonitor
 
 logger = logging.getLogger(__name__)
@@ -251,6 +251,34 @@ class Trainable:
 
         return result
 
+    def train_buffered(self, buffer_time_s, max_buffer_length=1000):
+        """Runs multiple iterations of training.
+
+        Calls ``train()`` repeatedly until ``buffer_time_s`` has passed,
+        ``max_buffer_length`` results were collected, or a result is
+        ``done``, requests a checkpoint or is a duplicate. At least one
+        iteration is run. This lets Tune fetch many results with a single
+        remote call.
+
+        Args:
+            buffer_time_s (float): Time in seconds to keep collecting
+                results for.
+            max_buffer_length (int): Maximum number of results to collect.
+
+        Returns:
+            A list of dicts that describe training progress.
+        """
+        results = []
+        send_buffer_at = time.time() + buffer_time_s
+        while not results or time.time() < send_buffer_at:
+            result = self.train()
+            results.append(result)
+            if (result.get(DONE, False) or result.get(SHOULD_CHECKPOINT, False)
+                    or RESULT_DUPLICATE in result
+                    or len(results) >= max_buffer_length):
+                break
+        return results
+
     def get_state(self):
         return {
             "experiment_id": self._experiment_id,
@@ -298,6 +326,38 @@ class Trainable:
         shutil.rmtree(tmpdir)
         return obj
 
+    def save_to_memory(self):
+        """Saves the current model state to an in-memory Python object.
+
+        If ``save_checkpoint`` returns a dict and writes no files, the dict
+        is returned as-is instead of being written to disk and pickled.
+        When this is the return value of a remote call, numpy arrays in the
+        dict are stored out-of-band in the object store instead of being
+        pickled into bytes. On restore, the read-only arrays are copied
+        once, so ``load_checkpoint`` can modify them in place. Otherwise,
+        this falls back to ``save_to_object``.
+
+        Returns:
+            Object holding checkpoint data.
+        """
+        tmpdir = tempfile.mkdtemp("save_to_memory", dir=self.logdir)
+        checkpoint_dir = TrainableUtil.make_checkpoint_dir(
+            tmpdir, index=self.iteration)
+        checkpoint = self.save_checkpoint(checkpoint_dir)
+        trainable_state = self.get_state()
+        if (isinstance(checkpoint, dict)
+                and TrainableUtil.is_empty_checkpoint_dir(checkpoint_dir)):
+            obj = TrainableUtil.checkpoint_to_memory(checkpoint,
+                                                     trainable_state)
+        else:
+            checkpoint_path = TrainableUtil.process_checkpoint(
+                checkpoint,
+                parent_dir=checkpoint_dir,
+                trainable_state=trainable_state)
+            obj = TrainableUtil.checkpoint_to_object(checkpoint_path)
+        shutil.rmtree(tmpdir)
+        return obj
+
     def restore(self, checkpoint_path):
         """Restores training state from a given model checkpoint.
 
@@ -308,11 +368,7 @@ class Trainable:
         """
         with open(checkpoint_path + ".tune_metadata", "rb") as f:
             metadata = pickle.load(f)
-        self._experiment_id = metadata["experiment_id"]
-        self._iteration = metadata["iteration"]
-        self._timesteps_total = metadata["timesteps_total"]
-        self._time_total = metadata["time_total"]
-        self._episodes_total = metadata["episodes_total"]
+        self._set_restored_state(metadata)
         saved_as_dict = metadata["saved_as_dict"]
         if saved_as_dict:
             with open(checkpoint_path, "rb") as loaded_state:
@@ -321,6 +377,16 @@ class Trainable:
             self.load_checkpoint(checkpoint_dict)
         else:
             self.load_checkpoint(checkpoint_path)
+        self._finish_restore(checkpoint_path)
+
+    def _set_restored_state(self, metadata):
+        self._experiment_id = metadata["experiment_id"]
+        self._iteration = metadata["iteration"]
+        self._timesteps_total = metadata["timesteps_total"]
+        self._time_total = metadata["time_total"]
+        self._episodes_total = metadata["episodes_total"]
+
+    def _finish_restore(self, checkpoint_path):
         self._time_since_restore = 0.0
         self._timesteps_since_restore = 0
         self._iterations_since_restore = 0
@@ -338,13 +404,42 @@ class Trainable:
     def restore_from_object(self, obj):
         """Restores training state from a checkpoint object.
 
-        These checkpoints are returned from calls to save_to_object().
+        These checkpoints are returned from calls to save_to_object()
+        or save_to_memory().
         """
+        if TrainableUtil.is_memory_checkpoint(obj):
+            self._restore_from_memory(obj)
+            return
         tmpdir = tempfile.mkdtemp("restore_from_object", dir=self.logdir)
         checkpoint_path = TrainableUtil.create_from_pickle(obj, tmpdir)
         self.restore(checkpoint_path)
         shutil.rmtree(tmpdir)
 
+    def _restore_from_memory(self, obj):
+        """Restores training state from a save_to_memory() object.
+
+        The checkpoint dict is passed to ``load_checkpoint`` without
+        touching disk. Numpy arrays read from the object store are
+        read-only, so they are copied first to let ``load_checkpoint``
+        modify them in place. ``tune_checkpoint_path`` points into an
+        empty temporary checkpoint directory, which is removed after
+        ``load_checkpoint`` returns, as no files were saved with the
+        checkpoint.
+        """
+        self._set_restored_state(obj["trainable_state"])
+        tmpdir = tempfile.mkdtemp("restore_from_memory", dir=self.logdir)
+        checkpoint_dir = TrainableUtil.make_checkpoint_dir(
+            tmpdir, index=self.iteration)
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint")
+        checkpoint_dict = TrainableUtil.copy_readonly_arrays(
+            dict(obj["checkpoint"]))
+        checkpoint_dict.update(tune_checkpoint_path=checkpoint_path)
+        try:
+            self.load_checkpoint(checkpoint_dict)
+        finally:
+            shutil.rmtree(tmpdir)
+        self._finish_restore(checkpoint_path)
+
     def delete_checkpoint(self, checkpoint_path):
         """Deletes local copy of checkpoint.
 
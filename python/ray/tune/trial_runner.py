@@ -507,90 +507,46 @@ class TrialRunner:
     def _process_trial(self, trial):
         """Processes a trial result.
 
-        Fetches the trial's latest result and makes a scheduling decision
-        regarding its next action. If a checkpoint is taken, the decided
-        action is cached and acted on only after the checkpoint is later
-        processed (see `_process_trial_save`). Otherwise the decision is
-        acted on immediately.
+        Fetches the trial's latest results and makes a scheduling decision
+        regarding its next action. If result buffering is enabled, several
+        results are fetched at once. Each of them is passed to the
+        scheduler, search algorithm and callbacks, and the decision is
+        acted on once after all of them were processed. Results after a
+        PAUSE decision only go to the callbacks, but are still checked for
+        stopping conditions, which override it. If a checkpoint is
+        taken, the decided action is cached and acted on only after the
+        checkpoint is later processed (see `_process_trial_save`).
+        Otherwise the decision is acted on immediately.
 
         Args:
             trial (Trial): Trial with a result ready to be processed.
         """
         try:
-            result = self.trial_executor.fetch_result(trial)
-            result.update(trial_id=trial.trial_id)
-            is_duplicate = RESULT_DUPLICATE in result
-            force_checkpoint = result.get(SHOULD_CHECKPOINT, False)
-            # TrialScheduler and SearchAlgorithm still receive a
-            # notification because there may be special handling for
-            # the `on_trial_complete` hook.
-            if is_duplicate:
-                logger.debug("Trial finished without logging 'done'.")
-                result = trial.last_result
-                result.update(done=True)
-
-            self._validate_result_metrics(result)
-            self._total_time += result.get(TIME_THIS_ITER_S, 0)
-
-            flat_result = flatten_dict(result)
-            if self._stopper(trial.trial_id,
-                             result) or trial.should_stop(flat_result):
-                result.update(done=True)
-
-                # Hook into scheduler
-                self._scheduler_alg.on_trial_complete(self, trial, flat_result)
-                self._search_alg.on_trial_complete(
-                    trial.trial_id, result=flat_result)
-
-                # If this is not a duplicate result, the callbacks should
-                # be informed about the result.
-                if not is_duplicate:
-                    with warn_if_slow("callbacks.on_trial_result"):
-                        self._callbacks.on_trial_result(
-                            iteration=self._iteration,
-                            trials=self._trials,
-                            trial=trial,
-                            result=result.copy())
-
-                self._callbacks.on_trial_complete(
-                    iteration=self._iteration,
-                    trials=self._trials,
-                    trial=trial)
-                decision = TrialScheduler.STOP
-            else:
-                with warn_if_slow("scheduler.on_trial_result"):
-                    decision = self._scheduler_alg.on_trial_result(
-                        self, trial, flat_result)
+            results = self.trial_executor.fetch_result(trial)
+            if not isinstance(results, list):
+                results = [results]
+            decision = TrialScheduler.CONTINUE
+            should_checkpoint = False
+            for i, result in enumerate(results):
+                decision = self._process_trial_result(trial, result, decision)
+                # Checkpoints are taken if any of the buffered results
+                # is due for one, and only once per batch.
+                should_checkpoint = (should_checkpoint
+                                     or result.get(SHOULD_CHECKPOINT, False)
+                                     or trial.should_checkpoint())
                 if decision == TrialScheduler.STOP:
-                    result.update(done=True)
-                with warn_if_slow("search_alg.on_trial_result"):
-                    self._search_alg.on_trial_result(trial.trial_id,
-                                                     flat_result)
-                with warn_if_slow("callbacks.on_trial_result"):
-                    self._callbacks.on_trial_result(
-                        iteration=self._iteration,
-                        trials=self._trials,
-                        trial=trial,
-                        result=result.copy())
-                if decision == TrialScheduler.STOP:
-                    with warn_if_slow("search_alg.on_trial_complete"):
-                        self._search_alg.on_trial_complete(
-                            trial.trial_id, result=flat_result)
-                    with warn_if_slow("callbacks.on_trial_complete"):
-                        self._callbacks.on_trial_complete(
-                            iteration=self._iteration,
-                            trials=self._trials,
-                            trial=trial)
-
-            if not is_duplicate:
-                trial.update_last_result(
-                    result, terminate=(decision == TrialScheduler.STOP))
+                    if i < len(results) - 1:
+                        logger.debug(
+                            "Trial %s: Ignoring %d results after the trial "
+                            "was stopped.", trial,
+                            len(results) - i - 1)
+                    break
 
             # Checkpoints to disk. This should be checked even if
             # the scheduler decision is STOP or PAUSE. Note that
             # PAUSE only checkpoints to memory and does not update
             # the global checkpoint state.
-            self._checkpoint_trial_if_needed(trial, force=force_checkpoint)
+            self._checkpoint_trial_if_needed(trial, force=should_checkpoint)
 
             if trial.is_saving:
                 # Cache decision to execute on after the save is processed.
@@ -608,6 +564,96 @@ class TrialRunner:
                 logger.exception(error_msg)
             self._process_trial_failure(trial, traceback.format_exc())
 
+    def _process_trial_result(self,
+                              trial,
+                              result,
+                              decision=TrialScheduler.CONTINUE):
+        """Processes a single trial result without acting on the decision.
+
+        Args:
+            trial (Trial): Trial the result belongs to.
+            result (dict): The result.
+            decision (str): Decision on an earlier result of the same
+                batch. Unless it is CONTINUE, e.g. if the trial is paused
+                after the batch, which it already trained for, the result
+                is not passed to the scheduler and search algorithm again.
+                Stopping conditions are still checked, and override it.
+
+        Returns:
+            The scheduling decision.
+        """
+        result.update(trial_id=trial.trial_id)
+        is_duplicate = RESULT_DUPLICATE in result
+        # TrialScheduler and SearchAlgorithm still receive a
+        # notification because there may be special handling for
+        # the `on_trial_complete` hook.
+        if is_duplicate:
+            logger.debug("Trial finished without logging 'done'.")
+            result = trial.last_result
+            result.update(done=True)
+
+        self._validate_result_metrics(result)
+        self._total_time += result.get(TIME_THIS_ITER_S, 0)
+
+        flat_result = flatten_dict(result)
+        if self._stopper(trial.trial_id,
+                         result) or trial.should_stop(flat_result):
+            result.update(done=True)
+
+            # Hook into scheduler
+            self._scheduler_alg.on_trial_complete(self, trial, flat_result)
+            self._search_alg.on_trial_complete(
+                trial.trial_id, result=flat_result)
+
+            # If this is not a duplicate result, the callbacks should
+            # be informed about the result.
+            if not is_duplicate:
+                with warn_if_slow("callbacks.on_trial_result"):
+                    self._callbacks.on_trial_result(
+                        iteration=self._iteration,
+                        trials=self._trials,
+                        trial=trial,
+                        result=result.copy())
+
+            self._callbacks.on_trial_complete(
+                iteration=self._iteration, trials=self._trials, trial=trial)
+            decision = TrialScheduler.STOP
+        elif decision != TrialScheduler.CONTINUE:
+            with warn_if_slow("callbacks.on_trial_result"):
+                self._callbacks.on_trial_result(
+                    iteration=self._iteration,
+                    trials=self._trials,
+                    trial=trial,
+                    result=result.copy())
+        else:
+            with warn_if_slow("scheduler.on_trial_result"):
+                decision = self._scheduler_alg.on_trial_result(
+                    self, trial, flat_result)
+            if decision == TrialScheduler.STOP:
+                result.update(done=True)
+            with warn_if_slow("search_alg.on_trial_result"):
+                self._search_alg.on_trial_result(trial.trial_id, flat_result)
+            with warn_if_slow("callbacks.on_trial_result"):
+                self._callbacks.on_trial_result(
+                    iteration=self._iteration,
+                    trials=self._trials,
+                    trial=trial,
+                    result=result.copy())
+            if decision == TrialScheduler.STOP:
+                with warn_if_slow("search_alg.on_trial_complete"):
+                    self._search_alg.on_trial_complete(
+                        trial.trial_id, result=flat_result)
+                with warn_if_slow("callbacks.on_trial_complete"):
+                    self._callbacks.on_trial_complete(
+                        iteration=self._iteration,
+                        trials=self._trials,
+                        trial=trial)
+
+        if not is_duplicate:
+            trial.update_last_result(
+                result, terminate=(decision == TrialScheduler.STOP))
+        return decision
+
     def _validate_result_metrics(self, result):
         """
         Check if any of the required metrics was not reported
@@ -880,6 +926,8 @@ class TrialRunner:
         elif trial.status is Trial.RUNNING:
             try:
                 result = self.trial_executor.fetch_result(trial)
+                if isinstance(result, list):
+                    result = result[-1]
                 trial.update_last_result(result, terminate=True)
                 self._scheduler_alg.on_trial_complete(self, trial, result)
                 self._search_alg.on_trial_complete(
@@ -4,6 +4,7 @@ import logging
 import shutil
 from typing import Dict, Any
 
+import numpy as np
 import pandas as pd
 import pickle
 import os
@@ -14,6 +15,8 @@ from six import string_types
 
 logger = logging.getLogger(__name__)
 
+MEMORY_CHECKPOINT_MARKER = "__tune_memory_checkpoint__"
+
 
 class TrainableUtil:
     @staticmethod
@@ -73,6 +76,52 @@ class TrainableUtil:
         out.write(data_dict)
         return out.getvalue()
 
+    @staticmethod
+    def checkpoint_to_memory(checkpoint, trainable_state):
+        """Wraps a checkpoint dict for in-memory transport.
+
+        The checkpoint is not pickled here, so that Ray can serialize
+        numpy arrays in it out-of-band when it is put in the object store.
+        """
+        return {
+            MEMORY_CHECKPOINT_MARKER: True,
+            "checkpoint": checkpoint,
+            "trainable_state": trainable_state,
+        }
+
+    @staticmethod
+    def is_memory_checkpoint(obj):
+        """Checks if obj was created by checkpoint_to_memory."""
+        return isinstance(obj, dict) and obj.get(MEMORY_CHECKPOINT_MARKER,
+                                                 False)
+
+    @staticmethod
+    def copy_readonly_arrays(obj):
+        """Copies the read-only numpy arrays in nested dicts, lists and
+        tuples, e.g. arrays deserialized from the object store without
+        copies. Other values are returned as-is."""
+        if isinstance(obj, dict):
+            return {
+                key: TrainableUtil.copy_readonly_arrays(value)
+                for key, value in obj.items()
+            }
+        if isinstance(obj, (list, tuple)):
+            copied = [TrainableUtil.copy_readonly_arrays(v) for v in obj]
+            if isinstance(obj, list):
+                return copied
+            if hasattr(obj, "_fields"):
+                # namedtuple
+                return type(obj)(*copied)
+            return type(obj)(copied)
+        if isinstance(obj, np.ndarray) and not obj.flags.writeable:
+            return obj.copy()
+        return obj
+
+    @staticmethod
+    def is_empty_checkpoint_dir(checkpoint_dir):
+        """Checks that nothing but the checkpoint marker was written."""
+        return os.listdir(checkpoint_dir) == [".is_checkpoint"]
+
     @staticmethod
     def find_checkpoint_dir(checkpoint_path):
         """Returns the directory containing the checkpoint path.
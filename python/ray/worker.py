@@ -47,7 +47,7 @@ from ray.exceptions import (
     ObjectStoreFullError,
 )
 from ray.function_manager import FunctionActorManager
-from ray.ray_logging import setup_logger
+from ray.ray_logging import decode_log_batch, setup_logger
 from ray.utils import _random_string, check_oversized_pickle
 from ray.util.inspect import is_cython
 
@@ -905,35 +905,35 @@ def print_logs(redis_client, threads_stopped, job_id):
                     "stdout/stderr of the workers. To avoid forwarding logs "
                     "to the driver, use 'ray.init(log_to_driver=False)'.")
 
-            data = json.loads(ray.utils.decode(msg["data"]))
-
-            # Don't show logs from other drivers.
-            if data["job"] and ray.utils.binary_to_hex(
-                    job_id.binary()) != data["job"]:
-                continue
-
-            print_file = sys.stderr if data["is_err"] else sys.stdout
-
-            def color_for(data):
-                if data["pid"] == "raylet":
-                    return colorama.Fore.YELLOW
+            for data in decode_log_batch(msg["data"]):
+                # Don't show logs from other drivers.
+                if data["job"] and ray.utils.binary_to_hex(
+                        job_id.binary()) != data["job"]:
+                    continue
+
+                print_file = sys.stderr if data["is_err"] else sys.stdout
+
+                def color_for(data):
+                    if data["pid"] == "raylet":
+                        return colorama.Fore.YELLOW
+                    else:
+                        return colorama.Fore.CYAN
+
+                if data["ip"] == localhost:
+                    for line in data["lines"]:
+                        print(
+                            "{}{}(pid={}){} {}".format(
+                                colorama.Style.DIM, color_for(data),
+                                data["pid"], colorama.Style.RESET_ALL, line),
+                            file=print_file)
                 else:
-                    return colorama.Fore.CYAN
-
-            if data["ip"] == localhost:
-                for line in data["lines"]:
-                    print(
-                        "{}{}(pid={}){} {}".format(
-                            colorama.Style.DIM, color_for(data), data["pid"],
-                            colorama.Style.RESET_ALL, line),
-                        file=print_file)
-            else:
-                for line in data["lines"]:
-                    print(
-                        "{}{}(pid={}, ip={}){} {}".format(
-                            colorama.Style.DIM, color_for(data), data["pid"],
-                            data["ip"], colorama.Style.RESET_ALL, line),
-                        file=print_file)
+                    for line in data["lines"]:
+                        print(
+                            "{}{}(pid={}, ip={}){} {}".format(
+                                colorama.Style.DIM, color_for(data),
+                                data["pid"], data["ip"],
+                                colorama.Style.RESET_ALL, line),
+                            file=print_file)
 
     except (OSError, redis.exceptions.ConnectionError) as e:
         logger.error(f"print_logs: {e}")
@@ -1209,6 +1209,19 @@ def connect(node,
             worker.logger_thread.daemon = True
             worker.logger_thread.start()
 
+    # Continuously sample the stacks of the tasks this worker runs. The
+    # samples are merged into flame graphs by the dashboard.
+    if mode == WORKER_MODE and ray_constants.SAMPLING_PROFILER_HZ > 0:
+        worker.sampling_profiler = profiling.SamplingProfiler()
+        worker.sampling_profiler_thread = threading.Thread(
+            target=worker.sampling_profiler.run,
+            name="ray_sampling_profiler",
+            args=(profiling.agent_reporter(
+                f"127.0.0.1:{node.metrics_agent_port}"),
+                  worker.threads_stopped))
+        worker.sampling_profiler_thread.daemon = True
+        worker.sampling_profiler_thread.start()
+
     if mode == SCRIPT_MODE:
         # Add the directory containing the script that is running to the Python
         # paths of the workers. Also add the current directory. Note that this
@@ -1255,6 +1268,8 @@ def disconnect(exiting_interpreter=False):
             worker.printer_thread.join()
         if hasattr(worker, "logger_thread"):
             worker.logger_thread.join()
+        if hasattr(worker, "sampling_profiler_thread"):
+            worker.sampling_profiler_thread.join()
         worker.threads_stopped.clear()
         worker._session_index += 1
 
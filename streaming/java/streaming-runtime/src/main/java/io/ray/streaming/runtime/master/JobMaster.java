@@ -19,9 +19,11 @@ import io.ray.streaming.runtime.master.context.JobMasterRuntimeContext;
 import io.ray.streaming.runtime.master.coordinator.CheckpointCoordinator;
 import io.ray.streaming.runtime.master.coordinator.FailoverCoordinator;
 import io.ray.streaming.runtime.master.coordinator.command.WorkerCommitReport;
+import io.ray.streaming.runtime.master.coordinator.command.WorkerMetricsReport;
 import io.ray.streaming.runtime.master.coordinator.command.WorkerRollbackRequest;
 import io.ray.streaming.runtime.master.graphmanager.GraphManager;
 import io.ray.streaming.runtime.master.graphmanager.GraphManagerImpl;
+import io.ray.streaming.runtime.master.metrics.JobMetrics;
 import io.ray.streaming.runtime.master.resourcemanager.ResourceManager;
 import io.ray.streaming.runtime.master.resourcemanager.ResourceManagerImpl;
 import io.ray.streaming.runtime.master.scheduler.JobSchedulerImpl;
@@ -56,6 +58,8 @@ public class JobMaster {
   private CheckpointCoordinator checkpointCoordinator;
   private FailoverCoordinator failoverCoordinator;
 
+  private final JobMetrics jobMetrics = new JobMetrics();
+
   public JobMaster(Map<String, String> confMap) {
     LOG.info("Creating job master with conf: {}.", confMap);
 
@@ -234,6 +238,47 @@ public class JobMaster {
     return RemoteCall.BoolResult.newBuilder().setBoolRes(ret).build().toByteArray();
   }
 
+  public byte[] reportJobWorkerMetrics(byte[] reportBytes) {
+    Boolean ret = false;
+    try {
+      RemoteCall.BaseWorkerCmd reportPb = RemoteCall.BaseWorkerCmd.parseFrom(reportBytes);
+      ActorId actorId = ActorId.fromBytes(reportPb.getActorId().toByteArray());
+      RemoteCall.WorkerMetricsReport metricsPb =
+          reportPb.getDetail().unpack(RemoteCall.WorkerMetricsReport.class);
+      WorkerMetricsReport report = new WorkerMetricsReport(
+          actorId,
+          metricsPb.getRecordsIn(),
+          metricsPb.getRecordsOut(),
+          metricsPb.getRecordsInPerSec(),
+          metricsPb.getRecordsOutPerSec(),
+          metricsPb.getProcessTimeP50Ms(),
+          metricsPb.getProcessTimeP99Ms(),
+          metricsPb.getWriteBlockedRatio(),
+          metricsPb.getReadIdleRatio());
+      ExecutionVertex exeVertex = graphManager == null ? null : getExecutionVertex(actorId);
+      if (exeVertex == null) {
+        LOG.warn("Skip metrics report of unknown actor {}.", actorId);
+      } else {
+        LOG.debug("Vertex {} reported metrics {}.", exeVertex, report);
+        jobMetrics.update(
+            exeVertex.getExecutionJobVertexName(), exeVertex.getExecutionVertexIndex(), report);
+        ret = true;
+      }
+    } catch (InvalidProtocolBufferException e) {
+      LOG.error("Parse job worker metrics report has exception.", e);
+    }
+    return RemoteCall.BoolResult.newBuilder().setBoolRes(ret).build().toByteArray();
+  }
+
+  /**
+   * Get the summary of the latest metrics reported by the job workers, one line per job vertex.
+   *
+   * @return metrics summary
+   */
+  public String getJobMetricsSummary() {
+    return jobMetrics.toString();
+  }
+
   private ExecutionVertex getExecutionVertex(ActorId id) {
     return graphManager.getExecutionGraph().getExecutionVertexByActorId(id);
   }
@@ -246,6 +291,10 @@ public class JobMaster {
     return runtimeContext;
   }
 
+  public JobMetrics getJobMetrics() {
+    return jobMetrics;
+  }
+
   public ResourceManager getResourceManager() {
     return resourceManager;
   }
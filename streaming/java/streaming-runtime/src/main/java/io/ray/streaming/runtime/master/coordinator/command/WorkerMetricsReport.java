@@ -0,0 +1,55 @@
+package io.ray.streaming.runtime.master.coordinator.command;
+
+import com.google.common.base.MoreObjects;
+import io.ray.api.id.ActorId;
+
+/**
+ * Metrics of a job worker over one report interval.
+ */
+public final class WorkerMetricsReport extends BaseWorkerCmd {
+
+  public final long recordsIn;
+  public final long recordsOut;
+  public final double recordsInPerSec;
+  public final double recordsOutPerSec;
+  public final double processTimeP50Ms;
+  public final double processTimeP99Ms;
+  /** Fraction of time blocked on writing to output channels, i.e. backpressured. */
+  public final double writeBlockedRatio;
+  /** Fraction of time waiting for input. */
+  public final double readIdleRatio;
+
+  public WorkerMetricsReport(
+      ActorId actorId,
+      long recordsIn,
+      long recordsOut,
+      double recordsInPerSec,
+      double recordsOutPerSec,
+      double processTimeP50Ms,
+      double processTimeP99Ms,
+      double writeBlockedRatio,
+      double readIdleRatio) {
+    super(actorId);
+    this.recordsIn = recordsIn;
+    this.recordsOut = recordsOut;
+    this.recordsInPerSec = recordsInPerSec;
+    this.recordsOutPerSec = recordsOutPerSec;
+    this.processTimeP50Ms = processTimeP50Ms;
+    this.processTimeP99Ms = processTimeP99Ms;
+    this.writeBlockedRatio = writeBlockedRatio;
+    this.readIdleRatio = readIdleRatio;
+  }
+
+  @Override
+  public String toString() {
+    return MoreObjects.toStringHelper(this)
+        .add("recordsInPerSec", recordsInPerSec)
+        .add("recordsOutPerSec", recordsOutPerSec)
+        .add("processTimeP50Ms", processTimeP50Ms)
+        .add("processTimeP99Ms", processTimeP99Ms)
+        .add("writeBlockedRatio", writeBlockedRatio)
+        .add("readIdleRatio", readIdleRatio)
+        .add("fromActorId", fromActorId)
+        .toString();
+  }
+}
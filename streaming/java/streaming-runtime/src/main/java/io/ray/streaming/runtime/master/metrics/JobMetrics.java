@@ -0,0 +1,39 @@
+package io.ray.streaming.runtime.master.metrics;
+
+import io.ray.streaming.runtime.master.coordinator.command.WorkerMetricsReport;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeMap;
+
+/**
+ * The latest metrics reported by the job workers, summarized per job vertex so that slow
+ * operators and skewed partitions stand out.
+ */
+public class JobMetrics {
+
+  /** Job vertex name -> execution vertex index -> latest report. */
+  private final Map<String, Map<Integer, WorkerMetricsReport>> reports = new TreeMap<>();
+
+  public synchronized void update(
+      String jobVertexName, int executionVertexIndex, WorkerMetricsReport report) {
+    reports.computeIfAbsent(jobVertexName, name -> new TreeMap<>())
+        .put(executionVertexIndex, report);
+  }
+
+  public synchronized List<VertexMetricsSummary> getSummaries() {
+    List<VertexMetricsSummary> summaries = new ArrayList<>();
+    reports.forEach((name, vertexReports) ->
+        summaries.add(VertexMetricsSummary.of(name, vertexReports)));
+    return summaries;
+  }
+
+  @Override
+  public String toString() {
+    StringBuilder builder = new StringBuilder("JobMetrics:");
+    for (VertexMetricsSummary summary : getSummaries()) {
+      builder.append("\n  ").append(summary);
+    }
+    return builder.toString();
+  }
+}
@@ -0,0 +1,121 @@
+package io.ray.streaming.runtime.master.metrics;
+
+import com.google.common.base.MoreObjects;
+import com.google.common.base.Preconditions;
+import io.ray.streaming.runtime.master.coordinator.command.WorkerMetricsReport;
+import java.util.Map;
+
+/**
+ * Metrics of a job vertex, summarized over the latest reports of its execution vertices.
+ */
+public class VertexMetricsSummary {
+
+  public final String jobVertexName;
+  public final int reportedParallelism;
+  public final double recordsInPerSec;
+  public final double recordsOutPerSec;
+  /**
+   * Input rate of the busiest execution vertex divided by the mean input rate, 1 if the input is
+   * evenly partitioned.
+   */
+  public final double inputSkew;
+  public final int busiestVertexIndex;
+  public final double maxProcessTimeP99Ms;
+  public final int slowestVertexIndex;
+  public final double maxWriteBlockedRatio;
+  public final int mostBackpressuredVertexIndex;
+  public final double meanReadIdleRatio;
+
+  private VertexMetricsSummary(
+      String jobVertexName,
+      int reportedParallelism,
+      double recordsInPerSec,
+      double recordsOutPerSec,
+      double inputSkew,
+      int busiestVertexIndex,
+      double maxProcessTimeP99Ms,
+      int slowestVertexIndex,
+      double maxWriteBlockedRatio,
+      int mostBackpressuredVertexIndex,
+      double meanReadIdleRatio) {
+    this.jobVertexName = jobVertexName;
+    this.reportedParallelism = reportedParallelism;
+    this.recordsInPerSec = recordsInPerSec;
+    this.recordsOutPerSec = recordsOutPerSec;
+    this.inputSkew = inputSkew;
+    this.busiestVertexIndex = busiestVertexIndex;
+    this.maxProcessTimeP99Ms = maxProcessTimeP99Ms;
+    this.slowestVertexIndex = slowestVertexIndex;
+    this.maxWriteBlockedRatio = maxWriteBlockedRatio;
+    this.mostBackpressuredVertexIndex = mostBackpressuredVertexIndex;
+    this.meanReadIdleRatio = meanReadIdleRatio;
+  }
+
+  /**
+   * Summarizes the reports of the execution vertices of a job vertex.
+   *
+   * @param jobVertexName name of the job vertex
+   * @param reports execution vertex index -> latest report
+   */
+  public static VertexMetricsSummary of(
+      String jobVertexName, Map<Integer, WorkerMetricsReport> reports) {
+    Preconditions.checkArgument(!reports.isEmpty(), "No reports of %s.", jobVertexName);
+    double recordsInPerSec = 0;
+    double recordsOutPerSec = 0;
+    double readIdleRatio = 0;
+    int busiest = -1;
+    int slowest = -1;
+    int mostBackpressured = -1;
+    for (Map.Entry<Integer, WorkerMetricsReport> entry : reports.entrySet()) {
+      int index = entry.getKey();
+      WorkerMetricsReport report = entry.getValue();
+      recordsInPerSec += report.recordsInPerSec;
+      recordsOutPerSec += report.recordsOutPerSec;
+      readIdleRatio += report.readIdleRatio;
+      if (busiest < 0 || report.recordsInPerSec > reports.get(busiest).recordsInPerSec) {
+        busiest = index;
+      }
+      if (slowest < 0 || report.processTimeP99Ms > reports.get(slowest).processTimeP99Ms) {
+        slowest = index;
+      }
+      if (mostBackpressured < 0
+          || report.writeBlockedRatio > reports.get(mostBackpressured).writeBlockedRatio) {
+        mostBackpressured = index;
+      }
+    }
+    int parallelism = reports.size();
+    double meanRecordsInPerSec = recordsInPerSec / parallelism;
+    double inputSkew = meanRecordsInPerSec > 0
+        ? reports.get(busiest).recordsInPerSec / meanRecordsInPerSec
+        : 1.0;
+    return new VertexMetricsSummary(
+        jobVertexName,
+        parallelism,
+        recordsInPerSec,
+        recordsOutPerSec,
+        inputSkew,
+        busiest,
+        reports.get(slowest).processTimeP99Ms,
+        slowest,
+        reports.get(mostBackpressured).writeBlockedRatio,
+        mostBackpressured,
+        readIdleRatio / parallelism);
+  }
+
+  @Override
+  public String toString() {
+    return MoreObjects.toStringHelper(this)
+        .add("jobVertexName", jobVertexName)
+        .add("reportedParallelism", reportedParallelism)
+        .add("recordsInPerSec", recordsInPerSec)
+        .add("recordsOutPerSec", recordsOutPerSec)
+        .add("inputSkew", inputSkew)
+        .add("busiestVertexIndex", busiestVertexIndex)
+        .add("maxProcessTimeP99Ms", maxProcessTimeP99Ms)
+        .add("slowestVertexIndex", slowestVertexIndex)
+        .add("maxWriteBlockedRatio", maxWriteBlockedRatio)
+        .add("mostBackpressuredVertexIndex", mostBackpressuredVertexIndex)
+        .add("meanReadIdleRatio", meanReadIdleRatio)
+        .toString();
+  }
+}
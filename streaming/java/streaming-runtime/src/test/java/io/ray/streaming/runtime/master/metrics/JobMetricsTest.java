@@ -0,0 +1,46 @@
+package io.ray.streaming.runtime.master.metrics;
+
+import io.ray.api.id.ActorId;
+import io.ray.streaming.runtime.BaseUnitTest;
+import io.ray.streaming.runtime.master.coordinator.command.WorkerMetricsReport;
+import java.util.List;
+import org.testng.Assert;
+import org.testng.annotations.Test;
+
+public class JobMetricsTest extends BaseUnitTest {
+
+  private static WorkerMetricsReport report(
+      double recordsInPerSec, double processTimeP99Ms, double writeBlockedRatio) {
+    return new WorkerMetricsReport(ActorId.NIL, 0, 0, recordsInPerSec, recordsInPerSec,
+        processTimeP99Ms / 10, processTimeP99Ms, writeBlockedRatio, 0.5);
+  }
+
+  @Test
+  public void testSummaries() {
+    JobMetrics jobMetrics = new JobMetrics();
+    jobMetrics.update("1-SourceOperator", 0, report(100, 1, 0.8));
+    jobMetrics.update("2-MapOperator", 0, report(10, 50, 0));
+    jobMetrics.update("2-MapOperator", 1, report(90, 5, 0));
+    jobMetrics.update("2-MapOperator", 2, report(20, 5, 0.1));
+    // The latest report of a vertex replaces the previous one.
+    jobMetrics.update("2-MapOperator", 0, report(10, 1, 0));
+
+    List<VertexMetricsSummary> summaries = jobMetrics.getSummaries();
+    Assert.assertEquals(summaries.size(), 2);
+    VertexMetricsSummary source = summaries.get(0);
+    Assert.assertEquals(source.jobVertexName, "1-SourceOperator");
+    Assert.assertEquals(source.inputSkew, 1.0);
+    Assert.assertEquals(source.maxWriteBlockedRatio, 0.8);
+
+    VertexMetricsSummary map = summaries.get(1);
+    Assert.assertEquals(map.reportedParallelism, 3);
+    Assert.assertEquals(map.recordsInPerSec, 120.0);
+    Assert.assertEquals(map.inputSkew, 90.0 / 40.0);
+    Assert.assertEquals(map.busiestVertexIndex, 1);
+    Assert.assertEquals(map.maxProcessTimeP99Ms, 5.0);
+    Assert.assertEquals(map.slowestVertexIndex, 1);
+    Assert.assertEquals(map.mostBackpressuredVertexIndex, 2);
+    Assert.assertEquals(map.meanReadIdleRatio, 0.5);
+    Assert.assertTrue(jobMetrics.toString().contains("2-MapOperator"));
+  }
+}
@@ -0,0 +1,64 @@
+"""Measures the records per second an OutputCollector writes and a reader
+deserializes, with and without batching.
+
+Usage: python collector_benchmark.py [num_records]
+"""
+import sys
+import time
+import types
+
+from ray import Language
+from ray.streaming import message
+from ray.streaming import partition
+from ray.streaming.collector import OutputCollector
+from ray.streaming.runtime import serialization
+from ray.streaming.runtime.transfer import ChannelID
+
+
+class MockWriter:
+    def __init__(self):
+        self.messages = []
+
+    def write(self, channel_id, item):
+        self.messages.append(item)
+
+
+def run(num_records, batch_max_records):
+    writer = MockWriter()
+    channel_ids = [ChannelID.gen_id(0, 1, 0)]
+    actors = [types.SimpleNamespace(_ray_actor_language=Language.PYTHON)]
+    collector = OutputCollector(
+        writer,
+        channel_ids,
+        actors,
+        partition.ForwardPartition(),
+        batch_max_records=batch_max_records)
+    records = [message.Record(i) for i in range(num_records)]
+
+    start = time.perf_counter()
+    for record in records:
+        collector.collect(record)
+    collector.flush()
+    write_time = time.perf_counter() - start
+
+    serializer = serialization.PythonSerializer()
+    start = time.perf_counter()
+    num_read = 0
+    for data in writer.messages:
+        num_read += len(serializer.deserialize_batch(data))
+    read_time = time.perf_counter() - start
+    assert num_read == num_records
+    return num_records / write_time, num_records / read_time
+
+
+def main():
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for batch_max_records in [1, 10, 100, 1000]:
+        write_rate, read_rate = run(num_records, batch_max_records)
+        print("batch_max_records={}: write {:.0f} records/s, "
+              "read {:.0f} records/s".format(batch_max_records, write_rate,
+                                             read_rate))
+
+
+if __name__ == "__main__":
+    main()
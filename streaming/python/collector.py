@@ -1,4 +1,5 @@
 import logging
+import time
 import typing
 from abc import ABC, abstractmethod
 
@@ -7,6 +8,7 @@ from ray.actor import ActorHandle
 from ray.streaming import function
 from ray.streaming import message
 from ray.streaming import partition
+from ray.streaming.config import Config
 from ray.streaming.runtime import serialization
 from ray.streaming.runtime.transfer import ChannelID, DataWriter
 
@@ -23,6 +25,14 @@ class Collector(ABC):
     def collect(self, record):
         pass
 
+    def flush(self):
+        """Emits the buffered records."""
+        pass
+
+    def flush_expired(self):
+        """Emits the buffered records if they waited too long."""
+        pass
+
 
 class CollectionCollector(Collector):
     def __init__(self, collector_list):
@@ -34,10 +44,37 @@ class CollectionCollector(Collector):
 
 
 class OutputCollector(Collector):
-    def __init__(self, writer: DataWriter, channel_ids: typing.List[str],
+    """
+    Writes records to the channels of downstream workers.
+
+    Records for python workers are buffered per channel and written as batch
+    messages, see :meth:`PythonSerializer.serialize_batch`. A batch is
+    written when it has `batch_max_records` records, when its oldest record
+    waited `batch_max_delay_ms`, or when :meth:`flush` is called, e.g.
+    before a checkpoint barrier. Records are serialized when their batch is
+    written, so values must not be mutated after they are collected.
+    Records for java workers are written one by one in the cross-language
+    format.
+
+    A :class:`message.RecordBatch` is split by
+    :meth:`partition.Partition.partition_batch` and written to python workers
+    as a whole, so its numpy arrays are serialized at once.
+
+    If `metrics` is given, the written records and the time blocked in
+    `DataWriter.write` are recorded to it, see
+    :class:`runtime.metrics.TaskMetrics`.
+    """
+
+    def __init__(self,
+                 writer: DataWriter,
+                 channel_ids: typing.List[str],
                  target_actors: typing.List[ActorHandle],
-                 partition_func: partition.Partition):
+                 partition_func: partition.Partition,
+                 batch_max_records: int = Config.BATCH_MAX_RECORDS_DEFAULT,
+                 batch_max_delay_ms: int = Config.BATCH_MAX_DELAY_MS_DEFAULT,
+                 metrics=None):
         self._writer = writer
+        self._metrics = metrics
         self._channel_ids = [ChannelID(id_str) for id_str in channel_ids]
         self._target_languages = []
         for actor in target_actors:
@@ -49,6 +86,14 @@ class OutputCollector(Collector):
                 raise Exception("Unsupported language {}"
                                 .format(actor._ray_actor_language))
         self._partition_func = partition_func
+        self._batch_max_records = batch_max_records
+        self._batch_max_delay_s = batch_max_delay_ms / 1000
+        # Records and record batches buffered for each python channel.
+        self._python_batches = [[] for _ in self._channel_ids]
+        # Number of records buffered for each python channel.
+        self._python_batch_sizes = [0] * len(self._channel_ids)
+        # When the oldest buffered record was collected.
+        self._oldest_batch_time = None
         self.python_serializer = serialization.PythonSerializer()
         self.cross_lang_serializer = serialization.CrossLangSerializer()
         logger.info(
@@ -56,25 +101,89 @@ class OutputCollector(Collector):
                 channel_ids, partition_func))
 
     def collect(self, record):
+        if isinstance(record, message.RecordBatch):
+            self._collect_batch(record)
+            return
+        if isinstance(record, message.Watermark):
+            self._collect_watermark(record)
+            return
         partitions = self._partition_func \
             .partition(record, len(self._channel_ids))
-        python_buffer = None
         cross_lang_buffer = None
         for partition_index in partitions:
             if self._target_languages[partition_index] == \
                     function.Language.PYTHON:
-                # avoid repeated serialization
-                if python_buffer is None:
-                    python_buffer = self.python_serializer.serialize(record)
-                self._writer.write(
-                    self._channel_ids[partition_index],
-                    bytes([serialization.PYTHON_TYPE_ID]) + python_buffer)
+                self._buffer(partition_index, record, 1)
             else:
                 # avoid repeated serialization
                 if cross_lang_buffer is None:
                     cross_lang_buffer = self.cross_lang_serializer.serialize(
                         record)
-                self._writer.write(
-                    self._channel_ids[partition_index],
+                self._write(
+                    partition_index,
                     bytes([serialization.CROSS_LANG_TYPE_ID]) +
-                    cross_lang_buffer)
+                    cross_lang_buffer, 1)
+        self.flush_expired()
+
+    def _collect_batch(self, record_batch):
+        for partition_index, batch in self._partition_func.partition_batch(
+                record_batch, len(self._channel_ids)):
+            if len(batch) == 0:
+                continue
+            if self._target_languages[partition_index] == \
+                    function.Language.PYTHON:
+                self._buffer(partition_index, batch, len(batch))
+            else:
+                for record in batch.records():
+                    self._write(
+                        partition_index,
+                        bytes([serialization.CROSS_LANG_TYPE_ID]) +
+                        self.cross_lang_serializer.serialize(record), 1)
+        self.flush_expired()
+
+    def _collect_watermark(self, watermark):
+        # Every downstream task tracks the watermark of each input channel.
+        # Java workers don't process watermarks.
+        for partition_index, language in enumerate(self._target_languages):
+            if language == function.Language.PYTHON:
+                self._buffer(partition_index, watermark, 0)
+        self.flush_expired()
+
+    def _buffer(self, partition_index, item, num_records):
+        self._python_batches[partition_index].append(item)
+        self._python_batch_sizes[partition_index] += num_records
+        if self._python_batch_sizes[partition_index] >= \
+                self._batch_max_records:
+            self._flush_channel(partition_index)
+        elif self._oldest_batch_time is None:
+            self._oldest_batch_time = time.monotonic()
+
+    def flush(self):
+        for partition_index, batch in enumerate(self._python_batches):
+            if batch:
+                self._flush_channel(partition_index)
+        self._oldest_batch_time = None
+
+    def flush_expired(self):
+        if self._oldest_batch_time is not None and \
+                time.monotonic() - self._oldest_batch_time >= \
+                self._batch_max_delay_s:
+            self.flush()
+
+    def _flush_channel(self, partition_index):
+        self._write(
+            partition_index,
+            self.python_serializer.serialize_batch(
+                self._python_batches[partition_index]),
+            self._python_batch_sizes[partition_index])
+        self._python_batches[partition_index] = []
+        self._python_batch_sizes[partition_index] = 0
+
+    def _write(self, partition_index, data, num_records):
+        if self._metrics is None:
+            self._writer.write(self._channel_ids[partition_index], data)
+            return
+        start = time.perf_counter()
+        self._writer.write(self._channel_ids[partition_index], data)
+        self._metrics.write_blocked_s += time.perf_counter() - start
+        self._metrics.records_out += num_records
@@ -17,6 +17,20 @@ class Config:
     # write an empty message if there is no data to be written in this
     # interval.
     STREAMING_EMPTY_MESSAGE_INTERVAL = "streaming.empty_message_interval"
+    # records written to python workers are sent in batches of at most this
+    # many records, or after the oldest record waited this long.
+    BATCH_MAX_RECORDS = "streaming.batch.max_records"
+    BATCH_MAX_RECORDS_DEFAULT = 1000
+    BATCH_MAX_DELAY_MS = "streaming.batch.max_delay_ms"
+    BATCH_MAX_DELAY_MS_DEFAULT = 10
+    # task metrics are exported and reported to the job master this often,
+    # see runtime/metrics.py. 0 disables them.
+    METRICS_REPORT_INTERVAL_MS = "streaming.metrics.report_interval_ms"
+    METRICS_REPORT_INTERVAL_MS_DEFAULT = 5000
+    # input channels which sent nothing for this long don't hold back the
+    # watermark of a task until they send again.
+    WATERMARK_IDLE_TIMEOUT_MS = "streaming.watermark.idle_timeout_ms"
+    WATERMARK_IDLE_TIMEOUT_MS_DEFAULT = 10000
 
     # operator type
     OPERATOR_TYPE = "operator_type"
@@ -32,6 +46,16 @@ class Config:
     CP_STATE_BACKEND_LOCAL_FILE = "local_file"
     CP_STATE_BACKEND_DEFAULT = CP_STATE_BACKEND_MEMORY
 
+    # keyed state of operators, see runtime/state_backend.py. A full snapshot
+    # is written every this many checkpoints, only changed keys in between.
+    STATE_SNAPSHOT_INTERVAL = "streaming.state.snapshot_interval"
+    STATE_SNAPSHOT_INTERVAL_DEFAULT = 10
+    # keys beyond this many are spilled to disk, 0 keeps all keys in memory.
+    STATE_MAX_MEMORY_KEYS = "streaming.state.max_memory_keys"
+    STATE_MAX_MEMORY_KEYS_DEFAULT = 0
+    # directory of spilled keys, the system temp directory by default.
+    STATE_SPILL_DIR = "streaming.state.spill_dir"
+
     # local disk
     FILE_STATE_ROOT_PATH = "streaming.context-backend.file-state.root"
     FILE_STATE_ROOT_PATH_DEFAULT = "/tmp/ray_streaming_state"
@@ -44,6 +68,7 @@ class Config:
 
     # checkpoint prefix key
     JOB_WORKER_OP_CHECKPOINT_PREFIX_KEY = "jobwk_op_"
+    JOB_WORKER_OP_STATE_PREFIX_KEY = "jobwk_state_"
 
 
 class ConfigHelper(object):
@@ -4,6 +4,7 @@ from ray.streaming.datastream import StreamSource
 from ray.streaming.function import LocalFileSourceFunction
 from ray.streaming.function import CollectionSourceFunction
 from ray.streaming.function import SourceFunction
+from ray.streaming.runtime.context_backend import MemoryContextBackend
 from ray.streaming.runtime.gateway_client import GatewayClient
 
 
@@ -167,6 +168,23 @@ class RuntimeContext(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_checkpoint_id(self):
+        """
+        Returns:
+            The id of the checkpoint being taken, or of the last checkpoint.
+        """
+        pass
+
+    @abstractmethod
+    def get_context_backend(self):
+        """
+        Returns:
+            The :class:`ray.streaming.runtime.context_backend.ContextBackend`
+            that operators store their state checkpoints in.
+        """
+        pass
+
 
 class RuntimeContextImpl(RuntimeContext):
     def __init__(self, task_id, task_index, parallelism, **kargs):
@@ -175,6 +193,9 @@ class RuntimeContextImpl(RuntimeContext):
         self.parallelism = parallelism
         self.config = kargs.get("config", {})
         self.job_config = kargs.get("job_config", {})
+        self.checkpoint_id = kargs.get("checkpoint_id", 0)
+        self.context_backend = kargs.get("context_backend") or \
+            MemoryContextBackend(self.job_config)
 
     def get_task_id(self):
         return self.task_id
@@ -190,3 +211,12 @@ class RuntimeContextImpl(RuntimeContext):
 
     def get_job_config(self):
         return self.job_config
+
+    def get_checkpoint_id(self):
+        return self.checkpoint_id
+
+    def set_checkpoint_id(self, checkpoint_id):
+        self.checkpoint_id = checkpoint_id
+
+    def get_context_backend(self):
+        return self.context_backend
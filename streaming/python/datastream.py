@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 from ray.streaming import function
 from ray.streaming import partition
+from ray.streaming import window
 
 
 class Stream(ABC):
@@ -194,6 +195,63 @@ class DataStream(Stream):
             call_method(self._j_stream, "filter", j_func)
         return DataStream(self, j_stream)
 
+    def map_batches(self, func, batch_format="numpy"):
+        """
+        Applies a vectorized Map transformation on a :class:`DataStream`.
+        The transformation calls a
+        :class:`ray.streaming.function.MapBatchesFunction` for each batch of
+        elements of the DataStream, see
+        :class:`ray.streaming.operator.BatchOperator` for how elements are
+        batched. The result batches are passed as a whole to succeeding
+        batch transformations. `func` can modify the numpy arrays of a batch
+        in place.
+
+        Args:
+            func: The MapBatchesFunction that is called for each batch of
+            elements. If `func` is a python function instead of a subclass
+            of MapBatchesFunction, it will be wrapped as
+            SimpleMapBatchesFunction.
+            batch_format: The format of the batches passed to a python
+            function `func`, "numpy" or "list".
+
+        Returns:
+            A new data stream transformed by the MapBatchesFunction.
+        """
+        if not isinstance(func, function.MapBatchesFunction):
+            func = function.SimpleMapBatchesFunction(func, batch_format)
+        j_func = self._gateway_client().create_py_func(
+            function.serialize(func))
+        j_stream = self._gateway_client(). \
+            call_method(self._j_stream, "map", j_func)
+        return DataStream(self, j_stream)
+
+    def filter_batches(self, func, batch_format="numpy"):
+        """
+        Applies a vectorized Filter transformation on a :class:`DataStream`.
+        The transformation calls a
+        :class:`ray.streaming.function.FilterBatchesFunction` for each batch
+        of elements of the DataStream and retains only those elements for
+        which the returned mask is True.
+
+        Args:
+            func: The FilterBatchesFunction that is called for each batch of
+            elements. If `func` is a python function instead of a subclass of
+            FilterBatchesFunction, it will be wrapped as
+            SimpleFilterBatchesFunction.
+            batch_format: The format of the batches passed to a python
+            function `func`, "numpy" or "list".
+
+        Returns:
+            The filtered DataStream
+        """
+        if not isinstance(func, function.FilterBatchesFunction):
+            func = function.SimpleFilterBatchesFunction(func, batch_format)
+        j_func = self._gateway_client().create_py_func(
+            function.serialize(func))
+        j_stream = self._gateway_client(). \
+            call_method(self._j_stream, "filter", j_func)
+        return DataStream(self, j_stream)
+
     def union(self, *streams):
         """Apply union transformations to this stream by merging data stream
          outputs of the same type with each other.
@@ -229,6 +287,31 @@ class DataStream(Stream):
             function.serialize(func))
         j_stream = self._gateway_client(). \
             call_method(self._j_stream, "keyBy", j_func)
+        return KeyDataStream(self, j_stream, func)
+
+    def key_by_batches(self, func, batch_format="numpy"):
+        """
+        Creates a new :class:`KeyDataStream` that uses the keys extracted by
+        a vectorized key function to partition data stream by key.
+
+        Args:
+            func: The KeyBatchesFunction that is called for each batch of
+            elements to extract their keys. If `func` is a python function
+            instead of a subclass of KeyBatchesFunction, it will be wrapped as
+            SimpleKeyBatchesFunction.
+            batch_format: The format of the batches passed to a python
+            function `func`, "numpy" or "list".
+
+        Returns:
+             A KeyDataStream
+        """
+        self._check_partition_call()
+        if not isinstance(func, function.KeyBatchesFunction):
+            func = function.SimpleKeyBatchesFunction(func, batch_format)
+        j_func = self._gateway_client().create_py_func(
+            function.serialize(func))
+        j_stream = self._gateway_client(). \
+            call_method(self._j_stream, "keyBy", j_func)
         return KeyDataStream(self, j_stream)
 
     def broadcast(self):
@@ -396,8 +479,9 @@ class KeyDataStream(DataStream):
      Wrapper of java io.ray.streaming.python.stream.PythonKeyDataStream
     """
 
-    def __init__(self, input_stream, j_stream):
+    def __init__(self, input_stream, j_stream, key_func=None):
         super().__init__(input_stream, j_stream)
+        self.key_func = key_func
 
     def reduce(self, func):
         """
@@ -424,6 +508,35 @@ class KeyDataStream(DataStream):
             call_method(self._j_stream, "reduce", j_func)
         return DataStream(self, j_stream)
 
+    def window(self,
+               window_assigner: window.WindowAssigner,
+               timestamp_func,
+               max_out_of_orderness=0):
+        """
+        Groups the elements of each key into event time windows.
+
+        The remaining windows are closed when bounded sources finish. Input
+        channels which sent nothing for `streaming.watermark.idle_timeout_ms`
+        don't hold back the windows until they send again.
+
+        Args:
+            window_assigner: A :class:`ray.streaming.window.WindowAssigner`,
+            such as TumblingWindows or SlidingWindows.
+            timestamp_func: A python function which returns the event time of
+            an element.
+            max_out_of_orderness: How much the event time of an element can
+            be behind the largest event time seen before it. Later elements
+            are dropped.
+
+        Returns:
+             A WindowedStream.
+        """
+        if self.key_func is None:
+            raise Exception("Windows are only supported on streams keyed by "
+                            "a python key function.")
+        return WindowedStream(self, window_assigner, timestamp_func,
+                              max_out_of_orderness)
+
     def as_java_stream(self):
         """
         Convert this stream as a java KeyDataStream.
@@ -462,6 +575,57 @@ class JavaKeyDataStream(JavaDataStream):
         return KeyDataStream(self, j_stream)
 
 
+class WindowedStream:
+    """Represents a KeyDataStream grouped into event time windows."""
+
+    def __init__(self, key_stream, window_assigner, timestamp_func,
+                 max_out_of_orderness):
+        self.key_stream = key_stream
+        self.window_assigner = window_assigner
+        self.timestamp_func = timestamp_func
+        self.max_out_of_orderness = max_out_of_orderness
+
+    def aggregate(self, func):
+        """
+        Aggregates the elements of each key and window. A
+        `(key, window, result)` element is emitted for each key of a window
+        when the watermark passes the end of the window.
+
+        The elements are pre-aggregated in the key_by tasks, so only one
+        accumulator per key and window goes through the key partition
+        shuffle.
+
+        Args:
+            func: The AggregateFunction of the elements. If `func` is a python
+            function instead of a subclass of AggregateFunction, it will be
+            wrapped as SimpleAggregateFunction, which combines two elements
+            into one.
+
+        Returns:
+            A DataStream of the window results.
+        """
+        if not isinstance(func, function.AggregateFunction):
+            func = function.SimpleAggregateFunction(func)
+        key_stream = self.key_stream
+        gateway_client = key_stream._gateway_client()
+        # The combiner replaces the key function of the key stream.
+        combine_func = function.WindowCombineFunction(
+            key_stream.key_func, self.window_assigner, self.timestamp_func,
+            func, self.max_out_of_orderness)
+        j_combine_stream = gateway_client.call_method(
+            key_stream.input_stream._j_stream, "keyBy",
+            gateway_client.create_py_func(function.serialize(combine_func)))
+        gateway_client.call_method(j_combine_stream, "setParallelism",
+                                   key_stream.get_parallelism())
+        combine_stream = KeyDataStream(key_stream.input_stream,
+                                       j_combine_stream)
+        merge_func = function.WindowMergeFunction(func)
+        j_stream = gateway_client.call_method(
+            j_combine_stream, "reduce",
+            gateway_client.create_py_func(function.serialize(merge_func)))
+        return DataStream(combine_stream, j_stream)
+
+
 class UnionStream(DataStream):
     """Represents a union stream.
      Wrapper of java io.ray.streaming.python.stream.PythonUnionStream
@@ -70,6 +70,10 @@ class SourceFunction(Function):
         """
         pass
 
+    def is_finished(self):
+        """Returns True once a bounded source emitted all its elements."""
+        return False
+
     def close(self):
         pass
 
@@ -178,6 +182,137 @@ class SinkFunction(Function):
         pass
 
 
+class MapBatchesFunction(Function):
+    """
+    Base interface for vectorized Map functions. Map batches functions take
+    a batch of elements in `batch_format` and transform it into a batch of
+    result elements.
+    """
+
+    batch_format = "numpy"
+
+    @abstractmethod
+    def map_batches(self, batch):
+        """
+        Args:
+            batch: The input elements, see
+             :meth:`ray.streaming.message.RecordBatch.to_format`.
+
+        Returns:
+            The result elements, as a list, a numpy array or a dict of numpy
+            arrays.
+        """
+        pass
+
+
+class FilterBatchesFunction(Function):
+    """
+    A vectorized filter function, which evaluates the predicate on a batch of
+    elements in `batch_format`.
+    """
+
+    batch_format = "numpy"
+
+    @abstractmethod
+    def filter_batches(self, batch):
+        """
+        Args:
+            batch: The elements to be filtered.
+
+        Returns:
+            A boolean mask, True for elements that should be retained.
+        """
+        pass
+
+
+class KeyBatchesFunction(Function):
+    """
+    A vectorized key function, which extracts the keys of a batch of elements
+    in `batch_format`.
+    """
+
+    batch_format = "numpy"
+
+    @abstractmethod
+    def key_by_batches(self, batch):
+        """
+        Args:
+            batch: The elements to get the keys from.
+
+        Returns:
+            The key of each element.
+        """
+        pass
+
+
+class AggregateFunction(Function):
+    """
+    Base interface for aggregations of windows. Values are added to an
+    accumulator, and accumulators of the same window and key are merged.
+    """
+
+    @abstractmethod
+    def create_accumulator(self):
+        """Creates an accumulator of no values."""
+        pass
+
+    @abstractmethod
+    def add(self, accumulator, value):
+        """Adds a value to an accumulator, and returns the accumulator."""
+        pass
+
+    @abstractmethod
+    def merge(self, accumulator1, accumulator2):
+        """Merges two accumulators, and returns the merged accumulator."""
+        pass
+
+    @abstractmethod
+    def get_result(self, accumulator):
+        """Returns the aggregated value of an accumulator."""
+        pass
+
+
+class WindowCombineFunction(Function):
+    """
+    Pre-aggregates the values of each key and window before the key partition
+    shuffle. Created by :meth:`ray.streaming.datastream.WindowedStream
+    .aggregate`.
+    """
+
+    def __init__(self, key_func, window_assigner, timestamp_func,
+                 aggregate_func, max_out_of_orderness):
+        self.key_func = key_func
+        self.window_assigner = window_assigner
+        self.timestamp_func = timestamp_func
+        self.aggregate_func = aggregate_func
+        self.max_out_of_orderness = max_out_of_orderness
+
+    def open(self, runtime_context):
+        self.key_func.open(runtime_context)
+        self.aggregate_func.open(runtime_context)
+
+    def close(self):
+        self.key_func.close()
+        self.aggregate_func.close()
+
+
+class WindowMergeFunction(Function):
+    """
+    Merges the pre-aggregated values of each key and window after the key
+    partition shuffle. Created by :meth:`ray.streaming.datastream
+    .WindowedStream.aggregate`.
+    """
+
+    def __init__(self, aggregate_func):
+        self.aggregate_func = aggregate_func
+
+    def open(self, runtime_context):
+        self.aggregate_func.open(runtime_context)
+
+    def close(self):
+        self.aggregate_func.close()
+
+
 class CollectionSourceFunction(SourceFunction):
     def __init__(self, values):
         self.values = values
@@ -190,6 +325,9 @@ class CollectionSourceFunction(SourceFunction):
             ctx.collect(v)
         self.values = []
 
+    def is_finished(self):
+        return not self.values
+
 
 class LocalFileSourceFunction(SourceFunction):
     def __init__(self, filename):
@@ -209,6 +347,9 @@ class LocalFileSourceFunction(SourceFunction):
                 line = f.readline()
             self.done = True
 
+    def is_finished(self):
+        return self.done
+
 
 class SimpleMapFunction(MapFunction):
     def __init__(self, func):
@@ -292,6 +433,61 @@ class SimpleSinkFunction(SinkFunction):
         return self.func(value)
 
 
+class SimpleMapBatchesFunction(MapBatchesFunction):
+    def __init__(self, func, batch_format="numpy"):
+        self.func = func
+        self.batch_format = batch_format
+
+    def map_batches(self, batch):
+        return self.func(batch)
+
+
+class SimpleFilterBatchesFunction(FilterBatchesFunction):
+    def __init__(self, func, batch_format="numpy"):
+        self.func = func
+        self.batch_format = batch_format
+
+    def filter_batches(self, batch):
+        return self.func(batch)
+
+
+class SimpleKeyBatchesFunction(KeyBatchesFunction):
+    def __init__(self, func, batch_format="numpy"):
+        self.func = func
+        self.batch_format = batch_format
+
+    def key_by_batches(self, batch):
+        return self.func(batch)
+
+
+class SimpleAggregateFunction(AggregateFunction):
+    """
+    Wrap a python function which combines two values into one value of the
+    same type as :class:`AggregateFunction`.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def create_accumulator(self):
+        return []
+
+    def add(self, accumulator, value):
+        if not accumulator:
+            return [value]
+        return [self.func(accumulator[0], value)]
+
+    def merge(self, accumulator1, accumulator2):
+        if not accumulator1:
+            return accumulator2
+        if not accumulator2:
+            return accumulator1
+        return [self.func(accumulator1[0], accumulator2[0])]
+
+    def get_result(self, accumulator):
+        return accumulator[0]
+
+
 def serialize(func: Function):
     """Serialize a streaming :class:`Function`"""
     return cloudpickle.dumps(func)
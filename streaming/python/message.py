@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Record:
     """Data record in data stream"""
 
@@ -32,3 +35,133 @@ class KeyRecord(Record):
 
     def __hash__(self):
         return hash((self.stream, self.key, self.value))
+
+
+# The watermark of a finished stream.
+MAX_TIMESTAMP = float("inf")
+
+
+class Watermark:
+    """
+    Event time progress in data stream: no more records with an event time
+    before `timestamp` follow. Sources emit a watermark of MAX_TIMESTAMP when
+    they finish.
+    """
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return "Watermark({})".format(self.timestamp)
+
+    def __eq__(self, other):
+        if type(self) is type(other):
+            return self.timestamp == other.timestamp
+        return False
+
+    def __hash__(self):
+        return hash(self.timestamp)
+
+
+class RecordBatch:
+    """A batch of records in data stream, produced by batch operators.
+
+    `values` is a list, a numpy array whose first axis indexes the records,
+    or a dict of equal length numpy arrays, one per column. `keys` is None,
+    or the key of each record if the batch belongs to a keyed data stream.
+    """
+
+    def __init__(self, values, keys=None):
+        self.values = values
+        self.keys = keys
+        self.stream = None
+
+    @staticmethod
+    def from_records(records):
+        return RecordBatch([record.value for record in records])
+
+    def __len__(self):
+        if isinstance(self.values, dict):
+            return len(next(iter(self.values.values()), ()))
+        return len(self.values)
+
+    def __repr__(self):
+        return "RecordBatch({}, keys={})".format(self.values, self.keys)
+
+    def to_format(self, batch_format):
+        """Returns the values in `batch_format`.
+
+        Args:
+            batch_format: "numpy" for a numpy array, or a dict of numpy
+             arrays if values are dicts, or "list" for a list of values.
+        """
+        if batch_format == "list":
+            return [record.value for record in self.records()]
+        if batch_format != "numpy":
+            raise ValueError(
+                "Unsupported batch format {}".format(batch_format))
+        values = self.values
+        if isinstance(values, (np.ndarray, dict)):
+            return values
+        if values and isinstance(values[0], dict):
+            return {
+                column: np.asarray([value[column] for value in values])
+                for column in values[0]
+            }
+        return np.asarray(values)
+
+    def take(self, selection):
+        """Returns a batch of the selected records.
+
+        Args:
+            selection: a boolean mask or an array of record indices.
+        """
+        indices = np.asarray(selection)
+        if indices.dtype == np.bool_:
+            assert len(indices) == len(self), \
+                "Mask length {} doesn't match batch size {}".format(
+                    len(indices), len(self))
+            indices = np.flatnonzero(indices)
+        batch = RecordBatch(
+            _take(self.values, indices), None
+            if self.keys is None else _take(self.keys, indices))
+        batch.stream = self.stream
+        return batch
+
+    def records(self):
+        """Returns the records of this batch with python values, as
+         :class:`Record` or :class:`KeyRecord` objects."""
+        values = self.values
+        if isinstance(values, dict):
+            columns = [_to_list(column) for column in values.values()]
+            values = [dict(zip(values, row)) for row in zip(*columns)]
+        else:
+            values = _to_list(values)
+        if self.keys is None:
+            records = [Record(value) for value in values]
+        else:
+            records = [
+                KeyRecord(key, value)
+                for key, value in zip(_to_list(self.keys), values)
+            ]
+        if self.stream is not None:
+            for record in records:
+                record.stream = self.stream
+        return records
+
+
+def _take(values, indices):
+    if isinstance(values, dict):
+        return {
+            column: np.asarray(array)[indices]
+            for column, array in values.items()
+        }
+    if isinstance(values, np.ndarray):
+        return values[indices]
+    return [values[i] for i in indices]
+
+
+def _to_list(values):
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
@@ -1,17 +1,26 @@
 import enum
 import importlib
 import logging
+import time
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from ray.streaming import function
 from ray.streaming import message
 from ray.streaming.collector import Collector
 from ray.streaming.collector import CollectionCollector
+from ray.streaming.config import Config
 from ray.streaming.function import SourceFunction
 from ray.streaming.runtime import gateway_client
+from ray.streaming.runtime.context_backend import NamespacedContextBackend
+from ray.streaming.runtime.state_backend import KeyedStateBackend
 
 logger = logging.getLogger(__name__)
 
+# Returned by a state lookup of a missing key.
+_NO_VALUE = object()
+
 
 class OperatorType(enum.Enum):
     SOURCE = 0  # Sources are where your program reads its input from
@@ -49,6 +58,19 @@ class Operator(ABC):
     def load_checkpoint(self, checkpoint_obj):
         pass
 
+    def flush(self):
+        """Processes the buffered records."""
+        pass
+
+    def flush_expired(self):
+        """Processes the buffered records if they waited too long."""
+        pass
+
+    def clear_expired_checkpoint(self, checkpoint_id):
+        """Removes the state that only checkpoints up to `checkpoint_id`
+         need."""
+        pass
+
 
 class OneInputOperator(Operator, ABC):
     """Interface for stream operators with one input."""
@@ -57,6 +79,12 @@ class OneInputOperator(Operator, ABC):
     def process_element(self, record):
         pass
 
+    def process_batch(self, batch: message.RecordBatch):
+        """Processes the records of a batch. Operators which can process a
+         batch at once override this."""
+        for record in batch.records():
+            self.process_element(record)
+
     def operator_type(self):
         return OperatorType.ONE_INPUT
 
@@ -99,8 +127,12 @@ class StreamOperator(Operator, ABC):
         for collector in self.collectors:
             collector.collect(record)
 
+    def process_watermark(self, watermark: message.Watermark):
+        """Processes event time progress, and forwards it by default."""
+        self.collect(watermark)
+
     def save_checkpoint(self):
-        self.func.save_checkpoint()
+        return self.func.save_checkpoint()
 
     def load_checkpoint(self, checkpoint_obj):
         self.func.load_checkpoint(checkpoint_obj)
@@ -129,6 +161,7 @@ class SourceOperatorImpl(SourceOperator, StreamOperator):
         assert isinstance(func, function.SourceFunction)
         super().__init__(func)
         self.source_context = None
+        self.finished = False
 
     def open(self, collectors, runtime_context):
         super().open(collectors, runtime_context)
@@ -138,6 +171,10 @@ class SourceOperatorImpl(SourceOperator, StreamOperator):
 
     def fetch(self):
         self.func.fetch(self.source_context)
+        if not self.finished and self.func.is_finished():
+            # Closes the event time windows of bounded input.
+            self.finished = True
+            self.collect(message.Watermark(message.MAX_TIMESTAMP))
 
     def operator_type(self):
         return OperatorType.SOURCE
@@ -202,6 +239,123 @@ class KeyByOperator(StreamOperator, OneInputOperator):
         self.collect(message.KeyRecord(key, record.value))
 
 
+class BatchOperator(StreamOperator, OneInputOperator, ABC):
+    """
+    Base class for operators which run a function on batches of records.
+
+    Batches from upstream batch operators are processed as they are. Single
+    records are buffered until there are `streaming.batch.max_records` of
+    them, the oldest one waited `streaming.batch.max_delay_ms`, or the
+    operator is flushed, e.g. when the task is idle or before a checkpoint.
+    """
+
+    def __init__(self, func):
+        super().__init__(func)
+        self.batch_max_records = Config.BATCH_MAX_RECORDS_DEFAULT
+        self.batch_max_delay_s = Config.BATCH_MAX_DELAY_MS_DEFAULT / 1000
+        self._pending_records = []
+        self._pending_time = None
+
+    def open(self, collectors, runtime_context):
+        super().open(collectors, runtime_context)
+        # Operator config overrides job config.
+        config = dict(runtime_context.get_job_config() or {})
+        config.update(runtime_context.get_config() or {})
+        self.batch_max_records = int(
+            config.get(Config.BATCH_MAX_RECORDS,
+                       Config.BATCH_MAX_RECORDS_DEFAULT))
+        self.batch_max_delay_s = int(
+            config.get(Config.BATCH_MAX_DELAY_MS,
+                       Config.BATCH_MAX_DELAY_MS_DEFAULT)) / 1000
+
+    def process_element(self, record):
+        if not self._pending_records:
+            self._pending_time = time.monotonic()
+        self._pending_records.append(record)
+        if len(self._pending_records) >= self.batch_max_records:
+            self.flush()
+        else:
+            self.flush_expired()
+
+    def process_batch(self, batch):
+        self.flush()
+        if len(batch) > 0:
+            self.apply_batch(batch)
+
+    def process_watermark(self, watermark):
+        # Buffered records precede the watermark.
+        self.flush()
+        super().process_watermark(watermark)
+
+    def flush(self):
+        if self._pending_records:
+            batch = message.RecordBatch.from_records(self._pending_records)
+            self._pending_records = []
+            self.apply_batch(batch)
+
+    def flush_expired(self):
+        if self._pending_records and \
+                time.monotonic() - self._pending_time >= \
+                self.batch_max_delay_s:
+            self.flush()
+
+    @abstractmethod
+    def apply_batch(self, batch: message.RecordBatch):
+        """Runs the function on a non-empty batch and collects the results.
+        """
+        pass
+
+
+class MapBatchesOperator(BatchOperator):
+    """
+    Operator to run a :class:`function.MapBatchesFunction`
+    """
+
+    def __init__(self, map_batches_func: function.MapBatchesFunction):
+        assert isinstance(map_batches_func, function.MapBatchesFunction)
+        super().__init__(map_batches_func)
+
+    def apply_batch(self, batch):
+        result = message.RecordBatch(
+            self.func.map_batches(batch.to_format(self.func.batch_format)))
+        if len(result) > 0:
+            self.collect(result)
+
+
+class FilterBatchesOperator(BatchOperator):
+    """
+    Operator to run a :class:`function.FilterBatchesFunction`
+    """
+
+    def __init__(self, filter_batches_func: function.FilterBatchesFunction):
+        assert isinstance(filter_batches_func, function.FilterBatchesFunction)
+        super().__init__(filter_batches_func)
+
+    def apply_batch(self, batch):
+        mask = self.func.filter_batches(
+            batch.to_format(self.func.batch_format))
+        result = batch.take(np.asarray(mask, dtype=np.bool_))
+        if len(result) > 0:
+            self.collect(result)
+
+
+class KeyByBatchesOperator(BatchOperator):
+    """
+    Operator to run a :class:`function.KeyBatchesFunction`
+    """
+
+    def __init__(self, key_batches_func: function.KeyBatchesFunction):
+        assert isinstance(key_batches_func, function.KeyBatchesFunction)
+        super().__init__(key_batches_func)
+
+    def apply_batch(self, batch):
+        keys = self.func.key_by_batches(
+            batch.to_format(self.func.batch_format))
+        assert len(keys) == len(batch), \
+            "Got {} keys for {} records".format(len(keys), len(batch))
+        self.collect(message.RecordBatch(batch.values, keys))
+
+
 class ReduceOperator(StreamOperator, OneInputOperator):
     """
     Operator to run a :class:`function.ReduceFunction`
@@ -210,23 +364,182 @@ class ReduceOperator(StreamOperator, OneInputOperator):
     def __init__(self, reduce_func: function.ReduceFunction):
         assert isinstance(reduce_func, function.ReduceFunction)
         super().__init__(reduce_func)
-        self.reduce_state = {}
+        self.reduce_state = None
+        # Loaded before the operator is opened.
+        self._state_checkpoint = None
 
     def open(self, collectors, runtime_context):
         super().open(collectors, runtime_context)
+        config = dict(runtime_context.get_job_config() or {})
+        config.update(runtime_context.get_config() or {})
+        self.reduce_state = KeyedStateBackend(
+            runtime_context.get_context_backend(), "reduce_state", config)
+        if self._state_checkpoint is not None:
+            self.reduce_state.restore(self._state_checkpoint)
+
+    def close(self):
+        super().close()
+        self.reduce_state.close()
 
     def process_element(self, record: message.KeyRecord):
         key = record.key
         value = record.value
-        if key in self.reduce_state:
-            old_value = self.reduce_state[key]
+        old_value = self.reduce_state.get(key, _NO_VALUE)
+        if old_value is not _NO_VALUE:
             new_value = self.func.reduce(old_value, value)
-            self.reduce_state[key] = new_value
+            self.reduce_state.put(key, new_value)
             self.collect(message.Record(new_value))
         else:
-            self.reduce_state[key] = value
+            self.reduce_state.put(key, value)
             self.collect(record)
 
+    def save_checkpoint(self):
+        return (super().save_checkpoint(),
+                self.reduce_state.snapshot(
+                    self.runtime_context.get_checkpoint_id()))
+
+    def load_checkpoint(self, checkpoint_obj):
+        if checkpoint_obj is None:
+            super().load_checkpoint(None)
+            return
+        func_checkpoint, self._state_checkpoint = checkpoint_obj
+        super().load_checkpoint(func_checkpoint)
+        if self.reduce_state is not None:
+            self.reduce_state.restore(self._state_checkpoint)
+
+    def clear_expired_checkpoint(self, checkpoint_id):
+        self.reduce_state.remove_expired(checkpoint_id)
+
+
+class WindowCombineOperator(StreamOperator, OneInputOperator):
+    """
+    Operator to run a :class:`function.WindowCombineFunction`
+
+    Values are aggregated per window and key locally. The watermark is the
+    largest event time seen minus `max_out_of_orderness`, or the upstream
+    watermark if that is larger. When the watermark passes the end of a
+    window, the accumulators of the window are emitted as
+    `KeyRecord(key, (window, accumulator))`. The watermark is emitted after
+    them, and whenever it passes a window end. Records of closed windows are
+    dropped.
+    """
+
+    def __init__(self, combine_func: function.WindowCombineFunction):
+        assert isinstance(combine_func, function.WindowCombineFunction)
+        super().__init__(combine_func)
+        # Window -> {key: accumulator}
+        self.windows = {}
+        self.max_timestamp = None
+        self.watermark = None
+        # The watermark is emitted again once it reaches this time.
+        self.next_window_end = None
+        self.num_late_records = 0
+
+    def process_element(self, record):
+        func = self.func
+        value = record.value
+        timestamp = func.timestamp_func(value)
+        key = func.key_func.key_by(value)
+        aggregate_func = func.aggregate_func
+        for window in func.window_assigner.assign_windows(timestamp):
+            if self.watermark is not None and window.end <= self.watermark:
+                self.num_late_records += 1
+                continue
+            accumulators = self.windows.setdefault(window, {})
+            accumulator = accumulators.get(key, _NO_VALUE)
+            if accumulator is _NO_VALUE:
+                accumulator = aggregate_func.create_accumulator()
+            accumulators[key] = aggregate_func.add(accumulator, value)
+        if self.max_timestamp is None or timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+            self._advance_watermark(timestamp - func.max_out_of_orderness)
+
+    def process_watermark(self, watermark):
+        self._advance_watermark(watermark.timestamp)
+
+    def _advance_watermark(self, watermark):
+        if self.watermark is not None and watermark <= self.watermark:
+            return
+        self.watermark = watermark
+        closed_windows = sorted(
+            window for window in self.windows if window.end <= watermark)
+        for window in closed_windows:
+            for key, accumulator in self.windows.pop(window).items():
+                self.collect(message.KeyRecord(key, (window, accumulator)))
+        if closed_windows or self.next_window_end is None or \
+                watermark >= self.next_window_end:
+            if watermark < message.MAX_TIMESTAMP:
+                self.next_window_end = min(
+                    window.end for window in
+                    self.func.window_assigner.assign_windows(watermark))
+            self.collect(message.Watermark(watermark))
+
+    def save_checkpoint(self):
+        return (super().save_checkpoint(),
+                (self.windows, self.max_timestamp, self.watermark,
+                 self.next_window_end))
+
+    def load_checkpoint(self, checkpoint_obj):
+        if checkpoint_obj is None:
+            super().load_checkpoint(None)
+            return
+        func_checkpoint, state = checkpoint_obj
+        super().load_checkpoint(func_checkpoint)
+        self.windows, self.max_timestamp, self.watermark, \
+            self.next_window_end = state
+
+
+class WindowMergeOperator(StreamOperator, OneInputOperator):
+    """
+    Operator to run a :class:`function.WindowMergeFunction`
+
+    Merges the accumulators of each window and key from the upstream
+    :class:`WindowCombineOperator` tasks. When the watermark passes the end of
+    a window, `(key, window, result)` is emitted for each key of the window.
+    """
+
+    def __init__(self, merge_func: function.WindowMergeFunction):
+        assert isinstance(merge_func, function.WindowMergeFunction)
+        super().__init__(merge_func)
+        # Window -> {key: accumulator}
+        self.windows = {}
+        self.watermark = None
+        self.num_late_records = 0
+
+    def process_element(self, record: message.KeyRecord):
+        window, accumulator = record.value
+        if self.watermark is not None and window.end <= self.watermark:
+            self.num_late_records += 1
+            return
+        accumulators = self.windows.setdefault(window, {})
+        old_accumulator = accumulators.get(record.key, _NO_VALUE)
+        if old_accumulator is not _NO_VALUE:
+            accumulator = self.func.aggregate_func.merge(
+                old_accumulator, accumulator)
+        accumulators[record.key] = accumulator
+
+    def process_watermark(self, watermark):
+        self.watermark = watermark.timestamp
+        aggregate_func = self.func.aggregate_func
+        for window in sorted(window for window in self.windows
+                             if window.end <= self.watermark):
+            for key, accumulator in self.windows.pop(window).items():
+                self.collect(
+                    message.Record((key, window,
+                                    aggregate_func.get_result(accumulator))))
+        self.collect(watermark)
+
+    def save_checkpoint(self):
+        return (super().save_checkpoint(), (self.windows, self.watermark))
+
+    def load_checkpoint(self, checkpoint_obj):
+        if checkpoint_obj is None:
+            super().load_checkpoint(None)
+            return
+        func_checkpoint, state = checkpoint_obj
+        super().load_checkpoint(func_checkpoint)
+        self.windows, self.watermark = state
+
 
 class SinkOperator(StreamOperator, OneInputOperator):
     """
@@ -257,7 +570,12 @@ class ChainedOperator(StreamOperator, ABC):
             self.succeeding_operator = succeeding_operator
 
         def collect(self, record):
-            self.succeeding_operator.process_element(record)
+            if isinstance(record, message.RecordBatch):
+                self.succeeding_operator.process_batch(record)
+            elif isinstance(record, message.Watermark):
+                self.succeeding_operator.process_watermark(record)
+            else:
+                self.succeeding_operator.process_element(record)
 
     def __init__(self, operators, configs):
         super().__init__(operators[0].func)
@@ -266,6 +584,8 @@ class ChainedOperator(StreamOperator, ABC):
 
     def open(self, collectors, runtime_context):
         # Dont' call super.open() as we `open` every operator separately.
+        self.runtime_context = runtime_context
+        context_backend = runtime_context.get_context_backend()
         num_operators = len(self.operators)
         succeeding_collectors = [
             ChainedOperator.ForwardCollector(operator)
@@ -275,19 +595,55 @@ class ChainedOperator(StreamOperator, ABC):
             forward_collectors = [succeeding_collectors[i]]
             self.operators[i].open(
                 forward_collectors,
-                self.__create_runtime_context(runtime_context, i))
+                self.__create_runtime_context(runtime_context, i,
+                                              context_backend))
         self.operators[-1].open(
             collectors,
-            self.__create_runtime_context(runtime_context, num_operators - 1))
+            self.__create_runtime_context(runtime_context, num_operators - 1,
+                                          context_backend))
+
+    def close(self):
+        for operator in self.operators:
+            operator.close()
 
     def operator_type(self) -> OperatorType:
         return self.operators[0].operator_type()
 
-    def __create_runtime_context(self, runtime_context, index):
+    def flush(self):
+        # Records flushed by an operator are buffered by the next one.
+        for operator in self.operators:
+            operator.flush()
+
+    def flush_expired(self):
+        for operator in self.operators:
+            operator.flush_expired()
+
+    def save_checkpoint(self):
+        return [operator.save_checkpoint() for operator in self.operators]
+
+    def load_checkpoint(self, checkpoint_obj):
+        if checkpoint_obj is None:
+            checkpoint_obj = [None] * len(self.operators)
+        for operator, operator_checkpoint in zip(self.operators,
+                                                 checkpoint_obj):
+            operator.load_checkpoint(operator_checkpoint)
+
+    def clear_expired_checkpoint(self, checkpoint_id):
+        for operator in self.operators:
+            operator.clear_expired_checkpoint(checkpoint_id)
+
+    def __create_runtime_context(self, runtime_context, index,
+                                 context_backend):
         def get_config():
             return self.configs[index]
 
+        def get_context_backend():
+            # Keep the state of each operator apart.
+            return NamespacedContextBackend(context_backend,
+                                            "op{}_".format(index))
+
         runtime_context.get_config = get_config
+        runtime_context.get_context_backend = get_context_backend
         return runtime_context
 
     @staticmethod
@@ -321,6 +677,12 @@ class ChainedOneInputOperator(ChainedOperator):
     def process_element(self, record):
         self.operators[0].process_element(record)
 
+    def process_batch(self, batch):
+        self.operators[0].process_batch(batch)
+
+    def process_watermark(self, watermark):
+        self.operators[0].process_watermark(watermark)
+
 
 class ChainedTwoInputOperator(ChainedOperator):
     def __init__(self, operators, configs):
@@ -329,6 +691,9 @@ class ChainedTwoInputOperator(ChainedOperator):
     def process_element(self, record1, record2):
         self.operators[0].process_element(record1, record2)
 
+    def process_watermark(self, watermark):
+        self.operators[0].process_watermark(watermark)
+
 
 def load_chained_operator(chained_operator_bytes: bytes):
     """Load chained operator from serialized operators and configs"""
@@ -375,6 +740,11 @@ _function_to_operator = {
     function.FlatMapFunction: FlatMapOperator,
     function.FilterFunction: FilterOperator,
     function.KeyFunction: KeyByOperator,
+    function.MapBatchesFunction: MapBatchesOperator,
+    function.FilterBatchesFunction: FilterBatchesOperator,
+    function.KeyBatchesFunction: KeyByBatchesOperator,
+    function.WindowCombineFunction: WindowCombineOperator,
+    function.WindowMergeFunction: WindowMergeOperator,
     function.ReduceFunction: ReduceOperator,
     function.SinkFunction: SinkOperator,
 }
@@ -1,3 +1,4 @@
+import collections
 import importlib
 import inspect
 from abc import ABC, abstractmethod
@@ -22,6 +23,22 @@ class Partition(ABC):
          """
         pass
 
+    def partition_batch(self, batch, num_partition: int):
+        """Split a :class:`ray.streaming.message.RecordBatch` by partition.
+
+        Args:
+            batch: The record batch.
+            num_partition: num of partitions
+        Returns:
+            A list of (partition ID, batch of the records of the partition).
+        """
+        indices = collections.defaultdict(list)
+        for i, record in enumerate(batch.records()):
+            for partition_index in self.partition(record, num_partition):
+                indices[partition_index].append(i)
+        return [(partition_index, batch.take(record_indices))
+                for partition_index, record_indices in indices.items()]
+
 
 class BroadcastPartition(Partition):
     """Broadcast the record to all downstream partitions."""
@@ -34,6 +51,9 @@ class BroadcastPartition(Partition):
             self.__partitions = list(range(num_partition))
         return self.__partitions
 
+    def partition_batch(self, batch, num_partition: int):
+        return [(i, batch) for i in range(num_partition)]
+
 
 class KeyPartition(Partition):
     """Partition the record by the key."""
@@ -46,6 +66,17 @@ class KeyPartition(Partition):
         self.__partitions[0] = abs(hash(key_record.key)) % num_partition
         return self.__partitions
 
+    def partition_batch(self, batch, num_partition: int):
+        keys = batch.keys
+        if hasattr(keys, "tolist"):
+            # Hash python values, as `partition` does.
+            keys = keys.tolist()
+        indices = collections.defaultdict(list)
+        for i, key in enumerate(keys):
+            indices[abs(hash(key)) % num_partition].append(i)
+        return [(partition_index, batch.take(record_indices))
+                for partition_index, record_indices in indices.items()]
+
 
 class RoundRobinPartition(Partition):
     """Partition record to downstream tasks in a round-robin matter."""
@@ -59,6 +90,10 @@ class RoundRobinPartition(Partition):
         self.__partitions[0] = self.seq
         return self.__partitions
 
+    def partition_batch(self, batch, num_partition: int):
+        self.seq = (self.seq + 1) % num_partition
+        return [(self.seq, batch)]
+
 
 class ForwardPartition(Partition):
     """Default partition for operator if the operator can be chained with
@@ -70,6 +105,9 @@ class ForwardPartition(Partition):
     def partition(self, key_record, num_partition: int):
         return self.__partitions
 
+    def partition_batch(self, batch, num_partition: int):
+        return [(0, batch)]
+
 
 class SimplePartition(Partition):
     """Wrap a python function as subclass of :class:`Partition`"""
@@ -28,3 +28,13 @@ class WorkerRollbackRequest(BaseWorkerCmd):
 
     def exception_msg(self):
         return self.__exception_msg
+
+
+class WorkerMetricsReport(BaseWorkerCmd):
+    """
+    worker metrics report, see runtime/metrics.py
+    """
+
+    def __init__(self, actor_id, metrics_snapshot):
+        super().__init__(actor_id)
+        self.metrics_snapshot = metrics_snapshot
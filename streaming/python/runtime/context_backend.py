@@ -105,6 +105,23 @@ class AtomicFsContextBackend(LocalFileContextBackend):
         super().remove(key)
 
 
+class NamespacedContextBackend(ContextBackend):
+    """Stores values in another context backend, with prefixed keys."""
+
+    def __init__(self, context_backend, namespace):
+        self.__context_backend = context_backend
+        self.__namespace = namespace
+
+    def get(self, key):
+        return self.__context_backend.get(self.__namespace + key)
+
+    def put(self, key, value):
+        self.__context_backend.put(self.__namespace + key, value)
+
+    def remove(self, key):
+        self.__context_backend.remove(self.__namespace + key)
+
+
 class ContextBackendFactory:
     @staticmethod
     def get_context_backend(worker_config) -> ContextBackend:
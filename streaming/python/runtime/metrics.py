@@ -0,0 +1,199 @@
+import bisect
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bucket boundaries of the processing time histogram, in milliseconds.
+PROCESS_TIME_BOUNDARIES_MS = [
+    0.01, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000
+]
+# Processing times recorded to the ray histogram per report interval, sampled
+# from all processed messages so that the cost doesn't grow with throughput.
+MAX_SAMPLES_PER_INTERVAL = 100
+
+_TAG_KEYS = ("job_name", "job_vertex", "vertex_index")
+_ray_metrics = None
+
+
+def _get_ray_metrics():
+    """Creates the ray metrics once per worker process."""
+    global _ray_metrics
+    if _ray_metrics is None:
+        from ray.util import metrics
+        _ray_metrics = {
+            # ray Counts count the recorded points, not their values, so
+            # the totals of each interval are exported as gauges.
+            "records_in": metrics.Gauge(
+                "streaming_records_in",
+                "Number of records read by a streaming task in the last "
+                "report interval.", _TAG_KEYS),
+            "records_out": metrics.Gauge(
+                "streaming_records_out",
+                "Number of records written to the output channels of a "
+                "streaming task in the last report interval.", _TAG_KEYS),
+            "records_in_per_s": metrics.Gauge(
+                "streaming_records_in_per_s",
+                "Records read per second by a streaming task.", _TAG_KEYS),
+            "records_out_per_s": metrics.Gauge(
+                "streaming_records_out_per_s",
+                "Records written per second by a streaming task.", _TAG_KEYS),
+            "process_time_ms": metrics.Histogram(
+                "streaming_process_time_ms",
+                "Time to process an input message, or a source fetch, "
+                "in milliseconds.", PROCESS_TIME_BOUNDARIES_MS, _TAG_KEYS),
+            "write_blocked_ratio": metrics.Gauge(
+                "streaming_write_blocked_ratio",
+                "Fraction of time a streaming task was blocked writing to "
+                "its output channels, i.e. backpressured.", _TAG_KEYS),
+            "read_idle_ratio": metrics.Gauge(
+                "streaming_read_idle_ratio",
+                "Fraction of time a streaming task waited for input.",
+                _TAG_KEYS),
+        }
+    return _ray_metrics
+
+
+class MetricsSnapshot:
+    """The metrics of a task over one report interval."""
+
+    def __init__(self, records_in, records_out, records_in_per_s,
+                 records_out_per_s, process_time_p50_ms, process_time_p99_ms,
+                 write_blocked_ratio, read_idle_ratio):
+        self.records_in = records_in
+        self.records_out = records_out
+        self.records_in_per_s = records_in_per_s
+        self.records_out_per_s = records_out_per_s
+        self.process_time_p50_ms = process_time_p50_ms
+        self.process_time_p99_ms = process_time_p99_ms
+        self.write_blocked_ratio = write_blocked_ratio
+        self.read_idle_ratio = read_idle_ratio
+
+    def __repr__(self):
+        return "MetricsSnapshot({})".format(", ".join(
+            "{}={}".format(k, v) for k, v in self.__dict__.items()))
+
+
+class TaskMetrics:
+    """
+    Throughput, latency and backpressure metrics of a stream task.
+
+    The task and its output collectors record into local counters, which are
+    cheap enough to update for every message. Every `report_interval_ms`,
+    :meth:`maybe_report` exports them through :mod:`ray.util.metrics`,
+    tagged with the job name, job vertex and vertex index, and returns a
+    :class:`MetricsSnapshot` for the job master. A non-positive interval
+    disables reporting.
+
+    - records in/out: records read by the task and written to its output
+      channels, a record written to n channels counts n times.
+    - processing time: the time to process each input message, which holds
+      a batch of records for python upstreams, or each source fetch.
+    - write blocked: time spent in `DataWriter.write`, which blocks when the
+      downstream channels are full.
+    - read idle: time spent in `DataReader.read` waiting for input.
+    """
+
+    def __init__(self,
+                 job_name,
+                 job_vertex,
+                 vertex_index,
+                 report_interval_ms,
+                 export=True):
+        self.tags = {
+            "job_name": str(job_name),
+            "job_vertex": str(job_vertex),
+            "vertex_index": str(vertex_index)
+        }
+        self.report_interval_s = report_interval_ms / 1000
+        self.export = export
+        self.records_in = 0
+        self.records_out = 0
+        self.write_blocked_s = 0
+        self.read_idle_s = 0
+        self._process_time_buckets = [0
+                                      ] * (len(PROCESS_TIME_BOUNDARIES_MS) + 1)
+        self._num_process_times = 0
+        self._samples = []
+        self._interval_start = time.monotonic()
+
+    def record_process_time(self, seconds):
+        millis = seconds * 1000
+        self._process_time_buckets[bisect.bisect_left(
+            PROCESS_TIME_BOUNDARIES_MS, millis)] += 1
+        self._num_process_times += 1
+        # Reservoir sampling, so every message is sampled with the same
+        # probability.
+        if len(self._samples) < MAX_SAMPLES_PER_INTERVAL:
+            self._samples.append(millis)
+        else:
+            index = random.randrange(self._num_process_times)
+            if index < MAX_SAMPLES_PER_INTERVAL:
+                self._samples[index] = millis
+
+    def maybe_report(self, now=None):
+        """Exports the metrics if the report interval passed.
+
+        Returns:
+            The :class:`MetricsSnapshot` of the interval, or None if it
+            didn't pass yet.
+        """
+        if self.report_interval_s <= 0:
+            return None
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._interval_start
+        if elapsed < self.report_interval_s:
+            return None
+        snapshot = MetricsSnapshot(self.records_in, self.records_out,
+                                   self.records_in / elapsed,
+                                   self.records_out / elapsed,
+                                   self._process_time_quantile(0.5),
+                                   self._process_time_quantile(0.99),
+                                   min(1.0, self.write_blocked_s / elapsed),
+                                   min(1.0, self.read_idle_s / elapsed))
+        if self.export:
+            self._export(snapshot)
+        self.records_in = 0
+        self.records_out = 0
+        self.write_blocked_s = 0
+        self.read_idle_s = 0
+        self._process_time_buckets = [0] * len(self._process_time_buckets)
+        self._num_process_times = 0
+        self._samples = []
+        self._interval_start = now
+        return snapshot
+
+    def _process_time_quantile(self, quantile):
+        """The upper bound of the histogram bucket of a quantile, the
+         largest bucket is reported as its lower bound."""
+        if self._num_process_times == 0:
+            return 0.0
+        rank = quantile * self._num_process_times
+        count = 0
+        for index, bucket in enumerate(self._process_time_buckets):
+            count += bucket
+            if count >= rank:
+                break
+        return float(PROCESS_TIME_BOUNDARIES_MS[min(
+            index,
+            len(PROCESS_TIME_BOUNDARIES_MS) - 1)])
+
+    def _export(self, snapshot):
+        try:
+            ray_metrics = _get_ray_metrics()
+            ray_metrics["records_in"].record(snapshot.records_in, self.tags)
+            ray_metrics["records_out"].record(snapshot.records_out, self.tags)
+            ray_metrics["records_in_per_s"].record(snapshot.records_in_per_s,
+                                                   self.tags)
+            ray_metrics["records_out_per_s"].record(snapshot.records_out_per_s,
+                                                    self.tags)
+            for millis in self._samples:
+                ray_metrics["process_time_ms"].record(millis, self.tags)
+            ray_metrics["write_blocked_ratio"].record(
+                snapshot.write_blocked_ratio, self.tags)
+            ray_metrics["read_idle_ratio"].record(snapshot.read_idle_ratio,
+                                                  self.tags)
+        except Exception:
+            logger.exception("Failed to export metrics of {}.".format(
+                self.tags))
@@ -51,11 +51,23 @@ class StreamingProcessor(Processor, ABC):
         self.operator.close()
 
     def save_checkpoint(self):
-        self.operator.save_checkpoint()
+        return self.operator.save_checkpoint()
 
     def load_checkpoint(self, checkpoint_obj):
         self.operator.load_checkpoint(checkpoint_obj)
 
+    def clear_expired_checkpoint(self, checkpoint_id):
+        self.operator.clear_expired_checkpoint(checkpoint_id)
+
+    def process_watermark(self, watermark: message.Watermark):
+        self.operator.process_watermark(watermark)
+
+    def flush(self):
+        self.operator.flush()
+
+    def flush_expired(self):
+        self.operator.flush_expired()
+
 
 class SourceProcessor(StreamingProcessor):
     """Processor for :class:`ray.streaming.operator.SourceOperator` """
@@ -77,7 +89,10 @@ class OneInputProcessor(StreamingProcessor):
         super().__init__(operator)
 
     def process(self, record):
-        self.operator.process_element(record)
+        if isinstance(record, message.RecordBatch):
+            self.operator.process_batch(record)
+        else:
+            self.operator.process_element(record)
 
 
 class TwoInputProcessor(StreamingProcessor):
@@ -89,7 +104,10 @@ class TwoInputProcessor(StreamingProcessor):
         self.right_stream = None
 
     def process(self, record: message.Record):
-        if record.stream == self.left_stream:
+        if isinstance(record, message.RecordBatch):
+            for r in record.records():
+                self.process(r)
+        elif record.stream == self.left_stream:
             self.operator.process_element(record, None)
         else:
             self.operator.process_element(None, record)
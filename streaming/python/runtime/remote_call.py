@@ -7,7 +7,7 @@ from enum import Enum
 from ray.actor import ActorHandle
 from ray.streaming.generated import remote_call_pb2
 from ray.streaming.runtime.command\
-    import WorkerCommitReport, WorkerRollbackRequest
+    import WorkerCommitReport, WorkerMetricsReport, WorkerRollbackRequest
 
 logger = logging.getLogger(__name__)
 
@@ -93,3 +93,24 @@ class RemoteCallMst:
         result.ParseFromString(ray.get(return_id))
         logger.info("Remote call mst: report job worker commit finish.")
         return result.boolRes
+
+    @staticmethod
+    def report_job_worker_metrics(master: ActorHandle,
+                                  report: WorkerMetricsReport):
+        """Reports without waiting for the result, so a slow job master
+        doesn't slow down the worker."""
+        report_pb = remote_call_pb2.BaseWorkerCmd()
+        report_pb.actor_id = report.from_actor_id
+        report_pb.timestamp = int(time.time() * 1000.0)
+        snapshot = report.metrics_snapshot
+        metrics_pb = remote_call_pb2.WorkerMetricsReport()
+        metrics_pb.records_in = snapshot.records_in
+        metrics_pb.records_out = snapshot.records_out
+        metrics_pb.records_in_per_sec = snapshot.records_in_per_s
+        metrics_pb.records_out_per_sec = snapshot.records_out_per_s
+        metrics_pb.process_time_p50_ms = snapshot.process_time_p50_ms
+        metrics_pb.process_time_p99_ms = snapshot.process_time_p99_ms
+        metrics_pb.write_blocked_ratio = snapshot.write_blocked_ratio
+        metrics_pb.read_idle_ratio = snapshot.read_idle_ratio
+        report_pb.detail.Pack(metrics_pb)
+        master.reportJobWorkerMetrics.remote(report_pb.SerializeToString())
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 import pickle
+import struct
 import msgpack
+import numpy as np
+from ray.cloudpickle.compat import pickle as pickle5
 from ray.streaming import message
 
 RECORD_TYPE_ID = 0
@@ -8,6 +11,21 @@ KEY_RECORD_TYPE_ID = 1
 CROSS_LANG_TYPE_ID = 0
 JAVA_TYPE_ID = 1
 PYTHON_TYPE_ID = 2
+PYTHON_BATCH_TYPE_ID = 3
+
+# Header of a batch message: the type id, the number of records, the number
+# of out-of-band buffers and the size of the pickled data.
+BATCH_HEADER = struct.Struct("<BIIQ")
+# Out-of-band buffers are aligned to this many bytes in a batch message.
+BUFFER_ALIGNMENT = 8
+# Smaller buffers are pickled in-band, as their size table entry and padding
+# cost more than copying them.
+MIN_OUT_OF_BAND_BYTES = 1024
+
+# Layouts of the records of a batch message.
+OBJECTS_LAYOUT = 0
+RECORDS_LAYOUT = 1
+KEY_RECORDS_LAYOUT = 2
 
 
 class Serializer(ABC):
@@ -27,9 +45,85 @@ class PythonSerializer(Serializer):
     def deserialize(self, serialized_bytes):
         return pickle.loads(serialized_bytes)
 
+    def serialize_batch(self, records):
+        """Serializes records into one message.
+
+        The message starts with BATCH_HEADER and the sizes of the out-of-band
+        buffers, followed by the pickled data and the buffers. Records may
+        also be :class:`message.Watermark` or :class:`message.RecordBatch`
+        objects.
+
+        The records are pickled with protocol 5, so the contiguous buffers
+        of numpy arrays, e.g. the columns of a RecordBatch, are copied into
+        the message once as raw bytes instead of into the pickle stream. If
+        all records are :class:`message.Record` or all are
+        :class:`message.KeyRecord` of the same stream, their keys and values
+        are pickled as lists instead of pickling each record object.
+        """
+        buffers = []
+
+        def buffer_callback(pickle_buffer):
+            try:
+                raw = pickle_buffer.raw()
+            except BufferError:
+                # Not contiguous.
+                return True
+            if raw.nbytes < MIN_OUT_OF_BAND_BYTES:
+                return True
+            buffers.append(raw)
+            return False
+
+        pickled = pickle5.dumps(
+            _to_layout(records), protocol=5, buffer_callback=buffer_callback)
+        parts = [
+            BATCH_HEADER.pack(PYTHON_BATCH_TYPE_ID, len(records), len(buffers),
+                              len(pickled)),
+            struct.pack("<{}Q".format(len(buffers)),
+                        *(buffer.nbytes for buffer in buffers)), pickled
+        ]
+        offset = sum(len(part) for part in parts)
+        for buffer in buffers:
+            padding = -offset % BUFFER_ALIGNMENT
+            parts.append(bytes(padding))
+            parts.append(buffer)
+            offset += padding + buffer.nbytes
+        return b"".join(parts)
+
+    def deserialize_batch(self, data):
+        """Deserializes the records of a message written by
+        :meth:`serialize_batch`.
+
+        The out-of-band buffers are copied from `data` at once, so numpy
+        arrays are writable and don't keep `data` alive. Operators can pass
+        them to user functions which modify them in place.
+        """
+        view = memoryview(data)
+        type_id, num_records, num_buffers, pickled_size = \
+            BATCH_HEADER.unpack_from(view)
+        assert type_id == PYTHON_BATCH_TYPE_ID
+        offset = BATCH_HEADER.size
+        buffer_sizes = struct.unpack_from("<{}Q".format(num_buffers), view,
+                                          offset)
+        offset += 8 * num_buffers
+        pickled = view[offset:offset + pickled_size]
+        offset += pickled_size
+        offset += -offset % BUFFER_ALIGNMENT
+        # Buffer offsets stay aligned in the copy.
+        buffers_view = memoryview(bytearray(view[offset:]))
+        offset = 0
+        buffers = []
+        for size in buffer_sizes:
+            offset += -offset % BUFFER_ALIGNMENT
+            buffers.append(buffers_view[offset:offset + size])
+            offset += size
+        records = _from_layout(pickle5.loads(pickled, buffers=buffers))
+        assert len(records) == num_records
+        return records
+
 
 class CrossLangSerializer(Serializer):
-    """Serialize stream element between java/python"""
+    """Serialize stream element between java/python. Numpy values are
+    written as the equivalent python values."""
 
     def serialize(self, obj):
         if type(obj) is message.Record:
@@ -38,7 +132,8 @@ class CrossLangSerializer(Serializer):
             fields = [KEY_RECORD_TYPE_ID, obj.stream, obj.key, obj.value]
         else:
             raise Exception("Unsupported value {}".format(obj))
-        return msgpack.packb(fields, use_bin_type=True)
+        return msgpack.packb(
+            fields, use_bin_type=True, default=_numpy_to_python)
 
     def deserialize(self, data):
         fields = msgpack.unpackb(data, raw=False)
@@ -55,3 +150,44 @@ class CrossLangSerializer(Serializer):
         else:
             raise Exception("Unsupported type id {}, type {}".format(
                 fields[0], type(fields[0])))
+
+
+def _to_layout(records):
+    """Pickles records of the same type and stream as columns."""
+    if records:
+        record_type = type(records[0])
+        if record_type is message.Record or \
+                record_type is message.KeyRecord:
+            stream = records[0].stream
+            if all(
+                    type(record) is record_type and record.stream == stream
+                    for record in records):
+                values = [record.value for record in records]
+                if record_type is message.Record:
+                    return RECORDS_LAYOUT, stream, values
+                keys = [record.key for record in records]
+                return KEY_RECORDS_LAYOUT, stream, keys, values
+    return OBJECTS_LAYOUT, records
+
+
+def _from_layout(layout):
+    if layout[0] == OBJECTS_LAYOUT:
+        return layout[1]
+    if layout[0] == RECORDS_LAYOUT:
+        _, stream, values = layout
+        records = [message.Record(value) for value in values]
+    else:
+        _, stream, keys, values = layout
+        records = [
+            message.KeyRecord(key, value) for key, value in zip(keys, values)
+        ]
+    if stream is not None:
+        for record in records:
+            record.stream = stream
+    return records
+
+
+def _numpy_to_python(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError("Can't serialize {} of type {}".format(obj, type(obj)))
@@ -0,0 +1,273 @@
+import collections
+import dbm
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+from ray.streaming.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Number of keys per blob of a full snapshot, which bounds the memory used to
+# write or restore a snapshot.
+SNAPSHOT_CHUNK_KEYS = 100000
+
+
+class StateCheckpoint:
+    """
+    The blobs in the context backend that a checkpoint of a
+    :class:`KeyedStateBackend` is restored from: the chunks of a full
+    snapshot, and the changelogs of the following checkpoints.
+    """
+
+    def __init__(self, snapshot_keys, changelog_keys):
+        self.snapshot_keys = snapshot_keys
+        self.changelog_keys = changelog_keys
+
+    def blob_keys(self):
+        return self.snapshot_keys + self.changelog_keys
+
+    def __repr__(self):
+        return "StateCheckpoint(snapshot_keys={}, changelog_keys={})".format(
+            self.snapshot_keys, self.changelog_keys)
+
+
+class KeyedStateBackend:
+    """
+    Key value state of an operator with incremental checkpoints.
+
+    The keys changed since the last checkpoint are tracked, and a checkpoint
+    writes only those as a changelog to the context backend. Every
+    `streaming.state.snapshot_interval` checkpoints, a full snapshot of the
+    state is written instead, so that restoring reads fewer changelogs than
+    that.
+
+    If `streaming.state.max_memory_keys` is set, the least recently used keys
+    beyond that many are spilled to a local on-disk store in
+    `streaming.state.spill_dir`, so state can be larger than memory. Spilled
+    keys are compared by their pickled bytes.
+    """
+
+    def __init__(self, context_backend, name, config=None):
+        config = config or {}
+        self._context_backend = context_backend
+        self._name = name
+        self.snapshot_interval = max(
+            1,
+            int(
+                config.get(Config.STATE_SNAPSHOT_INTERVAL,
+                           Config.STATE_SNAPSHOT_INTERVAL_DEFAULT)))
+        self.max_memory_keys = int(
+            config.get(Config.STATE_MAX_MEMORY_KEYS,
+                       Config.STATE_MAX_MEMORY_KEYS_DEFAULT))
+        self._spill_root = config.get(Config.STATE_SPILL_DIR)
+        # Keys in memory, least recently used first.
+        self._memory = collections.OrderedDict()
+        self._spill_dir = None
+        self._spill_store = None
+        self._num_spilled = 0
+        # Keys changed or deleted since the last checkpoint.
+        self._dirty = set()
+        self._deleted = set()
+        self._last_checkpoint = None
+        # Checkpoint id -> StateCheckpoint, for the checkpoints that are not
+        # expired yet.
+        self._checkpoints = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self._num_spilled:
+            spilled_key = _dumps(key)
+            try:
+                data = self._spill_store[spilled_key]
+            except KeyError:
+                return default
+            # Keep the key in memory while it's hot.
+            del self._spill_store[spilled_key]
+            self._num_spilled -= 1
+            value = pickle.loads(data)
+            self._memory[key] = value
+            self._spill_cold_keys()
+            return value
+        return default
+
+    def put(self, key, value):
+        if key not in self._memory:
+            self._remove_spilled(key)
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        self._dirty.add(key)
+        self._deleted.discard(key)
+        self._spill_cold_keys()
+
+    def delete(self, key):
+        if key in self._memory:
+            del self._memory[key]
+        else:
+            self._remove_spilled(key)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self._memory or (self._num_spilled > 0
+                                       and _dumps(key) in self._spill_store)
+
+    def __len__(self):
+        return len(self._memory) + self._num_spilled
+
+    def items(self):
+        """Iterates over all keys and values, without changing which keys
+         are kept in memory."""
+        yield from list(self._memory.items())
+        if self._num_spilled:
+            for spilled_key in self._spill_store.keys():
+                yield (pickle.loads(spilled_key),
+                       pickle.loads(self._spill_store[spilled_key]))
+
+    def snapshot(self, checkpoint_id) -> StateCheckpoint:
+        """Writes the state of a checkpoint to the context backend.
+
+        Returns:
+            The StateCheckpoint to restore the state from with
+            :meth:`restore`.
+        """
+        prefix = "{}_{}_".format(self._name, checkpoint_id)
+        last = self._last_checkpoint
+        if last is None or \
+                len(last.changelog_keys) + 1 >= self.snapshot_interval:
+            snapshot_keys = []
+            chunk = {}
+            for key, value in self.items():
+                chunk[key] = value
+                if len(chunk) >= SNAPSHOT_CHUNK_KEYS:
+                    snapshot_keys.append(
+                        self._write_blob(prefix, len(snapshot_keys), chunk))
+                    chunk = {}
+            if chunk or not snapshot_keys:
+                snapshot_keys.append(
+                    self._write_blob(prefix, len(snapshot_keys), chunk))
+            checkpoint = StateCheckpoint(snapshot_keys, [])
+            logger.info("Wrote state snapshot of {} keys, checkpoint {}."
+                        .format(len(self), checkpoint))
+        else:
+            changes = {key: self._peek(key) for key in self._dirty}
+            changelog_key = prefix + "changelog"
+            self._context_backend.put(
+                changelog_key,
+                pickle.dumps(
+                    (changes, list(self._deleted)),
+                    protocol=pickle.HIGHEST_PROTOCOL))
+            checkpoint = StateCheckpoint(last.snapshot_keys,
+                                         last.changelog_keys + [changelog_key])
+            logger.info("Wrote state changelog of {} keys, checkpoint {}."
+                        .format(len(changes) + len(self._deleted), checkpoint))
+        self._dirty.clear()
+        self._deleted.clear()
+        self._last_checkpoint = checkpoint
+        self._checkpoints[checkpoint_id] = checkpoint
+        return checkpoint
+
+    def restore(self, checkpoint: StateCheckpoint):
+        """Replaces the state with the state of a checkpoint."""
+        self._clear()
+        for snapshot_key in checkpoint.snapshot_keys:
+            for key, value in self._read_blob(snapshot_key)[0].items():
+                self._restore_put(key, value)
+        for changelog_key in checkpoint.changelog_keys:
+            changes, deleted = self._read_blob(changelog_key)
+            for key, value in changes.items():
+                self._restore_put(key, value)
+            for key in deleted:
+                if key in self._memory:
+                    del self._memory[key]
+                else:
+                    self._remove_spilled(key)
+        self._last_checkpoint = checkpoint
+        logger.info("Restored state of {} keys from checkpoint {}.".format(
+            len(self), checkpoint))
+
+    def remove_expired(self, checkpoint_id):
+        """Removes the blobs that only checkpoints up to `checkpoint_id`
+         need."""
+        live_keys = set()
+        if self._last_checkpoint is not None:
+            live_keys.update(self._last_checkpoint.blob_keys())
+        expired_keys = set()
+        for cp_id, checkpoint in list(self._checkpoints.items()):
+            if cp_id <= checkpoint_id:
+                expired_keys.update(checkpoint.blob_keys())
+                del self._checkpoints[cp_id]
+            else:
+                live_keys.update(checkpoint.blob_keys())
+        for blob_key in expired_keys - live_keys:
+            self._context_backend.remove(blob_key)
+
+    def close(self):
+        if self._spill_store is not None:
+            self._spill_store.close()
+            self._spill_store = None
+            self._num_spilled = 0
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+    def _clear(self):
+        self.close()
+        self._memory.clear()
+        self._dirty.clear()
+        self._deleted.clear()
+
+    def _restore_put(self, key, value):
+        if key not in self._memory:
+            self._remove_spilled(key)
+        self._memory[key] = value
+        self._spill_cold_keys()
+
+    def _peek(self, key):
+        if key in self._memory:
+            return self._memory[key]
+        return pickle.loads(self._spill_store[_dumps(key)])
+
+    def _remove_spilled(self, key):
+        if self._num_spilled:
+            try:
+                del self._spill_store[_dumps(key)]
+                self._num_spilled -= 1
+            except KeyError:
+                pass
+
+    def _spill_cold_keys(self):
+        if self.max_memory_keys <= 0:
+            return
+        while len(self._memory) > self.max_memory_keys:
+            if self._spill_store is None:
+                self._spill_dir = tempfile.mkdtemp(
+                    prefix="ray_streaming_state_", dir=self._spill_root)
+                self._spill_store = dbm.open(
+                    os.path.join(self._spill_dir, "state"), "n")
+                logger.info("Spilling cold keys of state {} to {}.".format(
+                    self._name, self._spill_dir))
+            key, value = self._memory.popitem(last=False)
+            self._spill_store[_dumps(key)] = pickle.dumps(
+                value, protocol=pickle.HIGHEST_PROTOCOL)
+            self._num_spilled += 1
+
+    def _write_blob(self, prefix, index, chunk):
+        blob_key = prefix + "snapshot_{}".format(index)
+        self._context_backend.put(
+            blob_key,
+            pickle.dumps((chunk, []), protocol=pickle.HIGHEST_PROTOCOL))
+        return blob_key
+
+    def _read_blob(self, blob_key):
+        data = self._context_backend.get(blob_key)
+        if data is None:
+            raise RuntimeError("State blob {} of {} is missing.".format(
+                blob_key, self._name))
+        return pickle.loads(data)
+
+
+def _dumps(key):
+    return pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
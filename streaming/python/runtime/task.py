@@ -6,13 +6,17 @@ import typing
 from abc import ABC, abstractmethod
 from typing import Optional
 
+from ray.streaming import message
 from ray.streaming.collector import OutputCollector
 from ray.streaming.config import Config
 from ray.streaming.context import RuntimeContextImpl
 from ray.streaming.generated import remote_call_pb2
 from ray.streaming.runtime import serialization
-from ray.streaming.runtime.command import WorkerCommitReport
+from ray.streaming.runtime.command import WorkerCommitReport, \
+    WorkerMetricsReport
+from ray.streaming.runtime.context_backend import NamespacedContextBackend
 from ray.streaming.runtime.failover import Barrier, OpCheckpointInfo
+from ray.streaming.runtime.metrics import TaskMetrics
 from ray.streaming.runtime.remote_call import RemoteCallMst
 from ray.streaming.runtime.serialization import \
     PythonSerializer, CrossLangSerializer
@@ -42,6 +46,10 @@ class StreamTask(ABC):
         self.config: dict = worker.config
         self.reader: Optional[DataReader] = None
         self.writer: Optional[DataWriter] = None
+        self.num_input_channels = 0
+        self.collectors = []
+        self.runtime_context = None
+        self.metrics: Optional[TaskMetrics] = None
         self.is_initial_state = True
         self.last_checkpoint_id: int = last_checkpoint_id
         self.thread = threading.Thread(target=self.run, daemon=True)
@@ -50,10 +58,13 @@ class StreamTask(ABC):
         logger.info("Start do checkpoint, cp id {}, inputPoints {}.".format(
             checkpoint_id, input_points))
 
+        # Buffered records belong to this checkpoint.
+        self.flush()
         output_points = None
         if self.writer is not None:
             output_points = self.writer.get_output_checkpoints()
 
+        self.runtime_context.set_checkpoint_id(checkpoint_id)
         operator_checkpoint = self.processor.save_checkpoint()
         op_checkpoint_info = OpCheckpointInfo(
             operator_checkpoint, input_points, output_points, checkpoint_id)
@@ -88,9 +99,38 @@ class StreamTask(ABC):
         RemoteCallMst.report_job_worker_commit(self.worker.master_actor,
                                                report)
 
+    def flush(self, only_expired=False):
+        """Processes the records buffered by the operators, then writes the
+         records buffered by the collectors."""
+        if only_expired:
+            self.processor.flush_expired()
+        else:
+            self.processor.flush()
+        for collector in self.collectors:
+            if only_expired:
+                collector.flush_expired()
+            else:
+                collector.flush()
+
+    def report_metrics(self):
+        """Exports the task metrics and reports them to the job master, if
+         the report interval passed."""
+        snapshot = self.metrics.maybe_report()
+        if snapshot is None:
+            return
+        logger.debug("Report metrics {}.".format(snapshot))
+        report = WorkerMetricsReport(self.vertex_context.actor_id.binary(),
+                                     snapshot)
+        try:
+            RemoteCallMst.report_job_worker_metrics(self.worker.master_actor,
+                                                    report)
+        except Exception:
+            logger.exception("Failed to report metrics to job master.")
+
     def clear_expired_cp_state(self, checkpoint_id):
         cp_key = self.__gen_op_checkpoint_key(checkpoint_id)
         self.worker.context_backend.remove(cp_key)
+        self.processor.clear_expired_checkpoint(checkpoint_id)
 
     def clear_expired_queue_msg(self, checkpoint_id):
         # clear operator checkpoint
@@ -145,6 +185,16 @@ class StreamTask(ABC):
                         "checkpoint bytes len={}, checkpointInfo={}.".format(
                             cp_bytes.__len__(), op_checkpoint_info))
 
+        execution_vertex = execution_vertex_context.execution_vertex
+        self.metrics = TaskMetrics(
+            self.vertex_context.job_name,
+            execution_vertex.execution_job_vertex_name,
+            execution_vertex.execution_vertex_index,
+            int(
+                self.worker.config.get(
+                    Config.METRICS_REPORT_INTERVAL_MS,
+                    Config.METRICS_REPORT_INTERVAL_MS_DEFAULT)))
+
         # writers
         collectors = []
         output_actors_map = {}
@@ -168,10 +218,19 @@ class StreamTask(ABC):
             logger.info("Create DataWriter succeed channel_ids {}, "
                         "target_actors {}.".format(channel_str_ids,
                                                    target_actors))
+            batch_max_records = int(
+                self.worker.config.get(Config.BATCH_MAX_RECORDS,
+                                       Config.BATCH_MAX_RECORDS_DEFAULT))
+            batch_max_delay_ms = int(
+                self.worker.config.get(Config.BATCH_MAX_DELAY_MS,
+                                       Config.BATCH_MAX_DELAY_MS_DEFAULT))
             for edge in execution_vertex_context.output_execution_edges:
                 collectors.append(
                     OutputCollector(self.writer, channel_str_ids,
-                                    target_actors, edge.partition))
+                                    target_actors, edge.partition,
+                                    batch_max_records, batch_max_delay_ms,
+                                    self.metrics))
+        self.collectors = collectors
 
         # readers
         input_actor_map = {}
@@ -192,6 +251,7 @@ class StreamTask(ABC):
                             op_checkpoint_info.input_points))
             self.reader = DataReader(channel_str_ids, from_actors,
                                      channel_conf)
+            self.num_input_channels = len(channel_str_ids)
 
             def exit_handler():
                 # Make DataReader stop read data when MockQueue destructor
@@ -201,12 +261,19 @@ class StreamTask(ABC):
             import atexit
             atexit.register(exit_handler)
 
+        state_namespace = Config.JOB_WORKER_OP_STATE_PREFIX_KEY + str(
+            self.vertex_context.job_name) + "_" + str(
+                self.vertex_context.exe_vertex_name) + "_"
         runtime_context = RuntimeContextImpl(
             self.worker.task_id,
             execution_vertex_context.execution_vertex.execution_vertex_index,
             execution_vertex_context.get_parallelism(),
             config=channel_conf,
-            job_config=channel_conf)
+            job_config=channel_conf,
+            checkpoint_id=self.last_checkpoint_id,
+            context_backend=NamespacedContextBackend(
+                self.worker.context_backend, state_namespace))
+        self.runtime_context = runtime_context
         logger.info("open Processor {}".format(self.processor))
         self.processor.open(collectors, runtime_context)
 
@@ -259,30 +326,115 @@ class InputStreamTask(StreamTask):
                                   Config.DEFAULT_READ_TIMEOUT_MS))
         self.python_serializer = PythonSerializer()
         self.cross_lang_serializer = CrossLangSerializer()
+        # Latest watermark of each input channel.
+        self.channel_watermarks = {}
+        # Time of the latest message of each input channel. Channels which
+        # sent nothing for watermark_idle_timeout_s are idle, and don't hold
+        # back the watermark until they send again.
+        self.channel_active_times = {}
+        self.watermark_idle_timeout_s = int(
+            worker.config.get(Config.WATERMARK_IDLE_TIMEOUT_MS,
+                              Config.WATERMARK_IDLE_TIMEOUT_MS_DEFAULT)) / 1000
+        self.start_time = None
+        # The watermark is advanced again at this time, when the next
+        # channel may become idle.
+        self.next_idle_check_time = None
+        self.watermark = None
+
+    def process_watermark(self, channel_id, watermark):
+        """Processes the watermark of all input channels, the smallest one,
+         when it advances."""
+        old = self.channel_watermarks.get(channel_id)
+        if old is not None and watermark.timestamp <= old:
+            return
+        self.channel_watermarks[channel_id] = watermark.timestamp
+        self.advance_watermark()
+
+    def advance_watermark(self):
+        """Processes the smallest watermark of the active input channels, if
+         it advances. Nothing is processed while all channels are idle."""
+        now = time.monotonic()
+        timeout = self.watermark_idle_timeout_s
+        self.next_idle_check_time = None
+        idle_times = []
+        timestamps = []
+        for channel_id, active_time in self.channel_active_times.items():
+            if now - active_time >= timeout:
+                continue
+            idle_times.append(active_time + timeout)
+            timestamps.append(self.channel_watermarks.get(channel_id))
+        # Channels which sent nothing yet are active until the timeout.
+        if len(self.channel_active_times) < self.num_input_channels and \
+                now - self.start_time < timeout:
+            idle_times.append(self.start_time + timeout)
+            timestamps.append(None)
+        if idle_times:
+            self.next_idle_check_time = min(idle_times)
+        if not timestamps or None in timestamps:
+            return
+        timestamp = min(timestamps)
+        if self.watermark is None or timestamp > self.watermark:
+            self.watermark = timestamp
+            self.processor.process_watermark(message.Watermark(timestamp))
 
     def run(self):
         logger.info("Input task thread start.")
+        self.start_time = time.monotonic()
         try:
             while self.running:
+                self.report_metrics()
                 self.worker.initial_state_lock.acquire()
                 try:
+                    read_start = time.perf_counter()
                     item = self.reader.read(self.read_timeout_millis)
+                    self.metrics.read_idle_s += \
+                        time.perf_counter() - read_start
                     self.is_initial_state = False
                 finally:
                     self.worker.initial_state_lock.release()
 
+                if self.next_idle_check_time is not None and \
+                        time.monotonic() >= self.next_idle_check_time:
+                    self.advance_watermark()
+
                 if item is None:
+                    # Don't hold back buffered records while idle.
+                    self.flush()
                     continue
 
                 if isinstance(item, DataMessage):
+                    process_start = time.perf_counter()
+                    write_blocked_s = self.metrics.write_blocked_s
                     msg_data = item.body
                     type_id = msg_data[0]
-                    if type_id == serialization.PYTHON_TYPE_ID:
-                        msg = self.python_serializer.deserialize(msg_data[1:])
+                    if type_id == serialization.PYTHON_BATCH_TYPE_ID:
+                        msgs = self.python_serializer.deserialize_batch(
+                            msg_data)
+                    elif type_id == serialization.PYTHON_TYPE_ID:
+                        msgs = [
+                            self.python_serializer.deserialize(msg_data[1:])
+                        ]
                     else:
-                        msg = self.cross_lang_serializer.deserialize(
-                            msg_data[1:])
-                    self.processor.process(msg)
+                        msgs = [
+                            self.cross_lang_serializer.deserialize(
+                                msg_data[1:])
+                        ]
+                    self.channel_active_times[item.channel_id] = \
+                        time.monotonic()
+                    for msg in msgs:
+                        if isinstance(msg, message.Watermark):
+                            self.process_watermark(item.channel_id, msg)
+                        elif isinstance(msg, message.RecordBatch):
+                            self.metrics.records_in += len(msg)
+                            self.processor.process(msg)
+                        else:
+                            self.metrics.records_in += 1
+                            self.processor.process(msg)
+                    self.flush(only_expired=True)
+                    # Time blocked by backpressure is recorded separately.
+                    self.metrics.record_process_time(
+                        time.perf_counter() - process_start -
+                        (self.metrics.write_blocked_s - write_blocked_s))
                 elif isinstance(item, CheckpointBarrier):
                     logger.info("Got barrier:{}".format(item))
                     logger.info("Start to do checkpoint {}.".format(
@@ -342,7 +494,14 @@ class SourceStreamTask(StreamTask):
         logger.info("Source task thread start.")
         try:
             while self.running:
+                self.report_metrics()
+                fetch_start = time.perf_counter()
+                write_blocked_s = self.metrics.write_blocked_s
                 self.processor.fetch()
+                self.flush(only_expired=True)
+                self.metrics.record_process_time(
+                    time.perf_counter() - fetch_start -
+                    (self.metrics.write_blocked_s - write_blocked_s))
                 # check checkpoint
                 if self.__pending_barrier is not None:
                     # source fetcher only have outputPoints
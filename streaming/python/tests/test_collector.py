@@ -0,0 +1,143 @@
+import collections
+import time
+import types
+
+import numpy as np
+
+from ray import Language
+from ray.streaming import message
+from ray.streaming import partition
+from ray.streaming.collector import OutputCollector
+from ray.streaming.runtime import serialization
+from ray.streaming.runtime.metrics import TaskMetrics
+from ray.streaming.runtime.transfer import ChannelID
+
+
+class MockWriter:
+    def __init__(self):
+        self.messages = collections.defaultdict(list)
+
+    def write(self, channel_id, item):
+        assert type(item) == bytes
+        self.messages[channel_id].append(item)
+
+
+def make_collector(languages, partition_func=None, **kwargs):
+    writer = MockWriter()
+    channel_ids = [ChannelID.gen_id(0, i, 0) for i in range(len(languages))]
+    actors = [
+        types.SimpleNamespace(_ray_actor_language=language)
+        for language in languages
+    ]
+    collector = OutputCollector(
+        writer, channel_ids, actors, partition_func
+        or partition.BroadcastPartition(), **kwargs)
+    return collector, writer, [ChannelID(id_str) for id_str in channel_ids]
+
+
+def read_records(messages):
+    python_serializer = serialization.PythonSerializer()
+    cross_lang_serializer = serialization.CrossLangSerializer()
+    records = []
+    for data in messages:
+        if data[0] == serialization.PYTHON_BATCH_TYPE_ID:
+            records.extend(python_serializer.deserialize_batch(data))
+        else:
+            assert data[0] == serialization.CROSS_LANG_TYPE_ID
+            records.append(cross_lang_serializer.deserialize(data[1:]))
+    return records
+
+
+def test_output_collector_batches():
+    collector, writer, (python_channel, java_channel) = make_collector(
+        [Language.PYTHON, Language.JAVA],
+        batch_max_records=3,
+        batch_max_delay_ms=60 * 1000)
+    records = [message.Record(i) for i in range(7)]
+    for record in records:
+        collector.collect(record)
+    # Full batches are written, java channels get every record.
+    assert len(writer.messages[python_channel]) == 2
+    assert read_records(writer.messages[python_channel]) == records[:6]
+    assert len(writer.messages[java_channel]) == 7
+    assert read_records(writer.messages[java_channel]) == records
+
+    collector.flush()
+    assert read_records(writer.messages[python_channel]) == records
+    collector.flush()
+    assert len(writer.messages[python_channel]) == 3
+
+
+def test_output_collector_flushes_expired():
+    collector, writer, (channel, ) = make_collector(
+        [Language.PYTHON], batch_max_records=100, batch_max_delay_ms=50)
+    collector.collect(message.Record(0))
+    collector.flush_expired()
+    assert not writer.messages[channel]
+    time.sleep(0.1)
+    collector.flush_expired()
+    assert read_records(writer.messages[channel]) == [message.Record(0)]
+
+
+def test_output_collector_record_batches():
+    collector, writer, channels = make_collector(
+        [Language.PYTHON, Language.PYTHON, Language.JAVA],
+        partition_func=partition.KeyPartition(),
+        batch_max_records=5,
+        batch_max_delay_ms=60 * 1000)
+    batch = message.RecordBatch(np.arange(8) * 1.5, keys=np.arange(8) % 5)
+    collector.collect(batch)
+    collector.flush()
+
+    key_partition = partition.KeyPartition()
+    for i, channel in enumerate(channels):
+        expected = [
+            r for r in batch.records()
+            if key_partition.partition(r, len(channels)) == [i]
+        ]
+        items = read_records(writer.messages[channel])
+        if i < 2:
+            # Python workers get the sub batch of their partition.
+            assert all(isinstance(item, message.RecordBatch) for item in items)
+            items = [r for item in items for r in item.records()]
+        assert items == expected
+
+
+def test_output_collector_broadcasts_watermarks():
+    collector, writer, channels = make_collector(
+        [Language.PYTHON, Language.PYTHON, Language.JAVA],
+        partition_func=partition.KeyPartition())
+    collector.collect(message.KeyRecord("a", 1))
+    collector.collect(message.Watermark(10))
+    collector.flush()
+    items = [read_records(writer.messages[c]) for c in channels]
+    # Python workers get the watermark after the records, java workers
+    # don't get it.
+    assert items[0][-1] == items[1][-1] == message.Watermark(10)
+    # The record went to the channel of its key, which may be any of them.
+    assert sum(len(i) for i in items) == 3
+    assert message.Watermark(10) not in items[2]
+
+
+def test_output_collector_records_metrics():
+    metrics = TaskMetrics("job", "1-MapOperator", 0, 1000, export=False)
+    collector, writer, channels = make_collector(
+        [Language.PYTHON, Language.JAVA], metrics=metrics)
+
+    def slow_write(channel_id, item):
+        time.sleep(0.01)
+
+    writer.write = slow_write
+    for i in range(3):
+        collector.collect(message.Record(i))
+    collector.collect(message.Watermark(10))
+    collector.flush()
+    # Broadcast records count once per channel, watermarks don't count.
+    assert metrics.records_out == 6
+    assert metrics.write_blocked_s >= 0.04
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,90 @@
+from ray.streaming.runtime import metrics as streaming_metrics
+from ray.streaming.runtime.metrics import TaskMetrics
+
+
+def test_task_metrics_report():
+    metrics = TaskMetrics("job", "1-MapOperator", 0, 1000, export=False)
+    start = metrics._interval_start
+    for _ in range(98):
+        metrics.record_process_time(0.0002)
+    metrics.record_process_time(0.02)
+    metrics.record_process_time(2)
+    metrics.records_in = 300
+    metrics.records_out = 600
+    metrics.write_blocked_s = 0.5
+    metrics.read_idle_s = 3
+    assert metrics.maybe_report(start + 0.5) is None
+
+    snapshot = metrics.maybe_report(start + 2)
+    assert snapshot.records_in == 300
+    assert snapshot.records_in_per_s == 150
+    assert snapshot.records_out_per_s == 300
+    assert snapshot.process_time_p50_ms == 0.5
+    assert snapshot.process_time_p99_ms == 50
+    assert snapshot.write_blocked_ratio == 0.25
+    assert snapshot.read_idle_ratio == 1.0
+    assert len(metrics._samples) == 0
+
+    # Counters start over for the next interval.
+    snapshot = metrics.maybe_report(start + 3)
+    assert snapshot.records_in == 0
+    assert snapshot.process_time_p99_ms == 0
+
+
+def test_task_metrics_samples_process_times():
+    metrics = TaskMetrics("job", "1-MapOperator", 0, 1000, export=False)
+    for i in range(10000):
+        metrics.record_process_time(i / 1000)
+    assert len(metrics._samples) == 100
+    # Later messages are sampled too.
+    assert max(metrics._samples) > 5000
+
+
+def test_task_metrics_export(monkeypatch):
+    from ray.util import metrics as ray_metrics
+    recorded = {}
+
+    def fake_metric(metric_type):
+        class FakeMetric:
+            def __init__(self, name, *args, **kwargs):
+                self.name = name
+
+            def record(self, value, tags):
+                recorded.setdefault(self.name, (metric_type, []))[1].append(
+                    (value, tags["vertex_index"]))
+
+        return FakeMetric
+
+    for metric_type in ["Count", "Gauge", "Histogram"]:
+        monkeypatch.setattr(ray_metrics, metric_type, fake_metric(metric_type))
+    monkeypatch.setattr(streaming_metrics, "_ray_metrics", None)
+
+    metrics = TaskMetrics("job", "1-MapOperator", 3, 1000)
+    start = metrics._interval_start
+    metrics.records_in = 300
+    metrics.records_out = 600
+    metrics.record_process_time(0.002)
+    metrics.maybe_report(start + 2)
+    metrics.records_in = 100
+    metrics.maybe_report(start + 4)
+
+    # The record counts of each interval are exported, not the number of
+    # reports.
+    assert recorded["streaming_records_in"] == ("Gauge", [(300, "3"), (100,
+                                                                       "3")])
+    assert recorded["streaming_records_out"] == ("Gauge", [(600, "3"), (0,
+                                                                        "3")])
+    assert recorded["streaming_records_in_per_s"] == ("Gauge", [(150, "3"),
+                                                                (50, "3")])
+    assert recorded["streaming_process_time_ms"] == ("Histogram", [(2, "3")])
+
+
+def test_task_metrics_disabled():
+    metrics = TaskMetrics("job", "1-MapOperator", 0, 0)
+    assert metrics.maybe_report(metrics._interval_start + 100) is None
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
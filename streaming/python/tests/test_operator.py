@@ -1,5 +1,15 @@
+import pickle
+
+import numpy as np
+
 from ray.streaming import function
+from ray.streaming import message
 from ray.streaming import operator
+from ray.streaming.collector import Collector
+from ray.streaming.config import Config
+from ray.streaming.context import RuntimeContextImpl
+from ray.streaming.runtime.context_backend import MemoryContextBackend
+from ray.streaming.runtime.serialization import PythonSerializer
 from ray.streaming.operator import OperatorType
 from ray.streaming.runtime import gateway_client
 
@@ -35,3 +45,146 @@ def test_load_operator():
         [None, __name__, EmptyOperator.__name__])
     test_operator = operator.load_operator(descriptor_op_bytes)
     assert isinstance(test_operator, EmptyOperator)
+
+
+class ListCollector(Collector):
+    def __init__(self):
+        self.items = []
+
+    def collect(self, record):
+        self.items.append(record)
+
+
+def open_operator(op):
+    collector = ListCollector()
+    op.open([collector], RuntimeContextImpl(0, 0, 1))
+    return collector
+
+
+def test_create_batch_operators():
+    assert type(
+        operator.create_operator_with_func(
+            function.SimpleMapBatchesFunction(
+                lambda x: x))) is operator.MapBatchesOperator
+    assert type(
+        operator.create_operator_with_func(
+            function.SimpleFilterBatchesFunction(
+                lambda x: x))) is operator.FilterBatchesOperator
+    assert type(
+        operator.create_operator_with_func(
+            function.SimpleKeyBatchesFunction(
+                lambda x: x))) is operator.KeyByBatchesOperator
+
+
+def test_batch_operators():
+    batch_sizes = []
+
+    def map_batches(batch):
+        assert isinstance(batch, np.ndarray)
+        batch_sizes.append(len(batch))
+        return batch * 10
+
+    map_op = operator.create_operator_with_func(
+        function.SimpleMapBatchesFunction(map_batches))
+    filter_op = operator.create_operator_with_func(
+        function.SimpleFilterBatchesFunction(lambda batch: batch % 20 == 0))
+    key_op = operator.create_operator_with_func(
+        function.SimpleKeyBatchesFunction(lambda batch: batch // 100))
+    chained = operator.ChainedOperator.new_chained_operator(
+        [map_op, filter_op, key_op], [{
+            Config.BATCH_MAX_RECORDS: "4"
+        }, {}, {}])
+    collector = ListCollector()
+    chained.open([collector], RuntimeContextImpl(0, 0, 1))
+
+    # Single records are buffered until the batch is full or flushed.
+    for i in range(6):
+        chained.process_element(message.Record(i))
+    assert batch_sizes == [4]
+    chained.flush()
+    assert batch_sizes == [4, 2]
+    # Batches are passed through the chain as a whole.
+    chained.process_batch(message.RecordBatch(np.arange(10, 30)))
+    assert batch_sizes == [4, 2, 20]
+
+    assert all(
+        isinstance(item, message.RecordBatch) for item in collector.items)
+    records = [r for item in collector.items for r in item.records()]
+    assert [(r.key, r.value) for r in records] == \
+        [(v // 100, v) for v in [0, 20, 40] + list(range(100, 300, 20))]
+
+
+def test_map_batches_modifies_received_batch():
+    def map_batches(batch):
+        batch["x"] *= 2
+        return batch
+
+    map_op = operator.create_operator_with_func(
+        function.SimpleMapBatchesFunction(map_batches))
+    collector = ListCollector()
+    map_op.open([collector], RuntimeContextImpl(0, 0, 1))
+    serializer = PythonSerializer()
+    values = np.arange(1000, dtype=np.float64)
+    received = serializer.deserialize_batch(
+        serializer.serialize_batch([message.RecordBatch({
+            "x": values
+        })]))
+    map_op.process_batch(received[0])
+    assert np.array_equal(collector.items[0].values["x"], values * 2)
+
+
+def test_process_batch_with_record_operator():
+    map_op = operator.create_operator_with_func(
+        function.SimpleMapFunction(lambda x: x + 1))
+    collector = open_operator(map_op)
+    batch = message.RecordBatch({
+        "a": np.arange(3),
+        "b": np.array(["x", "y", "z"])
+    })
+    map_op.process_batch(
+        message.RecordBatch(np.arange(3), keys=np.array([1, 1, 2])))
+    assert collector.items == [message.Record(i) for i in range(1, 4)]
+
+    filter_op = operator.create_operator_with_func(
+        function.SimpleFilterBatchesFunction(lambda columns: columns["a"] > 0))
+    collector = open_operator(filter_op)
+    filter_op.process_batch(batch)
+    assert [r.value for r in collector.items[0].records()] == \
+        [{"a": 1, "b": "y"}, {"a": 2, "b": "z"}]
+
+
+def test_batch_operator_flushes_expired():
+    map_op = operator.create_operator_with_func(
+        function.SimpleMapBatchesFunction(lambda batch: batch, "list"))
+    collector = open_operator(map_op)
+    map_op.batch_max_delay_s = 60
+    map_op.process_element(message.Record(1))
+    map_op.flush_expired()
+    assert not collector.items
+    map_op.batch_max_delay_s = 0
+    map_op.flush_expired()
+    assert [r.value for r in collector.items[0].records()] == [1]
+
+
+def test_reduce_operator_checkpoint():
+    def new_reduce_operator():
+        return operator.create_operator_with_func(
+            function.SimpleReduceFunction(lambda a, b: a + b))
+
+    context_backend = MemoryContextBackend({})
+    runtime_context = RuntimeContextImpl(
+        0, 0, 1, context_backend=context_backend)
+    reduce_op = new_reduce_operator()
+    reduce_op.open([ListCollector()], runtime_context)
+    for i in range(10):
+        reduce_op.process_element(message.KeyRecord(i % 3, i))
+    runtime_context.set_checkpoint_id(1)
+    checkpoint = pickle.loads(pickle.dumps(reduce_op.save_checkpoint()))
+    reduce_op.process_element(message.KeyRecord(0, 100))
+
+    restored_op = new_reduce_operator()
+    restored_op.load_checkpoint(checkpoint)
+    collector = ListCollector()
+    restored_op.open([collector], runtime_context)
+    restored_op.process_element(message.KeyRecord(0, 1))
+    assert collector.items == [message.Record(0 + 3 + 6 + 9 + 1)]
@@ -1,5 +1,9 @@
+import numpy as np
+
+from ray.streaming.runtime.serialization import BATCH_HEADER
 from ray.streaming.runtime.serialization import CrossLangSerializer
-from ray.streaming.message import Record, KeyRecord
+from ray.streaming.runtime.serialization import PythonSerializer
+from ray.streaming.message import Record, KeyRecord, RecordBatch, Watermark
 
 
 def test_serialize():
@@ -11,3 +15,60 @@ def test_serialize():
     assert record == serializer.deserialize(serializer.serialize(record))
     assert key_record == serializer.\
         deserialize(serializer.serialize(key_record))
+
+
+def test_serialize_batch():
+    serializer = PythonSerializer()
+    records = [Record(i) for i in range(10)] + [KeyRecord("key", "value")]
+    assert records == serializer.deserialize_batch(
+        serializer.serialize_batch(records))
+    assert [] == serializer.deserialize_batch(serializer.serialize_batch([]))
+
+
+def test_serialize_batch_layouts():
+    serializer = PythonSerializer()
+    records = [KeyRecord(i % 3, str(i)) for i in range(10)]
+    records[0].stream = records[1].stream = "stream1"
+    batches = [
+        records, records[2:], [Record(i) for i in range(10)],
+        [Record(1), KeyRecord("key", "value"),
+         Watermark(10)]
+    ]
+    for batch in batches:
+        result = serializer.deserialize_batch(
+            serializer.serialize_batch(batch))
+        assert result == batch
+        assert [type(r) for r in result] == [type(r) for r in batch]
+
+
+def test_serialize_batch_out_of_band_buffers():
+    serializer = PythonSerializer()
+    values = np.arange(10000, dtype=np.float64)
+    batch = RecordBatch({"x": values, "y": values.astype(np.int32)})
+    small = np.arange(3)
+    data = serializer.serialize_batch(
+        [batch, Record(small), Record(values[::2])])
+    header = BATCH_HEADER.unpack_from(data)
+    # The contiguous columns are out-of-band, the small and the strided
+    # arrays are pickled.
+    assert header[2] == 2
+
+    result = serializer.deserialize_batch(data)
+    columns = result[0].values
+    assert np.array_equal(columns["x"], values)
+    assert np.array_equal(columns["y"], values.astype(np.int32))
+    # Columns are writable copies, which don't keep the message alive.
+    message_array = np.frombuffer(data, dtype=np.uint8)
+    assert not np.shares_memory(columns["x"], message_array)
+    assert columns["x"].flags.writeable
+    assert columns["x"].ctypes.data % 8 == 0
+    assert columns["y"].ctypes.data % 8 == 0
+    assert np.array_equal(result[1].value, small)
+    assert np.array_equal(result[2].value, values[::2])
+
+
+def test_cross_lang_serialize_numpy():
+    serializer = CrossLangSerializer()
+    record = serializer.deserialize(
+        serializer.serialize(Record([np.int64(1), np.arange(3)])))
+    assert record.value == [1, [0, 1, 2]]
@@ -0,0 +1,110 @@
+import os
+import pickle
+
+from ray.streaming.config import Config
+from ray.streaming.runtime.context_backend import MemoryContextBackend
+from ray.streaming.runtime.state_backend import KeyedStateBackend
+
+
+class RecordingContextBackend(MemoryContextBackend):
+    def __init__(self):
+        super().__init__({})
+        self.keys = set()
+        self.puts = []
+
+    def put(self, key, value):
+        super().put(key, value)
+        self.keys.add(key)
+        self.puts.append((key, value))
+
+    def remove(self, key):
+        super().remove(key)
+        self.keys.discard(key)
+
+
+def test_incremental_checkpoints():
+    context_backend = RecordingContextBackend()
+    config = {Config.STATE_SNAPSHOT_INTERVAL: "3"}
+    state = KeyedStateBackend(context_backend, "state", config)
+    for i in range(100):
+        state.put(i, i)
+    checkpoints = [state.snapshot(1)]
+    assert checkpoints[0].changelog_keys == []
+
+    state.put(1, "one")
+    state.delete(2)
+    checkpoints.append(state.snapshot(2))
+    # Only the changed keys are written.
+    key, value = context_backend.puts[-1]
+    assert checkpoints[1].changelog_keys == [key]
+    assert pickle.loads(value) == ({1: "one"}, [2])
+
+    state.put(3, "three")
+    checkpoints.append(state.snapshot(3))
+    assert len(checkpoints[2].changelog_keys) == 2
+    state.put(4, "four")
+    checkpoints.append(state.snapshot(4))
+    # A full snapshot is written every 3 checkpoints.
+    assert checkpoints[3].changelog_keys == []
+    assert checkpoints[3].snapshot_keys != checkpoints[0].snapshot_keys
+
+    restored = KeyedStateBackend(context_backend, "state", config)
+    restored.restore(checkpoints[2])
+    assert len(restored) == 99
+    assert 2 not in restored
+    assert restored.get(1) == "one"
+    assert restored.get(3) == "three"
+    assert restored.get(4) == 4
+
+    state.remove_expired(3)
+    assert context_backend.keys == set(checkpoints[3].blob_keys())
+
+    # Restored state continues the changelog chain.
+    restored.restore(checkpoints[3])
+    restored.put(5, "five")
+    checkpoint = restored.snapshot(5)
+    assert checkpoint.snapshot_keys == checkpoints[3].snapshot_keys
+    assert len(checkpoint.changelog_keys) == 1
+
+
+def test_spill_cold_keys(tmp_path):
+    context_backend = MemoryContextBackend({})
+    config = {
+        Config.STATE_MAX_MEMORY_KEYS: "10",
+        Config.STATE_SPILL_DIR: str(tmp_path)
+    }
+    state = KeyedStateBackend(context_backend, "state", config)
+    for i in range(100):
+        state.put(i, str(i))
+    assert len(state) == 100
+    assert len(state._memory) == 10
+    assert len(os.listdir(str(tmp_path))) == 1
+    assert state.get(0) == "0"
+    state.put(0, "zero")
+    state.delete(1)
+    assert 1 not in state
+    assert len(state) == 99
+    assert dict(state.items()) == {
+        i: "zero" if i == 0 else str(i)
+        for i in range(100) if i != 1
+    }
+
+    checkpoint = state.snapshot(1)
+    state.put(50, "fifty")
+    checkpoint = state.snapshot(2)
+    restored = KeyedStateBackend(context_backend, "state", config)
+    restored.restore(checkpoint)
+    assert len(restored._memory) == 10
+    assert restored.get(50) == "fifty"
+    assert restored.get(99) == "99"
+    assert len(restored) == 99
+
+    state.close()
+    restored.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,208 @@
+import os
+import time
+import types
+
+import ray
+from ray.streaming import StreamingContext
+from ray.streaming import function
+from ray.streaming import message
+from ray.streaming import operator
+from ray.streaming.collector import Collector
+from ray.streaming.config import Config
+from ray.streaming.context import RuntimeContextImpl
+from ray.streaming.runtime.task import OneInputStreamTask
+from ray.streaming.window import SlidingWindows, TimeWindow, TumblingWindows
+from ray.test_utils import wait_for_condition
+
+
+class ListCollector(Collector):
+    def __init__(self):
+        self.items = []
+
+    def collect(self, record):
+        self.items.append(record)
+
+
+class CountFunction(function.AggregateFunction):
+    def create_accumulator(self):
+        return 0
+
+    def add(self, accumulator, value):
+        return accumulator + 1
+
+    def merge(self, accumulator1, accumulator2):
+        return accumulator1 + accumulator2
+
+    def get_result(self, accumulator):
+        return accumulator
+
+
+def test_window_assigners():
+    assert TumblingWindows(10).assign_windows(25) == [TimeWindow(20, 30)]
+    assert TumblingWindows(10, offset=5).assign_windows(25) == \
+        [TimeWindow(25, 35)]
+    assert SlidingWindows(10, 5).assign_windows(27) == \
+        [TimeWindow(25, 35), TimeWindow(20, 30)]
+
+
+def test_window_combine_and_merge():
+    combine_func = function.WindowCombineFunction(
+        function.SimpleKeyFunction(lambda x: x[0]), TumblingWindows(10),
+        lambda x: x[1], CountFunction(), 5)
+    combiners = []
+    for _ in range(2):
+        combiner = operator.create_operator_with_func(combine_func)
+        assert type(combiner) is operator.WindowCombineOperator
+        collector = ListCollector()
+        combiner.open([collector], RuntimeContextImpl(0, 0, 1))
+        combiners.append((combiner, collector))
+    merger = operator.create_operator_with_func(
+        function.WindowMergeFunction(CountFunction()))
+    assert type(merger) is operator.WindowMergeOperator
+    merged = ListCollector()
+    merger.open([merged], RuntimeContextImpl(0, 0, 1))
+
+    for combiner, _ in combiners:
+        for i in range(20):
+            combiner.process_element(message.Record(("a" * (i % 2 + 1), i)))
+    # Out of order, but within max_out_of_orderness.
+    combiners[0][0].process_element(message.Record(("a", 16)))
+    # Late, window [0, 10) is closed.
+    combiners[0][0].process_element(message.Record(("a", 3)))
+    assert combiners[0][0].num_late_records == 1
+
+    # Window [0, 10) is closed by the watermark 15 - 5 and pre-aggregated.
+    # Later watermarks are not emitted until the next window end.
+    items0, items1 = [collector.items for _, collector in combiners]
+    partials = [item for item in items0 if isinstance(item, message.KeyRecord)]
+    assert sorted((r.key, r.value) for r in partials) == [
+        ("a", (TimeWindow(0, 10), 5)),
+        ("aa", (TimeWindow(0, 10), 5)),
+    ]
+    assert items0[-1] == message.Watermark(10)
+    assert items1[-1] == message.Watermark(10)
+
+    for item in items0 + items1:
+        if isinstance(item, message.KeyRecord):
+            merger.process_element(item)
+    merger.process_watermark(message.Watermark(10))
+    assert sorted(
+        r.value for r in merged.items if type(r) is message.Record) == [
+            ("a", TimeWindow(0, 10), 10),
+            ("aa", TimeWindow(0, 10), 10),
+        ]
+    assert merged.items[-1] == message.Watermark(10)
+
+    # Windows are restored from checkpoints.
+    restored = operator.create_operator_with_func(combine_func)
+    restored.load_checkpoint(combiners[0][0].save_checkpoint())
+    collector = ListCollector()
+    restored.open([collector], RuntimeContextImpl(0, 0, 1))
+    restored.process_watermark(message.Watermark(20))
+    assert sorted((r.key, r.value) for r in collector.items
+                  if isinstance(r, message.KeyRecord)) == [
+                      ("a", (TimeWindow(10, 20), 6)),
+                      ("aa", (TimeWindow(10, 20), 5)),
+                  ]
+
+
+def test_source_end_closes_windows():
+    source = operator.create_operator_with_func(
+        function.CollectionSourceFunction([("a", 1), ("a", 12)]))
+    combiner = operator.create_operator_with_func(
+        function.WindowCombineFunction(
+            function.SimpleKeyFunction(lambda x: x[0]), TumblingWindows(10),
+            lambda x: x[1], CountFunction(), 5))
+    collector = ListCollector()
+    combiner.open([collector], RuntimeContextImpl(0, 0, 1))
+    source.open([operator.ChainedOperator.ForwardCollector(combiner)],
+                RuntimeContextImpl(0, 0, 1))
+    source.fetch()
+    source.fetch()
+    # Both windows are only closed by the watermark of the finished source.
+    assert collector.items[-3:] == [
+        message.KeyRecord("a", (TimeWindow(0, 10), 1)),
+        message.KeyRecord("a", (TimeWindow(10, 20), 1)),
+        message.Watermark(message.MAX_TIMESTAMP),
+    ]
+    assert all(
+        type(item) is message.Watermark for item in collector.items[:-3])
+
+
+def test_idle_channels_skipped():
+    class WatermarkProcessor:
+        def __init__(self):
+            self.watermarks = []
+
+        def process_watermark(self, watermark):
+            self.watermarks.append(watermark.timestamp)
+
+    worker = types.SimpleNamespace(
+        worker_context=None,
+        execution_vertex_context=None,
+        config={Config.WATERMARK_IDLE_TIMEOUT_MS: "200"})
+    processor = WatermarkProcessor()
+    task = OneInputStreamTask(0, processor, worker, 0)
+    task.num_input_channels = 2
+    task.start_time = time.monotonic()
+
+    task.channel_active_times["a"] = time.monotonic()
+    task.process_watermark("a", message.Watermark(10))
+    # Channel b sent nothing yet.
+    assert processor.watermarks == []
+    time.sleep(0.3)
+    task.advance_watermark()
+    # Channel a is idle too.
+    assert processor.watermarks == []
+    task.channel_active_times["a"] = time.monotonic()
+    task.process_watermark("a", message.Watermark(20))
+    assert processor.watermarks == [20]
+
+    # An active channel holds back the watermark again.
+    task.channel_active_times["b"] = time.monotonic()
+    task.process_watermark("b", message.Watermark(15))
+    task.channel_active_times["a"] = time.monotonic()
+    task.process_watermark("a", message.Watermark(30))
+    assert processor.watermarks == [20]
+    task.channel_active_times["b"] = time.monotonic()
+    task.process_watermark("b", message.Watermark(40))
+    assert processor.watermarks == [20, 30]
+
+
+def test_window_count():
+    ray.init(_load_code_from_local=True)
+    ctx = StreamingContext.Builder().build()
+    sink_file = "/tmp/ray_streaming_test_window_count.txt"
+    if os.path.exists(sink_file):
+        os.remove(sink_file)
+
+    def sink_func(x):
+        with open(sink_file, "a") as f:
+            key, window, count = x
+            f.write("{}:{}:{},".format(key, window.start, count))
+
+    values = [("b", t) for t in range(5)] + [("a", t) for t in range(10)]
+    ctx.from_collection(values) \
+        .set_parallelism(1) \
+        .key_by(lambda x: x[0]) \
+        .window(TumblingWindows(5), lambda x: x[1]) \
+        .aggregate(CountFunction()) \
+        .sink(sink_func)
+    ctx.submit("window_count")
+
+    def check_succeed():
+        if os.path.exists(sink_file):
+            with open(sink_file, "r") as f:
+                result = f.read()
+                return "a:0:5" in result and "a:5:5" in result and \
+                    "b:0:5" in result
+        return False
+
+    wait_for_condition(check_succeed, timeout=60, retry_interval_ms=1000)
+    ray.shutdown()
+
+
+if __name__ == "__main__":
+    import pytest
+    import sys
+    sys.exit(pytest.main(["-v", __file__]))
@@ -0,0 +1,57 @@
+import collections
+from abc import ABC, abstractmethod
+
+# An event time window, including `start` and excluding `end`.
+TimeWindow = collections.namedtuple("TimeWindow", ["start", "end"])
+
+
+class WindowAssigner(ABC):
+    """Assigns the event time windows of a record."""
+
+    @abstractmethod
+    def assign_windows(self, timestamp):
+        """
+        Args:
+            timestamp: The event time of the record.
+
+        Returns:
+            The :class:`TimeWindow` list the record belongs to.
+        """
+        pass
+
+
+class TumblingWindows(WindowAssigner):
+    """
+    Assigns records to consecutive windows of `size`, which don't overlap.
+    Windows start at `offset` plus a multiple of `size`.
+    """
+
+    def __init__(self, size, offset=0):
+        assert size > 0
+        self.size = size
+        self.offset = offset
+
+    def assign_windows(self, timestamp):
+        start = timestamp - (timestamp - self.offset) % self.size
+        return [TimeWindow(start, start + self.size)]
+
+
+class SlidingWindows(WindowAssigner):
+    """
+    Assigns records to windows of `size`, which start every `slide`, so a
+    record belongs to `size / slide` windows.
+    """
+
+    def __init__(self, size, slide, offset=0):
+        assert size > 0 and slide > 0
+        self.size = size
+        self.slide = slide
+        self.offset = offset
+
+    def assign_windows(self, timestamp):
+        start = timestamp - (timestamp - self.offset) % self.slide
+        windows = []
+        while start > timestamp - self.size:
+            windows.append(TimeWindow(start, start + self.size))
+            start -= self.slide
+        return windows